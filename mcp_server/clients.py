@@ -0,0 +1,161 @@
+"""
+Pooled service clients for the MCP server.
+
+The MCP server is long-lived, so the Google Sheets client of each project
+is built and authenticated once and reused by every tool call:
+
+- project config, OAuth/Service Account auth and the worksheet list are
+  loaded once per project (the token is refreshed when it expires)
+- closed RUN sheets are immutable and are served from the client's
+  caches (see GoogleSheetsClient.get_run_records / get_run_info)
+- tool handlers do blocking gspread I/O, so they run on a small thread
+  pool instead of the MCP event loop; calls for the same project are
+  serialised, since the client is not safe for concurrent use
+
+Usage:
+    client = SHEETS_POOL.get("my-chatbot")             # blocking
+    return await run_sheets_tool(handle_list_runs, arguments)
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# How long a worksheet list is reused before asking Sheets again
+WORKSHEETS_TTL_SECONDS = 30.0
+
+
+def create_sheets_client(project: str, project_root: Path = PROJECT_ROOT):
+    """Build and authenticate a GoogleSheetsClient for a project."""
+    from src.cache import configure_caches, get_tiered_cache
+    from src.config_loader import ConfigLoader
+    from src.sheets_client import GoogleSheetsClient
+
+    loader = ConfigLoader(str(project_root))
+    project_config = loader.load_project(project)
+
+    gs_config = project_config.google_sheets
+    logger.info(f"Google Sheets enabled: {gs_config.enabled}, spreadsheet_id: {gs_config.spreadsheet_id}")
+
+    if not gs_config.enabled:
+        raise Exception(f"Google Sheets not enabled for project {project}")
+
+    # Resolve credentials path relative to project root
+    credentials_path = gs_config.credentials_path or "config/oauth_credentials.json"
+    full_credentials_path = project_root / credentials_path
+    logger.info(f"Credentials path: {full_credentials_path}, exists: {full_credentials_path.exists()}")
+
+    cache_settings = loader.load_global_settings().cache
+    configure_caches(cache_settings, project_root)
+    client = GoogleSheetsClient(
+        credentials_path=str(full_credentials_path),
+        spreadsheet_id=gs_config.spreadsheet_id,
+        drive_folder_id=gs_config.drive_folder_id,
+        cache=get_tiered_cache("sheets_runs"),
+        cache_ttl_seconds=cache_settings.sheets_ttl_seconds,
+        worksheets_ttl_seconds=WORKSHEETS_TTL_SECONDS
+    )
+
+    if not client.authenticate():
+        raise Exception("Failed to authenticate with Google Sheets")
+
+    logger.info(f"GoogleSheetsClient for {project} authenticated")
+    return client
+
+
+class SheetsClientPool:
+    """Long-lived per-project Sheets clients plus the thread pool that uses them."""
+
+    def __init__(self,
+                 factory: Callable[[str], Any] = create_sheets_client,
+                 max_workers: int = 4):
+        """
+        Args:
+            factory: Builds an authenticated client for a project
+            max_workers: Threads for blocking tool calls
+        """
+        self._factory = factory
+        self._max_workers = max(1, max_workers)
+        self._clients: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.RLock] = {}
+        self._guard = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def lock(self, project: str) -> threading.RLock:
+        """Lock serialising the use of a project's client."""
+        with self._guard:
+            return self._locks.setdefault(project or "", threading.RLock())
+
+    def get(self, project: str):
+        """
+        Authenticated client for a project (built on first use).
+
+        Raises:
+            Exception: Sheets disabled for the project or authentication failed
+        """
+        with self.lock(project):
+            client = self._clients.get(project)
+            if client is None:
+                client = self._factory(project)
+                self._clients[project] = client
+            elif not client.ensure_authenticated():
+                self._clients.pop(project, None)
+                raise Exception("Failed to authenticate with Google Sheets")
+            return client
+
+    def invalidate(self, project: Optional[str] = None) -> None:
+        """Drop one (or every) pooled client; the next call rebuilds it."""
+        with self._guard:
+            if project is None:
+                self._clients.clear()
+            else:
+                self._clients.pop(project, None)
+
+    async def run(self, project: str, fn: Callable[..., Any], *args) -> Any:
+        """Run blocking fn(*args) on the pool, holding the project lock."""
+        def call():
+            with self.lock(project):
+                return fn(*args)
+
+        with self._guard:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix="mcp-sheets"
+                )
+            executor = self._executor
+        return await asyncio.get_running_loop().run_in_executor(executor, call)
+
+    async def run_handler(self, project: str,
+                          handler: Callable[[dict], Awaitable[Any]],
+                          arguments: dict) -> Any:
+        """
+        Run a tool handler off the event loop.
+
+        Sheets-backed handlers are async only by signature: everything they
+        do is blocking, so each call gets its own short-lived loop on a
+        pool thread.
+        """
+        return await self.run(project, lambda: asyncio.run(handler(arguments)))
+
+    def shutdown(self) -> None:
+        with self._guard:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False)
+
+
+SHEETS_POOL = SheetsClientPool(max_workers=int(os.environ.get("MCP_SHEETS_WORKERS", "4")))
+
+
+async def run_sheets_tool(handler: Callable[[dict], Awaitable[Any]], arguments: dict) -> Any:
+    """Dispatch a Sheets-backed tool handler to the pool."""
+    return await SHEETS_POOL.run_handler(arguments.get("project") or "", handler, arguments)
@@ -19,6 +19,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from mcp.server import Server
 from mcp.types import Tool, TextContent
 
+from mcp_server.clients import SHEETS_POOL, run_sheets_tool
+
 logger = logging.getLogger(__name__)
 
 
@@ -1133,7 +1135,7 @@ Il trace_id si trova nella colonna LS TRACE URL dei risultati su Google Sheets."
             elif name == "list_projects":
                 return await handle_list_projects()
             elif name == "suggest_project":
-                return await handle_suggest_project()
+                return await run_sheets_tool(lambda _: handle_suggest_project(), arguments)
             elif name == "list_test_sets":
                 return await handle_list_test_sets(arguments)
             elif name == "list_tests":
@@ -1145,24 +1147,24 @@ Il trace_id si trova nella colonna LS TRACE URL dei risultati su Google Sheets."
             elif name == "get_workflow_status":
                 return await handle_get_workflow_status(arguments)
             elif name == "list_runs":
-                return await handle_list_runs(arguments)
+                return await run_sheets_tool(handle_list_runs, arguments)
             elif name == "get_run_results":
-                return await handle_get_run_results(arguments)
+                return await run_sheets_tool(handle_get_run_results, arguments)
             elif name == "get_failed_tests":
-                return await handle_get_failed_tests(arguments)
+                return await run_sheets_tool(handle_get_failed_tests, arguments)
             elif name == "compare_runs":
-                return await handle_compare_runs(arguments)
+                return await run_sheets_tool(handle_compare_runs, arguments)
             # ====== NUOVI TOOL FOOL-PROOF ======
             elif name == "start_test_session":
-                return await handle_start_test_session(arguments)
+                return await run_sheets_tool(handle_start_test_session, arguments)
             elif name == "prepare_test_run":
-                return await handle_prepare_test_run(arguments)
+                return await run_sheets_tool(handle_prepare_test_run, arguments)
             elif name == "execute_test_run":
-                return await handle_execute_test_run(arguments)
+                return await run_sheets_tool(handle_execute_test_run, arguments)
             elif name == "check_pipeline_status":
                 return await handle_check_pipeline_status(arguments)
             elif name == "show_results":
-                return await handle_show_results(arguments)
+                return await run_sheets_tool(handle_show_results, arguments)
             elif name == "add_test":
                 return await handle_add_test(arguments)
             elif name == "notify_corrado":
@@ -1171,9 +1173,9 @@ Il trace_id si trova nella colonna LS TRACE URL dei risultati su Google Sheets."
                 return await handle_novita(arguments)
             # ====== NUOVI TOOL v1.4.0 ======
             elif name == "detect_flaky_tests":
-                return await handle_detect_flaky_tests(arguments)
+                return await run_sheets_tool(handle_detect_flaky_tests, arguments)
             elif name == "get_regressions":
-                return await handle_get_regressions(arguments)
+                return await run_sheets_tool(handle_get_regressions, arguments)
             elif name == "get_performance_report":
                 return await handle_get_performance_report(arguments)
             elif name == "get_performance_alerts":
@@ -1181,13 +1183,13 @@ Il trace_id si trova nella colonna LS TRACE URL dei risultati su Google Sheets."
             elif name == "analyze_coverage":
                 return await handle_analyze_coverage(arguments)
             elif name == "get_stability_report":
-                return await handle_get_stability_report(arguments)
+                return await run_sheets_tool(handle_get_stability_report, arguments)
             elif name == "diagnose_prompt":
-                return await handle_diagnose_prompt(arguments)
+                return await run_sheets_tool(handle_diagnose_prompt, arguments)
             elif name == "calibrate_thresholds":
-                return await handle_calibrate_thresholds(arguments)
+                return await run_sheets_tool(handle_calibrate_thresholds, arguments)
             elif name == "export_report":
-                return await handle_export_report(arguments)
+                return await run_sheets_tool(handle_export_report, arguments)
             elif name == "debug_trace":
                 return await handle_debug_trace(arguments)
             else:
@@ -1413,30 +1415,31 @@ async def handle_suggest_project() -> list[TextContent]:
 
         # Try to get last RUN info
         try:
-            client = get_sheets_client(project)
-            runs = client.get_all_run_numbers()
+            # Runs under the "" lock: take this project's lock for its pooled client
+            with SHEETS_POOL.lock(project):
+                client = get_sheets_client(project)
+                runs = client.get_all_run_numbers()
 
-            if runs:
-                last_run = max(runs)
-                stats["last_run"] = last_run
+                if runs:
+                    last_run = max(runs)
+                    stats["last_run"] = last_run
 
-                # Get last run results
-                client.active_run = last_run
-                results = client.get_all_results()
+                    # Get last run results
+                    results = client.get_run_records(last_run)
 
-                if results:
-                    passed = sum(1 for r in results if get_field(r, "esito").upper() == "PASS")
-                    failed = sum(1 for r in results if get_field(r, "esito").upper() == "FAIL")
-                    pending = total_tests - passed - failed
+                    if results:
+                        passed = sum(1 for r in results if get_field(r, "esito").upper() == "PASS")
+                        failed = sum(1 for r in results if get_field(r, "esito").upper() == "FAIL")
+                        pending = total_tests - passed - failed
 
-                    stats["pass_rate"] = (passed / len(results) * 100) if results else 0
-                    stats["pending"] = pending
-                    stats["failed"] = failed
+                        stats["pass_rate"] = (passed / len(results) * 100) if results else 0
+                        stats["pending"] = pending
+                        stats["failed"] = failed
 
-                    # Get run info for date
-                    run_info = client.get_run_info(last_run)
-                    if run_info:
-                        stats["last_run_date"] = run_info.get("timestamp", "?")
+                        # Get run info for date
+                        run_info = client.get_run_info(last_run)
+                        if run_info:
+                            stats["last_run_date"] = run_info.get("timestamp", "?")
 
         except Exception as e:
             logger.warning(f"Could not get stats for {project}: {e}")
@@ -1901,48 +1904,8 @@ async def handle_get_workflow_status(arguments: dict) -> list[TextContent]:
 
 
 def get_sheets_client(project: str):
-    """Get a GoogleSheetsClient for a project."""
-    from src.sheets_client import GoogleSheetsClient
-    from src.config_loader import ConfigLoader
-    from pathlib import Path
-
-    logger.info(f"get_sheets_client called for project: {project}")
-
-    # Load project configuration
-    project_root = Path(__file__).parent.parent
-    logger.info(f"Project root: {project_root}")
-
-    loader = ConfigLoader(str(project_root))
-    logger.info(f"ConfigLoader created")
-
-    project_config = loader.load_project(project)
-    logger.info(f"Project config loaded: {project_config.name}")
-
-    # Get Google Sheets config
-    gs_config = project_config.google_sheets
-    logger.info(f"Google Sheets enabled: {gs_config.enabled}, spreadsheet_id: {gs_config.spreadsheet_id}")
-
-    if not gs_config.enabled:
-        raise Exception(f"Google Sheets not enabled for project {project}")
-
-    # Resolve credentials path relative to project root
-    credentials_path = gs_config.credentials_path or "config/oauth_credentials.json"
-    full_credentials_path = project_root / credentials_path
-    logger.info(f"Credentials path: {full_credentials_path}, exists: {full_credentials_path.exists()}")
-
-    client = GoogleSheetsClient(
-        credentials_path=str(full_credentials_path),
-        spreadsheet_id=gs_config.spreadsheet_id,
-        drive_folder_id=gs_config.drive_folder_id
-    )
-    logger.info("GoogleSheetsClient created, authenticating...")
-
-    # Authenticate
-    if not client.authenticate():
-        raise Exception("Failed to authenticate with Google Sheets")
-
-    logger.info("Authentication successful")
-    return client
+    """Get the pooled, authenticated GoogleSheetsClient for a project."""
+    return SHEETS_POOL.get(project)
 
 
 async def handle_list_runs(arguments: dict) -> list[TextContent]:
@@ -2022,8 +1985,7 @@ async def handle_get_run_results(arguments: dict) -> list[TextContent]:
             return [TextContent(type="text", text=f"RUN {run_number} non trovata nel foglio Google Sheets.")]
 
         sheet_name = worksheet.title
-        client._worksheet = worksheet
-        results = client.get_all_results()
+        results = client.get_run_records(run_number)
 
         if not results:
             return [TextContent(type="text", text=f"Nessun dato trovato per RUN {run_number} (foglio: {sheet_name}).")]
@@ -2117,8 +2079,7 @@ async def handle_get_failed_tests(arguments: dict) -> list[TextContent]:
         if not worksheet:
             return [TextContent(type="text", text=f"RUN {run_number} non trovata nel foglio Google Sheets.")]
 
-        client._worksheet = worksheet
-        results = client.get_all_results()
+        results = client.get_run_records(run_number)
 
         # Filter failed tests
         failed_tests = [r for r in results if get_field(r, "esito").upper() == "FAIL"]
@@ -2255,8 +2216,7 @@ async def handle_start_test_session(arguments: dict) -> list[TextContent]:
         try:
             if current_run > 0:
                 client = get_sheets_client(project)
-                client.active_run = current_run
-                results = client.get_all_results()
+                results = client.get_run_records(current_run)
 
                 # Filter results for this test set
                 prefix = "PARA_" if name == "paraphrase" else "GRD_" if name == "ggp" else "TEST_"
@@ -2321,8 +2281,7 @@ async def handle_prepare_test_run(arguments: dict) -> list[TextContent]:
         current_run = run_config.get("active_run", 0)
         if current_run > 0:
             client = get_sheets_client(project)
-            client.active_run = current_run
-            results = client.get_all_results()
+            results = client.get_run_records(current_run)
             executed_ids = {r.get("test_id") for r in results if r.get("test_id")}
             failed_ids = {r.get("test_id") for r in results
                          if get_field(r, "esito").upper() == "FAIL"}
@@ -2408,8 +2367,7 @@ async def handle_execute_test_run(arguments: dict) -> list[TextContent]:
         current_run = run_config.get("active_run", 0)
         if current_run > 0 and tests_filter in ["pending", "failed"]:
             client = get_sheets_client(project)
-            client.active_run = current_run
-            results = client.get_all_results()
+            results = client.get_run_records(current_run)
             executed_ids = {r.get("test_id") for r in results if r.get("test_id")}
             failed_ids = {r.get("test_id") for r in results
                          if get_field(r, "esito").upper() == "FAIL"}
@@ -2561,8 +2519,7 @@ async def handle_show_results(arguments: dict) -> list[TextContent]:
         if not worksheet:
             return [TextContent(type="text", text=f"RUN {run_number} non trovata nel foglio Google Sheets.")]
 
-        client._worksheet = worksheet
-        results = client.get_all_results()
+        results = client.get_run_records(run_number)
 
         if not results:
             return [TextContent(type="text", text=f"Nessun risultato trovato per RUN {run_number}.")]
@@ -2856,7 +2813,7 @@ async def handle_detect_flaky_tests(arguments: dict) -> list[TextContent]:
 
     try:
         client = get_sheets_client(project)
-        comparator = RunComparator(client)
+        comparator = RunComparator(client, local_reports_path=PROJECTS_DIR.parent / "reports" / project)
         detector = FlakyTestDetector(comparator)
 
         flaky_tests = detector.detect_flaky_tests(
@@ -2907,7 +2864,7 @@ async def handle_get_regressions(arguments: dict) -> list[TextContent]:
                 return [TextContent(type="text", text="Nessuna RUN trovata.")]
             run_number = max(runs)
 
-        comparator = RunComparator(client)
+        comparator = RunComparator(client, local_reports_path=PROJECTS_DIR.parent / "reports" / project)
         detector = RegressionDetector(comparator)
 
         regressions = detector.check_for_regressions(new_run=run_number)
@@ -3087,7 +3044,7 @@ async def handle_get_stability_report(arguments: dict) -> list[TextContent]:
 
     try:
         client = get_sheets_client(project)
-        comparator = RunComparator(client)
+        comparator = RunComparator(client, local_reports_path=PROJECTS_DIR.parent / "reports" / project)
         detector = FlakyTestDetector(comparator)
 
         report = detector.get_stability_report(last_n_runs=last_n_runs)
@@ -3141,8 +3098,7 @@ async def handle_diagnose_prompt(arguments: dict) -> list[TextContent]:
         if not worksheet:
             return [TextContent(type="text", text=f"RUN {run_number} non trovata.")]
 
-        client._worksheet = worksheet
-        results = client.get_all_results()
+        results = client.get_run_records(run_number)
 
         # Filter failed tests
         failed_tests = [r for r in results if get_field(r, "esito").upper() == "FAIL"]
@@ -3219,8 +3175,7 @@ async def handle_calibrate_thresholds(arguments: dict) -> list[TextContent]:
         for run_num in sorted(runs, reverse=True)[:last_n_runs]:
             worksheet = client.get_run_sheet(run_num)
             if worksheet:
-                client._worksheet = worksheet
-                results = client.get_all_results()
+                results = client.get_run_records(run_num)
                 runs_analyzed.append(run_num)
 
                 for r in results:
@@ -3299,8 +3254,7 @@ async def handle_export_report(arguments: dict) -> list[TextContent]:
         if not worksheet:
             return [TextContent(type="text", text=f"RUN {run_number} non trovata.")]
 
-        client._worksheet = worksheet
-        results = client.get_all_results()
+        results = client.get_run_records(run_number)
 
         # Create report dir
         reports_dir = Path(__file__).parent.parent / "reports" / project / f"run_{run_number}" / "exports"
@@ -3443,11 +3397,10 @@ async def handle_debug_trace(arguments: dict) -> list[TextContent]:
         if not trace:
             return [TextContent(type="text", text=f"❌ Trace '{trace_id}' non trovato.\n\nVerifica che l'ID sia corretto e che il trace esista nel progetto LangSmith.")]
 
-        # Analizza
-        analysis = client.analyze_trace(trace)
-
-        # Ottieni child runs per errori dettagliati
-        child_runs = client.get_child_runs(trace_id)
+        # Un solo fetch dei run, riusato per analisi ed errori dettagliati
+        bundle = client.fetch_trace_bundle(trace_id)
+        analysis = client.analyze_trace(trace, bundle)
+        child_runs = bundle.runs
 
         # Formatta output
         output = []
@@ -14,30 +14,50 @@ Usage:
     python run.py --help                   # Aiuto
 """
 
-import asyncio
+from __future__ import annotations
+
 import argparse
 import os
 import sys
 import yaml
+from dataclasses import replace
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 # Aggiungi src al path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src.config_loader import ConfigLoader, ProjectConfig, RunConfig
-from src.tester import ChatbotTester, TestMode
-from src.ui import ConsoleUI, MenuItem, MenuAction, MenuSection, get_ui
+# Solo moduli leggeri all'avvio: --help, --version e gli errori di
+# argparse non devono pagare Rich, Playwright o i client Google.
+# UI e config sono caricati da load_core() dopo il parsing; gli altri
+# moduli (tester, health, cloud, dashboard...) dal comando che li usa.
 from src.i18n import get_i18n, set_language, t
-from src.health import HealthChecker, ServiceStatus
-from src.circleci_client import CircleCIClient
 from src.cli_utils import (
     ExitCode, suggest_project, NextSteps,
     confirm_action, ConfirmLevel, handle_keyboard_interrupt,
     print_startup_feedback
 )
-from src.dashboard import run_dashboard
+
+if TYPE_CHECKING:
+    from src.circleci_client import CircleCIClient
+    from src.config_loader import ConfigLoader, ProjectConfig, RunConfig
+    from src.tester import TestMode
+    from src.ui import ConsoleUI, MenuAction, MenuItem, MenuSection, get_ui
+
+
+def load_core() -> None:
+    """
+    Carica UI (Rich) e config nel namespace del modulo.
+
+    Chiamato da main() dopo il parsing degli argomenti; idempotente.
+    """
+    global ConfigLoader, ProjectConfig, RunConfig
+    global ConsoleUI, MenuItem, MenuAction, MenuSection, get_ui
+
+    from src.config_loader import ConfigLoader, ProjectConfig, RunConfig
+    from src.ui import ConsoleUI, MenuAction, MenuItem, MenuSection, get_ui
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # HELPER: Project validation with suggestions
@@ -153,6 +173,8 @@ def _generate_unique_shortcuts(projects: list) -> dict:
 
 def build_menu_sections(loader: ConfigLoader) -> list:
     """Costruisce le sezioni del menu accordion."""
+    from src.circleci_client import CircleCIClient
+
     projects = loader.list_projects()
 
     # Verifica disponibilità cloud
@@ -456,6 +478,8 @@ async def handle_run_shortcut(ui: ConsoleUI, loader: ConfigLoader, project_name:
             return
 
         # Esegui
+        from src.tester import ChatbotTester, TestMode
+
         tester = ChatbotTester(
             project=project,
             mode=TestMode[mode.upper()],
@@ -600,6 +624,27 @@ Documentazione: https://github.com/user/chatbot-tester
         action='store_true',
         help='Salta cattura screenshot'
     )
+    test_group.add_argument(
+        '--batch',
+        type=str,
+        default='',
+        metavar='PROJECTS',
+        help='Esegue piu progetti nello stesso processo (es: silicon-a,silicon-b); test da --test-ids'
+    )
+    test_group.add_argument(
+        '--batch-file',
+        type=str,
+        default='',
+        metavar='FILE',
+        help='Matrice batch YAML progetto -> lista test'
+    )
+    test_group.add_argument(
+        '--batch-concurrency',
+        type=int,
+        default=0,
+        metavar='N',
+        help='Progetti del batch in esecuzione contemporanea (default: tutti)'
+    )
 
     # ═══════════════════════════════════════════════════════════════════
     # Analisi
@@ -977,22 +1022,14 @@ Documentazione: https://github.com/user/chatbot-tester
     return args
 
 
-def run_health_check(project: ProjectConfig = None, settings = None) -> bool:
-    """
-    Esegue health check di tutti i servizi.
-
-    Args:
-        project: Configurazione progetto (opzionale)
-        settings: Settings globali (opzionale)
-
-    Returns:
-        True se tutti i servizi critici sono OK
-    """
-    ui = get_ui()
-    ui.section("Health Check")
-
+def _health_checker(project: ProjectConfig = None, settings = None):
+    """HealthChecker configurato per progetto/settings (cache condivisa su disco)"""
     # Carica .env per avere le variabili d'ambiente
     from dotenv import load_dotenv
+
+    from src.cache import configure_caches, get_cache_directory
+    from src.health import HealthChecker
+
     env_path = Path(__file__).parent / "config" / ".env"
     if env_path.exists():
         load_dotenv(env_path)
@@ -1015,14 +1052,30 @@ def run_health_check(project: ProjectConfig = None, settings = None) -> bool:
     elif project and hasattr(project, 'google_sheets') and hasattr(project.google_sheets, 'credentials_path'):
         google_creds = str(project.google_sheets.credentials_path or '')
 
-    checker = HealthChecker(
+    # Risultati condivisi con i processi fratelli (scheduler, batch, CI)
+    cache_path = None
+    cache_ttl = 30
+    if settings and hasattr(settings, 'cache'):
+        configure_caches(settings.cache)
+        cache_dir = get_cache_directory()
+        if cache_dir:
+            cache_path = cache_dir / "health.json"
+            cache_ttl = settings.cache.health_ttl_seconds
+
+    return HealthChecker(
         chatbot_url=chatbot_url,
         langsmith_api_key=langsmith_key,
-        google_credentials_path=google_creds
+        google_credentials_path=google_creds,
+        cache_ttl=cache_ttl,
+        cache_path=cache_path
     )
 
-    # Esegui check
-    health = checker.check_all(force=True)
+
+def _report_health(health) -> bool:
+    """Mostra i risultati; True se i servizi critici sono OK"""
+    from src.health import ServiceStatus
+
+    ui = get_ui()
 
     # Mostra risultati
     status_icons = {
@@ -1060,6 +1113,48 @@ def run_health_check(project: ProjectConfig = None, settings = None) -> bool:
     return True
 
 
+def run_health_check(project: ProjectConfig = None, settings = None, force: bool = False) -> bool:
+    """
+    Esegue health check di tutti i servizi (in parallelo).
+
+    Args:
+        project: Configurazione progetto (opzionale)
+        settings: Settings globali (opzionale)
+        force: Ignora i risultati in cache (anche quelli dei processi fratelli)
+
+    Returns:
+        True se tutti i servizi critici sono OK
+    """
+    get_ui().section("Health Check")
+    checker = _health_checker(project, settings)
+    return _report_health(checker.check_all(force=force))
+
+
+async def run_health_check_warm(project: ProjectConfig, settings) -> tuple:
+    """
+    Health check prima di una sessione, in modalità warm.
+
+    Il probe browser avvia il Chromium della sessione (in parallelo agli
+    altri probe) invece di limitarsi a verificare Playwright: se il check
+    passa, il browser va passato a run_test_session(browser=...).
+
+    Returns:
+        (True se i servizi critici sono OK, browser avviato o None)
+    """
+    from src.tester import launch_browser
+
+    get_ui().section("Health Check")
+    checker = _health_checker(project, settings)
+    health = await checker.acheck_all(warm_browser=lambda: launch_browser(project, settings))
+
+    if not _report_health(health):
+        if checker.warm_browser:
+            await checker.warm_browser.stop()
+        return False, None
+
+    return True, checker.warm_browser
+
+
 def show_main_menu(ui: ConsoleUI, loader: ConfigLoader) -> str:
     """Mostra menu principale e ritorna scelta"""
     projects = loader.list_projects()
@@ -1072,6 +1167,7 @@ def show_main_menu(ui: ConsoleUI, loader: ConfigLoader) -> str:
     project_desc = t('main_menu.open_project_desc').format(count=len(projects)) if projects else t('main_menu.open_project_empty')
 
     # Verifica disponibilita cloud execution (CircleCI)
+    from src.circleci_client import CircleCIClient
     ci_client = CircleCIClient()
     cloud_available = ci_client.is_available()
     cloud_desc = "Lancia test senza browser locale" if cloud_available else "Richiede: export CIRCLECI_TOKEN=..."
@@ -1426,6 +1522,8 @@ def toggle_options_interactive(ui: ConsoleUI, run_config: RunConfig) -> bool:
 
 def show_cloud_menu(ui: ConsoleUI, loader: ConfigLoader) -> None:
     """Menu per esecuzione test nel cloud (CircleCI)"""
+    from src.circleci_client import CircleCIClient
+
     ci_client = CircleCIClient()
 
     if not ci_client.is_available():
@@ -2064,6 +2162,7 @@ def show_analysis_menu(ui: ConsoleUI, loader: ConfigLoader) -> None:
         FlakyTestDetector, format_comparison_report
     )
     from src.sheets_client import GoogleSheetsClient
+    from src.cache import configure_caches, get_tiered_cache
 
     # Seleziona progetto
     project_name = show_project_menu(ui, loader)
@@ -2082,11 +2181,15 @@ def show_analysis_menu(ui: ConsoleUI, loader: ConfigLoader) -> None:
 
     if project.google_sheets.enabled:
         try:
+            cache_settings = loader.load_global_settings().cache
+            configure_caches(cache_settings, loader.base_dir)
             credentials_path = str(Path("config/credentials.json"))
             sheets_client = GoogleSheetsClient(
                 credentials_path=credentials_path,
                 spreadsheet_id=project.google_sheets.spreadsheet_id,
-                drive_folder_id=project.google_sheets.drive_folder_id
+                drive_folder_id=project.google_sheets.drive_folder_id,
+                cache=get_tiered_cache("sheets_runs"),
+                cache_ttl_seconds=cache_settings.sheets_ttl_seconds
             )
             ui.info(f"Connesso a Google Sheets")
         except Exception as e:
@@ -3193,9 +3296,24 @@ async def run_test_session(
     workers: int = 3,
     prompt_version: str = '',
     sheet_prefix: str = 'Run',
-    skip_screenshots: bool = False
+    skip_screenshots: bool = False,
+    browser=None
 ):
-    """Esegue una sessione di test (sequenziale o parallela)"""
+    """
+    Esegue una sessione di test (sequenziale o parallela).
+
+    Args:
+        browser: Browser già avviato (probe warm dell'health check) da
+            passare al tester invece di avviarne uno nuovo
+
+    Returns:
+        Risultati dei test eseguiti ([] se nessun test da eseguire),
+        None se la sessione non è partita
+    """
+    import asyncio
+
+    from src.tester import ChatbotTester, TestMode
+
     ui = get_ui()
 
     def on_status(msg):
@@ -3233,7 +3351,8 @@ async def run_test_session(
         dry_run=run_config.dry_run,
         use_langsmith=run_config.use_langsmith,
         single_turn=run_config.single_turn,
-        run_config=run_config
+        run_config=run_config,
+        browser=browser
     )
 
     try:
@@ -3261,6 +3380,14 @@ async def run_test_session(
                 completed_count = len(tester.sheets.get_completed_tests())
                 ui.print(f"   {t('test_execution.sheets_completed').format(count=completed_count)}")
 
+        # Senza Sheets la RUN è locale: numero dalla cartella report, valido
+        # solo per questa sessione (non salvato, la prossima ne apre una nuova)
+        from src.journal import RunJournal
+        local_run = not run_config.active_run
+        if local_run:
+            run_config.active_run = int(ConfigLoader().get_report_dir(project.name).name.replace('run_', ''))
+        journal = RunJournal(ConfigLoader().get_report_dir(project.name, run_config.active_run) / RunJournal.FILENAME)
+
         # Naviga al chatbot
         if not await tester.navigate_to_chatbot():
             ui.error(t('test_execution.chatbot_unreachable'))
@@ -3281,7 +3408,7 @@ async def run_test_session(
             tests = [tc for tc in all_tests if tc.id in test_id_list]
             if not tests:
                 ui.error(f"Nessun test trovato per gli ID specificati: {test_ids}")
-                return
+                return None
             ui.info(f"Esecuzione di {len(tests)} test specifici")
         elif test_filter == 'select':
             # Selezione interattiva
@@ -3293,9 +3420,12 @@ async def run_test_session(
             tests = all_tests
 
         # Filtra pending se richiesto
-        if test_filter == 'pending' and tester.sheets:
-            # Filtra solo test non completati in questa RUN
-            completed = tester.sheets.get_completed_tests()
+        if test_filter == 'pending':
+            # Filtra solo test non completati in questa RUN: il journal locale
+            # basta, Sheets solo se la RUN è stata eseguita altrove
+            completed = journal.completed_ids()
+            if not completed and tester.sheets:
+                completed = tester.sheets.get_completed_tests()
             tests = [tc for tc in tests if tc.id not in completed]
         elif test_filter == 'failed':
             # TODO: implementare filtro failed
@@ -3309,7 +3439,7 @@ async def run_test_session(
 
         if not tests:
             ui.info(t('test_execution.no_tests'))
-            return
+            return []
 
         ui.section(t('test_execution.running').format(count=len(tests), mode=mode.value))
 
@@ -3321,54 +3451,49 @@ async def run_test_session(
             # Esecuzione parallela con multi-browser
             ui.info(f"Esecuzione parallela con {workers} browser")
             from src.parallel import ParallelTestRunner, ParallelConfig
-            from src.browser import BrowserSettings, ChatbotSelectors
-            from src.sheets_client import ThreadSafeSheetsClient
-
-            # Wrap sheets client per thread safety
-            safe_sheets = ThreadSafeSheetsClient(tester.sheets) if tester.sheets else None
-
-            # Crea settings browser per parallel runner
-            browser_settings = BrowserSettings(
-                headless=settings.browser.headless,
-                viewport_width=settings.browser.viewport_width,
-                viewport_height=settings.browser.viewport_height,
-                device_scale_factor=settings.browser.device_scale_factor,
-                user_data_dir=project.browser_data_dir,
-                timeout_page_load=project.chatbot.timeouts.page_load,
-                timeout_bot_response=project.chatbot.timeouts.bot_response
-            )
+            from src.tester import browser_config
 
-            selectors = ChatbotSelectors(
-                textarea=project.chatbot.selectors.textarea,
-                submit_button=project.chatbot.selectors.submit_button,
-                bot_messages=project.chatbot.selectors.bot_messages,
-                thread_container=project.chatbot.selectors.thread_container,
-                loading_indicator=project.chatbot.selectors.loading_indicator
-            )
+            # Stessi settings/selettori del browser della sessione
+            browser_settings, selectors = browser_config(project, settings)
 
-            parallel_config = ParallelConfig(
-                max_workers=workers,
-                retry_strategy=settings.get('parallel', {}).get('retry_strategy', 'exponential') if hasattr(settings, 'get') else 'exponential',
-                max_retries=settings.get('parallel', {}).get('max_retries', 2) if hasattr(settings, 'get') else 2,
-                base_delay_ms=settings.get('parallel', {}).get('base_delay_ms', 1000) if hasattr(settings, 'get') else 1000,
-                rate_limit_per_minute=settings.get('parallel', {}).get('rate_limit_per_minute', 60) if hasattr(settings, 'get') else 60
-            )
+            parallel_config = ParallelConfig.from_settings(settings.parallel, max_workers=workers)
 
             def on_parallel_progress(completed, total, test_id):
                 ui.print(f"  [{completed}/{total}] {test_id}", "dim")
 
-            # Crea report per screenshots (normalmente creato in run_auto_session)
-            from src.config_loader import ConfigLoader
+            # Crea report per screenshots e journal (normalmente creato in run_auto_session)
             from src.report_local import ReportGenerator
 
             loader = ConfigLoader()
-            run_number = run_config.active_run if run_config else 1
+            run_number = run_config.active_run
             report_dir = loader.get_report_dir(project.name, run_number)
             tester.report = ReportGenerator(report_dir, project.name)
             tester.report.mode = "AUTO"
 
+            # Ogni test completato va subito nel journal; le righe Sheets
+            # vengono scritte in batch a fine run (e riprese se il run muore)
+            tester.current_mode = TestMode.AUTO
+            tester.executor.ctx.current_mode = TestMode.AUTO
+            tester.executor.report = tester.report
+            tester.executor.start_sheets_writer()
+
+            def on_parallel_complete(result):
+                tester.executor.persist(result, sync_sheets=False, sheets_verdict=False)
+
             print(f"DEBUG: report_dir={report_dir}")
 
+            from src.performance import (
+                PerformanceCollector,
+                PerformanceHistory,
+                PerformanceReporter,
+            )
+            from src.scheduling import DurationEstimator
+            perf_collector = PerformanceCollector(
+                run_id=str(run_number),
+                project=project.name,
+                environment="cloud" if settings.browser.headless else "local"
+            )
+
             runner = ParallelTestRunner(
                 browser_settings=browser_settings,
                 selectors=selectors,
@@ -3376,9 +3501,16 @@ async def run_test_session(
                 ollama_client=tester.ollama,
                 langsmith_client=tester.langsmith,
                 on_progress=on_parallel_progress,
+                on_test_complete=on_parallel_complete,
                 report_dir=report_dir,
                 run_config=run_config,
-                screenshot_css=getattr(project.chatbot, 'screenshot_css', '')
+                screenshot_css=getattr(project.chatbot, 'screenshot_css', ''),
+                evaluator=tester.evaluator,
+                pipeline_settings=tester.settings.pipeline,
+                perf_collector=perf_collector,
+                duration_estimator=DurationEstimator.from_history(project.name, Path("reports")),
+                baselines=tester.baselines_cache,
+                settings=tester.settings
             )
 
             parallel_result = await runner.run(
@@ -3387,6 +3519,12 @@ async def run_test_session(
                 single_turn=run_config.single_turn
             )
 
+            # Metriche performance (incluse le decisioni della concorrenza adattiva)
+            run_metrics = perf_collector.finalize()
+            perf_collector.save(report_dir / "performance")
+            PerformanceHistory(project.name, Path("reports")).save_run(run_metrics)
+            ui.print(PerformanceReporter(run_metrics).generate_summary())
+
             # DEBUG: risultati parallel
             print(f"DEBUG: parallel_result.completed={parallel_result.completed}, "
                   f"passed={parallel_result.passed}, failed={parallel_result.failed}, "
@@ -3396,55 +3534,15 @@ async def run_test_session(
             results = parallel_result.results
             print(f"DEBUG: results count={len(results)}")
 
-            # Scrivi risultati su Sheets (converti TestExecution -> TestResult)
-            if safe_sheets:
-                from src.sheets_client import TestResult
-                from datetime import datetime
-                from pathlib import Path
-
-                print(f"DEBUG: writing {len(results)} results to sheets")
-                date_str = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-
-                for result in results:
-                    # Formatta conversazione (identico al sequenziale)
-                    conv_str = "\n".join([
-                        f"{'USER' if t.role == 'user' else 'BOT'}: {t.content}"
-                        for t in result.conversation
-                    ])
-
-                    # Upload screenshot se presente
-                    screenshot_urls = None
-                    if result.screenshot_path:
-                        try:
-                            screenshot_urls = safe_sheets.client.upload_screenshot(
-                                Path(result.screenshot_path),
-                                result.test_case.id
-                            )
-                        except Exception as e:
-                            print(f"  Screenshot upload error for {result.test_case.id}: {e}")
-
-                    # Converti TestExecution -> TestResult (identico al sequenziale)
-                    test_result = TestResult(
-                        test_id=result.test_case.id,
-                        date=date_str,
-                        mode=mode.value.upper(),
-                        question=result.test_case.question,
-                        conversation=conv_str[:5000],
-                        screenshot_urls=screenshot_urls,
-                        prompt_version=result.prompt_version,
-                        model_version=result.model_version,
-                        vector_store=result.vector_store,
-                        environment=run_config.env if run_config else "DEV",
-                        result="",  # Vuoto - compilato dal reviewer
-                        notes=result.test_case.notes,  # Note predefinite (es. intent)
-                        langsmith_report=result.langsmith_report,
-                        langsmith_url=result.langsmith_url,
-                        timing=result.timing
-                    )
-                    safe_sheets.queue_result(test_result)
-
-                safe_sheets.flush()
-                print("DEBUG: flush completed")
+            # Scrivi su Sheets le righe ancora in coda (o, senza writer, quelle del journal)
+            if tester.sheets:
+                if await asyncio.to_thread(tester.executor.stop_sheets_writer) is None:
+                    written = tester.executor.sync_pending_sheets()
+                    print(f"DEBUG: {written} results written to sheets")
+
+            report_paths = tester.report.generate()
+            tester.report.journal.close()
+            ui.print(f"Report: {report_paths['html']}")
 
         elif mode == TestMode.TRAIN:
             results = await tester.run_train_session(tests, skip_completed=False)
@@ -3457,7 +3555,10 @@ async def run_test_session(
         run_config.tests_completed += len(results)
         if results:
             run_config.last_test_id = results[-1].test_case.id
-        run_config.save(project.run_config_file)
+        if local_run:
+            replace(run_config, active_run=None).save(project.run_config_file)
+        else:
+            run_config.save(project.run_config_file)
 
         # Cleanup automatico dei vecchi report
         # Carica cleanup config direttamente dal YAML (non è in GlobalSettings dataclass)
@@ -3532,12 +3633,16 @@ async def run_test_session(
                     diagnose_model = 'generic'
                 run_diagnose_command(DiagnoseArgs())
 
+        return results
+
     finally:
         await tester.shutdown()
 
 
 async def main_interactive(args):
     """Modalità interattiva con dashboard multi-panel"""
+    from src.dashboard import run_dashboard
+
     set_language(args.lang)
     ui = get_ui()
     loader = ConfigLoader()
@@ -3588,6 +3693,7 @@ async def main_direct(args):
 
     # --cloud: esegui su CircleCI invece che localmente
     if args.cloud:
+        from src.circleci_client import CircleCIClient
         ci_client = CircleCIClient()
         if not ci_client.is_available():
             ui.error("CircleCI non configurato. Imposta CIRCLECI_TOKEN.")
@@ -3636,17 +3742,21 @@ async def main_direct(args):
                 ui.error(f"Test file '{args.tests_file}' non trovato in {project.project_dir}")
                 return
 
-        # Health check pre-esecuzione (skip con --skip-health-check)
+        # Override headless se specificato (prima del probe warm)
+        if args.headless:
+            settings.browser.headless = True
+
+        # Health check pre-esecuzione (skip con --skip-health-check): il
+        # Chromium avviato dal probe viene riusato dalla sessione
+        browser = None
         if not args.skip_health_check:
-            if not run_health_check(project, settings):
+            ok, browser = await run_health_check_warm(project, settings)
+            if not ok:
                 ui.error("Health check fallito. Usa --skip-health-check per forzare.")
                 return
 
-        # Override headless se specificato
-        if args.headless:
-            settings.browser.headless = True
-
         # Determina modalità
+        from src.tester import TestMode
         mode_map = {'train': TestMode.TRAIN, 'assisted': TestMode.ASSISTED, 'auto': TestMode.AUTO}
         mode = mode_map.get(args.mode, TestMode.TRAIN)
 
@@ -3665,7 +3775,8 @@ async def main_direct(args):
             workers=args.workers,
             prompt_version=args.prompt_version or '',
             sheet_prefix=args.sheet_prefix,
-            skip_screenshots=args.skip_screenshots
+            skip_screenshots=args.skip_screenshots,
+            browser=browser
         )
 
     except FileNotFoundError:
@@ -3677,6 +3788,94 @@ async def main_direct(args):
             traceback.print_exc()
 
 
+async def run_batch_sessions(targets: list, settings, args):
+    """
+    Esegue una matrice progetto -> test in un solo processo.
+
+    Ogni progetto apre una sola sessione AUTO (browser, login, client e
+    foglio RUN) per tutti i suoi test; i progetti girano in concorrenza.
+
+    Returns:
+        BatchResult
+    """
+    from src.batch import run_batch
+    from src.tester import TestMode
+
+    ui = get_ui()
+    loader = ConfigLoader()
+
+    async def run_project(target):
+        project = loader.load_project(target.project)
+
+        browser = None
+        if not args.skip_health_check:
+            ok, browser = await run_health_check_warm(project, settings)
+            if not ok:
+                raise RuntimeError("health check fallito")
+
+        ui.info(f"[{target.project}] {len(target.test_ids) or 'tutti i'} test")
+        return await run_test_session(
+            project,
+            settings,
+            TestMode.AUTO,
+            test_filter=args.tests,
+            force_new_run=args.new_run,
+            no_interactive=True,
+            single_turn=args.single_turn,
+            test_limit=args.test_limit or 0,
+            test_ids=','.join(target.test_ids),
+            parallel=args.parallel,
+            workers=args.workers,
+            prompt_version=args.prompt_version or '',
+            sheet_prefix=args.sheet_prefix,
+            skip_screenshots=args.skip_screenshots,
+            browser=browser
+        )
+
+    return await run_batch(targets, run_project, max_projects=args.batch_concurrency)
+
+
+def run_batch_command(args) -> int:
+    """Gestisce --batch / --batch-file; ritorna l'exit code"""
+    import asyncio
+
+    from src.batch import build_batch_matrix, load_batch_matrix
+
+    set_language(args.lang)
+    ui = get_ui()
+    loader = ConfigLoader()
+
+    try:
+        if args.batch_file:
+            targets = load_batch_matrix(Path(args.batch_file))
+        else:
+            targets = build_batch_matrix(args.batch, args.test_ids)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        ui.error(f"Matrice batch non valida: {e}")
+        return ExitCode.USAGE_ERROR
+
+    if not targets:
+        ui.error("Nessun progetto nel batch")
+        return ExitCode.USAGE_ERROR
+    for target in targets:
+        if not validate_project(target.project, ui):
+            return ExitCode.PROJECT_NOT_FOUND
+
+    settings = loader.load_global_settings()
+    if args.headless:
+        settings.browser.headless = True
+
+    ui.section(f"Batch: {len(targets)} progetti")
+    result = asyncio.run(run_batch_sessions(targets, settings, args))
+
+    ui.section("Riepilogo batch")
+    ui.print(result.format_summary())
+
+    if any(p.error for p in result.projects):
+        return ExitCode.ERROR
+    return ExitCode.SUCCESS if result.ok else ExitCode.TEST_FAILED
+
+
 def run_scheduler_commands(args):
     """Gestisce comandi scheduler da CLI"""
     from src.scheduler import LocalScheduler, ScheduleConfig, ScheduleType
@@ -4151,6 +4350,7 @@ def run_cli_analysis(args):
         format_comparison_report
     )
     from src.sheets_client import GoogleSheetsClient
+    from src.cache import configure_caches, get_tiered_cache
 
     ui = get_ui()
     loader = ConfigLoader()
@@ -4171,11 +4371,15 @@ def run_cli_analysis(args):
 
     if project.google_sheets.enabled:
         try:
+            cache_settings = loader.load_global_settings().cache
+            configure_caches(cache_settings, loader.base_dir)
             credentials_path = str(Path("config/credentials.json"))
             sheets_client = GoogleSheetsClient(
                 credentials_path=credentials_path,
                 spreadsheet_id=project.google_sheets.spreadsheet_id,
-                drive_folder_id=project.google_sheets.drive_folder_id
+                drive_folder_id=project.google_sheets.drive_folder_id,
+                cache=get_tiered_cache("sheets_runs"),
+                cache_ttl_seconds=cache_settings.sheets_ttl_seconds
             )
         except Exception:
             pass  # Usa report locali
@@ -4808,6 +5012,7 @@ def main():
     signal.signal(signal.SIGINT, lambda s, f: handle_keyboard_interrupt())
 
     args = parse_args()
+    load_core()
 
     # Inizializza UI con opzioni da args
     use_colors = not getattr(args, 'no_color', False)
@@ -4911,10 +5116,15 @@ def main():
                 # validate_project gia chiamato sopra
                 sys.exit(ExitCode.PROJECT_NOT_FOUND)
 
-        success = run_health_check(project, settings)
+        success = run_health_check(project, settings, force=True)
         sys.exit(ExitCode.SUCCESS if success else ExitCode.HEALTH_CHECK_FAILED)
 
+    # Batch multi-progetto in-process
+    if args.batch or args.batch_file:
+        sys.exit(run_batch_command(args))
+
     # Determina modalita
+    import asyncio
     try:
         if args.no_interactive or args.project or args.new_project:
             # Modalita diretta
@@ -17,48 +17,66 @@ Moduli disponibili:
 __version__ = "1.1.0"
 __author__ = "Chatbot Tester Team"
 
-from .config_loader import (
-    ConfigLoader,
-    ProjectConfig,
-    GlobalSettings,
-    load_tests,
-    save_tests,
-    load_training_data,
-    save_training_data
-)
+# Le esportazioni sono risolte alla prima richiesta (PEP 562): importare
+# un sottomodulo leggero (es. src.config_loader) non carica Playwright,
+# i client Google o Rich finché non servono davvero.
+_EXPORTS = {
+    'config_loader': (
+        'ConfigLoader',
+        'ProjectConfig',
+        'GlobalSettings',
+        'load_tests',
+        'save_tests',
+        'load_training_data',
+        'save_training_data',
+    ),
+    'tester': (
+        'ChatbotTester',
+        'TestMode',
+        'TestCase',
+        'TestExecution',
+        'ConversationTurn',
+        'run_single_test',
+    ),
+    'browser': (
+        'BrowserManager',
+        'BrowserSettings',
+        'ChatbotSelectors',
+        'SelectorDetector',
+    ),
+    'ui': (
+        'ConsoleUI',
+        'MenuItem',
+        'get_ui',
+    ),
+    'health': (
+        'HealthChecker',
+        'HealthCheckResult',
+        'SystemHealth',
+        'ServiceStatus',
+        'CircuitBreaker',
+        'CircuitBreakerOpen',
+        'retry_with_backoff',
+        'quick_health_check',
+    ),
+}
 
-from .tester import (
-    ChatbotTester,
-    TestMode,
-    TestCase,
-    TestExecution,
-    ConversationTurn,
-    run_single_test
-)
+_LAZY = {name: module for module, names in _EXPORTS.items() for name in names}
 
-from .browser import (
-    BrowserManager,
-    BrowserSettings,
-    ChatbotSelectors,
-    SelectorDetector
-)
 
-from .ui import (
-    ConsoleUI,
-    MenuItem,
-    get_ui
-)
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
 
-from .health import (
-    HealthChecker,
-    HealthCheckResult,
-    SystemHealth,
-    ServiceStatus,
-    CircuitBreaker,
-    CircuitBreakerOpen,
-    retry_with_backoff,
-    quick_health_check
-)
 
 __all__ = [
     # Config
@@ -9,11 +9,15 @@ Funzionalità:
 - Fetch da Google Sheets (colonna BASELINE = ✓)
 - Lookup per test_id
 - Auto-refresh quando la cache scade
+- Indice locale persistente: al refresh si leggono solo i fogli RUN
+  nuovi o modificati
 """
 
+import json
+import os
 import time
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, TYPE_CHECKING
+from typing import Dict, List, Optional, Any, TYPE_CHECKING
 from pathlib import Path
 
 if TYPE_CHECKING:
@@ -43,6 +47,85 @@ class Baseline:
         return '\n'.join(bot_responses) if bot_responses else self.conversation
 
 
+class BaselineIndex:
+    """
+    Indice locale delle baseline, persistente su disco (JSON).
+
+    Per ogni foglio RUN già letto registra titolo, numero RUN, fingerprint
+    della colonna BASELINE e baseline trovate; per lo spreadsheet la
+    versione Drive. GoogleSheetsClient.get_all_baselines(index=...) rilegge
+    solo i fogli con fingerprint cambiato, e niente se la versione Drive
+    è la stessa dell'ultima scansione.
+
+    Uso:
+        index = BaselineIndex(project_dir / BaselineIndex.FILENAME)
+        baselines = sheets_client.get_all_baselines(index=index)
+    """
+
+    FILENAME = "baselines_index.json"
+    SCHEMA = 1
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.spreadsheet_id = ""
+        self.version: Optional[str] = None
+        self.sheets: Dict[str, Dict[str, Any]] = {}
+        # Statistiche dell'ultima scansione (fogli, cambiati, righe lette)
+        self.last_scan: Dict[str, int] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, json.JSONDecodeError):
+            return
+        if data.get('schema') != self.SCHEMA:
+            return
+        self.spreadsheet_id = data.get('spreadsheet_id', "")
+        self.version = data.get('version')
+        self.sheets = data.get('sheets', {})
+
+    def save(self) -> None:
+        """Scrittura atomica (file temporaneo + rename)"""
+        data = {
+            'schema': self.SCHEMA,
+            'spreadsheet_id': self.spreadsheet_id,
+            'version': self.version,
+            'sheets': self.sheets,
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix('.tmp')
+            tmp.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"! Indice baseline non salvato: {e}")
+
+    def is_current(self, spreadsheet_id: str, version: Optional[str]) -> bool:
+        """True se l'indice è aggiornato alla versione Drive indicata"""
+        return bool(version) and self.spreadsheet_id == spreadsheet_id and self.version == version
+
+    def get_sheet(self, spreadsheet_id: str, sheet_id: Any) -> Optional[Dict[str, Any]]:
+        """Voce di un foglio già letto (None se nuovo o di un altro spreadsheet)"""
+        if self.spreadsheet_id != spreadsheet_id:
+            return None
+        return self.sheets.get(str(sheet_id))
+
+    def replace(self, spreadsheet_id: str, version: Optional[str], sheets: Dict[str, Dict[str, Any]]) -> None:
+        """Sostituisce il contenuto (i fogli eliminati escono dall'indice)"""
+        self.spreadsheet_id = spreadsheet_id
+        self.version = version
+        self.sheets = sheets
+
+    def baselines(self, spreadsheet_id: str) -> List[Dict[str, Any]]:
+        """Tutte le baseline indicizzate, nello stesso formato di get_all_baselines"""
+        if self.spreadsheet_id != spreadsheet_id:
+            return []
+        return [b for entry in self.sheets.values() for b in entry.get('baselines', [])]
+
+
 @dataclass
 class BaselinesCache:
     """
@@ -52,11 +135,15 @@ class BaselinesCache:
         cache = BaselinesCache(ttl_seconds=300)  # 5 minuti
         cache.load(sheets_client, project_name)
 
+        # Con indice persistente: refresh incrementale
+        cache = BaselinesCache(index=BaselineIndex(project_dir / BaselineIndex.FILENAME))
+
         baseline = cache.get("TEST_001")
         if baseline:
             print(f"Golden answer: {baseline.answer}")
     """
     ttl_seconds: int = 300  # Default: 5 minuti
+    index: Optional[BaselineIndex] = None  # Indice persistente (refresh incrementale)
     _baselines: Dict[str, Baseline] = field(default_factory=dict)
     _loaded_at: float = 0.0
     _project: str = ""
@@ -135,7 +222,10 @@ class BaselinesCache:
 
         try:
             # Usa il metodo del sheets_client per ottenere tutte le baseline
-            baselines_data = sheets_client.get_all_baselines()
+            if self.index is not None:
+                baselines_data = sheets_client.get_all_baselines(index=self.index)
+            else:
+                baselines_data = sheets_client.get_all_baselines()
 
             for data in baselines_data:
                 baseline = Baseline(
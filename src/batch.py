@@ -0,0 +1,185 @@
+"""
+Batch - Esecuzione multi-progetto in un solo processo
+
+Una matrice (progetto, lista test) viene eseguita nello stesso processo:
+ogni progetto apre una sola sessione (browser o pool di browser, login,
+client Ollama/LangSmith/Sheets, foglio RUN) e ci esegue tutti i suoi
+test; i progetti girano in concorrenza. Una sweep di regressione su tre
+ambienti costa così tre avvii a freddo invece di uno per test.
+
+Matrice da file YAML:
+
+    silicon-a: [TEST_006, TEST_007]
+    silicon-b: all                       # tutti i test del progetto
+
+oppure come lista:
+
+    - project: silicon-a
+      tests: [TEST_006, TEST_007]
+
+Usage:
+    targets = build_batch_matrix("silicon-a,silicon-b", "TEST_006,TEST_007")
+    result = await run_batch(targets, run_project, max_projects=3)
+    print(result.format_summary())
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, List, Optional, Sequence
+
+import yaml
+
+
+@dataclass
+class BatchTarget:
+    """Un progetto della matrice con i suoi test (vuoto = tutti)"""
+    project: str
+    test_ids: List[str] = field(default_factory=list)
+
+
+@dataclass
+class BatchProjectResult:
+    """Esito di un progetto del batch"""
+    project: str
+    total: int = 0
+    passed: int = 0
+    failed: int = 0
+    duration_seconds: float = 0.0
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return not self.error and self.failed == 0
+
+
+@dataclass
+class BatchResult:
+    """Esito del batch, nell'ordine della matrice"""
+    projects: List[BatchProjectResult] = field(default_factory=list)
+    duration_seconds: float = 0.0
+
+    @property
+    def total(self) -> int:
+        return sum(p.total for p in self.projects)
+
+    @property
+    def passed(self) -> int:
+        return sum(p.passed for p in self.projects)
+
+    @property
+    def failed(self) -> int:
+        return sum(p.failed for p in self.projects)
+
+    @property
+    def ok(self) -> bool:
+        return all(p.ok for p in self.projects)
+
+    def format_summary(self) -> str:
+        """Riepilogo testuale per progetto"""
+        lines = []
+        for p in self.projects:
+            if p.error:
+                lines.append(f"  {p.project}: ERRORE - {p.error}")
+                continue
+            status = "OK" if p.ok else "ISSUES"
+            lines.append(f"  {p.project}: {p.passed}/{p.total} passed [{status}] ({p.duration_seconds:.0f}s)")
+        lines.append("")
+        lines.append(f"  Totale: {self.passed}/{self.total} passed in {self.duration_seconds:.0f}s")
+        return "\n".join(lines)
+
+
+def _split_ids(value) -> List[str]:
+    """'A,B' / ['A', 'B'] / 'all' / None -> lista ID (vuota = tutti)"""
+    if value is None or value == 'all':
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [str(v).strip() for v in value if str(v).strip()]
+
+
+def build_batch_matrix(projects, test_ids='') -> List[BatchTarget]:
+    """
+    Matrice da CLI: stessi test per ogni progetto.
+
+    Args:
+        projects: Progetti separati da virgola (o lista)
+        test_ids: ID test separati da virgola (o lista); vuoto = tutti
+    """
+    ids = _split_ids(test_ids)
+    names = projects.split(',') if isinstance(projects, str) else projects
+    targets: List[BatchTarget] = []
+    for name in names:
+        name = name.strip()
+        if name and all(t.project != name for t in targets):
+            targets.append(BatchTarget(name, list(ids)))
+    return targets
+
+
+def load_batch_matrix(path: Path) -> List[BatchTarget]:
+    """
+    Matrice da file YAML (mapping progetto -> test, o lista di voci).
+
+    Raises:
+        ValueError: Formato non valido
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = yaml.safe_load(f) or {}
+
+    if isinstance(data, dict):
+        entries = [{'project': k, 'tests': v} for k, v in data.items()]
+    elif isinstance(data, list):
+        entries = data
+    else:
+        raise ValueError(f"Matrice batch non valida: {path}")
+
+    targets: List[BatchTarget] = []
+    for entry in entries:
+        if not isinstance(entry, dict) or not entry.get('project'):
+            raise ValueError(f"Voce batch senza progetto: {entry!r}")
+        targets.append(BatchTarget(str(entry['project']), _split_ids(entry.get('tests'))))
+    return targets
+
+
+async def run_batch(
+    targets: Sequence[BatchTarget],
+    run_project: Callable[[BatchTarget], Awaitable[Optional[List[Any]]]],
+    max_projects: int = 0
+) -> BatchResult:
+    """
+    Esegue i progetti della matrice in concorrenza.
+
+    Args:
+        targets: Matrice progetto -> test
+        run_project: Coroutine che esegue la sessione di un progetto e
+            ritorna i risultati (oggetti con .result 'PASS'/'FAIL'),
+            o None se la sessione non è partita
+        max_projects: Progetti contemporanei (0 = tutti)
+
+    Returns:
+        BatchResult nell'ordine della matrice; l'errore di un progetto
+        non interrompe gli altri
+    """
+    limit = asyncio.Semaphore(max_projects if max_projects > 0 else max(1, len(targets)))
+    started = time.monotonic()
+
+    async def run_one(target: BatchTarget) -> BatchProjectResult:
+        outcome = BatchProjectResult(project=target.project)
+        async with limit:
+            t0 = time.monotonic()
+            try:
+                results = await run_project(target)
+                if results is None:
+                    outcome.error = "sessione non avviata"
+                else:
+                    outcome.total = len(results)
+                    outcome.passed = sum(1 for r in results if r.result == 'PASS')
+                    outcome.failed = sum(1 for r in results if r.result == 'FAIL')
+            except Exception as e:
+                outcome.error = str(e) or type(e).__name__
+            outcome.duration_seconds = time.monotonic() - t0
+        return outcome
+
+    projects = await asyncio.gather(*(run_one(t) for t in targets))
+    return BatchResult(projects=list(projects), duration_seconds=time.monotonic() - started)
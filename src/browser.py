@@ -3,22 +3,29 @@ Browser Manager - Playwright wrapper for chatbot automation
 
 Handles:
 - Persistent browser session
+- Shared Chromium process with isolated contexts (pool)
 - Login and authentication
 - Screenshot and element capture
 - CSS injection for clean screenshots
 """
 
 import asyncio
+import json
+import logging
+import time
 from pathlib import Path
 from typing import Optional, Callable, Any, List
 import tempfile
 import io
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Locator
 
 from src.auth import authenticate as auth_authenticate, AuthConfig
+from src.screenshots import ScreenshotEncoding, save_screenshot, screenshot_extension
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -31,6 +38,13 @@ class BrowserSettings:
     user_data_dir: Optional[Path] = None
     timeout_page_load: int = 30000
     timeout_bot_response: int = 60000
+    response_detection: str = "poll"  # poll | observer
+    observer_quiet_ms: int = 400  # Silenzio DOM richiesto per considerare completa la risposta
+    # Strategie di reset tra un test e l'altro, in ordine di preferenza
+    reset_strategies: List[str] = field(default_factory=lambda: ["new_chat", "clear_storage", "reload"])
+    reset_ready_timeout_ms: int = 3000  # Attesa readiness per new_chat (nessuna navigazione)
+    # Codifica screenshot (catturati in memoria, codificati una volta in un thread)
+    screenshot: ScreenshotEncoding = field(default_factory=ScreenshotEncoding)
 
 
 @dataclass
@@ -41,6 +55,7 @@ class ChatbotSelectors:
     bot_messages: str
     thread_container: str = ""
     loading_indicator: str = ""
+    new_chat_button: str = ""
 
 
 @dataclass
@@ -51,6 +66,146 @@ class ResponseTiming:
     text: Optional[str] = None
 
 
+@dataclass
+class ResetResult:
+    """Esito del reset sessione tra due test"""
+    strategy: str          # new_chat | clear_storage | reload
+    duration_ms: float = 0.0
+    ready: bool = True     # False se nessuna strategia ha superato il controllo readiness
+
+
+# Pagina pronta per un nuovo test: textarea visibile e nessun messaggio bot
+# oltre a quelli presenti a pagina appena caricata (es. messaggio di benvenuto)
+READY_CHECK_SCRIPT = """
+({ textarea, botMessages, maxMessages }) => {
+    const input = document.querySelector(textarea);
+    if (!input) return false;
+    const rect = input.getBoundingClientRect();
+    if (rect.width === 0 || rect.height === 0) return false;
+    if (!botMessages) return true;
+    return document.querySelectorAll(botMessages).length <= maxMessages;
+}
+"""
+
+
+# Nome della binding esposta alla pagina per gli eventi del MutationObserver
+OBSERVER_BINDING = "__chatbotTesterEvent"
+
+# Script iniettato nella pagina: osserva il thread e notifica Python
+# solo quando cambia qualcosa di rilevante (conteggio, testo, loading).
+OBSERVER_SCRIPT = """
+(config) => {
+    if (window.__chatbotTesterObserver) return;
+    const emit = (type, state) => {
+        try { window.%(binding)s(Object.assign({type: type, ts: Date.now()}, state)); } catch (e) {}
+    };
+    const snapshot = () => {
+        const messages = document.querySelectorAll(config.botMessages);
+        const last = messages.length ? messages[messages.length - 1] : null;
+        let loading = false;
+        if (config.loadingIndicator) {
+            const el = document.querySelector(config.loadingIndicator);
+            loading = !!(el && el.offsetParent !== null);
+        }
+        return {
+            count: messages.length,
+            textLength: last ? (last.textContent || '').length : 0,
+            loading: loading
+        };
+    };
+    const start = () => {
+        const root = (config.threadContainer && document.querySelector(config.threadContainer))
+            || document.body;
+        if (!root) return false;
+        let prev = snapshot();
+        const observer = new MutationObserver(() => {
+            const cur = snapshot();
+            if (cur.count !== prev.count) {
+                emit(cur.count > prev.count ? 'new_message' : 'reset', cur);
+            } else if (cur.textLength !== prev.textLength) {
+                emit('text_changed', cur);
+            }
+            if (prev.loading && !cur.loading) {
+                emit('loading_gone', cur);
+            }
+            prev = cur;
+        });
+        observer.observe(root, {childList: true, subtree: true, characterData: true});
+        window.__chatbotTesterObserver = observer;
+        emit('ready', prev);
+        return true;
+    };
+    if (!start()) {
+        document.addEventListener('DOMContentLoaded', start, {once: true});
+    }
+}
+""" % {"binding": OBSERVER_BINDING}
+
+
+class SharedBrowser:
+    """
+    Un solo processo Chromium condiviso da più BrowserManager.
+
+    Ogni manager riceve un BrowserContext isolato (cookie, storage e cache
+    separati) creato con new_context(): costa pochi MB e qualche decina di
+    ms, contro un intero processo Chromium per launch_persistent_context.
+    L'autenticazione viene precaricata da user_data_dir/state.json.
+
+    Usage:
+        shared = SharedBrowser(settings)
+        await shared.start()
+        manager = BrowserManager(settings, selectors)
+        await manager.start(shared=shared)
+        ...
+        await manager.stop()   # chiude solo il context
+        await shared.stop()
+    """
+
+    def __init__(self, settings: BrowserSettings):
+        self.settings = settings
+        self._playwright = None
+        self._browser: Optional[Browser] = None
+
+    async def start(self) -> None:
+        """Avvia playwright e Chromium (una volta sola)"""
+        if self._browser:
+            return
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(
+            headless=self.settings.headless
+        )
+
+    @property
+    def storage_state(self) -> Optional[str]:
+        """Path di state.json (auth) se presente"""
+        if not self.settings.user_data_dir:
+            return None
+        state_file = Path(self.settings.user_data_dir) / "state.json"
+        return str(state_file) if state_file.exists() else None
+
+    async def new_context(self) -> BrowserContext:
+        """Crea un context isolato con viewport e auth del progetto"""
+        if not self._browser:
+            raise RuntimeError("SharedBrowser non avviato. Chiama start() prima.")
+        return await self._browser.new_context(
+            viewport={
+                'width': self.settings.viewport_width,
+                'height': self.settings.viewport_height
+            },
+            device_scale_factor=self.settings.device_scale_factor,
+            storage_state=self.storage_state
+        )
+
+    async def stop(self) -> None:
+        """Chiude Chromium e playwright"""
+        if self._browser:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+
 class BrowserManager:
     """
     Manager per browser Playwright con sessione persistente.
@@ -89,8 +244,18 @@ class BrowserManager:
         self._current_url: str = ""
         self._last_message_count: int = 0
         self._send_timestamp: float = 0.0  # For TTFR measurement
+        self._send_wall_ms: float = 0.0  # Wall clock all'invio, confrontabile con Date.now() della pagina
         self.last_response_timing: Optional[ResponseTiming] = None  # Timing from last response
 
+        # Rilevamento push via MutationObserver (response_detection="observer")
+        self._observer_events: Optional[asyncio.Queue] = None
+        self._observer_installed = False
+
+        # Reset veloce tra i test
+        self._clean_message_count: int = 0  # Messaggi bot a pagina appena caricata
+        self._failed_resets: set = set()     # Strategie non funzionanti su questo chatbot
+        self.last_reset: Optional[ResetResult] = None
+
     async def __aenter__(self):
         await self.start()
         return self
@@ -98,8 +263,29 @@ class BrowserManager:
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         await self.stop()
 
-    async def start(self) -> None:
-        """Avvia il browser con sessione persistente"""
+    async def start(self, shared: Optional[SharedBrowser] = None) -> None:
+        """
+        Avvia il browser con sessione persistente.
+
+        Args:
+            shared: Se indicato, apre solo un context isolato sul Chromium
+                    condiviso invece di avviare un processo dedicato
+        """
+        if shared:
+            self._context = await shared.new_context()
+            self._page = await self._context.new_page()
+        else:
+            await self._launch()
+
+        # Timeout di default
+        self._page.set_default_timeout(self.settings.timeout_page_load)
+        self._is_initialized = True
+
+        if self.settings.response_detection == "observer" and self.selectors:
+            await self._install_response_observer()
+
+    async def _launch(self) -> None:
+        """Avvia playwright e un Chromium dedicato a questo manager"""
         self._playwright = await async_playwright().start()
 
         # Usa sessione persistente se user_data_dir è specificato
@@ -140,9 +326,51 @@ class BrowserManager:
             )
             self._page = await self._context.new_page()
 
-        # Timeout di default
-        self._page.set_default_timeout(self.settings.timeout_page_load)
-        self._is_initialized = True
+    async def _install_response_observer(self) -> bool:
+        """
+        Installa il MutationObserver che notifica Python via expose_binding.
+
+        Lo script viene registrato come init script (sopravvive a reload e
+        navigazioni) e valutato subito sulla pagina corrente. Se qualcosa
+        fallisce si ricade sul polling.
+
+        Returns:
+            True se l'observer è attivo
+        """
+        if self._observer_installed:
+            return True
+
+        self._observer_events = asyncio.Queue()
+
+        def on_event(source, payload):
+            if self._observer_events is not None and isinstance(payload, dict):
+                self._observer_events.put_nowait(payload)
+
+        config = {
+            "botMessages": self.selectors.bot_messages,
+            "threadContainer": self.selectors.thread_container,
+            "loadingIndicator": self.selectors.loading_indicator,
+        }
+        script = f"({OBSERVER_SCRIPT})({json.dumps(config)});"
+
+        try:
+            await self._page.expose_binding(OBSERVER_BINDING, on_event)
+            await self._page.add_init_script(script=script)
+            await self._page.evaluate(script)
+            self._observer_installed = True
+        except Exception as e:
+            print(f"! MutationObserver non installato, uso polling: {e}")
+            self._observer_events = None
+            self._observer_installed = False
+
+        return self._observer_installed
+
+    def _drain_observer_events(self) -> None:
+        """Scarta eventi observer pendenti (appartenenti al turno precedente)"""
+        if self._observer_events is None:
+            return
+        while not self._observer_events.empty():
+            self._observer_events.get_nowait()
 
     async def stop(self) -> None:
         """Chiude il browser salvando la sessione"""
@@ -155,6 +383,23 @@ class BrowserManager:
 
         self._is_initialized = False
 
+    async def js_heap_mb(self) -> Optional[float]:
+        """
+        Heap JavaScript usato dalla pagina in MB (solo Chromium).
+
+        Returns:
+            MB usati o None se non disponibile
+        """
+        if not self._page:
+            return None
+        try:
+            used = await self._page.evaluate(
+                "() => (performance.memory ? performance.memory.usedJSHeapSize : null)"
+            )
+            return used / (1024 * 1024) if used else None
+        except Exception:
+            return None
+
     @property
     def page(self) -> Page:
         """Accesso diretto alla pagina Playwright"""
@@ -167,30 +412,106 @@ class BrowserManager:
         """Verifica se il browser è pronto"""
         return self._is_initialized and self._page is not None
 
-    async def reset_session(self) -> None:
+    @property
+    def current_url(self) -> str:
+        """URL dell'ultima navigazione ("" se nessuna)"""
+        return self._current_url
+
+    async def reset_session(self) -> Optional[ResetResult]:
         """
         Reset della sessione chat per iniziare un nuovo test.
-        Refresh della pagina per garantire uno stato pulito.
+
+        Prova le strategie configurate in ordine (new_chat, clear_storage,
+        reload) e si ferma alla prima verificata dal controllo readiness
+        (textarea visibile, nessun messaggio bot). Una strategia che fallisce
+        non viene più tentata in questa sessione.
+
+        Returns:
+            ResetResult con strategia usata e durata, None se nessuna pagina
         """
         self._last_message_count = 0
         self._send_timestamp = 0.0
         self.last_response_timing = None
 
-        # Sempre refresh della pagina per garantire stato pulito
-        if self._page:
-            await self._page.reload()
-            await asyncio.sleep(2)  # Attendi caricamento completo
+        if not self._page:
+            return None
+
+        start = time.perf_counter()
+        strategy = "reload"
+        ready = False
 
-            # Attendi che textarea sia visibile
-            if self.selectors and self.selectors.textarea:
-                try:
-                    await self._page.wait_for_selector(
-                        self.selectors.textarea,
-                        state='visible',
-                        timeout=10000
-                    )
-                except Exception:
-                    pass  # Continua comunque
+        for strategy in self._reset_order():
+            try:
+                ready = await self._apply_reset(strategy)
+            except Exception as e:
+                print(f"  Reset '{strategy}' fallito: {e}")
+                ready = False
+
+            if ready:
+                break
+            if strategy != "reload":
+                self._failed_resets.add(strategy)
+
+        self.last_reset = ResetResult(
+            strategy=strategy,
+            duration_ms=(time.perf_counter() - start) * 1000,
+            ready=ready
+        )
+        return self.last_reset
+
+    def _reset_order(self) -> List[str]:
+        """Strategie da tentare, con reload sempre come ultima risorsa"""
+        order = []
+        for strategy in self.settings.reset_strategies:
+            if strategy in self._failed_resets or strategy in order:
+                continue
+            if strategy == "new_chat" and not (self.selectors and self.selectors.new_chat_button):
+                continue
+            order.append(strategy)
+        if "reload" not in order:
+            order.append("reload")
+        return order
+
+    async def _apply_reset(self, strategy: str) -> bool:
+        """Esegue una strategia di reset e ne verifica l'esito"""
+        fast_timeout = self.settings.reset_ready_timeout_ms
+
+        if strategy == "new_chat":
+            return await self.new_chat(self.selectors.new_chat_button, timeout_ms=fast_timeout)
+
+        if strategy == "clear_storage" and self._current_url:
+            # Conversazione tenuta in sessionStorage dall'app: svuotata, poi la
+            # pagina viene ricaricata dall'URL iniziale (la vecchia chat resta
+            # a schermo finché l'app non si ri-renderizza)
+            await self._page.evaluate("() => window.sessionStorage.clear()")
+            await self._page.goto(self._current_url, wait_until='domcontentloaded')
+            return await self._wait_ready(self.settings.timeout_page_load)
+
+        await self._page.reload(wait_until='domcontentloaded')
+        return await self._wait_ready(self.settings.timeout_page_load)
+
+    async def _wait_ready(self, timeout_ms: int) -> bool:
+        """
+        Attende che la pagina sia pronta per un nuovo test.
+
+        Returns:
+            True se textarea visibile e nessun messaggio bot entro il timeout
+        """
+        if not self.selectors or not self.selectors.textarea:
+            return True
+        try:
+            await self._page.wait_for_function(
+                READY_CHECK_SCRIPT,
+                arg={
+                    'textarea': self.selectors.textarea,
+                    'botMessages': self.selectors.bot_messages,
+                    'maxMessages': self._clean_message_count
+                },
+                timeout=timeout_ms
+            )
+            return True
+        except Exception:
+            return False
 
     def start_new_test(self, test_id: str) -> None:
         """
@@ -235,6 +556,7 @@ class BrowserManager:
             await asyncio.sleep(0.5)  # Attendi che la pagina sia stabile
             if self.selectors:
                 self._last_message_count = await self._count_bot_messages()
+                self._clean_message_count = self._last_message_count
 
             return True
         except Exception as e:
@@ -287,6 +609,7 @@ class BrowserManager:
         try:
             # Conta messaggi bot attuali prima di inviare
             self._last_message_count = await self._count_bot_messages()
+            self._drain_observer_events()
 
             # Trova e compila textarea
             textarea = self._page.locator(self.selectors.textarea)
@@ -302,6 +625,7 @@ class BrowserManager:
 
             # Record timestamp for TTFR measurement
             self._send_timestamp = asyncio.get_event_loop().time()
+            self._send_wall_ms = time.time() * 1000
 
             return True
         except Exception as e:
@@ -323,6 +647,9 @@ class BrowserManager:
 
         timeout = timeout_ms or self.settings.timeout_bot_response
 
+        if self._observer_installed:
+            return await self._wait_for_response_observer(timeout)
+
         try:
             start_time = asyncio.get_event_loop().time()
             initial_count = self._last_message_count
@@ -375,36 +702,7 @@ class BrowserManager:
                     self._last_message_count = current_count
 
                     # Ottieni testo ultimo messaggio completo
-                    # Il selettore bot_messages può matchare singoli elementi dentro il messaggio
-                    # Dobbiamo risalire al container per catturare tutto il contenuto
-                    messages = self._page.locator(self.selectors.bot_messages)
-                    last_message = messages.last
-
-                    text = None
-                    try:
-                        # Strategia 1: Risali al container .llm__message--assistant
-                        # e cattura tutto il testo del .llm__text-body al suo interno
-                        message_container = last_message.locator("xpath=ancestor::*[contains(@class, 'llm__message--assistant')]").first
-                        if await message_container.count() > 0:
-                            # Trova tutti i .llm__text-body nel container
-                            text_bodies = message_container.locator(".llm__text-body")
-                            if await text_bodies.count() > 0:
-                                texts = []
-                                for i in range(await text_bodies.count()):
-                                    t = await text_bodies.nth(i).inner_text()
-                                    if t and t.strip():
-                                        texts.append(t.strip())
-                                text = "\n\n".join(texts) if texts else None
-
-                        # Strategia 2: Fallback - prendi inner_text del singolo elemento
-                        if not text:
-                            text = await last_message.inner_text()
-                    except Exception as e:
-                        # Fallback finale
-                        try:
-                            text = await last_message.inner_text()
-                        except:
-                            text = await last_message.text_content()
+                    text = await self._extract_last_message_text()
 
                     # Calculate timing metrics
                     end_time = asyncio.get_event_loop().time()
@@ -431,6 +729,124 @@ class BrowserManager:
             print(f"Errore attesa risposta: {e}")
             return None
 
+    async def _wait_for_response_observer(self, timeout: int) -> Optional[str]:
+        """
+        Attende la risposta usando gli eventi push del MutationObserver.
+
+        La risposta è considerata completa quando, dopo la comparsa di un nuovo
+        messaggio, il DOM resta fermo per observer_quiet_ms e il loading
+        indicator (se configurato) non è visibile. TTFR è misurato dal
+        timestamp dell'evento DOM, non dal momento in cui Python lo riceve.
+
+        Args:
+            timeout: Timeout in millisecondi
+
+        Returns:
+            Testo della risposta o None se timeout
+        """
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout / 1000
+        quiet_s = self.settings.observer_quiet_ms / 1000
+        initial_count = self._last_message_count
+
+        first_event_ms: float = 0.0
+        last_event_ms: float = 0.0
+        current_count = initial_count
+        loading = False
+
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    print("! Timeout attesa risposta bot (observer)")
+                    return None
+
+                wait_s = min(remaining, quiet_s) if first_event_ms else remaining
+                try:
+                    event = await asyncio.wait_for(self._observer_events.get(), timeout=wait_s)
+                except asyncio.TimeoutError:
+                    if first_event_ms and loading:
+                        # L'indicatore può stare fuori dal container osservato
+                        loading = await self._is_loading_visible()
+                    if first_event_ms and not loading:
+                        break
+                    continue
+
+                current_count = event.get('count', current_count)
+                loading = bool(event.get('loading', False))
+
+                if current_count > initial_count:
+                    if not first_event_ms:
+                        first_event_ms = event.get('ts') or time.time() * 1000
+                    last_event_ms = event.get('ts') or time.time() * 1000
+
+            self._last_message_count = current_count
+            text = await self._extract_last_message_text()
+
+            ttfr_ms = max(0.0, first_event_ms - self._send_wall_ms) if self._send_wall_ms > 0 else 0
+            total_ms = max(0.0, last_event_ms - self._send_wall_ms) if self._send_wall_ms > 0 else 0
+
+            self.last_response_timing = ResponseTiming(
+                ttfr_ms=ttfr_ms,
+                total_ms=total_ms,
+                text=text.strip() if text else None
+            )
+
+            logger.debug("Timing (observer): TTFR=%.0fms, Total=%.0fms", ttfr_ms, total_ms)
+            return text.strip() if text else None
+
+        except Exception as e:
+            print(f"Errore attesa risposta (observer): {e}")
+            return None
+
+    async def _is_loading_visible(self) -> bool:
+        """Verifica se il loading indicator è attualmente visibile"""
+        if not self.selectors.loading_indicator:
+            return False
+        try:
+            loading = self._page.locator(self.selectors.loading_indicator)
+            return await loading.count() > 0 and await loading.first.is_visible()
+        except Exception:
+            return False
+
+    async def _extract_last_message_text(self) -> Optional[str]:
+        """
+        Estrae il testo completo dell'ultimo messaggio bot.
+
+        Il selettore bot_messages può matchare singoli elementi dentro il messaggio,
+        quindi si risale al container per catturare tutto il contenuto.
+        """
+        messages = self._page.locator(self.selectors.bot_messages)
+        last_message = messages.last
+
+        text = None
+        try:
+            # Strategia 1: Risali al container .llm__message--assistant
+            # e cattura tutto il testo del .llm__text-body al suo interno
+            message_container = last_message.locator("xpath=ancestor::*[contains(@class, 'llm__message--assistant')]").first
+            if await message_container.count() > 0:
+                # Trova tutti i .llm__text-body nel container
+                text_bodies = message_container.locator(".llm__text-body")
+                if await text_bodies.count() > 0:
+                    texts = []
+                    for i in range(await text_bodies.count()):
+                        t = await text_bodies.nth(i).inner_text()
+                        if t and t.strip():
+                            texts.append(t.strip())
+                    text = "\n\n".join(texts) if texts else None
+
+            # Strategia 2: Fallback - prendi inner_text del singolo elemento
+            if not text:
+                text = await last_message.inner_text()
+        except Exception:
+            # Fallback finale
+            try:
+                text = await last_message.inner_text()
+            except:
+                text = await last_message.text_content()
+
+        return text
+
     async def _count_bot_messages(self) -> int:
         """Conta i messaggi bot attualmente visibili"""
         try:
@@ -498,6 +914,11 @@ class BrowserManager:
 
         return conversation
 
+    @property
+    def screenshot_extension(self) -> str:
+        """Estensione dei file screenshot con la codifica configurata (es. '.webp')"""
+        return screenshot_extension(self.settings.screenshot)
+
     async def take_screenshot(self,
                                path: Path,
                                full_page: bool = False,
@@ -519,7 +940,8 @@ class BrowserManager:
                 await self._page.add_style_tag(content=inject_css)
                 await asyncio.sleep(0.3)  # Attendi rendering
 
-            await self._page.screenshot(path=str(path), full_page=full_page)
+            raw = await self._page.screenshot(full_page=full_page)
+            await save_screenshot(raw, path, self.settings.screenshot)
             return True
         except Exception as e:
             print(f"Errore screenshot: {e}")
@@ -546,7 +968,8 @@ class BrowserManager:
                 await asyncio.sleep(0.3)
 
             element = self._page.locator(selector)
-            await element.screenshot(path=str(path))
+            raw = await element.screenshot()
+            await save_screenshot(raw, path, self.settings.screenshot)
             return True
         except Exception as e:
             print(f"Errore screenshot elemento: {e}")
@@ -617,16 +1040,19 @@ class BrowserManager:
             await asyncio.sleep(500 / 1000)  # 500ms come nel progetto originale
 
             # 2. Cattura screenshot di section.llm__thread (contiene tutta la conversazione)
+            #    in memoria: codifica e scrittura su disco avvengono in un thread
             thread = self._page.locator("section.llm__thread")
             try:
                 if await thread.count() > 0:
-                    await thread.screenshot(path=str(path), timeout=60000)
+                    raw = await thread.screenshot(timeout=60000)
                 else:
                     # Fallback a full page
-                    await self._page.screenshot(path=str(path), full_page=True)
+                    raw = await self._page.screenshot(full_page=True)
             except Exception as e:
                 print(f"  [DEBUG] Errore screenshot thread, fallback: {e}")
-                await self._page.screenshot(path=str(path), full_page=True)
+                raw = await self._page.screenshot(full_page=True)
+
+            await save_screenshot(raw, path, self.settings.screenshot)
 
             # CSS iniettato rimane nella pagina, ma non influisce sul funzionamento
             # perché i container tornano normali al prossimo reload
@@ -688,7 +1114,7 @@ class BrowserManager:
             True se riuscito
         """
         try:
-            from PIL import Image
+            from PIL import Image  # noqa: F401 - richiesto per la cucitura
 
             if inject_css:
                 await self._page.add_style_tag(content=inject_css)
@@ -719,7 +1145,8 @@ class BrowserManager:
 
             # Se non c'è scroll, cattura normale
             if scroll_height <= client_height:
-                await element.screenshot(path=str(path))
+                raw = await element.screenshot()
+                await save_screenshot(raw, path, self.settings.screenshot)
                 return True
 
             # Scroll to top
@@ -755,35 +1182,9 @@ class BrowserManager:
                     print("Troppi screenshot, interrompo")
                     break
 
-            # Concatena immagini verticalmente
-            images = [Image.open(io.BytesIO(s)) for s in screenshots]
-
-            if len(images) == 1:
-                images[0].save(str(path))
-                return True
-
-            # Calcola altezza totale (rimuovendo overlap)
-            total_height = images[0].height  # Prima immagine completa
-            for img in images[1:]:
-                total_height += img.height - overlap
-
-            # Crea immagine finale
-            width = images[0].width
-            final_image = Image.new('RGB', (width, total_height))
-
-            # Incolla immagini
-            y_offset = 0
-            for i, img in enumerate(images):
-                if i == 0:
-                    final_image.paste(img, (0, 0))
-                    y_offset = img.height - overlap
-                else:
-                    # Taglia la parte superiore (overlap) delle immagini successive
-                    cropped = img.crop((0, overlap, img.width, img.height))
-                    final_image.paste(cropped, (0, y_offset))
-                    y_offset += cropped.height
-
-            final_image.save(str(path))
+            # Cucitura e codifica in un thread: il loop asyncio resta libero
+            stitched = await asyncio.to_thread(self._stitch_screenshots, screenshots, overlap)
+            await save_screenshot(stitched, path, self.settings.screenshot)
             return True
 
         except ImportError:
@@ -793,6 +1194,38 @@ class BrowserManager:
             print(f"Errore screenshot scrollabile: {e}")
             return False
 
+    @staticmethod
+    def _stitch_screenshots(screenshots: List[bytes], overlap: int) -> Any:
+        """Concatena verticalmente gli screenshot (rimuovendo l'overlap)"""
+        from PIL import Image
+
+        images = [Image.open(io.BytesIO(s)) for s in screenshots]
+        if len(images) == 1:
+            return images[0]
+
+        # Calcola altezza totale (rimuovendo overlap)
+        total_height = images[0].height  # Prima immagine completa
+        for img in images[1:]:
+            total_height += img.height - overlap
+
+        # Crea immagine finale
+        width = images[0].width
+        final_image = Image.new('RGB', (width, total_height))
+
+        # Incolla immagini
+        y_offset = 0
+        for i, img in enumerate(images):
+            if i == 0:
+                final_image.paste(img, (0, 0))
+                y_offset = img.height - overlap
+            else:
+                # Taglia la parte superiore (overlap) delle immagini successive
+                cropped = img.crop((0, overlap, img.width, img.height))
+                final_image.paste(cropped, (0, y_offset))
+                y_offset += cropped.height
+
+        return final_image
+
     async def execute_script(self, script: str) -> Any:
         """
         Esegue JavaScript nella pagina.
@@ -857,28 +1290,25 @@ class BrowserManager:
         except:
             return None
 
-    async def new_chat(self, new_chat_selector: str) -> bool:
+    async def new_chat(self, new_chat_selector: str, timeout_ms: int = 10000) -> bool:
         """
         Avvia una nuova chat (clicca bottone new chat).
 
         Args:
             new_chat_selector: Selettore del bottone nuova chat
+            timeout_ms: Attesa massima della chat vuota
 
         Returns:
-            True se riuscito
+            True se la nuova chat è pronta
         """
         try:
             # Clicca new chat
-            await self.click_element(new_chat_selector)
-            await asyncio.sleep(1)
+            if not await self.click_element(new_chat_selector):
+                return False
 
-            # Attendi che textarea sia pronta
-            if self.selectors:
-                await self._page.wait_for_selector(
-                    self.selectors.textarea,
-                    state='visible',
-                    timeout=10000
-                )
+            # Attendi textarea pronta e thread vuoto
+            if not await self._wait_ready(timeout_ms):
+                return False
 
             # Reset contatore messaggi
             self._last_message_count = 0
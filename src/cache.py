@@ -4,16 +4,21 @@ Cache Module - Caching intelligente per ottimizzazione performance
 Fornisce:
 - Cache in memoria con TTL
 - Cache su disco per persistenza
+- Cache a due livelli (memoria + disco) con statistiche hit/miss
 - Decoratori per caching automatico
 - Invalidazione intelligente
 """
 
+import os
 import json
 import hashlib
 import time
 import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Optional, Any, Callable, TypeVar, Generic
+from typing import Optional, Any, Callable, Iterator, TypeVar, Generic
 from dataclasses import dataclass, field
 from functools import wraps
 from datetime import datetime, timedelta
@@ -61,7 +66,7 @@ class MemoryCache:
                  default_ttl_seconds: int = 300):
         self.max_size = max_size
         self.default_ttl = default_ttl_seconds
-        self._cache: dict[str, CacheEntry] = {}
+        self._cache: OrderedDict[str, CacheEntry] = OrderedDict()
         self._lock = threading.RLock()
         self._stats = {
             'hits': 0,
@@ -92,7 +97,8 @@ class MemoryCache:
                 self._stats['misses'] += 1
                 return None
 
-            # Update access stats
+            # Update access stats (fine lista = usata piu di recente)
+            self._cache.move_to_end(key)
             entry.hits += 1
             entry.last_accessed = time.time()
             self._stats['hits'] += 1
@@ -112,8 +118,10 @@ class MemoryCache:
             ttl: TTL in secondi (default: default_ttl)
         """
         with self._lock:
-            # Evict se necessario
-            if len(self._cache) >= self.max_size:
+            # Evict se necessario (solo per chiavi nuove)
+            if key in self._cache:
+                self._cache.move_to_end(key)
+            elif len(self._cache) >= self.max_size:
                 self._evict_lru()
 
             ttl_seconds = ttl if ttl is not None else self.default_ttl
@@ -144,13 +152,8 @@ class MemoryCache:
         if not self._cache:
             return
 
-        # Trova entry con last_accessed piu vecchio
-        oldest_key = min(
-            self._cache.keys(),
-            key=lambda k: self._cache[k].last_accessed
-        )
-
-        del self._cache[oldest_key]
+        # L'OrderedDict e' in ordine di accesso: la prima entry e' la piu vecchia
+        self._cache.popitem(last=False)
         self._stats['evictions'] += 1
 
     def cached(self, ttl: Optional[int] = None):
@@ -207,6 +210,7 @@ class MemoryCache:
                 'hits': self._stats['hits'],
                 'misses': self._stats['misses'],
                 'hit_rate': f"{hit_rate:.1%}",
+                'hit_ratio': hit_rate,
                 'evictions': self._stats['evictions']
             }
 
@@ -229,6 +233,10 @@ class DiskCache:
     Salva le entry come file JSON individuali.
     Utile per cache tra sessioni diverse.
 
+    Il numero di file e' limitato da max_entries: oltre il limite vengono
+    rimossi i file con mtime piu vecchio (ogni get() aggiorna l'mtime, quindi
+    l'eviction e' LRU anche tra sessioni diverse).
+
     Usage:
         cache = DiskCache(Path("./cache"))
         cache.set("key", {"data": "value"}, ttl=3600)
@@ -237,10 +245,19 @@ class DiskCache:
 
     def __init__(self,
                  cache_dir: Path,
-                 default_ttl_seconds: int = 3600):
+                 default_ttl_seconds: int = 3600,
+                 max_entries: int = 5000):
         self.cache_dir = cache_dir
         self.default_ttl = default_ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.RLock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0
+        }
         self._ensure_dir()
+        self._entry_count = len(list(self.cache_dir.glob("*.json")))
 
     def _ensure_dir(self) -> None:
         """Crea directory cache se non esiste"""
@@ -255,23 +272,30 @@ class DiskCache:
         """Ottiene valore dalla cache"""
         path = self._key_to_path(key)
 
-        if not path.exists():
-            return None
+        with self._lock:
+            if not path.exists():
+                self._stats['misses'] += 1
+                return None
 
-        try:
-            with open(path, 'r') as f:
-                entry = json.load(f)
+            try:
+                with open(path, 'r') as f:
+                    entry = json.load(f)
 
-            # Check TTL
-            if time.time() > entry['expires_at']:
-                path.unlink()
-                return None
+                # Check TTL
+                if time.time() > entry['expires_at']:
+                    self._remove(path)
+                    self._stats['misses'] += 1
+                    return None
 
-            return entry['value']
+                # Aggiorna mtime per l'eviction LRU
+                os.utime(path)
+                self._stats['hits'] += 1
+                return entry['value']
 
-        except (json.JSONDecodeError, KeyError):
-            path.unlink(missing_ok=True)
-            return None
+            except (json.JSONDecodeError, KeyError, OSError):
+                self._remove(path)
+                self._stats['misses'] += 1
+                return None
 
     def set(self,
             key: str,
@@ -289,41 +313,91 @@ class DiskCache:
         }
 
         try:
-            with open(path, 'w') as f:
-                json.dump(entry, f)
+            data = json.dumps(entry)
         except (TypeError, ValueError) as e:
             # Valore non serializzabile
             print(f"Cache: impossibile salvare {key}: {e}")
+            return
+
+        with self._lock:
+            is_new = not path.exists()
+            # Scrittura atomica: un lettore concorrente non vede mai file parziali
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            try:
+                tmp_path.write_text(data)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                tmp_path.unlink(missing_ok=True)
+                print(f"Cache: impossibile salvare {key}: {e}")
+                return
+
+            if is_new:
+                self._entry_count += 1
+                if self.max_entries and self._entry_count > self.max_entries:
+                    self._evict_lru()
+
+    def _remove(self, path: Path) -> None:
+        """Rimuove un file entry aggiornando il conteggio"""
+        try:
+            path.unlink()
+            self._entry_count = max(0, self._entry_count - 1)
+        except FileNotFoundError:
+            pass
+
+    def _evict_lru(self) -> None:
+        """Rimuove i file meno usati fino a tornare sotto max_entries"""
+        files = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                files.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+
+        self._entry_count = len(files)
+        excess = self._entry_count - self.max_entries
+        if excess <= 0:
+            return
+
+        # Libera un 10% extra per non ripetere la scansione ad ogni set()
+        excess += self.max_entries // 10
+        files.sort(key=lambda item: item[0])
+        for _, path in files[:excess]:
+            self._remove(path)
+            self._stats['evictions'] += 1
 
     def delete(self, key: str) -> bool:
         """Elimina entry dalla cache"""
         path = self._key_to_path(key)
-        if path.exists():
-            path.unlink()
-            return True
-        return False
+        with self._lock:
+            if path.exists():
+                self._remove(path)
+                return True
+            return False
 
     def clear(self) -> None:
         """Svuota la cache"""
-        for path in self.cache_dir.glob("*.json"):
-            path.unlink()
+        with self._lock:
+            for path in self.cache_dir.glob("*.json"):
+                path.unlink(missing_ok=True)
+            self._entry_count = 0
 
     def cleanup_expired(self) -> int:
         """Rimuove entry scadute"""
         now = time.time()
         removed = 0
 
-        for path in self.cache_dir.glob("*.json"):
-            try:
-                with open(path, 'r') as f:
-                    entry = json.load(f)
-
-                if entry.get('expires_at', 0) < now:
-                    path.unlink()
+        with self._lock:
+            for path in self.cache_dir.glob("*.json"):
+                try:
+                    with open(path, 'r') as f:
+                        entry = json.load(f)
+
+                    if entry.get('expires_at', 0) < now:
+                        self._remove(path)
+                        removed += 1
+                except:
+                    self._remove(path)
                     removed += 1
-            except:
-                path.unlink(missing_ok=True)
-                removed += 1
 
         return removed
 
@@ -333,6 +407,115 @@ class DiskCache:
         total_bytes = sum(f.stat().st_size for f in files)
         return len(files), total_bytes
 
+    def get_stats(self) -> dict:
+        """Statistiche cache"""
+        with self._lock:
+            total = self._stats['hits'] + self._stats['misses']
+            hit_rate = self._stats['hits'] / total if total > 0 else 0
+
+            return {
+                'size': self._entry_count,
+                'max_size': self.max_entries,
+                'hits': self._stats['hits'],
+                'misses': self._stats['misses'],
+                'hit_rate': f"{hit_rate:.1%}",
+                'hit_ratio': hit_rate,
+                'evictions': self._stats['evictions']
+            }
+
+
+class TieredCache:
+    """
+    Cache a due livelli: memoria (veloce, per sessione) + disco (persistente).
+
+    get() cerca prima in memoria, poi su disco; un hit su disco viene
+    promosso in memoria. set() scrive su entrambi i livelli.
+
+    Ogni lookup viene registrato come chiamata al servizio "cache" sul
+    PerformanceCollector attivo (operation "<nome>.hit" / "<nome>.miss"),
+    cosi' RunMetrics puo' calcolare l'hit ratio del run.
+
+    Usage:
+        cache = TieredCache("embeddings", MemoryCache(1000, 3600), DiskCache(path))
+        vector = cache.get(key)
+        if vector is None:
+            vector = compute()
+            cache.set(key, vector, ttl=86400)
+    """
+
+    def __init__(self,
+                 name: str,
+                 memory: MemoryCache,
+                 disk: Optional[DiskCache] = None):
+        self.name = name
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Ottiene valore dalla cache (memoria, poi disco).
+
+        Args:
+            key: Chiave
+
+        Returns:
+            Valore o None se non trovato/scaduto
+        """
+        start = time.perf_counter()
+
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+
+        record_cache_lookup(self.name, value is not None, (time.perf_counter() - start) * 1000)
+        return value
+
+    def set(self,
+            key: str,
+            value: Any,
+            ttl: Optional[int] = None) -> None:
+        """
+        Salva valore su entrambi i livelli.
+
+        Args:
+            key: Chiave
+            value: Valore (deve essere serializzabile JSON per il disco)
+            ttl: TTL su disco in secondi (la memoria usa il proprio default
+                 se piu breve)
+        """
+        memory_ttl = self.memory.default_ttl
+        if ttl is not None:
+            memory_ttl = min(ttl, memory_ttl)
+        self.memory.set(key, value, memory_ttl)
+
+        if self.disk is not None:
+            self.disk.set(key, value, ttl)
+
+    def delete(self, key: str) -> bool:
+        """Elimina entry da entrambi i livelli"""
+        removed = self.memory.delete(key)
+        if self.disk is not None:
+            removed = self.disk.delete(key) or removed
+        return removed
+
+    def clear(self) -> None:
+        """Svuota entrambi i livelli"""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def get_stats(self) -> dict:
+        """Statistiche per livello"""
+        stats = {
+            'name': self.name,
+            'memory': self.memory.get_stats(),
+        }
+        if self.disk is not None:
+            stats['disk'] = self.disk.get_stats()
+        return stats
+
 
 class LangSmithCache:
     """
@@ -411,6 +594,160 @@ class LangSmithCache:
 _global_memory_cache: Optional[MemoryCache] = None
 _global_langsmith_cache: Optional[LangSmithCache] = None
 
+# Cache a due livelli per nome (langsmith_traces, sheets_runs)
+_tiered_caches: dict[str, TieredCache] = {}
+_tiered_lock = threading.Lock()
+_tiered_config = {
+    'enabled': True,
+    'directory': Path(__file__).parent.parent / ".cache",
+    'memory_max_entries': 1000,
+    'memory_ttl_seconds': 3600,
+    'disk_max_entries': 5000,
+}
+
+# PerformanceCollector che riceve gli hit/miss, per contesto: i tester
+# di run_batch girano in task diversi, ognuno con il proprio collector
+_performance_collector: ContextVar[Optional[Any]] = ContextVar('performance_collector', default=None)
+
+# Metriche del test a cui imputare i lookup nel contesto corrente (task
+# asyncio, thread di asyncio.to_thread): la pipeline lavora per test
+# diversi da quello in corso sul collector
+_UNATTRIBUTED = object()
+_cache_metrics: ContextVar[Any] = ContextVar('cache_metrics', default=None)
+
+
+def configure_caches(cache_settings: Any, base_dir: Optional[Path] = None) -> None:
+    """
+    Configura le cache a due livelli da CacheSettings (config_loader).
+
+    Se la configurazione cambia, le cache gia' create vengono scartate e
+    ricreate al prossimo get_tiered_cache() con i nuovi parametri.
+
+    Args:
+        cache_settings: CacheSettings dataclass (GlobalSettings.cache)
+        base_dir: Directory base per path relativi (default: root progetto)
+    """
+    directory = Path(getattr(cache_settings, 'directory', '.cache'))
+    if not directory.is_absolute():
+        directory = (base_dir or Path(__file__).parent.parent) / directory
+
+    new_config = {
+        'enabled': getattr(cache_settings, 'enabled', True),
+        'directory': directory,
+        'memory_max_entries': getattr(cache_settings, 'memory_max_entries', 1000),
+        'memory_ttl_seconds': getattr(cache_settings, 'memory_ttl_seconds', 3600),
+        'disk_max_entries': getattr(cache_settings, 'disk_max_entries', 5000),
+    }
+
+    with _tiered_lock:
+        if new_config != _tiered_config:
+            _tiered_config.update(new_config)
+            _tiered_caches.clear()
+
+
+def get_tiered_cache(name: str) -> Optional[TieredCache]:
+    """
+    Ottiene (creandola se serve) la cache a due livelli con questo nome.
+
+    Args:
+        name: Nome cache, usato anche come sottocartella su disco
+
+    Returns:
+        TieredCache o None se il caching e' disabilitato
+    """
+    with _tiered_lock:
+        if not _tiered_config['enabled']:
+            return None
+
+        cache = _tiered_caches.get(name)
+        if cache is None:
+            try:
+                disk = DiskCache(
+                    _tiered_config['directory'] / name,
+                    max_entries=_tiered_config['disk_max_entries']
+                )
+            except OSError as e:
+                print(f"Cache: disco non disponibile per {name}: {e}")
+                disk = None
+
+            cache = TieredCache(
+                name,
+                MemoryCache(
+                    _tiered_config['memory_max_entries'],
+                    _tiered_config['memory_ttl_seconds']
+                ),
+                disk
+            )
+            _tiered_caches[name] = cache
+
+        return cache
+
+
+def get_cache_directory() -> Optional[Path]:
+    """
+    Directory della cache su disco (per store dedicati, es. embeddings).
+
+    Returns:
+        Path configurato o None se il caching e' disabilitato
+    """
+    with _tiered_lock:
+        if not _tiered_config['enabled']:
+            return None
+        return _tiered_config['directory']
+
+
+def set_performance_collector(collector: Optional[Any]) -> None:
+    """
+    Imposta il PerformanceCollector che riceve gli hit/miss delle cache
+    nel contesto corrente (task asyncio e i task/thread che avvia).
+
+    Args:
+        collector: PerformanceCollector del run corrente (None per staccare)
+    """
+    _performance_collector.set(collector)
+
+
+def record_cache_lookup(name: str, hit: bool, duration_ms: float) -> None:
+    """
+    Registra un lookup di cache sulle metriche del test del contesto
+    (cache_metrics_scope) o, in mancanza, sul PerformanceCollector attivo.
+
+    Args:
+        name: Nome cache (operation "<name>.hit" / "<name>.miss")
+        hit: True se il valore era in cache
+        duration_ms: Durata del lookup
+    """
+    operation = f"{name}.{'hit' if hit else 'miss'}"
+    target = _cache_metrics.get()
+    if target is _UNATTRIBUTED:
+        return
+    try:
+        if target is not None:
+            target.add_service_call(service="cache", operation=operation,
+                                    duration_ms=duration_ms, success=True)
+            return
+        collector = _performance_collector.get()
+        if collector is not None:
+            collector.record_service_call(service="cache", operation=operation,
+                                          duration_ms=duration_ms, success=True)
+    except Exception:
+        pass
+
+
+@contextmanager
+def cache_metrics_scope(metrics: Optional[Any]) -> Iterator[None]:
+    """
+    Imputa i lookup delle cache nel blocco alle metriche di un test.
+
+    Args:
+        metrics: TestMetrics del test (None = lookup non imputati a nessun test)
+    """
+    token = _cache_metrics.set(metrics if metrics is not None else _UNATTRIBUTED)
+    try:
+        yield
+    finally:
+        _cache_metrics.reset(token)
+
 
 def get_memory_cache() -> MemoryCache:
     """Ottiene cache in memoria globale"""
@@ -10,6 +10,8 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 
+from .history import RunHistoryStore
+
 
 @dataclass
 class MetricStats:
@@ -75,16 +77,18 @@ class CalibrationAnalyzer:
         "OVERALL": "overall"
     }
 
-    def __init__(self, sheets_client, project_config):
+    def __init__(self, sheets_client, project_config, history: Optional[RunHistoryStore] = None):
         """
         Initialize analyzer.
 
         Args:
             sheets_client: GoogleSheetsClient instance
             project_config: ProjectConfig with spreadsheet info
+            history: Local run history; closed runs already in it are not re-read
         """
         self.sheets = sheets_client
         self.project = project_config
+        self.history = history
 
     def analyze(self,
                 last_n_runs: int = 5,
@@ -113,15 +117,19 @@ class CalibrationAnalyzer:
         report.run_numbers = runs_to_analyze
 
         # Collect all metric values
-        all_values: Dict[str, List[float]] = {
-            metric: [] for metric in self.METRIC_COLUMNS.values()
-        }
-
-        for run_num in runs_to_analyze:
-            run_data = self._read_run_data(run_num)
-            if run_data:
-                report.total_tests += len(run_data)
-                self._extract_metrics(run_data, all_values)
+        if self.history is not None:
+            self._sync_history(runs_to_analyze)
+            report.total_tests = self.history.count_results(runs_to_analyze, "sheets")
+            all_values = self.history.metric_values(runs_to_analyze, "sheets")
+        else:
+            all_values: Dict[str, List[float]] = {
+                metric: [] for metric in self.METRIC_COLUMNS.values()
+            }
+            for run_num in runs_to_analyze:
+                run_data = self._read_run_data(run_num)
+                if run_data:
+                    report.total_tests += len(run_data)
+                    self._extract_metrics(run_data, all_values)
 
         # Calculate statistics for each metric
         for col_name, metric_name in self.METRIC_COLUMNS.items():
@@ -161,25 +169,44 @@ class CalibrationAnalyzer:
             print(f"Error getting run list: {e}")
             return []
 
+    def _sync_history(self, run_numbers: List[int]) -> None:
+        """Read from Sheets only the runs missing from the history or still open"""
+        latest_run = None
+        for run_num in run_numbers:
+            if self.history.run_info(run_num, "sheets"):
+                if latest_run is None:
+                    latest_run = max(self._get_recent_runs(1), default=0)
+                if self.sheets.is_closed_run(run_num, latest_run):
+                    continue
+            run_data = self._read_run_data(run_num)
+            if run_data:
+                self.history.ingest_sheet_records(run_num, run_data)
+
     def _read_run_data(self, run_num: int) -> List[Dict]:
         """Read data from a specific run sheet"""
         import re
         try:
             # Find worksheet by run number (handles "Run 001 [DEV] auto - date" format)
             worksheet = None
+            latest_run = 0
             pattern = re.compile(rf'^Run\s+{run_num:03d}\b', re.IGNORECASE)
 
             for ws in self.sheets._spreadsheet.worksheets():
-                if pattern.match(ws.title):
+                match = re.match(r'^Run\s+(\d{3})', ws.title, re.IGNORECASE)
+                if match:
+                    latest_run = max(latest_run, int(match.group(1)))
+                if worksheet is None and pattern.match(ws.title):
                     worksheet = ws
-                    break
 
             if not worksheet:
                 print(f"  Sheet for RUN {run_num:03d} not found")
                 return []
 
-            # Get all values using gspread
-            rows = worksheet.get_all_values()
+            # Get all values (closed runs come from the cache)
+            rows = self.sheets.get_run_values(
+                worksheet,
+                closed=self.sheets.is_closed_run(run_num, latest_run)
+            )
             if len(rows) < 2:
                 return []
 
@@ -337,6 +364,7 @@ def run_calibration(project_name: str,
     Returns:
         CalibrationReport or None on error
     """
+    from .cache import configure_caches, get_tiered_cache
     from .config_loader import ConfigLoader
     from .sheets_client import GoogleSheetsClient
 
@@ -356,11 +384,15 @@ def run_calibration(project_name: str,
         token_path = str(Path(creds_path).parent / "token.json") if creds_path else ""
 
         # Initialize sheets client
+        settings = loader.load_global_settings()
+        configure_caches(settings.cache, loader.base_dir)
         sheets = GoogleSheetsClient(
             spreadsheet_id=project.google_sheets.spreadsheet_id,
             credentials_path=creds_path,
             token_path=token_path,
-            drive_folder_id=project.google_sheets.drive_folder_id
+            drive_folder_id=project.google_sheets.drive_folder_id,
+            cache=get_tiered_cache("sheets_runs"),
+            cache_ttl_seconds=settings.cache.sheets_ttl_seconds
         )
 
         # Authenticate
@@ -369,7 +401,8 @@ def run_calibration(project_name: str,
             return None
 
         # Run analysis
-        analyzer = CalibrationAnalyzer(sheets, project)
+        history = RunHistoryStore(Path(f"reports/{project_name}") / RunHistoryStore.FILENAME)
+        analyzer = CalibrationAnalyzer(sheets, project, history=history)
         report = analyzer.analyze(last_n_runs=last_n_runs, run_numbers=run_numbers)
 
         # Print report
@@ -6,15 +6,22 @@ Contains:
 - LangSmithSetup: Helper for LangSmith setup
 - ThreadSafeSheetsClient: Thread-safe wrapper for parallel execution
 - ParallelResultsCollector: In-memory collector for parallel results
+- SheetsWriter: Background batched Sheets writer (one batchUpdate per window)
+- ScreenshotUploader: Concurrent, deduplicated Drive screenshot uploads
 """
 
 from .sheets_setup import GoogleSheetsSetup
 from .langsmith_setup import LangSmithSetup
 from .thread_safe import ThreadSafeSheetsClient, ParallelResultsCollector
+from .sheets_writer import SheetsWriter, TokenBucket
+from .screenshot_uploader import ScreenshotUploader
 
 __all__ = [
     'GoogleSheetsSetup',
     'LangSmithSetup',
     'ThreadSafeSheetsClient',
     'ParallelResultsCollector',
+    'SheetsWriter',
+    'TokenBucket',
+    'ScreenshotUploader',
 ]
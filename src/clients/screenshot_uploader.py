@@ -0,0 +1,209 @@
+"""
+Screenshot Uploader - Upload concorrenti e deduplicati su Google Drive
+
+Contains:
+- ScreenshotUploader: pool di thread per gli upload, permessi pubblici
+  raggruppati in batch HTTP Drive, deduplica per hash del contenuto
+
+Gli upload partono appena il test salva lo screenshot e si sovrappongono
+all'esecuzione dei test successivi; a fine run resta da attendere solo
+l'ultimo blocco invece di una coda seriale.
+"""
+
+import hashlib
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from ..screenshots import get_screenshot_buffers
+
+if TYPE_CHECKING:
+    from ..sheets_client import GoogleSheetsClient, ScreenshotUrls
+
+
+_STOP = object()
+
+
+def file_digest(file_path: Path) -> str:
+    """SHA-256 del contenuto di un file (dal buffer screenshot se in memoria)"""
+    shot = get_screenshot_buffers().get(file_path)
+    if shot is not None:
+        return shot.digest
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ScreenshotUploader:
+    """
+    Upload screenshot su Drive con pool di thread limitato.
+
+    - Ogni file viene creato da un thread del pool (Drive service per thread),
+      che passa subito al prossimo upload
+    - I permessi "chiunque con il link" di più file vengono creati con un
+      solo batch HTTP (fino a permission_batch file, attesa max permission_window_s)
+    - Screenshot con lo stesso contenuto vengono caricati una volta sola:
+      le richieste successive ricevono gli stessi URL
+
+    Usage:
+        uploader = ScreenshotUploader(sheets_client, max_workers=4)
+
+        future = uploader.submit(Path("shot.png"), "TEST_001")   # non blocca
+        urls = future.result()                                   # ScreenshotUrls o None
+
+        uploader.close()
+    """
+
+    def __init__(self,
+                 client: 'GoogleSheetsClient',
+                 max_workers: int = 4,
+                 permission_batch: int = 50,
+                 permission_window_s: float = 0.3):
+        """
+        Args:
+            client: GoogleSheetsClient autenticato (con cartella Drive)
+            max_workers: Upload simultanei
+            permission_batch: Permessi massimi per batch HTTP
+            permission_window_s: Attesa massima per riempire un batch di permessi
+        """
+        self.client = client
+        self.permission_batch = max(1, permission_batch)
+        self.permission_window_s = permission_window_s
+
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="drive-upload")
+        self._by_digest: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+        self._permissions: 'queue.Queue' = queue.Queue()
+        self._permission_thread = threading.Thread(target=self._permission_loop,
+                                                   name="drive-permissions", daemon=True)
+        self._permission_thread.start()
+        self._closed = False
+
+        # Statistiche
+        self.uploaded = 0
+        self.deduplicated = 0
+        self.failed = 0
+        self.permission_batches = 0
+
+    def submit(self, file_path: Path, test_id: str) -> 'Future[Optional[ScreenshotUrls]]':
+        """
+        Avvia l'upload di uno screenshot (ritorna subito).
+
+        Returns:
+            Future con ScreenshotUrls (None se upload fallito o file assente)
+        """
+        file_path = Path(file_path)
+        try:
+            digest = file_digest(file_path)
+        except OSError:
+            done: Future = Future()
+            done.set_result(None)
+            return done
+
+        with self._lock:
+            existing = self._by_digest.get(digest)
+            if existing is not None:
+                self.deduplicated += 1
+                return existing
+            future: Future = Future()
+            self._by_digest[digest] = future
+        self._pool.submit(self._upload, file_path, test_id, digest, future)
+        return future
+
+    def upload(self, file_path: Path, test_id: str) -> Optional['ScreenshotUrls']:
+        """Upload bloccante (submit + attesa)"""
+        return self.submit(file_path, test_id).result()
+
+    def upload_many(self, items: List[Tuple[Path, str]]) -> Dict[str, Optional['ScreenshotUrls']]:
+        """
+        Upload concorrente di più screenshot.
+
+        Args:
+            items: Coppie (file_path, test_id)
+
+        Returns:
+            test_id -> ScreenshotUrls (o None)
+        """
+        futures = [(test_id, self.submit(path, test_id)) for path, test_id in items]
+        return {test_id: future.result() for test_id, future in futures}
+
+    def close(self) -> None:
+        """Attende gli upload in corso e ferma i thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._pool.shutdown(wait=True)
+        self._permissions.put(_STOP)
+        self._permission_thread.join()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'uploaded': self.uploaded,
+            'deduplicated': self.deduplicated,
+            'failed': self.failed,
+            'permission_batches': self.permission_batches
+        }
+
+    def _upload(self, file_path: Path, test_id: str, digest: str, future: Future) -> None:
+        """Crea il file su Drive; il permesso (e il future) li chiude il batch"""
+        try:
+            file = self.client.create_drive_file(file_path, test_id)
+        except Exception as e:
+            print(f"! Errore upload screenshot: {e}")
+            file = None
+
+        if not file:
+            self._forget(digest)
+            future.set_result(None)
+            return
+
+        # Il thread è subito libero per il prossimo upload
+        self._permissions.put((file, digest, future))
+
+    def _forget(self, digest: str) -> None:
+        """Upload fallito: il prossimo screenshot identico riprova"""
+        with self._lock:
+            self._by_digest.pop(digest, None)
+            self.failed += 1
+
+    def _permission_loop(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[Tuple[Dict[str, str], str, Future]] = []
+            deadline: Optional[float] = None
+
+            while len(batch) < self.permission_batch:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    item = self._permissions.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.permission_window_s
+
+            if not batch:
+                continue
+            granted: set = set()
+            try:
+                granted = self.client.grant_public_read([file['id'] for file, _, _ in batch])
+                self.permission_batches += 1
+            except Exception as e:
+                print(f"! Errore permessi screenshot: {e}")
+            for file, digest, future in batch:
+                if file['id'] not in granted:
+                    # File privato: il link non sarebbe leggibile dal foglio
+                    self._forget(digest)
+                    future.set_result(None)
+                    continue
+                self.uploaded += 1
+                future.set_result(self.client.screenshot_urls(file))
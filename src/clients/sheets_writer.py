@@ -0,0 +1,258 @@
+"""
+Sheets Writer - Scrittura Google Sheets in background a batch
+
+Contains:
+- TokenBucket: Limite richieste al minuto (quota Sheets API)
+- SheetsWriter: Thread che raccoglie i risultati e li scrive con un
+  values.append (più una batchUpdate per le altezze righe screenshot)
+  per finestra (tempo o dimensione)
+
+Il ciclo dei test non attende mai Sheets: submit() accoda e ritorna.
+Con uno ScreenshotUploader lo screenshot parte subito in parallelo e il
+writer ne attende gli URL solo al momento della batch; righe e altezze
+righe viaggiano nel thread del writer e un 429 (o 5xx) viene ritentato
+con backoff esponenziale.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from ..sheets_client import GoogleSheetsClient, TestResult
+    from .screenshot_uploader import ScreenshotUploader
+
+
+# Stati HTTP per cui ha senso ritentare
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    """Codice HTTP di un errore gspread/googleapiclient, se presente"""
+    response = getattr(error, 'response', None) or getattr(error, 'resp', None)
+    status = getattr(response, 'status_code', None) or getattr(response, 'status', None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Token bucket thread-safe.
+
+    Ogni chiamata API consuma un token; i token si ricaricano a
+    rate_per_minute / 60 al secondo fino a `capacity`.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[int] = None):
+        """
+        Args:
+            rate_per_minute: Richieste al minuto sostenibili
+            capacity: Burst massimo (default: rate_per_minute / 6, minimo 1)
+        """
+        self.rate_per_second = max(rate_per_minute, 1) / 60.0
+        self.capacity = capacity or max(1, int(rate_per_minute / 6))
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Attende un token.
+
+        Returns:
+            Secondi attesi
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate_per_second)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate_per_second
+            time.sleep(delay)
+            waited += delay
+
+
+_STOP = object()
+
+
+class SheetsWriter:
+    """
+    Writer Sheets in background.
+
+    Raccoglie i risultati per `flush_interval_s` secondi o fino a
+    `max_batch` righe, poi li scrive con GoogleSheetsClient.write_results_batch
+    (values.append, più una batchUpdate per le righe con screenshot). Un run da 500 test produce decine di chiamate API
+    invece di migliaia.
+
+    Usage:
+        writer = SheetsWriter(sheets_client, on_written=mark_synced)
+        writer.start()
+
+        writer.submit(result)      # non blocca
+
+        writer.close()             # a fine sessione: scrive il residuo
+    """
+
+    def __init__(self,
+                 client: 'GoogleSheetsClient',
+                 flush_interval_s: float = 5.0,
+                 max_batch: int = 50,
+                 requests_per_minute: int = 50,
+                 max_retries: int = 5,
+                 base_delay_s: float = 2.0,
+                 on_written: Optional[Callable[[List['TestResult']], None]] = None,
+                 uploader: Optional['ScreenshotUploader'] = None):
+        """
+        Args:
+            client: GoogleSheetsClient con foglio RUN attivo
+            flush_interval_s: Attesa massima di una riga prima della scrittura
+            max_batch: Righe massime per batchUpdate
+            requests_per_minute: Quota Sheets API (token bucket)
+            max_retries: Tentativi extra su 429/5xx
+            base_delay_s: Attesa iniziale del backoff esponenziale
+            on_written: Callback (dal thread del writer) con le righe scritte
+            uploader: Upload screenshot concorrente (None = upload nel thread del writer)
+        """
+        self.client = client
+        self.flush_interval_s = flush_interval_s
+        self.max_batch = max(1, max_batch)
+        self.max_retries = max_retries
+        self.base_delay_s = base_delay_s
+        self.on_written = on_written
+        self.uploader = uploader
+
+        self._bucket = TokenBucket(requests_per_minute)
+        self._queue: 'queue.Queue[Any]' = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+        # Statistiche
+        self.api_calls = 0
+        self.batches = 0
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.retries = 0
+        self.screenshots_uploaded = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Avvia il thread del writer"""
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="sheets-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, result: 'TestResult') -> None:
+        """Accoda un risultato (ritorna subito); lo screenshot parte subito se c'è l'uploader"""
+        upload = None
+        if self.uploader and self._needs_upload(result):
+            upload = self.uploader.submit(Path(result.screenshot_path), result.test_id)
+        self._queue.put((result, upload))
+
+    def close(self, timeout: Optional[float] = None) -> int:
+        """
+        Scrive le righe in coda e ferma il thread.
+
+        Args:
+            timeout: Attesa massima in secondi (None = fino alla fine)
+
+        Returns:
+            Righe scritte in totale
+        """
+        if self._thread:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+        return self.rows_written
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'api_calls': self.api_calls,
+            'batches': self.batches,
+            'rows_written': self.rows_written,
+            'rows_failed': self.rows_failed,
+            'retries': self.retries,
+            'screenshots_uploaded': self.screenshots_uploaded
+        }
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[Tuple['TestResult', Optional[Future]]] = []
+            deadline: Optional[float] = None
+
+            # Prima riga: attesa senza limite; poi finestra di flush_interval_s
+            while len(batch) < self.max_batch:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval_s
+
+            if batch:
+                self._write(batch)
+
+    @staticmethod
+    def _needs_upload(row: 'TestResult') -> bool:
+        return bool(row.screenshot_path and not row.screenshot_urls and Path(row.screenshot_path).exists())
+
+    def _write(self, items: List[Tuple['TestResult', Optional[Future]]]) -> None:
+        """URL screenshot (attesa upload o upload diretto) e scrittura batch (con retry)"""
+        batch = []
+        for row, upload in items:
+            if upload is not None:
+                urls = upload.result()
+            elif self._needs_upload(row):
+                urls = self.client.upload_screenshot(Path(row.screenshot_path), row.test_id)
+            else:
+                urls = None
+            if urls:
+                row.screenshot_urls = urls
+                self.screenshots_uploaded += 1
+            batch.append(row)
+
+        # values.append, più la batchUpdate delle altezze se ci sono thumbnail
+        calls = 2 if any(row.screenshot_urls and row.screenshot_urls.image_url for row in batch) else 1
+        for attempt in range(self.max_retries + 1):
+            for _ in range(calls):
+                self._bucket.acquire()
+            self.api_calls += calls
+            try:
+                written = self.client.write_results_batch(batch)
+                break
+            except Exception as e:
+                status = _status_code(e)
+                retryable = status in RETRYABLE_STATUS or (status is None and "429" in str(e))
+                if not retryable or attempt == self.max_retries:
+                    print(f"✗ Errore scrittura Sheets ({len(batch)} righe): {e}")
+                    self.rows_failed += len(batch)
+                    return
+                self.retries += 1
+                time.sleep(self.base_delay_s * (2 ** attempt))
+
+        self.batches += 1
+        self.rows_written += written
+        if written < len(batch):
+            self.rows_failed += len(batch) - written
+        if self.on_written and written:
+            try:
+                self.on_written(batch[:written])
+            except Exception as e:
+                print(f"! Callback scrittura Sheets fallita: {e}")
@@ -105,22 +105,40 @@ class ThreadSafeSheetsClient:
         with self._lock:
             return self._screenshot_urls.get(test_id)
 
-    def flush_screenshots(self) -> int:
+    def flush_screenshots(self, max_workers: int = 4) -> int:
         """
         Upload tutti gli screenshot in coda.
 
+        Upload concorrenti con permessi in batch; screenshot identici
+        vengono caricati una volta sola.
+
+        Args:
+            max_workers: Upload simultanei
+
         Returns:
             Numero screenshot uploadati
         """
+        from .screenshot_uploader import ScreenshotUploader
+
         with self._lock:
             screenshots_to_upload = self._screenshots_queue.copy()
             self._screenshots_queue.clear()
 
+        if not screenshots_to_upload:
+            return 0
+
+        uploader = ScreenshotUploader(self._client, max_workers=max_workers)
+        try:
+            urls_by_test = uploader.upload_many(screenshots_to_upload)
+        finally:
+            uploader.close()
+
         uploaded = 0
-        for file_path, test_id in screenshots_to_upload:
-            urls = self.upload_screenshot_now(file_path, test_id)
-            if urls:
-                uploaded += 1
+        with self._lock:
+            for test_id, urls in urls_by_test.items():
+                if urls:
+                    self._screenshot_urls[test_id] = urls
+                    uploaded += 1
 
         return uploaded
 
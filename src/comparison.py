@@ -7,6 +7,9 @@ Permette di:
 - Rilevare miglioramenti (test che fallivano e ora passano)
 - Analizzare coverage dei test
 - Identificare flaky tests
+
+Le analisi su più RUN sono query sullo storico locale (RunHistoryStore):
+ogni RUN viene letta dalla sorgente una volta sola, poi solo se cambiata.
 """
 
 from dataclasses import dataclass, field
@@ -16,6 +19,8 @@ from enum import Enum
 from pathlib import Path
 import json
 
+from .history import RunHistoryStore, journal_fingerprint
+
 
 class ChangeType(Enum):
     """Tipo di cambiamento tra due run"""
@@ -139,15 +144,27 @@ class RunComparator:
                 print(f"  - {reg.test_id}: {reg.old_result} -> {reg.new_result}")
     """
 
-    def __init__(self, sheets_client=None, local_reports_path: Path = None):
+    def __init__(self,
+                 sheets_client=None,
+                 local_reports_path: Path = None,
+                 history: Optional[RunHistoryStore] = None):
         """
         Args:
             sheets_client: GoogleSheetsClient per leggere da Sheets
             local_reports_path: Path ai report locali (alternativo)
+            history: Storico RUN (default: history.sqlite nei report locali,
+                     in memoria se non ci sono report locali)
         """
         self._sheets = sheets_client
-        self._local_path = local_reports_path
+        self._local_path = Path(local_reports_path) if local_reports_path else None
+        # Sorgente delle RUN analizzate: Sheets se disponibile, altrimenti report locali
+        self.source = "sheets" if sheets_client else "local"
         self._cache: Dict[int, Dict[str, Any]] = {}
+        if history is None:
+            history = RunHistoryStore(
+                self._local_path / RunHistoryStore.FILENAME if self._local_path else None
+            )
+        self.history = history
 
     def compare(self, run_a: int, run_b: int) -> ComparisonResult:
         """
@@ -261,7 +278,7 @@ class RunComparator:
 
     def _load_run_data(self, run_number: int) -> Dict[str, Dict]:
         """
-        Carica dati di una RUN.
+        Carica dati di una RUN (dallo storico, aggiornato se serve).
 
         Returns:
             Dict[test_id -> {result, notes, category, question, ...}]
@@ -270,43 +287,79 @@ class RunComparator:
         if run_number in self._cache:
             return self._cache[run_number]
 
-        data = {}
+        self.sync_history([run_number])
+        data = self.history.run_results(run_number, self.source)
+        if not data and self._sheets and self._local_path:
+            # RUN non presente su Sheets: report locale
+            data = self.history.run_results(run_number, "local")
+        self._cache[run_number] = data
+        return data
 
-        # Prova da Sheets
-        if self._sheets:
-            try:
-                worksheet = self._sheets.get_run_sheet(run_number)
-                if worksheet:
-                    records = worksheet.get_all_records()
-                    for record in records:
-                        test_id = record.get('TEST ID', '')
-                        if test_id:
-                            data[test_id] = {
-                                'result': record.get('RESULT', record.get('ESITO', '')),  # Supporta sia RESULT che ESITO (legacy)
-                                'notes': record.get('NOTES', ''),
-                                'question': record.get('QUESTION', ''),
-                                'category': '',  # Non sempre presente
-                                'date': record.get('DATE', '')
-                            }
-            except Exception as e:
-                print(f"! Errore caricamento RUN {run_number} da Sheets: {e}")
-
-        # Prova da report locali
-        if not data and self._local_path:
-            report_path = self._local_path / f"run_{run_number}" / "results.json"
-            if report_path.exists():
+    def sync_history(self, runs: List[int], latest_run: Optional[int] = None) -> List[int]:
+        """
+        Porta nello storico le RUN mancanti o cambiate.
+
+        RUN locali: rilette solo se il journal è cambiato. RUN Sheets: le
+        RUN chiuse già nello storico non vengono rilette; quella corrente
+        e l'ultima (ancora modificabili) sì. Le RUN locali e Sheets con lo
+        stesso numero restano separate nello storico.
+
+        Args:
+            runs: RUN da sincronizzare
+            latest_run: Ultima RUN esistente (default: calcolata se serve)
+
+        Returns:
+            RUN lette dalla sorgente
+        """
+        loaded = []
+        for run_number in runs:
+            # Prova da Sheets
+            if self._sheets:
+                if self.history.run_info(run_number, "sheets"):
+                    if latest_run is None:
+                        latest_run = max(self._get_all_run_numbers(), default=0)
+                    if self._sheets.is_closed_run(run_number, latest_run):
+                        continue
+                try:
+                    records = self._sheets.get_run_records(run_number)
+                    if records:
+                        self.history.ingest_sheet_records(run_number, records)
+                        self._cache.pop(run_number, None)
+                        loaded.append(run_number)
+                        continue
+                except Exception as e:
+                    print(f"! Errore caricamento RUN {run_number} da Sheets: {e}")
+
+            # Prova da report locali
+            if self._local_path and self._load_local_run(run_number):
+                self._cache.pop(run_number, None)
+                loaded.append(run_number)
+        return loaded
+
+    def _load_local_run(self, run_number: int) -> bool:
+        """Importa una RUN locale (journal, o results.json legacy) se cambiata"""
+        from .journal import RunJournal
+
+        info = self.history.run_info(run_number, "local")
+
+        for run_dir in (self._local_path / f"run_{run_number:03d}", self._local_path / f"run_{run_number}"):
+            fingerprint = journal_fingerprint(run_dir)
+            if fingerprint:
+                if info and info['fingerprint'] == fingerprint:
+                    return False
+                journal = RunJournal(run_dir / RunJournal.FILENAME)
+                self.history.ingest_results(run_number, journal.iter_results(), "local", fingerprint)
+                return True
+
+            report_path = run_dir / "results.json"
+            if report_path.exists() and not info:
                 try:
                     with open(report_path) as f:
-                        results = json.load(f)
-                    for result in results:
-                        test_id = result.get('test_id', '')
-                        if test_id:
-                            data[test_id] = result
+                        self.history.ingest_rows(run_number, json.load(f), "local")
+                    return True
                 except Exception as e:
                     print(f"! Errore caricamento RUN {run_number} locale: {e}")
-
-        self._cache[run_number] = data
-        return data
+        return False
 
     def _get_all_run_numbers(self) -> List[int]:
         """Ottiene tutti i numeri RUN disponibili"""
@@ -380,20 +433,19 @@ class RegressionDetector:
         Returns:
             Statistiche sul trend
         """
-        runs = self._comparator._get_all_run_numbers()[-last_n_runs:]
+        all_runs = self._comparator._get_all_run_numbers()
+        runs = all_runs[-last_n_runs:]
 
         if len(runs) < 2:
             return {'error': 'Serve almeno 2 RUN per analisi trend'}
 
-        regression_counts = []
-        improvement_counts = []
-        pass_rates = []
+        # Una query sullo storico per tutte le coppie di RUN consecutive
+        self._comparator.sync_history(runs, latest_run=all_runs[-1])
+        trend = self._comparator.history.transitions(runs, self._comparator.source)
 
-        for i in range(1, len(runs)):
-            result = self._comparator.compare(runs[i-1], runs[i])
-            regression_counts.append(result.regression_count)
-            improvement_counts.append(result.improvement_count)
-            pass_rates.append(result.pass_rate_b)
+        regression_counts = [t['regressions'] for t in trend]
+        improvement_counts = [t['improvements'] for t in trend]
+        pass_rates = [t['pass_rate'] for t in trend]
 
         return {
             'runs_analyzed': len(runs),
@@ -525,60 +577,29 @@ class FlakyTestDetector:
         Returns:
             Lista di FlakyTestReport per test flaky
         """
-        runs = self._comparator._get_all_run_numbers()[-last_n_runs:]
+        all_runs = self._comparator._get_all_run_numbers()
+        runs = all_runs[-last_n_runs:]
 
         if len(runs) < 3:
             return []  # Servono almeno 3 run per rilevare flakiness
 
-        # Raccogli storia di ogni test
-        test_history: Dict[str, List[Tuple[int, str]]] = {}
-
-        for run_num in runs:
-            data = self._comparator._load_run_data(run_num)
-
-            for test_id, test_data in data.items():
-                if test_id not in test_history:
-                    test_history[test_id] = []
-
-                test_history[test_id].append(
-                    (run_num, test_data.get('result', ''))
-                )
-
-        # Calcola flaky score per ogni test
-        flaky_tests = []
-
-        for test_id, history in test_history.items():
-            if len(history) < 3:
-                continue  # Non abbastanza dati
-
-            results = [r for _, r in history]
-            pass_count = results.count('PASS')
-            fail_count = results.count('FAIL')
-            total = len(results)
-
-            # Flaky score: quanto varia tra PASS e FAIL
-            # 0 = sempre stesso risultato, 1 = 50/50
-            if total == 0:
-                continue
-
-            pass_ratio = pass_count / total
-            flaky_score = 2 * min(pass_ratio, 1 - pass_ratio)
-
-            if flaky_score >= flaky_threshold:
-                report = FlakyTestReport(
-                    test_id=test_id,
-                    total_runs=total,
-                    pass_count=pass_count,
-                    fail_count=fail_count,
-                    flaky_score=flaky_score,
-                    history=history
-                )
-                flaky_tests.append(report)
-
-        # Ordina per flaky score decrescente
-        flaky_tests.sort(key=lambda x: x.flaky_score, reverse=True)
-
-        return flaky_tests
+        self._comparator.sync_history(runs, latest_run=all_runs[-1])
+
+        # Flaky score: quanto varia tra PASS e FAIL
+        # 0 = sempre stesso risultato, 1 = 50/50 (calcolato nella query)
+        return [
+            FlakyTestReport(
+                test_id=row['test_id'],
+                total_runs=row['total'],
+                pass_count=row['passed'],
+                fail_count=row['failed'],
+                flaky_score=row['score'],
+                history=row['history']
+            )
+            for row in self._comparator.history.flaky_tests(
+                runs, self._comparator.source, flaky_threshold, min_runs=3
+            )
+        ]
 
     def get_stability_report(self, last_n_runs: int = 10) -> Dict[str, Any]:
         """
@@ -594,27 +615,11 @@ class FlakyTestDetector:
 
         flaky = self.detect_flaky_tests(last_n_runs, flaky_threshold=0.2)
 
-        # Conta test stabili
-        test_history: Dict[str, List[str]] = {}
-
-        for run_num in runs:
-            data = self._comparator._load_run_data(run_num)
-            for test_id, test_data in data.items():
-                if test_id not in test_history:
-                    test_history[test_id] = []
-                test_history[test_id].append(test_data.get('result', ''))
-
-        stable_pass = 0
-        stable_fail = 0
-
-        for test_id, results in test_history.items():
-            if len(results) >= 2:
-                if all(r == 'PASS' for r in results):
-                    stable_pass += 1
-                elif all(r == 'FAIL' for r in results):
-                    stable_fail += 1
-
-        total_tests = len(test_history)
+        # Test sempre PASS / sempre FAIL (storico già sincronizzato)
+        counts = self._comparator.history.stability(runs, self._comparator.source)
+        total_tests = counts['total_tests']
+        stable_pass = counts['stable_pass']
+        stable_fail = counts['stable_fail']
 
         return {
             'runs_analyzed': len(runs),
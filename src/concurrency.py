@@ -0,0 +1,228 @@
+"""
+Adaptive Concurrency - Limite di worker paralleli regolato a runtime
+
+Controller AIMD (additive increase, multiplicative decrease) per
+ParallelTestRunner: parte basso, aggiunge un worker finché la latenza
+del chatbot resta vicina al minimo osservato e riduce il limite quando
+il chatbot degrada (latenza, timeout), LangSmith risponde 429 o l'host
+è saturo. Ogni decisione viene registrata come serie temporale per il
+report performance.
+
+Usage:
+    controller = AdaptiveConcurrency(max_limit=8)
+
+    await controller.acquire()
+    try:
+        ...  # test
+    finally:
+        await controller.release()
+    await controller.record(latency_ms=1800, timed_out=False)
+"""
+
+import asyncio
+import os
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class ConcurrencyDecision:
+    """Una regolazione del limite (un punto della serie temporale)"""
+    elapsed_s: float
+    limit: int
+    previous: int
+    reason: str                       # start | stable | latency | timeout | langsmith_429 | host_cpu | host_memory | max
+    p50_ms: Optional[float] = None
+    baseline_ms: Optional[float] = None
+    timeout_rate: float = 0.0
+    cpu_percent: Optional[float] = None
+    memory_percent: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def sample_host_load() -> Tuple[Optional[float], Optional[float]]:
+    """
+    CPU e RAM dell'host in percentuale.
+
+    Usa psutil se installato, altrimenti il load average (solo CPU).
+
+    Returns:
+        (cpu_percent, memory_percent), None se non misurabile
+    """
+    try:
+        import psutil
+        return psutil.cpu_percent(interval=None), psutil.virtual_memory().percent
+    except ImportError:
+        pass
+
+    try:
+        cpu = os.getloadavg()[0] / (os.cpu_count() or 1) * 100
+    except (AttributeError, OSError):
+        cpu = None
+    return cpu, None
+
+
+class AdaptiveConcurrency:
+    """
+    Semaforo con limite variabile regolato dalle latenze osservate.
+
+    Ogni `window` test completati confronta la latenza mediana con la
+    baseline (la migliore mediana vista, riallineata quando il limite è
+    al minimo) e decide:
+    - timeout, 429 LangSmith, CPU/RAM oltre soglia o latenza oltre
+      baseline * latency_tolerance -> limite * backoff_factor
+    - altrimenti -> limite + 1 (fino a max_limit)
+    """
+
+    def __init__(self,
+                 max_limit: int,
+                 min_limit: int = 1,
+                 initial: Optional[int] = None,
+                 window: int = 5,
+                 latency_tolerance: float = 1.5,
+                 backoff_factor: float = 0.7,
+                 cpu_limit_percent: float = 90.0,
+                 memory_limit_percent: float = 90.0,
+                 throttle_source: Optional[Callable[[], int]] = None,
+                 host_probe: Optional[Callable[[], Tuple[Optional[float], Optional[float]]]] = None):
+        """
+        Args:
+            max_limit: Limite massimo (worker disponibili nel pool)
+            min_limit: Limite minimo
+            initial: Limite iniziale (default: min(2, max_limit))
+            window: Test per finestra di decisione
+            latency_tolerance: Rapporto p50/baseline oltre cui il chatbot è degradato
+            backoff_factor: Riduzione moltiplicativa del limite
+            cpu_limit_percent: Soglia CPU host
+            memory_limit_percent: Soglia RAM host
+            throttle_source: Contatore cumulativo dei 429 (es. LangSmithClient.throttled_count)
+            host_probe: Funzione (cpu%, ram%) (default: sample_host_load)
+        """
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        start = initial if initial is not None else min(2, self.max_limit)
+        self.limit = max(self.min_limit, min(start, self.max_limit))
+        self.window = max(1, window)
+        self.latency_tolerance = latency_tolerance
+        self.backoff_factor = backoff_factor
+        self.cpu_limit_percent = cpu_limit_percent
+        self.memory_limit_percent = memory_limit_percent
+        self.throttle_source = throttle_source
+        self.host_probe = host_probe or sample_host_load
+
+        self._active = 0
+        self._condition = asyncio.Condition()
+        self._samples: List[Tuple[float, bool]] = []
+        self._baseline_ms: Optional[float] = None
+        self._throttles_seen = throttle_source() if throttle_source else 0
+        self._start = time.time()
+
+        self.decisions: List[ConcurrencyDecision] = [
+            ConcurrencyDecision(elapsed_s=0.0, limit=self.limit, previous=self.limit, reason="start")
+        ]
+
+    async def __aenter__(self) -> 'AdaptiveConcurrency':
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.release()
+
+    @property
+    def active(self) -> int:
+        """Test in esecuzione"""
+        return self._active
+
+    async def acquire(self) -> None:
+        """Attende uno slot sotto il limite corrente"""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._active < self.limit)
+            self._active += 1
+
+    async def release(self) -> None:
+        """Libera uno slot"""
+        async with self._condition:
+            self._active = max(0, self._active - 1)
+            self._condition.notify_all()
+
+    async def record(self, latency_ms: float, timed_out: bool = False) -> Optional[ConcurrencyDecision]:
+        """
+        Registra l'esito di un test; a finestra piena regola il limite.
+
+        Args:
+            latency_ms: Latenza risposta chatbot del test
+            timed_out: True se il chatbot non ha risposto
+
+        Returns:
+            La decisione presa, None se la finestra non è ancora piena
+        """
+        async with self._condition:
+            self._samples.append((latency_ms, timed_out))
+            if len(self._samples) < self.window:
+                return None
+
+            decision = self._decide(self._samples)
+            self._samples = []
+            self.limit = decision.limit
+            self.decisions.append(decision)
+            self._condition.notify_all()
+            return decision
+
+    def _decide(self, samples: List[Tuple[float, bool]]) -> ConcurrencyDecision:
+        """Calcola il nuovo limite da una finestra di campioni"""
+        latencies = [latency for latency, timed_out in samples if not timed_out and latency > 0]
+        p50 = statistics.median(latencies) if latencies else None
+        timeout_rate = sum(1 for _, timed_out in samples if timed_out) / len(samples)
+
+        throttles = 0
+        if self.throttle_source:
+            total = self.throttle_source()
+            throttles = total - self._throttles_seen
+            self._throttles_seen = total
+
+        cpu, memory = self.host_probe()
+
+        # Al limite minimo la latenza misurata è quella senza contesa
+        if p50 is not None:
+            if self._baseline_ms is None or p50 < self._baseline_ms or self.limit == self.min_limit:
+                self._baseline_ms = p50
+
+        if timeout_rate > 0:
+            reason = "timeout"
+        elif throttles > 0:
+            reason = "langsmith_429"
+        elif cpu is not None and cpu > self.cpu_limit_percent:
+            reason = "host_cpu"
+        elif memory is not None and memory > self.memory_limit_percent:
+            reason = "host_memory"
+        elif p50 is not None and self._baseline_ms and p50 > self._baseline_ms * self.latency_tolerance:
+            reason = "latency"
+        else:
+            reason = "stable" if self.limit < self.max_limit else "max"
+
+        if reason in ("stable", "max"):
+            new_limit = min(self.max_limit, self.limit + 1)
+        else:
+            new_limit = max(self.min_limit, int(self.limit * self.backoff_factor))
+            if new_limit == self.limit and self.limit > self.min_limit:
+                new_limit = self.limit - 1
+
+        return ConcurrencyDecision(
+            elapsed_s=round(time.time() - self._start, 1),
+            limit=new_limit,
+            previous=self.limit,
+            reason=reason,
+            p50_ms=p50,
+            baseline_ms=self._baseline_ms,
+            timeout_rate=timeout_rate,
+            cpu_percent=cpu,
+            memory_percent=memory
+        )
+
+    def get_timeline(self) -> List[Dict[str, Any]]:
+        """Serie temporale delle decisioni (serializzabile)"""
+        return [d.to_dict() for d in self.decisions]
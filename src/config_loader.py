@@ -25,6 +25,7 @@ class SelectorsConfig:
     bot_messages: str = ""
     thread_container: str = ""
     loading_indicator: str = ""
+    new_chat_button: str = ""  # Opzionale: abilita il reset veloce "new_chat"
 
 
 @dataclass
@@ -86,6 +87,9 @@ class OllamaConfig:
     enabled: bool = False
     model: str = "mistral"
     url: str = "http://localhost:11434/api/generate"
+    timeout_seconds: int = 120
+    keep_alive: str = "30m"        # Modello residente in memoria tra le richieste ("-1" = sempre)
+    num_parallel: int = 0          # Richieste simultanee (0 = OLLAMA_NUM_PARALLEL o 1)
 
 
 @dataclass
@@ -141,6 +145,14 @@ class BrowserConfig:
     viewport_width: int = 1280
     viewport_height: int = 720
     device_scale_factor: int = 2
+    response_detection: str = "poll"  # poll | observer (MutationObserver push)
+    observer_quiet_ms: int = 400
+    reset_strategies: list = field(default_factory=lambda: ["new_chat", "clear_storage", "reload"])
+    reset_ready_timeout_ms: int = 3000
+    screenshot_format: str = "png"    # png | webp | jpeg
+    screenshot_quality: int = 80      # Solo webp/jpeg
+    screenshot_max_height: int = 0    # Pixel (0 = nessun limite)
+    screenshot_scale: float = 1.0     # Riduzione (es. 0.5 con device_scale_factor 2)
 
 
 @dataclass
@@ -189,6 +201,9 @@ class EvaluationSettings:
     provider: str = "openai"
     model: str = "gpt-4o-mini"
     embedding_model: str = "text-embedding-3-small"
+    embedding_provider: str = "openai"            # openai | ollama (locale, offline)
+    embedding_url: str = "http://localhost:11434"  # Server Ollama per gli embedding
+    embedding_batch_size: int = 256               # Testi per richiesta embeddings
     api_key_env: str = "OPENAI_API_KEY"
     semantic_threshold: float = 0.8
     judge_threshold: float = 0.7
@@ -200,6 +215,63 @@ class EvaluationSettings:
     auto_rag_context: AutoRAGContextSettings = field(default_factory=AutoRAGContextSettings)
 
 
+@dataclass
+class CacheSettings:
+    """Settings per la cache a due livelli (memoria + disco)"""
+    enabled: bool = True
+    directory: str = ".cache"              # Relativa alla root se non assoluta
+    memory_max_entries: int = 1000
+    memory_ttl_seconds: int = 300
+    disk_max_entries: int = 5000
+    trace_ttl_seconds: int = 604800        # Trace LangSmith completati (immutabili)
+    sheets_ttl_seconds: int = 604800       # Fogli RUN chiusi (chiave: foglio, invalidati dalla colonna BASELINE)
+    embedding_ttl_seconds: int = 2592000   # Embeddings (dipendono solo da modello + testo)
+    health_ttl_seconds: int = 60           # Health check condivisi tra processi
+
+
+@dataclass
+class ParallelSettings:
+    """Settings per l'esecuzione parallela"""
+    enabled: bool = False
+    max_workers: int = 3
+    retry_strategy: str = "exponential"   # none | linear | exponential
+    max_retries: int = 2
+    base_delay_ms: int = 1000
+    rate_limit_per_minute: int = 60
+    pool_mode: str = "process"            # process | context (un Chromium, N context)
+    context_recycle_after: int = 25       # Test per context prima del riciclo (0 = mai)
+    context_max_heap_mb: int = 512        # Riciclo oltre questo heap JS (0 = no check)
+    adaptive: bool = False                # Concorrenza AIMD: max_workers diventa il tetto
+    min_workers: int = 1
+    adaptive_window: int = 5              # Test per decisione
+    latency_tolerance: float = 1.5        # p50 / baseline oltre cui si riduce
+    schedule: str = "longest_first"       # longest_first | input
+    speculative: bool = True              # Copia dei test in ritardo sui worker liberi
+    straggler_factor: float = 2.0         # Tempo trascorso / stima oltre cui duplicare
+
+
+@dataclass
+class PipelineSettings:
+    """Settings per la pipeline di post-processing (LangSmith + valutazione)"""
+    queue_size: int = 20               # Job in attesa prima di fermare i browser
+    workers: int = 4                   # Consumer della coda
+    langsmith_concurrency: int = 4     # Report LangSmith simultanei
+    judge_concurrency: int = 4         # Valutazioni (semantic/judge/RAG) simultanee
+    vision_concurrency: int = 2        # Validazioni vision simultanee
+    ollama_concurrency: int = 1        # Valutazioni Ollama simultanee (modello locale)
+
+
+@dataclass
+class SheetsWriterSettings:
+    """Settings per la scrittura Google Sheets in background (batch)"""
+    enabled: bool = True               # False = scrittura sincrona per test
+    flush_interval_s: float = 5.0      # Attesa massima di una riga prima della scrittura
+    max_batch: int = 50                # Righe per batchUpdate
+    requests_per_minute: int = 50      # Quota Sheets API (limite Google: 60/min per utente)
+    max_retries: int = 5               # Tentativi su 429/5xx
+    upload_workers: int = 4            # Upload screenshot Drive simultanei
+
+
 @dataclass
 class GlobalSettings:
     """Settings globali dell'applicazione"""
@@ -208,6 +280,10 @@ class GlobalSettings:
     browser: BrowserConfig = field(default_factory=BrowserConfig)
     report: ReportConfig = field(default_factory=ReportConfig)
     evaluation: EvaluationSettings = field(default_factory=EvaluationSettings)
+    cache: CacheSettings = field(default_factory=CacheSettings)
+    pipeline: PipelineSettings = field(default_factory=PipelineSettings)
+    parallel: ParallelSettings = field(default_factory=ParallelSettings)
+    sheets_writer: SheetsWriterSettings = field(default_factory=SheetsWriterSettings)
     max_turns: int = 15
     screenshot_on_complete: bool = True
     colors: bool = True
@@ -351,6 +427,16 @@ class ConfigLoader:
         settings.browser.viewport_width = viewport.get('width', 1280)
         settings.browser.viewport_height = viewport.get('height', 720)
         settings.browser.device_scale_factor = browser.get('device_scale_factor', 2)
+        settings.browser.response_detection = browser.get('response_detection', 'poll')
+        settings.browser.observer_quiet_ms = browser.get('observer_quiet_ms', 400)
+        reset = browser.get('reset', {})
+        settings.browser.reset_strategies = reset.get('strategies', ["new_chat", "clear_storage", "reload"])
+        settings.browser.reset_ready_timeout_ms = reset.get('ready_timeout_ms', 3000)
+        screenshot = browser.get('screenshot', {})
+        settings.browser.screenshot_format = screenshot.get('format', 'png')
+        settings.browser.screenshot_quality = screenshot.get('quality', 80)
+        settings.browser.screenshot_max_height = screenshot.get('max_height', 0)
+        settings.browser.screenshot_scale = screenshot.get('scale', 1.0)
 
         # Test settings
         test = data.get('test', {})
@@ -374,6 +460,9 @@ class ConfigLoader:
         settings.evaluation.provider = evaluation.get('provider', 'openai')
         settings.evaluation.model = evaluation.get('model', 'gpt-4o-mini')
         settings.evaluation.embedding_model = evaluation.get('embedding_model', 'text-embedding-3-small')
+        settings.evaluation.embedding_provider = evaluation.get('embedding_provider', 'openai')
+        settings.evaluation.embedding_url = evaluation.get('embedding_url', 'http://localhost:11434')
+        settings.evaluation.embedding_batch_size = evaluation.get('embedding_batch_size', 256)
         settings.evaluation.api_key_env = evaluation.get('api_key_env', 'OPENAI_API_KEY')
         settings.evaluation.semantic_threshold = evaluation.get('semantic_threshold', 0.8)
         settings.evaluation.judge_threshold = evaluation.get('judge_threshold', 0.7)
@@ -389,6 +478,58 @@ class ConfigLoader:
         settings.evaluation.auto_rag_context.max_chars = auto_rag.get('max_chars', 10000)
         settings.evaluation.auto_rag_context.prefer_manual = auto_rag.get('prefer_manual', True)
 
+        # Cache settings
+        cache = data.get('cache', {})
+        settings.cache.enabled = cache.get('enabled', True)
+        settings.cache.directory = cache.get('directory', '.cache')
+        cache_memory = cache.get('memory', {})
+        settings.cache.memory_max_entries = cache_memory.get('max_entries', 1000)
+        settings.cache.memory_ttl_seconds = cache_memory.get('default_ttl_seconds', 300)
+        settings.cache.disk_max_entries = cache.get('disk', {}).get('max_entries', 5000)
+        settings.cache.trace_ttl_seconds = cache.get('langsmith', {}).get('trace_ttl_seconds', 604800)
+        settings.cache.sheets_ttl_seconds = cache.get('sheets', {}).get('run_ttl_seconds', 604800)
+        settings.cache.embedding_ttl_seconds = cache.get('embeddings', {}).get('ttl_seconds', 2592000)
+        settings.cache.health_ttl_seconds = cache.get('health', {}).get('ttl_seconds', 60)
+
+        # Parallel settings
+        parallel = data.get('parallel', {})
+        settings.parallel.enabled = parallel.get('enabled', False)
+        settings.parallel.max_workers = parallel.get('max_workers', 3)
+        settings.parallel.retry_strategy = parallel.get('retry_strategy', 'exponential')
+        settings.parallel.max_retries = parallel.get('max_retries', 2)
+        settings.parallel.base_delay_ms = parallel.get('base_delay_ms', 1000)
+        settings.parallel.rate_limit_per_minute = parallel.get('rate_limit_per_minute', 60)
+        settings.parallel.pool_mode = parallel.get('pool_mode', 'process')
+        settings.parallel.context_recycle_after = parallel.get('context_recycle_after', 25)
+        settings.parallel.context_max_heap_mb = parallel.get('context_max_heap_mb', 512)
+        adaptive = parallel.get('adaptive', {})
+        settings.parallel.adaptive = adaptive.get('enabled', False)
+        settings.parallel.min_workers = adaptive.get('min_workers', 1)
+        settings.parallel.adaptive_window = adaptive.get('window', 5)
+        settings.parallel.latency_tolerance = adaptive.get('latency_tolerance', 1.5)
+        scheduling = parallel.get('scheduling', {})
+        settings.parallel.schedule = scheduling.get('order', 'longest_first')
+        settings.parallel.speculative = scheduling.get('speculative', True)
+        settings.parallel.straggler_factor = scheduling.get('straggler_factor', 2.0)
+
+        # Pipeline settings
+        pipeline = data.get('pipeline', {})
+        settings.pipeline.queue_size = pipeline.get('queue_size', 20)
+        settings.pipeline.workers = pipeline.get('workers', 4)
+        settings.pipeline.langsmith_concurrency = pipeline.get('langsmith_concurrency', 4)
+        settings.pipeline.judge_concurrency = pipeline.get('judge_concurrency', 4)
+        settings.pipeline.vision_concurrency = pipeline.get('vision_concurrency', 2)
+        settings.pipeline.ollama_concurrency = pipeline.get('ollama_concurrency', 1)
+
+        # Google Sheets writer settings
+        writer = data.get('google_sheets', {}).get('writer', {})
+        settings.sheets_writer.enabled = writer.get('enabled', True)
+        settings.sheets_writer.flush_interval_s = writer.get('flush_interval_s', 5.0)
+        settings.sheets_writer.max_batch = writer.get('max_batch', 50)
+        settings.sheets_writer.requests_per_minute = writer.get('requests_per_minute', 50)
+        settings.sheets_writer.max_retries = writer.get('max_retries', 5)
+        settings.sheets_writer.upload_workers = writer.get('upload_workers', 4)
+
         return settings
 
     def load_project(self, project_name: str) -> ProjectConfig:
@@ -433,7 +574,8 @@ class ConfigLoader:
             submit_button=selectors.get('submit_button', ''),
             bot_messages=selectors.get('bot_messages', ''),
             thread_container=selectors.get('thread_container', ''),
-            loading_indicator=selectors.get('loading_indicator', '')
+            loading_indicator=selectors.get('loading_indicator', ''),
+            new_chat_button=selectors.get('new_chat_button', '')
         )
 
         timeouts = chatbot.get('timeouts', {})
@@ -490,7 +632,10 @@ class ConfigLoader:
         config.ollama = OllamaConfig(
             enabled=ollama.get('enabled', False),
             model=ollama.get('model', 'mistral'),
-            url=ollama.get('url', 'http://localhost:11434/api/generate')
+            url=ollama.get('url', 'http://localhost:11434/api/generate'),
+            timeout_seconds=ollama.get('timeout_seconds', 120),
+            keep_alive=str(ollama.get('keep_alive', '30m')),
+            num_parallel=ollama.get('num_parallel', 0)
         )
 
         # Auth (for cloud CI)
@@ -593,7 +738,10 @@ class ConfigLoader:
             'ollama': {
                 'enabled': config.ollama.enabled,
                 'model': config.ollama.model,
-                'url': config.ollama.url
+                'url': config.ollama.url,
+                'timeout_seconds': config.ollama.timeout_seconds,
+                'keep_alive': config.ollama.keep_alive,
+                'num_parallel': config.ollama.num_parallel
             }
         }
 
@@ -0,0 +1,446 @@
+"""
+Embeddings - Batched, cached embedding service for semantic matching
+
+Handles:
+- Persistent embedding store keyed by (model, sha256(text)), float32 blobs in SQLite
+- Batched backend calls (many texts per request), OpenAI or local Ollama
+- Coalescing: concurrent requests for missing texts share one backend call,
+  and a text already being fetched is awaited instead of requested twice
+- Vectorised cosine similarity over whole batches (NumPy when available)
+
+Expected answers are identical on every run of the same test, so after the
+first run they come from the store; prefetching them at run start embeds
+the rest in one or two calls.
+
+Usage:
+    service = EmbeddingService(OpenAIEmbeddingBackend("text-embedding-3-small"),
+                               store=EmbeddingStore(cache_dir / EmbeddingStore.FILENAME))
+    service.prefetch(expected_answers)
+    scores = service.similarities([(expected, actual), ...])
+"""
+
+import hashlib
+import importlib.util
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .cache import record_cache_lookup
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def text_digest(text: str) -> str:
+    """Cache key of a text (model is stored alongside)"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def to_vector(values: Sequence[float]) -> Any:
+    """float32 vector: NumPy array, or array('f') without NumPy"""
+    if NUMPY_AVAILABLE:
+        return np.asarray(values, dtype=np.float32)
+    return array('f', values)
+
+
+def _from_blob(blob: bytes) -> Any:
+    if NUMPY_AVAILABLE:
+        return np.frombuffer(blob, dtype=np.float32)
+    vector = array('f')
+    vector.frombytes(blob)
+    return vector
+
+
+def _to_blob(vector: Any) -> bytes:
+    return vector.tobytes()
+
+
+def cosine_similarities(left: Sequence[Any], right: Sequence[Any]) -> List[float]:
+    """
+    Row-wise cosine similarity of two equally long lists of vectors.
+
+    With NumPy this is one matrix operation over the whole batch.
+    """
+    if not left:
+        return []
+    if NUMPY_AVAILABLE:
+        a = np.vstack(left)
+        b = np.vstack(right)
+        dots = np.einsum('ij,ij->i', a, b, dtype=np.float64)
+        norms = np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = np.where(norms > 0, dots / norms, 0.0)
+        return [float(s) for s in scores]
+
+    scores = []
+    for a, b in zip(left, right):
+        norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+        scores.append(sum(x * y for x, y in zip(a, b)) / norm if norm else 0.0)
+    return scores
+
+
+class EmbeddingStore:
+    """
+    Persistent embedding store (SQLite, float32 blobs).
+
+    One row per (model, text digest); rows older than ttl_seconds are
+    pruned on open. Thread-safe.
+    """
+
+    FILENAME = "embeddings.sqlite"
+
+    def __init__(self, path: Optional[Path] = None, ttl_seconds: int = 2592000):
+        """
+        Args:
+            path: SQLite file (None = in memory)
+            ttl_seconds: Max age of stored embeddings (0 = keep forever)
+        """
+        self.path = Path(path) if path else None
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path) if self.path else ":memory:", check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            if self.path:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    digest TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (model, digest)
+                ) WITHOUT ROWID
+            """)
+            if ttl_seconds:
+                self._conn.execute("DELETE FROM embeddings WHERE created_at < ?",
+                                   (time.time() - ttl_seconds,))
+            self._conn.commit()
+
+    def get_many(self, model: str, digests: Sequence[str]) -> Dict[str, Any]:
+        """Stored vectors for these digests (missing ones are omitted)"""
+        found: Dict[str, Any] = {}
+        digests = list(dict.fromkeys(digests))
+        with self._lock:
+            # SQLite limits bound parameters per statement
+            for start in range(0, len(digests), 500):
+                chunk = digests[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT digest, vector FROM embeddings WHERE model = ? "
+                    f"AND digest IN ({','.join('?' * len(chunk))})",
+                    [model, *chunk]
+                )
+                for digest, blob in rows:
+                    found[digest] = _from_blob(blob)
+        return found
+
+    def put_many(self, model: str, items: Iterable[Tuple[str, Any]]) -> None:
+        """Store (digest, vector) pairs"""
+        now = time.time()
+        rows = [(model, digest, _to_blob(vector), now) for digest, vector in items]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def count(self, model: Optional[str] = None) -> int:
+        with self._lock:
+            if model:
+                return self._conn.execute("SELECT COUNT(*) FROM embeddings WHERE model = ?", (model,)).fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class OpenAIEmbeddingBackend:
+    """OpenAI embeddings API: one request embeds a whole list of texts"""
+
+    max_batch = 2048
+
+    def __init__(self, model: str, api_key_env: str = "OPENAI_API_KEY"):
+        self.model = model
+        self.api_key_env = api_key_env
+        self._client = None
+        self._initialized = False
+
+    def available(self) -> bool:
+        """Initialize the OpenAI client lazily"""
+        if self._initialized:
+            return self._client is not None
+        self._initialized = True
+
+        try:
+            api_key = os.getenv(self.api_key_env)
+            if not api_key:
+                logger.warning(f"API key not found in {self.api_key_env}")
+                return False
+
+            from openai import OpenAI
+            self._client = OpenAI(api_key=api_key)
+            return True
+        except ImportError:
+            logger.warning("openai package not installed")
+            return False
+        except Exception as e:
+            logger.error(f"Failed to initialize OpenAI client: {e}")
+            return False
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        response = self._client.embeddings.create(model=self.model, input=texts)
+        data = sorted(response.data, key=lambda item: item.index)
+        return [item.embedding for item in data]
+
+
+class OllamaEmbeddingBackend:
+    """Local Ollama embeddings (/api/embed, batched input): works offline"""
+
+    max_batch = 256
+
+    def __init__(self, model: str, url: str = "http://localhost:11434", timeout: float = 120):
+        self.model = model
+        # Accept the generate endpoint used elsewhere in the config
+        self.base_url = url.split('/api/')[0].rstrip('/')
+        self.timeout = timeout
+
+    def available(self) -> bool:
+        if importlib.util.find_spec("requests") is None:
+            logger.warning("requests package not installed")
+            return False
+        return True
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        import requests
+        response = requests.post(
+            f"{self.base_url}/api/embed",
+            json={'model': self.model, 'input': texts},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        embeddings = response.json().get('embeddings') or []
+        if len(embeddings) != len(texts):
+            raise ValueError(f"Ollama returned {len(embeddings)} embeddings for {len(texts)} texts")
+        return embeddings
+
+
+def create_embedding_backend(provider: str, model: str,
+                             api_key_env: str = "OPENAI_API_KEY",
+                             url: str = "http://localhost:11434") -> Any:
+    """Backend for an embedding provider (openai | ollama)"""
+    if provider == "ollama":
+        return OllamaEmbeddingBackend(model, url=url)
+    return OpenAIEmbeddingBackend(model, api_key_env=api_key_env)
+
+
+class EmbeddingService:
+    """
+    Embeddings for many texts with the fewest backend calls.
+
+    Lookup order: in-process memory, persistent store, backend. Missing
+    texts are queued; the first caller flushes the queue in batches of
+    batch_size while concurrent callers add to it and wait, so texts
+    requested at the same time share one request. Each lookup is reported
+    to the performance metrics as a cache call ("embeddings.hit"/"miss").
+    """
+
+    def __init__(self, backend: Any,
+                 store: Optional[EmbeddingStore] = None,
+                 batch_size: int = 256,
+                 memory_max_entries: int = 10000):
+        self.backend = backend
+        self.model = backend.model
+        self.store = store
+        self.batch_size = max(1, min(batch_size, getattr(backend, 'max_batch', batch_size)))
+        self.memory_max_entries = memory_max_entries
+
+        self._memory: 'OrderedDict[str, Any]' = OrderedDict()
+        self._pending: Dict[str, Future] = {}
+        self._queue: List[Tuple[str, str]] = []
+        self._flushing = False
+        self._lock = threading.Lock()
+
+        # Stats
+        self.api_calls = 0
+        self.texts_embedded = 0
+        self.store_hits = 0
+
+    def embed_many(self, texts: Sequence[str]) -> List[Optional[Any]]:
+        """
+        float32 embedding for each text (None where the backend failed).
+
+        Empty or whitespace-only texts get None without reaching the backend
+        (OpenAI rejects them, failing the whole shared batch).
+
+        Returns:
+            List aligned with texts
+        """
+        start = time.perf_counter()
+        digests = [text_digest(text) if text and text.strip() else None for text in texts]
+        vectors: Dict[str, Any] = {}
+
+        with self._lock:
+            for digest in digests:
+                if digest is None:
+                    continue
+                vector = self._memory.get(digest)
+                if vector is not None:
+                    self._memory.move_to_end(digest)
+                    vectors[digest] = vector
+
+        missing = {d: t for d, t in zip(digests, texts) if d is not None and d not in vectors}
+        if missing and self.store:
+            stored = self.store.get_many(self.model, list(missing))
+            self.store_hits += len(stored)
+            self._remember(stored)
+            vectors.update(stored)
+            missing = {d: t for d, t in missing.items() if d not in stored}
+
+        self._record_lookups(digests, missing, (time.perf_counter() - start) * 1000)
+        if missing:
+            vectors.update(self._fetch(missing))
+
+        return [vectors.get(digest) if digest else None for digest in digests]
+
+    @staticmethod
+    def _record_lookups(digests: Sequence[Optional[str]], missing: Dict[str, str],
+                        duration_ms: float) -> None:
+        """One "embeddings" cache hit/miss per looked-up text (memory or store)"""
+        looked_up = [d for d in digests if d is not None]
+        if not looked_up:
+            return
+        per_lookup_ms = duration_ms / len(looked_up)
+        for digest in looked_up:
+            record_cache_lookup("embeddings", digest not in missing, per_lookup_ms)
+
+    def embed(self, text: str) -> Optional[Any]:
+        return self.embed_many([text])[0]
+
+    def prefetch(self, texts: Iterable[str]) -> int:
+        """Embed texts ahead of use (e.g. expected answers at run start); returns how many are available"""
+        unique = list(dict.fromkeys(t for t in texts if t))
+        return sum(1 for vector in self.embed_many(unique) if vector is not None)
+
+    def similarities(self, pairs: Sequence[Tuple[str, str]]) -> List[Optional[float]]:
+        """
+        Cosine similarity for each (text1, text2) pair.
+
+        All texts are embedded together and scored in one vectorised pass.
+        """
+        if not pairs:
+            return []
+        texts = [text for pair in pairs for text in pair]
+        vectors = self.embed_many(texts)
+        lefts, rights = vectors[0::2], vectors[1::2]
+
+        valid = [i for i, (a, b) in enumerate(zip(lefts, rights)) if a is not None and b is not None]
+        scores = cosine_similarities([lefts[i] for i in valid], [rights[i] for i in valid])
+
+        result: List[Optional[float]] = [None] * len(pairs)
+        for i, score in zip(valid, scores):
+            result[i] = score
+        return result
+
+    def _remember(self, vectors: Dict[str, Any]) -> None:
+        with self._lock:
+            for digest, vector in vectors.items():
+                self._memory[digest] = vector
+                self._memory.move_to_end(digest)
+            while len(self._memory) > self.memory_max_entries:
+                self._memory.popitem(last=False)
+
+    def _fetch(self, missing: Dict[str, str]) -> Dict[str, Any]:
+        """Queue missing texts; flush the queue unless another caller already is"""
+        with self._lock:
+            futures = {}
+            for digest, text in missing.items():
+                future = self._pending.get(digest)
+                if future is None:
+                    future = self._pending[digest] = Future()
+                    self._queue.append((digest, text))
+                futures[digest] = future
+            leader = not self._flushing
+            if leader:
+                self._flushing = True
+
+        if leader:
+            self._flush()
+
+        return {digest: future.result() for digest, future in futures.items()}
+
+    def _flush(self) -> None:
+        """Embed queued texts in batches until the queue is empty"""
+        while True:
+            with self._lock:
+                batch = self._queue[:self.batch_size]
+                del self._queue[:self.batch_size]
+                if not batch:
+                    self._flushing = False
+                    return
+
+            vectors: List[Optional[Any]] = [None] * len(batch)
+            try:
+                if self.backend.available():
+                    try:
+                        vectors = self._embed_batch(batch)
+                    except Exception as e:
+                        # The batch mixes texts of different callers: one bad
+                        # text must not cost the others their embedding
+                        logger.warning(f"Embedding batch of {len(batch)} failed ({e}), retrying one by one")
+                        vectors = [self._embed_single(item) for item in batch] if len(batch) > 1 else [None]
+
+                    fetched = {digest: v for (digest, _), v in zip(batch, vectors) if v is not None}
+                    self._remember(fetched)
+                    if self.store and fetched:
+                        self.store.put_many(self.model, fetched.items())
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding store write failed: {e}")
+            except Exception as e:
+                logger.error(f"Embedding error: {e}")
+                vectors = [None] * len(batch)
+            finally:
+                # Waiting callers are always released, with None on failure
+                with self._lock:
+                    for (digest, _), vector in zip(batch, vectors):
+                        future = self._pending.pop(digest, None)
+                        if future is not None:
+                            future.set_result(vector)
+
+    def _embed_batch(self, batch: List[Tuple[str, str]]) -> List[Any]:
+        """One backend call for (digest, text) items"""
+        self.api_calls += 1
+        embeddings = self.backend.embed([text for _, text in batch])
+        if len(embeddings) != len(batch):
+            raise ValueError(f"{len(embeddings)} embeddings for {len(batch)} texts")
+        self.texts_embedded += len(batch)
+        return [to_vector(e) for e in embeddings]
+
+    def _embed_single(self, item: Tuple[str, str]) -> Optional[Any]:
+        try:
+            return self._embed_batch([item])[0]
+        except Exception as e:
+            logger.error(f"Embedding error: {e}")
+            return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'model': self.model,
+            'api_calls': self.api_calls,
+            'texts_embedded': self.texts_embedded,
+            'store_hits': self.store_hits,
+            'memory_entries': len(self._memory),
+        }
@@ -6,6 +6,7 @@ from typing import Optional, List, Dict, Any, TYPE_CHECKING
 from dataclasses import asdict
 
 from ..models import TestCase, TestExecution, ConversationTurn, TestResult, TestMode, ExecutionContext
+from .pipeline import EvaluationPipeline, PostProcessJob
 
 if TYPE_CHECKING:
     from ..browser import BrowserManager
@@ -17,6 +18,7 @@ if TYPE_CHECKING:
     from ..evaluation import Evaluator
     from ..baselines import BaselinesCache
     from ..report_local import ReportGenerator
+    from ..clients.sheets_writer import SheetsWriter
     from rich.console import Console
 
 
@@ -51,6 +53,20 @@ class TestExecutor:
         self.project = context.project
         self.single_turn = context.single_turn
 
+        # Post-processing (LangSmith + valutazione) fuori dal percorso browser
+        self.pipeline = EvaluationPipeline(
+            config=getattr(context.settings, 'pipeline', None),
+            langsmith=context.langsmith,
+            evaluator=context.evaluator,
+            ollama=context.ollama,
+            baselines=context.baselines,
+            settings=context.settings,
+            on_status=self.on_status
+        )
+
+        # Scrittura Sheets in background (start_sheets_writer / stop_sheets_writer)
+        self.sheets_writer: Optional['SheetsWriter'] = None
+
         # State
         self._quit_requested = False
 
@@ -61,10 +77,10 @@ class TestExecutor:
         else:
             print(msg)
 
-    def decide_next_message(self,
-                              conversation: List[ConversationTurn],
-                              remaining_followups: List[str],
-                              test: TestCase) -> Optional[str]:
+    async def decide_next_message(self,
+                                  conversation: List[ConversationTurn],
+                                  remaining_followups: List[str],
+                                  test: TestCase) -> Optional[str]:
         """
         Decide il prossimo messaggio da inviare.
 
@@ -83,7 +99,7 @@ class TestExecutor:
         if self.ollama:
             # Usa decide_response che sfrutta training + LLM
             conv_dicts = [{'role': t.role, 'content': t.content} for t in conversation]
-            return self.ollama.decide_response(
+            return await self.ollama.adecide_response(
                 bot_message=bot_message,
                 conversation=conv_dicts,
                 followups=remaining_followups if remaining_followups else None,
@@ -101,8 +117,13 @@ class TestExecutor:
         # Fallback: primo followup o None
         return remaining_followups[0] if remaining_followups else None
 
-    async def execute_auto_test(self, test: TestCase, max_turns: int) -> TestExecution:
-        """Esegue un singolo test in modalità auto"""
+    async def run_conversation(self, test: TestCase, max_turns: int) -> PostProcessJob:
+        """
+        Fase browser di un test auto: conversazione, screenshot e HTML.
+
+        Il browser è libero appena questo metodo ritorna; LangSmith e
+        valutazione vengono eseguiti da EvaluationPipeline sul job.
+        """
         if self.perf_collector:
             self.perf_collector.start_test(test.id, test.category)
 
@@ -111,8 +132,10 @@ class TestExecutor:
         conversation: List[ConversationTurn] = []
         remaining_followups = list(test.followups) if test.followups else []
 
-        # Reset sessione
-        await self.browser.reset_session()
+        # Reset sessione (strategia più veloce verificata)
+        reset = await self.browser.reset_session()
+        if reset and self.perf_collector:
+            self.perf_collector.record_reset(reset.strategy, reset.duration_ms, success=reset.ready)
         self.browser.start_new_test(test.id)
 
         # Invia domanda iniziale
@@ -175,7 +198,7 @@ class TestExecutor:
                 break
 
             # Decidi prossimo messaggio
-            next_message = self.decide_next_message(
+            next_message = await self.decide_next_message(
                 conversation,
                 remaining_followups,
                 test
@@ -198,7 +221,7 @@ class TestExecutor:
                 timestamp=datetime.utcnow().isoformat()
             ))
 
-        # Finale: Screenshot e Valutazione
+        # Finale: Screenshot e HTML (la valutazione avviene nella pipeline)
         try:
             # PHASE: Screenshot
             skip_ss = False
@@ -212,7 +235,7 @@ class TestExecutor:
 
             screenshot_path = ""
             if self.settings.screenshot_on_complete and not skip_ss and self.report:
-                ss_path = self.report.get_screenshot_path(test.id)
+                ss_path = self.report.get_screenshot_path(test.id, self.browser.screenshot_extension)
                 success = await self.browser.take_conversation_screenshot(
                     path=ss_path,
                     hide_elements=['.llm__prompt', '.llm__footer', '.llm__busyIndicator', '.llm__scrollDown'],
@@ -233,112 +256,22 @@ class TestExecutor:
             if self.settings.screenshot_on_complete and not skip_ss:
                 html_response = await self.browser.get_thread_html()
 
-            # Valutazione LLM
-            final_response = conversation[-1].content if conversation else ""
-            evaluation = None
-
-            # LangSmith fetch
-            langsmith_url = ""
-            langsmith_report = ""
-            model_version = ""
-            report = None
-            if self.langsmith:
-                try:
-                    langsmith_start = time.perf_counter()
-                    report = self.langsmith.get_report_for_question(test.question)
-                    langsmith_duration_ms = (time.perf_counter() - langsmith_start) * 1000
-
-                    if self.perf_collector:
-                        self.perf_collector.record_service_call(
-                            service="langsmith",
-                            operation="get_report",
-                            duration_ms=langsmith_duration_ms,
-                            success=report.trace_url is not None
-                        )
-
-                    if report.trace_url:
-                        langsmith_url = report.trace_url
-                        langsmith_report = report.format_for_sheets()
-                        model_version = report.get_model_version()
-                except Exception as e:
-                    self.on_status(f"! Errore LangSmith: {e}")
-
-            # Priorità 1: Evaluator
-            if self.evaluator:
-                try:
-                    expected_answer = getattr(test, 'expected_answer', None)
-                    rag_context_file = getattr(test, 'rag_context_file', None)
-
-                    if not expected_answer and self.baselines:
-                        baseline = self.baselines.get(test.id)
-                        if baseline:
-                            expected_answer = baseline.answer
-                            self.on_status(f"  Baseline: usando golden answer da RUN {baseline.run_number}")
-
-                    rag_context = None
-                    auto_rag_cfg = self.settings.evaluation.auto_rag_context
-                    use_auto_rag = auto_rag_cfg.enabled and (not rag_context_file or not auto_rag_cfg.prefer_manual)
-
-                    if use_auto_rag and not rag_context_file and report and report.sources:
-                        rag_context = report.get_rag_context(
-                            max_docs=auto_rag_cfg.max_documents,
-                            max_chars=auto_rag_cfg.max_chars
-                        )
-                        if rag_context:
-                            self.on_status(f"  Auto RAG context: {len(report.sources)} docs")
-
-                    output_validation = getattr(test, 'output_validation', None)
-
-                    eval_result = self.evaluator.evaluate(
-                        question=test.question,
-                        response=final_response,
-                        expected_answer=expected_answer,
-                        expected_behavior=test.expected,
-                        rag_context_file=rag_context_file,
-                        rag_context=rag_context,
-                        output_validation=output_validation,
-                        html_response=html_response,
-                        screenshot_path=screenshot_path if screenshot_path else None
-                    )
-
-                    evaluation = {
-                        'passed': eval_result.passed,
-                        'reason': eval_result.judge_reasoning or eval_result.summary(),
-                        'details': eval_result.to_dict()
-                    }
-                except Exception as e:
-                    self.on_status(f"! Errore Evaluation: {e}")
-                    evaluation = None
-
-            # Priorità 2: Ollama
-            if evaluation is None and self.ollama:
-                evaluation = self.ollama.evaluate_test_result(
-                    test_case={'question': test.question, 'category': test.category, 'expected': test.expected},
-                    conversation=[{'role': t.role, 'content': t.content} for t in conversation],
-                    final_response=final_response
-                )
-
-            if evaluation is None:
-                evaluation = {'passed': None, 'reason': 'Valutazione manuale richiesta'}
-
             duration_ms = int((datetime.utcnow() - start_time).total_seconds() * 1000)
 
-            test_result = "PASS" if evaluation.get('passed', False) else "FAIL"
+            # Lo stato finale (PASS/FAIL) viene scritto dalla pipeline
+            metrics = None
             if self.perf_collector:
-                self.perf_collector.end_test(test_result)
+                metrics = self.perf_collector.end_test("PENDING")
 
-            return TestExecution(
-                test_case=test,
+            return PostProcessJob(
+                test=test,
                 conversation=conversation,
-                result=test_result,
                 duration_ms=duration_ms,
                 screenshot_path=screenshot_path,
-                langsmith_url=langsmith_url,
-                langsmith_report=langsmith_report,
-                notes="",
-                llm_evaluation=evaluation,
-                model_version=model_version,
-                prompt_version=self.run_config.prompt_version if self.run_config else ""
+                html_response=html_response,
+                timing=self._format_timing(),
+                prompt_version=self.run_config.prompt_version if self.run_config else "",
+                metrics=metrics
             )
 
         except Exception as e:
@@ -346,13 +279,20 @@ class TestExecutor:
                 self.perf_collector.record_error(str(e))
                 self.perf_collector.end_test("ERROR")
 
-            return TestExecution(
-                test_case=test,
-                conversation=conversation,
-                result="ERROR",
-                duration_ms=0,
-                notes=f"Errore: {e}"
-            )
+            return PostProcessJob(test=test, conversation=conversation, error=str(e))
+
+    async def execute_auto_test(self, test: TestCase, max_turns: int) -> TestExecution:
+        """Esegue un singolo test in modalità auto (conversazione + valutazione)"""
+        job = await self.run_conversation(test, max_turns)
+        return await self.pipeline.process(job)
+
+    def _format_timing(self) -> str:
+        """Timing TTFR → totale dell'ultima risposta (es. '1.2s → 4.5s')"""
+        if self.browser and self.browser.last_response_timing:
+            timing = self.browser.last_response_timing
+            if timing.ttfr_ms > 0 or timing.total_ms > 0:
+                return f"{timing.ttfr_ms / 1000:.1f}s → {timing.total_ms / 1000:.1f}s"
+        return ""
 
     async def execute_and_save(self, test: TestCase, max_turns: int = 10) -> TestExecution:
         """
@@ -372,19 +312,24 @@ class TestExecutor:
         self.persist(execution)
         return execution
 
-    def persist(self, execution: TestExecution) -> None:
+    def persist(self, execution: TestExecution, sync_sheets: bool = True,
+                sheets_verdict: bool = True) -> None:
         """
         Persist test execution to all configured outputs.
 
         Saves to:
-        - Local report (if report configured)
-        - Google Sheets (if sheets configured)
+        - Local report journal (if report configured), immediately
+        - Google Sheets (if sheets configured), via the journal: the row is
+          journaled as pending and marked synced once written, so rows lost
+          to a crash are re-sent by sync_pending_sheets()
 
         Args:
             execution: Completed test execution to save
+            sync_sheets: False to only journal the Sheets row (parallel runs
+                write them in one batch at the end)
+            sheets_verdict: False to leave RESULT empty for the reviewer and
+                put the test case notes in NOTES (parallel runs' rows)
         """
-        import time
-        from pathlib import Path
         from zoneinfo import ZoneInfo
 
         date_str = datetime.now(ZoneInfo("Europe/Rome")).strftime('%Y-%m-%d %H:%M:%S')
@@ -413,67 +358,164 @@ class TestExecutor:
             ))
 
         # Save to Google Sheets
+        if not self.ctx.sheets:
+            return
+
+        # Timing catturato a fine conversazione (il browser può essere già avanti)
+        timing_str = execution.timing or self._format_timing()
+
+        # Extract evaluation metrics
+        eval_data = execution.llm_evaluation or {}
+        eval_details = eval_data.get('details', {})
+
+        row = TestResult(
+            test_id=execution.test_case.id,
+            date=date_str,
+            mode=self.ctx.current_mode.value.upper(),
+            question=execution.test_case.question,
+            expected=getattr(execution.test_case, 'expected_answer', '') or "",  # Golden answer
+            conversation=conv_str[:5000],  # Sheets limit
+            screenshot_path=execution.screenshot_path,  # Upload al momento della scrittura
+            prompt_version=execution.prompt_version,
+            model_version=execution.model_version,
+            environment=self.run_config.env if self.run_config else "DEV",
+            # PASS/FAIL from evaluation, or left to the reviewer
+            result=execution.result if sheets_verdict else "",
+            notes="" if sheets_verdict else execution.test_case.notes,
+            langsmith_report=execution.langsmith_report,
+            langsmith_url=execution.langsmith_url,
+            timing=timing_str,
+            # GGP fields
+            section=execution.test_case.section,
+            target=execution.test_case.test_target,
+            run_number=self.run_config.active_run if self.run_config else 0,
+            # Evaluation metrics
+            semantic_score=eval_details.get('semantic_score'),
+            judge_score=eval_details.get('judge_score'),
+            groundedness=eval_details.get('groundedness'),
+            faithfulness=eval_details.get('faithfulness'),
+            relevance=eval_details.get('relevance'),
+            overall_score=eval_details.get('overall_score'),
+            judge_reasoning=eval_data.get('reason', '')[:500]
+        )
+
+        if not self.report:
+            self._write_sheets_rows([row])
+            return
+
+        self.report.journal.record_pending("sheets", row)
+        if self.sheets_writer:
+            self.sheets_writer.submit(row)
+        elif sync_sheets:
+            self.sync_pending_sheets()
+
+    def start_sheets_writer(self) -> int:
+        """
+        Start background Sheets writes for a session.
+
+        With the writer enabled, rows are batched off the test loop and rows
+        left pending in the journal by an interrupted session are queued
+        first; otherwise the leftovers are written synchronously.
+
+        Returns:
+            Number of leftover rows resumed from the journal
+        """
+        if not self.ctx.sheets or not self.report:
+            return 0
+
+        config = getattr(self.settings, 'sheets_writer', None)
+        if config is None or not config.enabled:
+            return self.sync_pending_sheets()
+
+        if not self.sheets_writer:
+            from ..clients.screenshot_uploader import ScreenshotUploader
+            from ..clients.sheets_writer import SheetsWriter
+
+            journal = self.report.journal
+            self.sheets_writer = SheetsWriter(
+                self.ctx.sheets,
+                flush_interval_s=config.flush_interval_s,
+                max_batch=config.max_batch,
+                requests_per_minute=config.requests_per_minute,
+                max_retries=config.max_retries,
+                on_written=lambda rows: journal.mark_synced("sheets", [r.test_id for r in rows]),
+                uploader=ScreenshotUploader(self.ctx.sheets, max_workers=config.upload_workers)
+            )
+            self.sheets_writer.start()
+
+        leftovers = self.report.journal.pending("sheets")
+        for row in leftovers:
+            self.sheets_writer.submit(row)
+        return len(leftovers)
+
+    def stop_sheets_writer(self) -> Optional[Dict[str, int]]:
+        """
+        Write the queued rows and stop the background writer.
+
+        Rows that could not be written stay pending in the journal.
+
+        Returns:
+            Writer statistics, None if no writer was running
+        """
+        if not self.sheets_writer:
+            return None
+        writer, self.sheets_writer = self.sheets_writer, None
+        writer.close()
+        stats = writer.get_stats()
+        if writer.uploader:
+            writer.uploader.close()
+            stats.update(writer.uploader.get_stats())
+        self.on_status(f"Sheets: {stats['rows_written']} righe in {stats['api_calls']} batchUpdate"
+                       + (f", {stats['rows_failed']} rimaste nel journal" if stats['rows_failed'] else "")
+                       + (f", {stats['deduplicated']} screenshot duplicati non ricaricati"
+                          if stats.get('deduplicated') else ""))
+        return stats
+
+    def sync_pending_sheets(self) -> int:
+        """
+        Write Sheets rows journaled but not yet written (this session or a crashed one).
+
+        Returns:
+            Number of rows written
+        """
+        if not self.ctx.sheets or not self.report:
+            return 0
+        return self.report.journal.sync_pending("sheets", self._write_sheets_rows)
+
+    def _write_sheets_rows(self, rows: List[TestResult]) -> int:
+        """
+        Upload screenshots and append rows to the RUN sheet.
+
+        Returns:
+            Number of rows written (a prefix of rows)
+        """
+        from pathlib import Path
+
         sheets = self.ctx.sheets
-        if sheets:
-            sheets_start = time.perf_counter()
-
-            screenshot_urls = None
-            if execution.screenshot_path:
-                screenshot_urls = sheets.upload_screenshot(
-                    Path(execution.screenshot_path),
-                    execution.test_case.id
-                )
+        sheets_start = time.perf_counter()
 
-            # Build timing string from browser timing
-            timing_str = ""
-            if self.browser and self.browser.last_response_timing:
-                timing = self.browser.last_response_timing
-                if timing.ttfr_ms > 0 or timing.total_ms > 0:
-                    ttfr_sec = timing.ttfr_ms / 1000
-                    total_sec = timing.total_ms / 1000
-                    timing_str = f"{ttfr_sec:.1f}s → {total_sec:.1f}s"
+        for row in rows:
+            if row.screenshot_path and not row.screenshot_urls and Path(row.screenshot_path).exists():
+                row.screenshot_urls = sheets.upload_screenshot(Path(row.screenshot_path), row.test_id)
 
-            # Extract evaluation metrics
-            eval_data = execution.llm_evaluation or {}
-            eval_details = eval_data.get('details', {})
+        if len(rows) == 1:
+            written = 1 if sheets.append_result(rows[0]) else 0
+        else:
+            written = sheets.append_results(rows)
 
-            sheets.append_result(TestResult(
-                test_id=execution.test_case.id,
-                date=date_str,
-                mode=self.ctx.current_mode.value.upper(),
-                question=execution.test_case.question,
-                expected=getattr(execution.test_case, 'expected_answer', '') or "",  # Golden answer
-                conversation=conv_str[:5000],  # Sheets limit
-                screenshot_urls=screenshot_urls,
-                prompt_version=execution.prompt_version,
-                model_version=execution.model_version,
-                environment=self.run_config.env if self.run_config else "DEV",
-                result=execution.result,  # PASS/FAIL from evaluation
-                notes="",  # Empty - reviewer notes
-                langsmith_report=execution.langsmith_report,
-                langsmith_url=execution.langsmith_url,
-                timing=timing_str,
-                # GGP fields
-                section=execution.test_case.section,
-                target=execution.test_case.test_target,
-                run_number=self.run_config.active_run if self.run_config else 0,
-                # Evaluation metrics
-                semantic_score=eval_details.get('semantic_score'),
-                judge_score=eval_details.get('judge_score'),
-                groundedness=eval_details.get('groundedness'),
-                faithfulness=eval_details.get('faithfulness'),
-                relevance=eval_details.get('relevance'),
-                overall_score=eval_details.get('overall_score'),
-                judge_reasoning=eval_data.get('reason', '')[:500]
-            ))
+        # Track Sheets performance
+        sheets_duration_ms = (time.perf_counter() - sheets_start) * 1000
+        if self.perf_collector:
+            # Con la pipeline il test salvato non è necessariamente l'ultimo
+            for row in rows:
+                for metrics in reversed(self.perf_collector.run_metrics.test_metrics):
+                    if metrics.test_id == row.test_id:
+                        metrics.add_service_call(
+                            service="google_sheets",
+                            operation="save_result",
+                            duration_ms=sheets_duration_ms / len(rows),
+                            success=written > 0
+                        )
+                        break
 
-            # Track Sheets performance
-            sheets_duration_ms = (time.perf_counter() - sheets_start) * 1000
-            if self.perf_collector and self.perf_collector._current_test is None:
-                if self.perf_collector.run_metrics.test_metrics:
-                    self.perf_collector.run_metrics.test_metrics[-1].add_service_call(
-                        service="google_sheets",
-                        operation="save_result",
-                        duration_ms=sheets_duration_ms,
-                        success=True
-                    )
+        return written
@@ -0,0 +1,326 @@
+"""
+Post-processing pipeline - LangSmith, evaluation and LLM judge off the browser path.
+
+The browser stage produces a PostProcessJob (conversation, screenshot, html)
+and hands it to the pipeline; the worker is then free for the next test.
+The pipeline consumes a bounded queue and runs the blocking clients
+(requests/OpenAI/Ollama) in threads, each service behind its own
+concurrency limit, so the asyncio loop driving the browsers never stalls.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from ..cache import cache_metrics_scope
+from ..models import ConversationTurn, TestCase, TestExecution
+from ..trace_poller import question_sent_at
+
+if TYPE_CHECKING:
+    from ..baselines import BaselinesCache
+    from ..config_loader import GlobalSettings
+    from ..evaluation import Evaluator
+    from ..langsmith_client import LangSmithClient, LangSmithReport
+    from ..ollama_client import OllamaClient
+    from ..performance import TestMetrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PostProcessJob:
+    """Output of the browser stage, input of the post-processing stage"""
+    test: TestCase
+    conversation: List[ConversationTurn]
+    duration_ms: int = 0
+    screenshot_path: str = ""
+    html_response: Optional[str] = None
+    timing: str = ""
+    prompt_version: str = ""
+    # Per-test metrics (already closed by the browser stage, enriched here)
+    metrics: Optional['TestMetrics'] = None
+    # Browser stage failure: the job is returned as ERROR without enrichment
+    error: Optional[str] = None
+
+
+class EvaluationPipeline:
+    """
+    Bounded queue + consumers for test post-processing.
+
+    Usage:
+        pipeline = EvaluationPipeline(settings.pipeline, langsmith=ls, evaluator=ev)
+        await pipeline.start()
+
+        future = await pipeline.submit(job)   # waits only if the queue is full
+        ...                                   # browser goes on with next test
+        execution = await future
+
+        await pipeline.close()
+
+    process(job) runs the same enrichment inline (still off-loop) for callers
+    that do not need the queue.
+    """
+
+    def __init__(self,
+                 config: Any = None,
+                 langsmith: Optional['LangSmithClient'] = None,
+                 evaluator: Optional['Evaluator'] = None,
+                 ollama: Optional['OllamaClient'] = None,
+                 baselines: Optional['BaselinesCache'] = None,
+                 settings: Optional['GlobalSettings'] = None,
+                 on_status: Optional[Callable[[str], None]] = None):
+        """
+        Args:
+            config: PipelineSettings (queue_size, *_concurrency)
+            langsmith: Client LangSmith (report/trace)
+            evaluator: Evaluator (semantic, judge, RAG, vision)
+            ollama: Client Ollama (fallback evaluation)
+            baselines: Golden answers cache
+            settings: Global settings (auto RAG context)
+            on_status: Status callback
+        """
+        self.langsmith = langsmith
+        self.evaluator = evaluator
+        self.ollama = ollama
+        self.baselines = baselines
+        self.settings = settings
+        self.on_status = on_status or (lambda msg: None)
+
+        self.queue_size = getattr(config, 'queue_size', 20)
+        self._workers = max(1, getattr(config, 'workers', 4))
+        self._langsmith_slots = asyncio.Semaphore(max(1, getattr(config, 'langsmith_concurrency', 4)))
+        self._judge_slots = asyncio.Semaphore(max(1, getattr(config, 'judge_concurrency', 4)))
+        self._vision_slots = asyncio.Semaphore(max(1, getattr(config, 'vision_concurrency', 2)))
+        self._ollama_slots = asyncio.Semaphore(max(1, getattr(config, 'ollama_concurrency', 1)))
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    # ==================== QUEUE ====================
+
+    async def start(self) -> None:
+        """Avvia i consumer della coda"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [
+            asyncio.create_task(self._consume())
+            for _ in range(self._workers)
+        ]
+
+    async def submit(self, job: PostProcessJob) -> 'asyncio.Future[TestExecution]':
+        """
+        Accoda un job. Attende solo se la coda è piena (backpressure).
+
+        Returns:
+            Future risolto con la TestExecution finale
+        """
+        if not self._tasks:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((job, future))
+        return future
+
+    async def close(self) -> None:
+        """Attende lo svuotamento della coda e ferma i consumer"""
+        if not self._tasks:
+            return
+        await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _consume(self) -> None:
+        """Consumer: processa job finché non viene cancellato"""
+        while True:
+            job, future = await self._queue.get()
+            try:
+                execution = await self.process(job)
+                if not future.done():
+                    future.set_result(execution)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    # ==================== PROCESSING ====================
+
+    async def process(self, job: PostProcessJob) -> TestExecution:
+        """
+        Arricchisce un job con LangSmith + valutazione.
+
+        Returns:
+            TestExecution con risultato PASS/FAIL (ERROR se il browser è fallito)
+        """
+        # Lookup delle cache (anche nei thread) imputati al test del job
+        with cache_metrics_scope(job.metrics):
+            return await self._process(job)
+
+    async def _process(self, job: PostProcessJob) -> TestExecution:
+        if job.error:
+            return TestExecution(
+                test_case=job.test,
+                conversation=job.conversation,
+                result="ERROR",
+                duration_ms=0,
+                notes=f"Errore: {job.error}"
+            )
+
+        start = time.perf_counter()
+        test = job.test
+
+        # LangSmith fetch
+        langsmith_url = ""
+        langsmith_report = ""
+        model_version = ""
+        vector_store = ""
+        report = None
+        if self.langsmith:
+            try:
+                async with self._langsmith_slots:
+                    langsmith_start = time.perf_counter()
+                    sent_at = question_sent_at(job.conversation)
+                    aget_report = getattr(self.langsmith, 'aget_report_for_question', None)
+                    if aget_report:
+                        report = await aget_report(test.question, sent_at=sent_at)
+                    else:
+                        report = await asyncio.to_thread(
+                            self.langsmith.get_report_for_question, test.question, sent_at=sent_at
+                        )
+                    langsmith_duration_ms = (time.perf_counter() - langsmith_start) * 1000
+
+                self._record(job, "langsmith", "get_report", langsmith_duration_ms,
+                             success=bool(report and report.trace_url))
+
+                if report and report.trace_url:
+                    langsmith_url = report.trace_url
+                    langsmith_report = report.format_for_sheets()
+                    model_version = report.get_model_version()
+                    vector_store = report.vector_store
+            except Exception as e:
+                self.on_status(f"! Errore LangSmith ({test.id}): {e}")
+
+        final_response = ""
+        for turn in reversed(job.conversation):
+            if turn.role == 'assistant':
+                final_response = turn.content
+                break
+
+        # Priorità 1: Evaluator
+        evaluation = None
+        if self.evaluator:
+            evaluation = await self._evaluate(job, final_response, report)
+
+        # Priorità 2: Ollama
+        if evaluation is None and self.ollama and job.conversation:
+            async with self._ollama_slots:
+                evaluation = await self.ollama.aevaluate_test_result(
+                    {'question': test.question, 'category': test.category, 'expected': test.expected},
+                    [{'role': t.role, 'content': t.content} for t in job.conversation],
+                    final_response
+                )
+
+        if evaluation is None:
+            evaluation = {'passed': None, 'reason': 'Valutazione manuale richiesta'}
+
+        test_result = "PASS" if evaluation.get('passed', False) else "FAIL"
+
+        if job.metrics is not None:
+            job.metrics.add_phase("post_process", (time.perf_counter() - start) * 1000)
+            job.metrics.status = test_result
+
+        return TestExecution(
+            test_case=test,
+            conversation=job.conversation,
+            result=test_result,
+            duration_ms=job.duration_ms,
+            screenshot_path=job.screenshot_path,
+            langsmith_url=langsmith_url,
+            langsmith_report=langsmith_report,
+            notes="",
+            llm_evaluation=evaluation,
+            model_version=model_version,
+            prompt_version=job.prompt_version,
+            timing=job.timing,
+            vector_store=vector_store
+        )
+
+    async def _evaluate(self,
+                        job: PostProcessJob,
+                        final_response: str,
+                        report: Optional['LangSmithReport']) -> Optional[Dict[str, Any]]:
+        """Evaluator (semantic + judge + RAG + structured/vision)"""
+        test = job.test
+        try:
+            expected_answer = getattr(test, 'expected_answer', None)
+            rag_context_file = getattr(test, 'rag_context_file', None)
+
+            if not expected_answer and self.baselines:
+                baseline = self.baselines.get(test.id)
+                if baseline:
+                    expected_answer = baseline.answer
+                    self.on_status(f"  Baseline: usando golden answer da RUN {baseline.run_number}")
+
+            rag_context = None
+            if self.settings:
+                auto_rag_cfg = self.settings.evaluation.auto_rag_context
+                use_auto_rag = auto_rag_cfg.enabled and (not rag_context_file or not auto_rag_cfg.prefer_manual)
+
+                if use_auto_rag and not rag_context_file and report and report.sources:
+                    rag_context = report.get_rag_context(
+                        max_docs=auto_rag_cfg.max_documents,
+                        max_chars=auto_rag_cfg.max_chars
+                    )
+                    if rag_context:
+                        self.on_status(f"  Auto RAG context: {len(report.sources)} docs")
+
+            output_validation = getattr(test, 'output_validation', None)
+            needs_vision = bool(output_validation) and output_validation.get("mode") == "vision"
+
+            async with self._judge_slots:
+                if needs_vision:
+                    await self._vision_slots.acquire()
+                try:
+                    eval_start = time.perf_counter()
+                    eval_result = await asyncio.to_thread(
+                        self.evaluator.evaluate,
+                        question=test.question,
+                        response=final_response,
+                        expected_answer=expected_answer,
+                        expected_behavior=test.expected,
+                        rag_context_file=rag_context_file,
+                        rag_context=rag_context,
+                        output_validation=output_validation,
+                        html_response=job.html_response,
+                        screenshot_path=job.screenshot_path or None
+                    )
+                finally:
+                    if needs_vision:
+                        self._vision_slots.release()
+
+            self._record(job, "evaluation", "evaluate", (time.perf_counter() - eval_start) * 1000,
+                         success=eval_result.error is None)
+
+            return {
+                'passed': eval_result.passed,
+                'reason': eval_result.judge_reasoning or eval_result.summary(),
+                'details': eval_result.to_dict()
+            }
+        except Exception as e:
+            self.on_status(f"! Errore Evaluation ({test.id}): {e}")
+            return None
+
+    def _record(self, job: PostProcessJob, service: str, operation: str,
+                duration_ms: float, success: bool = True) -> None:
+        """Registra la chiamata sulle metriche del test del job"""
+        if job.metrics is not None:
+            job.metrics.add_service_call(
+                service=service,
+                operation=operation,
+                duration_ms=duration_ms,
+                success=success
+            )
@@ -16,9 +16,11 @@ import os
 import json
 import logging
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from dataclasses import dataclass, field
 
+from .embeddings import EmbeddingService, EmbeddingStore, create_embedding_backend
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,6 +31,9 @@ class EvaluationConfig:
     provider: str = "openai"  # openai | ollama
     model: str = "gpt-4o-mini"
     embedding_model: str = "text-embedding-3-small"
+    embedding_provider: str = "openai"  # openai | ollama (local, offline)
+    embedding_url: str = "http://localhost:11434"  # Ollama server (embedding_provider: ollama)
+    embedding_batch_size: int = 256  # Texts per embeddings request
     api_key_env: str = "OPENAI_API_KEY"
 
     # Thresholds
@@ -55,6 +60,9 @@ class EvaluationConfig:
             provider=eval_cfg.get('provider', 'openai'),
             model=eval_cfg.get('model', 'gpt-4o-mini'),
             embedding_model=eval_cfg.get('embedding_model', 'text-embedding-3-small'),
+            embedding_provider=eval_cfg.get('embedding_provider', 'openai'),
+            embedding_url=eval_cfg.get('embedding_url', 'http://localhost:11434'),
+            embedding_batch_size=eval_cfg.get('embedding_batch_size', 256),
             api_key_env=eval_cfg.get('api_key_env', 'OPENAI_API_KEY'),
             semantic_threshold=eval_cfg.get('semantic_threshold', 0.8),
             judge_threshold=eval_cfg.get('judge_threshold', 0.7),
@@ -75,6 +83,9 @@ class EvaluationConfig:
             provider=getattr(eval_settings, 'provider', 'openai'),
             model=getattr(eval_settings, 'model', 'gpt-4o-mini'),
             embedding_model=getattr(eval_settings, 'embedding_model', 'text-embedding-3-small'),
+            embedding_provider=getattr(eval_settings, 'embedding_provider', 'openai'),
+            embedding_url=getattr(eval_settings, 'embedding_url', 'http://localhost:11434'),
+            embedding_batch_size=getattr(eval_settings, 'embedding_batch_size', 256),
             api_key_env=getattr(eval_settings, 'api_key_env', 'OPENAI_API_KEY'),
             semantic_threshold=getattr(eval_settings, 'semantic_threshold', 0.8),
             judge_threshold=getattr(eval_settings, 'judge_threshold', 0.7),
@@ -161,51 +172,31 @@ class SemanticMatcher:
     """
     Semantic similarity using embeddings.
 
-    Uses OpenAI embeddings by default, with optional Ollama fallback.
+    Uses OpenAI embeddings by default, or a local Ollama embedding model
+    (embedding_provider: ollama). Embeddings go through an EmbeddingService:
+    batched requests, persistent float32 store keyed by model + text hash
+    (expected answers are embedded once, not on every run), vectorised
+    cosine similarity.
     """
 
-    def __init__(self, config: EvaluationConfig):
+    def __init__(self, config: EvaluationConfig,
+                 store: Optional[EmbeddingStore] = None):
         self.config = config
-        self._client = None
-        self._initialized = False
-
-    def _init_client(self) -> bool:
-        """Initialize OpenAI client lazily"""
-        if self._initialized:
-            return self._client is not None
-
-        self._initialized = True
-
-        try:
-            api_key = os.getenv(self.config.api_key_env)
-            if not api_key:
-                logger.warning(f"API key not found in {self.config.api_key_env}")
-                return False
-
-            from openai import OpenAI
-            self._client = OpenAI(api_key=api_key)
-            return True
-        except ImportError:
-            logger.warning("openai package not installed")
-            return False
-        except Exception as e:
-            logger.error(f"Failed to initialize OpenAI client: {e}")
-            return False
+        backend = create_embedding_backend(
+            config.embedding_provider,
+            config.embedding_model,
+            api_key_env=config.api_key_env,
+            url=config.embedding_url
+        )
+        self.service = EmbeddingService(backend, store=store, batch_size=config.embedding_batch_size)
 
-    def get_embedding(self, text: str) -> Optional[List[float]]:
-        """Get embedding vector for text"""
-        if not self._init_client():
-            return None
+    def get_embedding(self, text: str) -> Optional[Any]:
+        """Get float32 embedding vector for text"""
+        return self.service.embed(text)
 
-        try:
-            response = self._client.embeddings.create(
-                model=self.config.embedding_model,
-                input=text
-            )
-            return response.data[0].embedding
-        except Exception as e:
-            logger.error(f"Embedding error: {e}")
-            return None
+    def prefetch(self, texts: List[str]) -> int:
+        """Embed texts in batches ahead of use (e.g. expected answers at run start)"""
+        return self.service.prefetch(texts)
 
     def similarity(self, text1: str, text2: str) -> Optional[float]:
         """
@@ -214,22 +205,11 @@ class SemanticMatcher:
         Returns:
             Similarity score 0-1, or None on error
         """
-        emb1 = self.get_embedding(text1)
-        emb2 = self.get_embedding(text2)
+        return self.service.similarities([(text1, text2)])[0]
 
-        if emb1 is None or emb2 is None:
-            return None
-
-        # Cosine similarity
-        import math
-        dot_product = sum(a * b for a, b in zip(emb1, emb2))
-        norm1 = math.sqrt(sum(a * a for a in emb1))
-        norm2 = math.sqrt(sum(b * b for b in emb2))
-
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
-
-        return dot_product / (norm1 * norm2)
+    def similarities(self, pairs: List[Tuple[str, str]]) -> List[Optional[float]]:
+        """Cosine similarity for many (text1, text2) pairs with one batched embedding pass"""
+        return self.service.similarities(pairs)
 
 
 class LLMJudge:
@@ -599,12 +579,13 @@ class Evaluator:
             print(f"Failed: {result.summary()}")
     """
 
-    def __init__(self, config: EvaluationConfig, project_path: Optional[Path] = None):
+    def __init__(self, config: EvaluationConfig, project_path: Optional[Path] = None,
+                 embedding_store: Optional[EmbeddingStore] = None):
         self.config = config
         self.project_path = project_path
 
         # Initialize components
-        self.semantic_matcher = SemanticMatcher(config)
+        self.semantic_matcher = SemanticMatcher(config, store=embedding_store)
         self.judge = LLMJudge(config)
         self.rag_evaluator = RAGEvaluator(config)
 
@@ -831,16 +812,18 @@ def create_evaluator(settings: Dict[str, Any], project_path: Optional[Path] = No
     return Evaluator(config, project_path)
 
 
-def create_evaluator_from_settings(eval_settings: Any, project_path: Optional[Path] = None) -> Evaluator:
+def create_evaluator_from_settings(eval_settings: Any, project_path: Optional[Path] = None,
+                                   embedding_store: Optional[EmbeddingStore] = None) -> Evaluator:
     """
     Factory function to create an Evaluator from EvaluationSettings dataclass.
 
     Args:
         eval_settings: EvaluationSettings dataclass (from config_loader.GlobalSettings.evaluation)
         project_path: Path to project directory (for loading RAG context files)
+        embedding_store: Persistent store for semantic-match embeddings (optional)
 
     Returns:
         Configured Evaluator instance
     """
     config = EvaluationConfig.from_dataclass(eval_settings)
-    return Evaluator(config, project_path)
+    return Evaluator(config, project_path, embedding_store=embedding_store)
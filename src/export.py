@@ -17,8 +17,14 @@ from pathlib import Path
 from datetime import datetime
 import json
 import csv
-import base64
+import hashlib
+import html
 import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
 
 # Optional imports for PDF
 try:
@@ -40,6 +46,7 @@ try:
     from openpyxl import Workbook
     from openpyxl.styles import Font, Fill, PatternFill, Alignment, Border, Side
     from openpyxl.utils import get_column_letter
+    from openpyxl.cell import WriteOnlyCell
     from openpyxl.chart import BarChart, Reference, PieChart
     OPENPYXL_AVAILABLE = True
 except ImportError:
@@ -54,7 +61,12 @@ except ImportError:
 
 
 # Import shared models
+from .cache import get_cache_directory
+from .html_report import LAZY_CSS, PAGER_HTML, LazyItemWriter, lazy_script
 from .models import TestResult
+from .screenshots import find_screenshot, load_screenshot
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -133,8 +145,8 @@ class RunReport:
                     test_id = row.get('test_id', row.get('TEST_ID', ''))
                     screenshot_path = None
                     if screenshots_dir.exists():
-                        potential_screenshot = screenshots_dir / f"{test_id}.png"
-                        if potential_screenshot.exists():
+                        potential_screenshot = find_screenshot(screenshots_dir, test_id)
+                        if potential_screenshot:
                             screenshot_path = str(potential_screenshot)
 
                     tests.append(TestResult(
@@ -175,12 +187,29 @@ class RunReport:
 
 
 class PDFExporter:
-    """Export report to PDF"""
+    """
+    Export report to PDF.
 
-    def __init__(self, output_path: Path):
+    Screenshots are downsampled to JPEG thumbnails cached on disk and
+    embedded lazily: reportlab opens each file only while drawing its
+    page, so the story never holds the full-size images.
+    """
+
+    # Thumbnail bounding box in pixels (~150 dpi for the 12x8 cm frame)
+    THUMBNAIL_SIZE = (720, 480)
+    THUMBNAIL_QUALITY = 80
+
+    # Rows per results table (reportlab re-splits a long table on every page)
+    RESULTS_TABLE_ROWS = 200
+
+    def __init__(self, output_path: Path, thumbnail_dir: Optional[Path] = None):
         if not REPORTLAB_AVAILABLE:
             raise ImportError("reportlab not installed. Install with: pip install reportlab")
         self.output_path = output_path
+        if thumbnail_dir is None:
+            cache_dir = get_cache_directory()
+            thumbnail_dir = cache_dir / "thumbnails" if cache_dir else Path(output_path).parent / ".thumbnails"
+        self.thumbnail_dir = Path(thumbnail_dir)
         self.styles = getSampleStyleSheet()
         self._setup_custom_styles()
 
@@ -321,19 +350,24 @@ class PDFExporter:
         return elements
 
     def _create_results_table(self, report: RunReport) -> List:
-        """Create results table"""
+        """Create results table (one table per RESULTS_TABLE_ROWS tests)"""
         elements = []
+        tests = report.tests
+        for start in range(0, len(tests), self.RESULTS_TABLE_ROWS):
+            elements.append(self._results_table(tests[start:start + self.RESULTS_TABLE_ROWS]))
+        return elements
 
+    def _results_table(self, tests: List[TestResult]) -> 'Table':
         # Header
         data = [['ID', 'Category', 'Status', 'Score']]
 
         # Rows
-        for test in report.tests:
+        for test in tests:
             status_text = test.status
             score_text = f"{test.score:.1f}" if test.score is not None else "-"
             data.append([test.test_id, test.category[:20], status_text, score_text])
 
-        table = Table(data, colWidths=[2.5*cm, 6*cm, 2.5*cm, 2*cm])
+        table = Table(data, colWidths=[2.5*cm, 6*cm, 2.5*cm, 2*cm], repeatRows=1)
 
         # Stile con colori per status
         style = [
@@ -348,7 +382,7 @@ class PDFExporter:
         ]
 
         # Color rows by status
-        for i, test in enumerate(report.tests, start=1):
+        for i, test in enumerate(tests, start=1):
             if test.status == 'PASS':
                 style.append(('TEXTCOLOR', (2, i), (2, i), colors.HexColor('#28a745')))
             elif test.status == 'FAIL':
@@ -356,9 +390,7 @@ class PDFExporter:
                 style.append(('BACKGROUND', (0, i), (-1, i), colors.HexColor('#fff5f5')))
 
         table.setStyle(TableStyle(style))
-        elements.append(table)
-
-        return elements
+        return table
 
     def _create_regressions_section(self, report: RunReport) -> List:
         """Create regressions section"""
@@ -408,14 +440,10 @@ class PDFExporter:
 
             # Screenshot (if available and requested)
             if include_screenshots and test.screenshot_path and PIL_AVAILABLE:
-                screenshot_path = Path(test.screenshot_path)
-                if screenshot_path.exists():
-                    try:
-                        img = Image(str(screenshot_path), width=12*cm, height=8*cm)
-                        test_elements.append(Spacer(1, 10))
-                        test_elements.append(img)
-                    except Exception:
-                        pass
+                img = self._screenshot_image(Path(test.screenshot_path))
+                if img is not None:
+                    test_elements.append(Spacer(1, 10))
+                    test_elements.append(img)
 
             test_elements.append(Spacer(1, 20))
 
@@ -424,18 +452,73 @@ class PDFExporter:
 
         return elements
 
+    def _thumbnail(self, screenshot_path: Path) -> Optional[Path]:
+        """
+        Downsampled JPEG of a screenshot, cached by path, mtime and size.
+
+        Returns:
+            Path of the thumbnail, or None if the screenshot is unreadable
+        """
+        try:
+            stat = screenshot_path.stat()
+        except OSError:
+            return None
+
+        key = hashlib.sha1(
+            f"{screenshot_path.resolve()}:{stat.st_mtime_ns}:{stat.st_size}:{self.THUMBNAIL_SIZE}".encode('utf-8')
+        ).hexdigest()
+        thumbnail = self.thumbnail_dir / f"{key}.jpg"
+        if thumbnail.exists():
+            return thumbnail
+
+        try:
+            with PILImage.open(screenshot_path) as img:
+                img.draft('RGB', self.THUMBNAIL_SIZE)
+                img.thumbnail(self.THUMBNAIL_SIZE)
+                img = img.convert('RGB')
+                self.thumbnail_dir.mkdir(parents=True, exist_ok=True)
+                # Atomic: parallel exports may build the same thumbnail
+                tmp = thumbnail.with_name(f"{key}.{os.getpid()}.tmp")
+                img.save(tmp, format='JPEG', quality=self.THUMBNAIL_QUALITY, optimize=True)
+            os.replace(tmp, thumbnail)
+        except Exception as e:
+            logger.warning(f"Thumbnail failed for {screenshot_path.name}: {e}")
+            return None
+        return thumbnail
+
+    def _screenshot_image(self, screenshot_path: Path) -> Optional['Image']:
+        """Lazily loaded image flowable fitted in the 12x8 cm frame"""
+        thumbnail = self._thumbnail(screenshot_path)
+        if thumbnail is None:
+            return None
+        with PILImage.open(thumbnail) as img:
+            width, height = img.size
+        scale = min(12*cm / width, 8*cm / height)
+        # lazy=2: opened while drawing and released right after
+        return Image(str(thumbnail), width=width * scale, height=height * scale, lazy=2)
+
 
 class ExcelExporter:
-    """Export report to Excel"""
+    """
+    Export report to Excel.
+
+    Uses openpyxl write-only mode: rows are serialised as they are
+    appended, so memory does not grow with the number of tests.
+    """
 
     def __init__(self, output_path: Path):
         if not OPENPYXL_AVAILABLE:
             raise ImportError("openpyxl not installed. Install with: pip install openpyxl")
         self.output_path = output_path
 
+        # Shared styles
+        self.header_font = Font(bold=True, color="FFFFFF")
+        self.pass_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+        self.fail_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+
     def export(self, report: RunReport) -> Path:
         """Generate Excel report"""
-        wb = Workbook()
+        wb = Workbook(write_only=True)
 
         # Sheet Summary
         self._create_summary_sheet(wb, report)
@@ -446,27 +529,44 @@ class ExcelExporter:
         # Detail Sheet (conversations)
         self._create_detail_sheet(wb, report)
 
-        # Remove default sheet
-        if 'Sheet' in wb.sheetnames:
-            del wb['Sheet']
-
         wb.save(str(self.output_path))
         return self.output_path
 
+    @staticmethod
+    def _cell(ws, value, font=None, fill=None, alignment=None) -> 'WriteOnlyCell':
+        """Styled cell for a write-only sheet"""
+        cell = WriteOnlyCell(ws, value=value)
+        if font is not None:
+            cell.font = font
+        if fill is not None:
+            cell.fill = fill
+        if alignment is not None:
+            cell.alignment = alignment
+        return cell
+
+    def _header_row(self, ws, headers: List[str], fill_color: str, alignment=None) -> List:
+        fill = PatternFill(start_color=fill_color, end_color=fill_color, fill_type="solid")
+        return [self._cell(ws, header, self.header_font, fill, alignment) for header in headers]
+
+    @staticmethod
+    def _set_widths(ws, widths: Dict[str, int]) -> None:
+        """Column widths (write-only: before the first row)"""
+        for column, width in widths.items():
+            ws.column_dimensions[column].width = width
+
     def _create_summary_sheet(self, wb: Workbook, report: RunReport):
         """Create summary sheet"""
-        ws = wb.create_sheet("Summary", 0)
+        ws = wb.create_sheet("Summary")
+        self._set_widths(ws, {'A': 20, 'B': 30})
 
         # Styles
         header_font = Font(bold=True, size=14)
         label_font = Font(bold=True)
-        pass_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-        fail_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
 
         # Title
-        ws['A1'] = f"Chatbot Test Report - {report.project}"
-        ws['A1'].font = Font(bold=True, size=16)
-        ws.merge_cells('A1:D1')
+        ws.append([self._cell(ws, f"Chatbot Test Report - {report.project}", Font(bold=True, size=16))])
+        ws.merged_cells.add('A1:D1')
+        ws.append([])
 
         # General info
         info = [
@@ -477,16 +577,12 @@ class ExcelExporter:
             ('Model Version', report.model_version),
         ]
 
-        row = 3
         for label, value in info:
-            ws.cell(row=row, column=1, value=label).font = label_font
-            ws.cell(row=row, column=2, value=value)
-            row += 1
+            ws.append([self._cell(ws, label, label_font), value])
 
         # Metrics
-        row += 1
-        ws.cell(row=row, column=1, value="Metrics").font = header_font
-        row += 1
+        ws.append([])
+        ws.append([self._cell(ws, "Metrics", header_font)])
 
         metrics = [
             ('Total Tests', report.total_tests),
@@ -498,170 +594,109 @@ class ExcelExporter:
         ]
 
         for label, value in metrics:
-            ws.cell(row=row, column=1, value=label).font = label_font
-            cell = ws.cell(row=row, column=2, value=value)
+            fill = None
             if label == 'Passed':
-                cell.fill = pass_fill
+                fill = self.pass_fill
             elif label == 'Failed' and report.failed > 0:
-                cell.fill = fail_fill
-            row += 1
+                fill = self.fail_fill
+            ws.append([self._cell(ws, label, label_font), self._cell(ws, value, fill=fill)])
 
         # Regressions
         if report.regressions:
-            row += 1
-            ws.cell(row=row, column=1, value="Regressions").font = header_font
-            row += 1
+            ws.append([])
+            ws.append([self._cell(ws, "Regressions", header_font)])
             for reg in report.regressions:
-                ws.cell(row=row, column=1, value=reg)
-                row += 1
-
-        # Adjust columns
-        ws.column_dimensions['A'].width = 20
-        ws.column_dimensions['B'].width = 30
+                ws.append([reg])
 
     def _create_results_sheet(self, wb: Workbook, report: RunReport):
         """Create results sheet"""
         ws = wb.create_sheet("Results")
+        self._set_widths(ws, {'A': 12, 'B': 20, 'C': 10, 'D': 8, 'E': 40, 'F': 40, 'G': 40})
 
         # Header
         headers = ['Test ID', 'Category', 'Status', 'Score', 'Question', 'Expected Response', 'Actual Response']
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="343A40", end_color="343A40", fill_type="solid")
-
-        for col, header in enumerate(headers, start=1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = Alignment(horizontal='center')
+        ws.append(self._header_row(ws, headers, "343A40", Alignment(horizontal='center')))
 
         # Data
-        pass_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-        fail_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-
-        for row, test in enumerate(report.tests, start=2):
-            ws.cell(row=row, column=1, value=test.test_id)
-            ws.cell(row=row, column=2, value=test.category)
-
-            status_cell = ws.cell(row=row, column=3, value=test.status)
-            if test.status == 'PASS':
-                status_cell.fill = pass_fill
-            elif test.status == 'FAIL':
-                status_cell.fill = fail_fill
-
-            ws.cell(row=row, column=4, value=test.score if test.score else '')
-            ws.cell(row=row, column=5, value=test.question[:500])
-            ws.cell(row=row, column=6, value=test.expected[:500])
-            ws.cell(row=row, column=7, value=test.actual_response[:500])
-
-        # Adjust columns
-        ws.column_dimensions['A'].width = 12
-        ws.column_dimensions['B'].width = 20
-        ws.column_dimensions['C'].width = 10
-        ws.column_dimensions['D'].width = 8
-        ws.column_dimensions['E'].width = 40
-        ws.column_dimensions['F'].width = 40
-        ws.column_dimensions['G'].width = 40
+        fills = {'PASS': self.pass_fill, 'FAIL': self.fail_fill}
+        for test in report.tests:
+            ws.append([
+                test.test_id,
+                test.category,
+                self._cell(ws, test.status, fill=fills.get(test.status)),
+                test.score if test.score else '',
+                test.question[:500],
+                test.expected[:500],
+                test.actual_response[:500],
+            ])
 
         # Filters
-        ws.auto_filter.ref = ws.dimensions
+        ws.auto_filter.ref = f"A1:G{len(report.tests) + 1}"
 
     def _create_detail_sheet(self, wb: Workbook, report: RunReport):
         """Create conversations detail sheet"""
         ws = wb.create_sheet("Detail")
+        self._set_widths(ws, {'A': 12, 'B': 8, 'C': 10, 'D': 80, 'E': 40})
 
         headers = ['Test ID', 'Turn', 'Role', 'Message', 'Sources']
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="2C3E50", end_color="2C3E50", fill_type="solid")
-
-        for col, header in enumerate(headers, start=1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
+        ws.append(self._header_row(ws, headers, "2C3E50"))
 
-        row = 2
         for test in report.tests:
             if not test.conversation_history:
                 continue
 
             for turn_idx, turn in enumerate(test.conversation_history, start=1):
-                ws.cell(row=row, column=1, value=test.test_id)
-                ws.cell(row=row, column=2, value=turn_idx)
-                ws.cell(row=row, column=3, value=turn.get('role', ''))
-                ws.cell(row=row, column=4, value=turn.get('content', '')[:1000])
-                ws.cell(row=row, column=5, value=', '.join(test.sources) if turn_idx == 1 else '')
-                row += 1
-
-        # Adjust columns
-        ws.column_dimensions['A'].width = 12
-        ws.column_dimensions['B'].width = 8
-        ws.column_dimensions['C'].width = 10
-        ws.column_dimensions['D'].width = 80
-        ws.column_dimensions['E'].width = 40
+                ws.append([
+                    test.test_id,
+                    turn_idx,
+                    turn.get('role', ''),
+                    turn.get('content', '')[:1000],
+                    ', '.join(test.sources) if turn_idx == 1 else '',
+                ])
 
 
 class HTMLExporter:
-    """Export report to standalone HTML"""
+    """
+    Export report to standalone HTML.
+
+    Test cards are streamed to the file one by one; screenshots are kept
+    in lazily parsed JSON chunks and only decoded when a card is expanded.
+    """
+
+    # Cards per details chunk (screenshots are large: keep chunks small)
+    CHUNK_SIZE = 10
+
+    RENDER_JS = """
+        LazyReport.render = function (details, target) {
+            if (!details.screenshot) return;
+            const img = document.createElement('img');
+            img.src = details.screenshot;
+            img.style.cssText = 'max-width: 100%; margin-top: 10px; border: 1px solid #ddd;';
+            target.appendChild(img);
+        };
+"""
 
     def __init__(self, output_path: Path):
         self.output_path = output_path
 
     def export(self, report: RunReport, include_screenshots: bool = True) -> Path:
         """Generate HTML report"""
-        html = self._generate_html(report, include_screenshots)
-
         with open(self.output_path, 'w', encoding='utf-8') as f:
-            f.write(html)
+            self._write_html(f, report, include_screenshots)
 
         return self.output_path
 
-    def _generate_html(self, report: RunReport, include_screenshots: bool) -> str:
-        """Generate HTML content"""
-        # Embed screenshots as base64
-        screenshots_html = ""
-        if include_screenshots:
-            for test in report.tests:
-                if test.screenshot_path and Path(test.screenshot_path).exists():
-                    try:
-                        with open(test.screenshot_path, 'rb') as f:
-                            b64 = base64.b64encode(f.read()).decode()
-                            test.screenshot_base64 = f"data:image/png;base64,{b64}"
-                    except Exception:
-                        test.screenshot_base64 = None
-                else:
-                    test.screenshot_base64 = None
-
+    def _write_html(self, out, report: RunReport, include_screenshots: bool) -> None:
+        """Stream the HTML document to out"""
         pass_color = "#28a745" if report.pass_rate >= 80 else "#dc3545"
 
-        tests_html = ""
-        for test in report.tests:
-            status_class = "pass" if test.status == "PASS" else "fail" if test.status == "FAIL" else "skip"
-            screenshot_img = ""
-            if include_screenshots and hasattr(test, 'screenshot_base64') and test.screenshot_base64:
-                screenshot_img = f'<img src="{test.screenshot_base64}" style="max-width: 100%; margin-top: 10px; border: 1px solid #ddd;">'
-
-            tests_html += f"""
-            <div class="test-card {status_class}">
-                <div class="test-header">
-                    <span class="test-id">{test.test_id}</span>
-                    <span class="test-status">{test.status}</span>
-                </div>
-                <div class="test-category">{test.category}</div>
-                <div class="test-content">
-                    <p><strong>Question:</strong> {test.question[:500]}</p>
-                    <p><strong>Response:</strong> {test.actual_response[:500]}</p>
-                    {f'<p><strong>Evaluation:</strong> {test.evaluation}</p>' if test.evaluation else ''}
-                    {screenshot_img}
-                </div>
-            </div>
-            """
-
-        html = f"""
+        out.write(f"""
 <!DOCTYPE html>
 <html lang="it">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Test Report - {report.project} RUN {report.run_number}</title>
+    <title>Test Report - {html.escape(report.project)} RUN {report.run_number}</title>
     <style>
         * {{ box-sizing: border-box; margin: 0; padding: 0; }}
         body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; background: #f5f5f5; padding: 20px; }}
@@ -692,13 +727,14 @@ class HTMLExporter:
         .test-content {{ padding: 20px; }}
         .test-content p {{ margin-bottom: 10px; line-height: 1.6; }}
         .footer {{ text-align: center; padding: 20px; color: #7f8c8d; font-size: 12px; }}
+{LAZY_CSS}
     </style>
 </head>
 <body>
     <div class="container">
         <div class="header">
             <h1>Chatbot Test Report</h1>
-            <div class="subtitle">{report.project} - RUN {report.run_number}</div>
+            <div class="subtitle">{html.escape(report.project)} - RUN {report.run_number}</div>
         </div>
 
         <div class="summary">
@@ -730,18 +766,56 @@ class HTMLExporter:
 
         <div class="tests-section">
             <h2>Test Results</h2>
-            {tests_html}
-        </div>
+""")
 
+        cards = LazyItemWriter(out, self.CHUNK_SIZE)
+        for test in report.tests:
+            # One screenshot in memory at a time (plus the current chunk)
+            shot = None
+            if include_screenshots and test.screenshot_path:
+                shot = load_screenshot(test.screenshot_path)
+            screenshot = shot.data_url if shot is not None else None
+            cards.add(lambda idx, test=test, has_shot=bool(screenshot): self._card(test, idx, has_shot),
+                      {'screenshot': screenshot})
+        cards.close()
+
+        out.write(f"""
+        </div>
+{PAGER_HTML}
         <div class="footer">
             Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} by Chatbot Tester
         </div>
     </div>
+{lazy_script(self.RENDER_JS, chunk_size=self.CHUNK_SIZE)}
 </body>
 </html>
-        """
-
-        return html
+        """)
+
+    @staticmethod
+    def _card(test: TestResult, idx: int, has_screenshot: bool) -> str:
+        """HTML card for a test (screenshot loaded on expand)"""
+        status_class = "pass" if test.status == "PASS" else "fail" if test.status == "FAIL" else "skip"
+        evaluation = f'<p><strong>Evaluation:</strong> {html.escape(str(test.evaluation))}</p>' if test.evaluation else ''
+        screenshot = ''
+        if has_screenshot:
+            screenshot = ('<button type="button" data-expand="Hide screenshot">Show screenshot</button>'
+                          '<div class="lazy-body"></div>')
+
+        return f"""
+            <div class="test-card {status_class}" data-idx="{idx}">
+                <div class="test-header">
+                    <span class="test-id">{html.escape(test.test_id)}</span>
+                    <span class="test-status">{html.escape(test.status)}</span>
+                </div>
+                <div class="test-category">{html.escape(test.category)}</div>
+                <div class="test-content">
+                    <p><strong>Question:</strong> {html.escape(test.question[:500])}</p>
+                    <p><strong>Response:</strong> {html.escape(test.actual_response[:500])}</p>
+                    {evaluation}
+                    {screenshot}
+                </div>
+            </div>
+            """
 
 
 class ReportExporter:
@@ -760,6 +834,12 @@ class ReportExporter:
         exporter.export_all(output_dir)
     """
 
+    # Below this size spawning the worker processes costs more than it saves
+    PARALLEL_MIN_TESTS = 200
+    # Formats slow enough to be worth a process pool; without them the
+    # others finish before the workers have even started
+    POOL_FORMATS = ('pdf',)
+
     def __init__(self, report: RunReport):
         self.report = report
 
@@ -796,34 +876,86 @@ class ReportExporter:
 
         return output_path
 
-    def export_all(self, output_dir: Path) -> Dict[str, Path]:
-        """Export to all available formats"""
+    def export_all(self, output_dir: Path, parallel: bool = True) -> Dict[str, Path]:
+        """
+        Export to all available formats.
+
+        The formats are independent: with parallel=True, a slow format among
+        them (POOL_FORMATS) and at least PARALLEL_MIN_TESTS tests each one is
+        rendered in its own process, so the total time is about that of the
+        slowest (usually PDF). Formats the pool could not finish (no pool,
+        or a worker died) are exported one at a time afterwards.
+        """
         output_dir.mkdir(parents=True, exist_ok=True)
 
         base_name = f"{self.report.project}_run{self.report.run_number}"
-        results = {}
-
-        # HTML (always available)
-        results['html'] = self.to_html(output_dir / f"{base_name}.html")
-
-        # CSV (always available)
-        results['csv'] = self.to_csv(output_dir / f"{base_name}.csv")
 
-        # PDF (if reportlab available)
+        # HTML and CSV always available, PDF/Excel if installed
+        jobs = {
+            'html': output_dir / f"{base_name}.html",
+            'csv': output_dir / f"{base_name}.csv",
+        }
         if REPORTLAB_AVAILABLE:
+            jobs['pdf'] = output_dir / f"{base_name}.pdf"
+        if OPENPYXL_AVAILABLE:
+            jobs['excel'] = output_dir / f"{base_name}.xlsx"
+
+        # fmt -> path, None if the export failed
+        done: Dict[str, Optional[Path]] = {}
+        use_pool = (
+            parallel
+            and len(jobs) > 1
+            and any(fmt in jobs for fmt in self.POOL_FORMATS)
+            and len(self.report.tests) >= self.PARALLEL_MIN_TESTS
+        )
+        if use_pool:
             try:
-                results['pdf'] = self.to_pdf(output_dir / f"{base_name}.pdf")
-            except Exception as e:
-                print(f"! PDF export failed: {e}")
+                self._export_parallel(jobs, done)
+            except OSError as e:
+                print(f"! Parallel export unavailable ({e}), exporting sequentially")
 
-        # Excel (if openpyxl available)
-        if OPENPYXL_AVAILABLE:
+        for fmt, path in jobs.items():
+            if fmt in done:
+                continue
             try:
-                results['excel'] = self.to_excel(output_dir / f"{base_name}.xlsx")
+                done[fmt] = _export_format(self.report, fmt, path)
             except Exception as e:
-                print(f"! Excel export failed: {e}")
-
-        return results
+                print(f"! {fmt.upper()} export failed: {e}")
+                done[fmt] = None
+
+        return {fmt: done[fmt] for fmt in jobs if done[fmt] is not None}
+
+    def _export_parallel(self, jobs: Dict[str, Path], done: Dict[str, Optional[Path]]) -> None:
+        """Fills done with the formats the pool finished (exported or failed)"""
+        # spawn: no fork of the caller's threads (browser, pollers, caches)
+        context = multiprocessing.get_context('spawn')
+        workers = min(len(jobs), os.cpu_count() or 1)
+        broken: List[str] = []
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = {fmt: pool.submit(_export_format, self.report, fmt, path) for fmt, path in jobs.items()}
+            for fmt, future in futures.items():
+                try:
+                    done[fmt] = future.result()
+                except BrokenProcessPool:
+                    # Formats already written are kept, only these are redone
+                    broken.append(fmt)
+                except Exception as e:
+                    print(f"! {fmt.upper()} export failed: {e}")
+                    done[fmt] = None
+        if broken:
+            print(f"! Export worker died, exporting {', '.join(broken)} sequentially")
+
+
+def _export_format(report: RunReport, fmt: str, output_path: Path) -> Path:
+    """Export a single format (module level: runs in export_all worker processes)"""
+    exporter = ReportExporter(report)
+    export = {
+        'html': exporter.to_html,
+        'csv': exporter.to_csv,
+        'pdf': exporter.to_pdf,
+        'excel': exporter.to_excel,
+    }[fmt]
+    return export(output_path)
 
 
 def check_dependencies() -> Dict[str, bool]:
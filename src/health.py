@@ -13,21 +13,35 @@ Usage:
     # Single service check
     result = health.check_ollama()
 
-    # Check all services
+    # Check all services (in parallelo, con deadline per probe)
     status = health.check_all()
     if not status.can_run:
         print(status.blocking_issues)
 
+    # Risultati condivisi tra processi fratelli (scheduler, batch)
+    health = HealthChecker(config, cache_path=Path(".cache/health.json"))
+
+    # Warm: il Chromium del probe passa alla sessione di test
+    status = await health.acheck_all(warm_browser=launch_browser)
+    browser = health.warm_browser
+
     # With circuit breaker
     with health.circuit_breaker("google_sheets"):
         sheets_client.append_row(...)
 """
 
+import asyncio
+import hashlib
+import json
+import os
+import threading
 import time
 import requests
+from concurrent.futures import ThreadPoolExecutor, wait
 from enum import Enum
-from typing import Optional, Dict, List, Callable, Any
-from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Dict, List, Callable, Any, Awaitable, Iterable
+from dataclasses import dataclass, field, asdict
 from datetime import datetime, timedelta
 from functools import wraps
 
@@ -60,6 +74,15 @@ class HealthCheckResult:
         """Il servizio può essere usato (anche se degradato)"""
         return self.status in (ServiceStatus.HEALTHY, ServiceStatus.DEGRADED, ServiceStatus.DISABLED)
 
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['status'] = self.status.value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'HealthCheckResult':
+        return cls(**{**data, 'status': ServiceStatus(data['status'])})
+
 
 @dataclass
 class SystemHealth:
@@ -107,6 +130,55 @@ class SystemHealth:
         }
 
 
+class HealthResultCache:
+    """
+    Cache su disco dei risultati, condivisa tra processi.
+
+    Un file JSON {chiave: {result, saved_at}} riscritto in modo atomico
+    (file temporaneo + os.replace): i processi fratelli lanciati dallo
+    scheduler o dal batch riusano i probe dei primi invece di ripeterli.
+    Le chiavi includono un hash della configurazione verificata (URL,
+    API key, credenziali), quindi progetti diversi non si confondono.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: float = 60):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            return json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, key: str) -> Optional[HealthCheckResult]:
+        """Risultato ancora valido o None"""
+        entry = self._load().get(key)
+        if not entry or time.time() - entry.get('saved_at', 0) >= self.ttl_seconds:
+            return None
+        try:
+            return HealthCheckResult.from_dict(entry['result'])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def put(self, key: str, result: HealthCheckResult) -> None:
+        with self._lock:
+            now = time.time()
+            entries = {
+                k: v for k, v in self._load().items()
+                if now - v.get('saved_at', 0) < self.ttl_seconds
+            }
+            entries[key] = {'result': result.to_dict(), 'saved_at': now}
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+                tmp.write_text(json.dumps(entries), encoding='utf-8')
+                os.replace(tmp, self.path)
+            except OSError as e:
+                print(f"! Cache health check non scrivibile: {e}")
+
+
 class CircuitState(Enum):
     """Stati del circuit breaker"""
     CLOSED = "closed"       # Normale, lascia passare
@@ -247,17 +319,33 @@ class HealthChecker:
     Health checker centralizzato per tutti i servizi.
 
     Gestisce:
-    - Verifica disponibilità servizi
+    - Verifica disponibilità servizi (probe in parallelo, deadline per probe)
     - Circuit breaker per ogni servizio
-    - Caching risultati health check
+    - Caching risultati health check (in memoria e, opzionale, su disco
+      condiviso tra processi)
+    - Modalità warm: il Chromium avviato dal probe browser viene passato
+      alla sessione di test invece di essere chiuso
     """
 
+    # Ordine dei probe (e delle righe nel report)
+    SERVICES = ("browser", "chatbot_url", "ollama", "langsmith", "google_sheets")
+
+    # Deadline per probe (secondi): oltre, il servizio risulta in timeout
+    PROBE_DEADLINES: Dict[str, float] = {
+        "browser": 30.0,
+        "chatbot_url": 12.0,
+        "ollama": 7.0,
+        "langsmith": 12.0,
+        "google_sheets": 12.0,
+    }
+
     def __init__(self,
                  chatbot_url: str = "",
                  ollama_url: str = "http://localhost:11434",
                  langsmith_api_key: str = "",
                  google_credentials_path: str = "",
-                 cache_ttl: int = 30):
+                 cache_ttl: int = 30,
+                 cache_path: Optional[Path] = None):
         """
         Args:
             chatbot_url: URL del chatbot da testare
@@ -265,12 +353,17 @@ class HealthChecker:
             langsmith_api_key: API key LangSmith
             google_credentials_path: Path alle credenziali Google
             cache_ttl: Tempo di cache per i risultati (secondi)
+            cache_path: File JSON della cache condivisa tra processi (None = solo memoria)
         """
         self.chatbot_url = chatbot_url
         self.ollama_url = ollama_url
         self.langsmith_api_key = langsmith_api_key
         self.google_credentials_path = google_credentials_path
         self.cache_ttl = cache_ttl
+        self.disk_cache = HealthResultCache(cache_path, cache_ttl) if cache_path else None
+
+        # Browser avviato dal probe warm (da passare alla sessione)
+        self.warm_browser: Optional[Any] = None
 
         # Circuit breakers per servizio
         self.circuit_breakers: Dict[str, CircuitBreaker] = {
@@ -284,18 +377,42 @@ class HealthChecker:
         self._cache: Dict[str, HealthCheckResult] = {}
         self._cache_time: Dict[str, datetime] = {}
 
+    def _disk_key(self, service: str) -> str:
+        """Chiave su disco: servizio + hash della configurazione verificata"""
+        config = {
+            "chatbot_url": self.chatbot_url,
+            "ollama": self.ollama_url,
+            "langsmith": self.langsmith_api_key,
+            "google_sheets": self.google_credentials_path,
+        }.get(service, "")
+        return f"{service}:{hashlib.sha1(config.encode('utf-8')).hexdigest()[:16]}"
+
     def _is_cached(self, service: str) -> bool:
-        """Verifica se il risultato è in cache e valido"""
-        if service not in self._cache_time:
-            return False
-        elapsed = (datetime.now() - self._cache_time[service]).total_seconds()
-        return elapsed < self.cache_ttl
+        """Verifica se il risultato è in cache e valido (memoria, poi disco)"""
+        if service in self._cache_time:
+            elapsed = (datetime.now() - self._cache_time[service]).total_seconds()
+            if elapsed < self.cache_ttl:
+                return True
+
+        if self.disk_cache:
+            result = self.disk_cache.get(self._disk_key(service))
+            if result:
+                self._cache[service] = result
+                self._cache_time[service] = datetime.now()
+                return True
+
+        return False
 
     def _cache_result(self, service: str, result: HealthCheckResult):
         """Salva risultato in cache"""
         self._cache[service] = result
         self._cache_time[service] = datetime.now()
 
+        # Su disco solo i servizi usabili: un guasto viene ricontrollato
+        # subito dal processo successivo, così una correzione si vede
+        if self.disk_cache and result.is_usable:
+            self.disk_cache.put(self._disk_key(service), result)
+
     def check_chatbot_url(self, force: bool = False) -> HealthCheckResult:
         """
         Verifica raggiungibilità URL chatbot.
@@ -561,25 +678,121 @@ class HealthChecker:
         self._cache_result(service, result)
         return result
 
-    def check_all(self, force: bool = False) -> SystemHealth:
+    async def check_browser_warm(self,
+                                 launch: Callable[[], Awaitable[Any]]) -> HealthCheckResult:
+        """
+        Probe browser "warm": avvia davvero Chromium e lo tiene aperto.
+
+        Il browser avviato resta in self.warm_browser per la sessione di
+        test (che non deve avviarne un altro); chi lo riceve lo chiude.
+
+        Args:
+            launch: Coroutine factory che restituisce un browser avviato (con stop())
+        """
+        service = "browser"
+        deadline = self.PROBE_DEADLINES[service]
+        start = time.time()
+        try:
+            self.warm_browser = await asyncio.wait_for(launch(), timeout=deadline)
+            latency = int((time.time() - start) * 1000)
+            result = HealthCheckResult(
+                service=service,
+                status=ServiceStatus.HEALTHY,
+                message=f"Chromium avviato ({latency}ms)",
+                latency_ms=latency,
+                details={"warm": True}
+            )
+        except asyncio.TimeoutError:
+            result = HealthCheckResult(
+                service=service,
+                status=ServiceStatus.UNHEALTHY,
+                message=f"Timeout avvio Chromium (>{deadline:.0f}s)"
+            )
+        except Exception as e:
+            result = HealthCheckResult(
+                service=service,
+                status=ServiceStatus.UNHEALTHY,
+                message=f"Errore avvio Chromium: {str(e)[:50]}"
+            )
+
+        self._cache[service] = result
+        self._cache_time[service] = datetime.now()
+        return result
+
+    def _probe(self, service: str) -> Callable[[bool], HealthCheckResult]:
+        return {
+            "browser": self.check_browser,
+            "chatbot_url": self.check_chatbot_url,
+            "ollama": self.check_ollama,
+            "langsmith": self.check_langsmith,
+            "google_sheets": self.check_google_sheets,
+        }[service]
+
+    def check_all(self, force: bool = False,
+                  services: Optional[Iterable[str]] = None) -> SystemHealth:
         """
-        Esegue tutti gli health check.
+        Esegue tutti gli health check in parallelo.
+
+        Ogni probe ha la sua deadline (PROBE_DEADLINES): un servizio che
+        non risponde in tempo risulta UNHEALTHY senza trattenere gli altri.
 
         Args:
             force: Ignora cache e ricontrolla tutto
+            services: Sottoinsieme di SERVICES da verificare (default: tutti)
 
         Returns:
             SystemHealth con tutti i risultati
         """
+        names = [s for s in self.SERVICES if services is None or s in services]
         health = SystemHealth()
 
-        # Esegui tutti i check
-        health.checks["browser"] = self.check_browser(force)
-        health.checks["chatbot_url"] = self.check_chatbot_url(force)
-        health.checks["ollama"] = self.check_ollama(force)
-        health.checks["langsmith"] = self.check_langsmith(force)
-        health.checks["google_sheets"] = self.check_google_sheets(force)
+        executor = ThreadPoolExecutor(max_workers=max(1, len(names)), thread_name_prefix="health")
+        futures = {name: executor.submit(self._probe(name), force) for name in names}
+        started = time.monotonic()
+        try:
+            for name in names:
+                remaining = self.PROBE_DEADLINES[name] - (time.monotonic() - started)
+                done, _ = wait([futures[name]], timeout=max(0.0, remaining))
+                if done:
+                    health.checks[name] = futures[name].result()
+                else:
+                    health.checks[name] = HealthCheckResult(
+                        service=name,
+                        status=ServiceStatus.UNHEALTHY,
+                        message=f"Timeout health check (>{self.PROBE_DEADLINES[name]:.0f}s)"
+                    )
+        finally:
+            # Un probe bloccato non deve trattenere il chiamante
+            executor.shutdown(wait=False)
+
+        return health
+
+    async def acheck_all(self, force: bool = False,
+                         warm_browser: Optional[Callable[[], Awaitable[Any]]] = None) -> SystemHealth:
+        """
+        check_all() dall'event loop della sessione.
+
+        Args:
+            force: Ignora cache e ricontrolla tutto
+            warm_browser: Se indicato, il probe browser avvia Chromium con
+                questa factory (nel loop della sessione) e lo lascia in
+                self.warm_browser invece di verificare solo l'installazione
+
+        Returns:
+            SystemHealth con tutti i risultati
+        """
+        if not warm_browser:
+            return await asyncio.to_thread(self.check_all, force)
+
+        others = [s for s in self.SERVICES if s != "browser"]
+        browser, rest = await asyncio.gather(
+            self.check_browser_warm(warm_browser),
+            asyncio.to_thread(self.check_all, force, others)
+        )
 
+        health = SystemHealth()
+        health.checks["browser"] = browser
+        health.checks.update(rest.checks)
         return health
 
     def get_circuit_breaker(self, service: str) -> CircuitBreaker:
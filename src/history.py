@@ -0,0 +1,476 @@
+"""
+Run History - Storico locale dei risultati per le analisi tra RUN
+
+Un database SQLite per progetto (reports/<progetto>/history.sqlite) con
+una riga per (sorgente, RUN, test) e indici su test_id e RUN. Viene aggiornato a
+ogni generazione del report locale e, in modo incrementale, dai fogli
+Sheets o dai journal che non contiene ancora.
+
+Confronti, flaky test, trend regressioni, calibrazione e aggregati
+diventano query aggregate invece di ricaricare e scorrere ogni RUN.
+
+Usage:
+    store = RunHistoryStore(reports_dir / RunHistoryStore.FILENAME)
+    store.sync_local_runs(reports_dir)              # solo RUN nuove/cambiate
+    store.ingest_results(7, journal.iter_results(), source="local")
+
+    store.flaky_tests(runs, "local", threshold=0.3)
+    store.transitions(runs, "sheets")               # regressioni per RUN
+"""
+
+import csv
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .journal import RunJournal
+from .models import TestResult
+
+# Colonne metriche: nome colonna storico -> (campo TestResult, colonna Sheets)
+METRIC_COLUMNS = {
+    'semantic': ('semantic_score', 'SEMANTIC'),
+    'judge': ('judge_score', 'JUDGE'),
+    'groundedness': ('groundedness', 'GROUND'),
+    'faithfulness': ('faithfulness', 'FAITH'),
+    'relevance': ('relevance', 'RELEV'),
+    'overall': ('overall_score', 'OVERALL'),
+}
+
+_RESULT_COLUMNS = ['run', 'test_id', 'result', 'category', 'question', 'notes', 'date',
+                   'duration_ms'] + list(METRIC_COLUMNS)
+
+# Versione schema (PRAGMA user_version): uno storico precedente viene
+# ricreato, i dati si rileggono dalle sorgenti
+SCHEMA_VERSION = 2
+
+# Una RUN locale e un foglio Sheets con lo stesso numero sono RUN distinte
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    source TEXT NOT NULL,
+    run INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL DEFAULT '',
+    ingested_at REAL NOT NULL,
+    date TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (source, run)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS results (
+    source TEXT NOT NULL,
+    run INTEGER NOT NULL,
+    test_id TEXT NOT NULL,
+    result TEXT NOT NULL DEFAULT '',
+    category TEXT NOT NULL DEFAULT '',
+    question TEXT NOT NULL DEFAULT '',
+    notes TEXT NOT NULL DEFAULT '',
+    date TEXT NOT NULL DEFAULT '',
+    duration_ms INTEGER NOT NULL DEFAULT 0,
+    {', '.join(f'{name} REAL' for name in METRIC_COLUMNS)},
+    PRIMARY KEY (source, run, test_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_results_test ON results (source, test_id, run);
+"""
+
+
+def _metric(value: Any) -> Optional[float]:
+    """Valore metrica valido (0-1) o None"""
+    if value is None or value == "":
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if 0 <= number <= 1 else None
+
+
+def journal_fingerprint(run_dir: Path) -> str:
+    """Dimensione e mtime del journal di una RUN ('' se assente)"""
+    try:
+        stat = (Path(run_dir) / RunJournal.FILENAME).stat()
+    except OSError:
+        return ""
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+# Risultati delle RUN locali senza journal (report precedenti al journal)
+LEGACY_RESULT_FILES = ("report.csv", "results.json")
+
+
+def legacy_results_file(run_dir: Path) -> Optional[Path]:
+    """report.csv o results.json di una RUN senza journal (None se assenti)"""
+    for name in LEGACY_RESULT_FILES:
+        path = Path(run_dir) / name
+        if path.exists():
+            return path
+    return None
+
+
+def _file_fingerprint(path: Path) -> str:
+    try:
+        stat = path.stat()
+    except OSError:
+        return ""
+    return f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _legacy_rows(path: Path) -> List[Dict[str, Any]]:
+    """Righe risultato da report.csv o results.json"""
+    if path.suffix == ".csv":
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            rows = json.load(f)
+    for row in rows:
+        row['result'] = str(row.get('result') or '').upper()
+        try:
+            row['duration_ms'] = int(float(row.get('duration_ms') or 0))
+        except (TypeError, ValueError):
+            row['duration_ms'] = 0
+        for name in METRIC_COLUMNS:
+            row[name] = _metric(row.get(name))
+    return rows
+
+
+def run_dir_number(run_dir: Path) -> Optional[int]:
+    """Numero RUN da una cartella report (run_007 -> 7)"""
+    name = Path(run_dir).name
+    if not name.startswith('run_'):
+        return None
+    try:
+        return int(name[4:])
+    except ValueError:
+        return None
+
+
+class RunHistoryStore:
+    """
+    Storico colonnare dei risultati (SQLite).
+
+    Thread-safe; path None crea un database in memoria (sessione corrente).
+    """
+
+    FILENAME = "history.sqlite"
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Args:
+            path: File SQLite (None = in memoria)
+        """
+        self.path = Path(path) if path else None
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path) if self.path else ":memory:", check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            if self.path:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < SCHEMA_VERSION:
+                self._conn.executescript(
+                    "DROP INDEX IF EXISTS idx_results_test; DROP TABLE IF EXISTS results; DROP TABLE IF EXISTS runs;"
+                )
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _query(self, sql: str, params: Iterable[Any] = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    @staticmethod
+    def _in(runs: List[int]) -> str:
+        return ",".join("?" * len(runs))
+
+    # ==================== SCRITTURA ====================
+
+    def ingest_rows(self, run: int, rows: Iterable[Dict[str, Any]],
+                    source: str, fingerprint: str = "") -> int:
+        """
+        Sostituisce i risultati di una RUN di una sorgente (una transazione).
+
+        Args:
+            run: Numero RUN
+            rows: Dizionari con le chiavi di _RESULT_COLUMNS (run escluso)
+            source: Origine (local, sheets); le altre sorgenti non cambiano
+            fingerprint: Identifica la versione della sorgente letta
+
+        Returns:
+            Righe scritte
+        """
+        placeholders = ",".join("?" * (len(_RESULT_COLUMNS) + 1))
+        values = (
+            tuple([source, run] + [row.get(col) if col in METRIC_COLUMNS else (row.get(col) or _default(col))
+                           for col in _RESULT_COLUMNS[1:]])
+            for row in rows if row.get('test_id')
+        )
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM results WHERE source = ? AND run = ?", (source, run))
+            cursor = self._conn.executemany(
+                f"INSERT OR REPLACE INTO results (source,{','.join(_RESULT_COLUMNS)}) VALUES ({placeholders})",
+                values
+            )
+            count = cursor.rowcount
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs (source, run, fingerprint, ingested_at, date) "
+                "VALUES (?, ?, ?, ?, COALESCE((SELECT substr(MIN(date), 1, 10) FROM results "
+                "WHERE source = ? AND run = ? AND date != ''), ''))",
+                (source, run, fingerprint, time.time(), source, run)
+            )
+        return count
+
+    def ingest_results(self, run: int, results: Iterable[TestResult],
+                       source: str = "local", fingerprint: str = "") -> int:
+        """Risultati locali (TestResult) di una RUN"""
+        rows = (
+            {
+                'test_id': r.test_id,
+                'result': (r.result or "").upper(),
+                'category': r.category,
+                'question': r.question,
+                'notes': r.notes,
+                'date': r.date,
+                'duration_ms': r.duration_ms,
+                **{name: _metric(getattr(r, attr, None)) for name, (attr, _) in METRIC_COLUMNS.items()}
+            }
+            for r in results
+        )
+        return self.ingest_rows(run, rows, source, fingerprint)
+
+    def ingest_sheet_records(self, run: int, records: Iterable[Dict[str, Any]],
+                             fingerprint: str = "") -> int:
+        """Righe di un foglio RUN (header -> valore)"""
+        rows = (
+            {
+                'test_id': record.get('TEST ID', ''),
+                # Supporta sia RESULT che ESITO (legacy)
+                'result': str(record.get('RESULT', record.get('ESITO', '')) or '').upper(),
+                'question': record.get('QUESTION', ''),
+                'notes': record.get('NOTES', ''),
+                'date': record.get('DATE', ''),
+                **{name: _metric(record.get(column)) for name, (_, column) in METRIC_COLUMNS.items()}
+            }
+            for record in records
+        )
+        return self.ingest_rows(run, rows, "sheets", fingerprint)
+
+    def sync_local_runs(self, reports_dir: Path) -> List[int]:
+        """
+        Importa le RUN locali nuove o cambiate (fingerprint diverso).
+
+        Le RUN con journal sono lette dal journal; quelle precedenti dal
+        report.csv o results.json.
+
+        Args:
+            reports_dir: Cartella report del progetto (reports/<progetto>)
+
+        Returns:
+            RUN importate
+        """
+        reports_dir = Path(reports_dir)
+        if not reports_dir.exists():
+            return []
+        known = dict(self._query("SELECT run, fingerprint FROM runs WHERE source = 'local'"))
+        imported = []
+        for run_dir in sorted(reports_dir.iterdir()):
+            run = run_dir_number(run_dir)
+            if run is None or not run_dir.is_dir():
+                continue
+            fingerprint = journal_fingerprint(run_dir)
+            legacy = None if fingerprint else legacy_results_file(run_dir)
+            if legacy:
+                fingerprint = _file_fingerprint(legacy)
+            if not fingerprint or known.get(run) == fingerprint:
+                continue
+            if legacy:
+                try:
+                    self.ingest_rows(run, _legacy_rows(legacy), "local", fingerprint)
+                except Exception as e:
+                    print(f"! Errore import RUN {run} ({legacy.name}): {e}")
+                    continue
+            else:
+                journal = RunJournal(run_dir / RunJournal.FILENAME)
+                self.ingest_results(run, journal.iter_results(), "local", fingerprint)
+            imported.append(run)
+        return imported
+
+    # ==================== LETTURA ====================
+    #
+    # Ogni lettura è per una sola sorgente (local, sheets): una RUN locale
+    # e il foglio Sheets con lo stesso numero non si mescolano.
+
+    def run_numbers(self, source: str) -> List[int]:
+        return [row[0] for row in self._query("SELECT run FROM runs WHERE source = ? ORDER BY run", (source,))]
+
+    def run_info(self, run: int, source: str) -> Optional[Dict[str, Any]]:
+        rows = self._query("SELECT fingerprint, ingested_at, date FROM runs WHERE source = ? AND run = ?",
+                           (source, run))
+        if not rows:
+            return None
+        fingerprint, ingested_at, date = rows[0]
+        return {'source': source, 'fingerprint': fingerprint, 'ingested_at': ingested_at, 'date': date}
+
+    def run_results(self, run: int, source: str) -> Dict[str, Dict[str, Any]]:
+        """test_id -> {result, notes, category, question, date, ...} di una RUN"""
+        columns = _RESULT_COLUMNS[1:]
+        rows = self._query(f"SELECT {','.join(columns)} FROM results WHERE source = ? AND run = ?",
+                           (source, run))
+        return {row[0]: dict(zip(columns, row)) for row in rows}
+
+    def run_totals(self, source: str, runs: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Per RUN: totale, PASS, FAIL e data.
+
+        Args:
+            source: Origine delle RUN (local, sheets)
+            runs: RUN da includere (None = tutte)
+        """
+        where = "WHERE r.source = ?"
+        params: List[Any] = [source]
+        if runs:
+            where += f" AND r.run IN ({self._in(runs)})"
+            params.extend(runs)
+        rows = self._query(
+            "SELECT r.run, COUNT(*), SUM(r.result = 'PASS'), SUM(r.result = 'FAIL'), MAX(u.date) "
+            f"FROM results r JOIN runs u ON u.source = r.source AND u.run = r.run {where} "
+            "GROUP BY r.run ORDER BY r.run",
+            params
+        )
+        return [{'run': run, 'total': total, 'passed': passed, 'failed': failed, 'date': date}
+                for run, total, passed, failed, date in rows]
+
+    def flaky_tests(self, runs: List[int], source: str, threshold: float = 0.3,
+                    min_runs: int = 3) -> List[Dict[str, Any]]:
+        """
+        Test con esiti alternati nelle RUN indicate.
+
+        Flaky score = 2 * min(PASS, totale - PASS) / totale
+        (0 = sempre lo stesso esito, 1 = 50/50).
+
+        Returns:
+            Dizionari test_id, total, passed, failed, score, history [(run, esito)]
+            ordinati per score decrescente
+        """
+        if not runs:
+            return []
+        marks = self._in(runs)
+        rows = self._query(
+            f"""
+            SELECT test_id, total, passed, failed, 2.0 * MIN(passed, total - passed) / total AS score
+            FROM (
+                SELECT test_id, COUNT(*) AS total,
+                       SUM(result = 'PASS') AS passed, SUM(result = 'FAIL') AS failed
+                FROM results WHERE source = ? AND run IN ({marks}) GROUP BY test_id
+            )
+            WHERE total >= ? AND 2.0 * MIN(passed, total - passed) / total >= ?
+            ORDER BY score DESC, test_id
+            """,
+            [source, *runs, min_runs, threshold]
+        )
+        flaky = [{'test_id': t, 'total': n, 'passed': p, 'failed': f, 'score': s, 'history': []}
+                 for t, n, p, f, s in rows]
+        if not flaky:
+            return flaky
+
+        by_id = {f['test_id']: f for f in flaky}
+        history = self._query(
+            f"""
+            SELECT test_id, run, result FROM results
+            WHERE source = ? AND run IN ({marks}) AND test_id IN ({self._in(list(by_id))})
+            ORDER BY test_id, run
+            """,
+            [source, *runs, *by_id]
+        )
+        for test_id, run, result in history:
+            by_id[test_id]['history'].append((run, result))
+        return flaky
+
+    def stability(self, runs: List[int], source: str) -> Dict[str, int]:
+        """Test totali e test sempre PASS / sempre FAIL (in almeno 2 RUN)"""
+        if not runs:
+            return {'total_tests': 0, 'stable_pass': 0, 'stable_fail': 0}
+        total, stable_pass, stable_fail = self._query(
+            f"""
+            SELECT COUNT(*), COALESCE(SUM(n >= 2 AND p = n), 0), COALESCE(SUM(n >= 2 AND f = n), 0)
+            FROM (
+                SELECT COUNT(*) AS n, SUM(result = 'PASS') AS p, SUM(result = 'FAIL') AS f
+                FROM results WHERE source = ? AND run IN ({self._in(runs)}) GROUP BY test_id
+            )
+            """,
+            [source, *runs]
+        )[0]
+        return {'total_tests': total, 'stable_pass': stable_pass, 'stable_fail': stable_fail}
+
+    def transitions(self, runs: List[int], source: str) -> List[Dict[str, Any]]:
+        """
+        Regressioni e miglioramenti tra RUN consecutive della lista.
+
+        Returns:
+            Per ogni RUN dopo la prima: run, previous, regressions,
+            improvements, pass_rate (della RUN)
+        """
+        runs = sorted(set(runs))
+        if len(runs) < 2:
+            return []
+        pairs = list(zip(runs, runs[1:]))
+        values = ",".join("(?, ?)" for _ in pairs)
+        counts = {
+            run: (regressions, improvements)
+            for run, regressions, improvements in self._query(
+                f"""
+                WITH pairs(previous, run) AS (VALUES {values})
+                SELECT p.run,
+                       SUM(a.result = 'PASS' AND b.result = 'FAIL'),
+                       SUM(a.result = 'FAIL' AND b.result = 'PASS')
+                FROM pairs p
+                JOIN results b ON b.source = ? AND b.run = p.run
+                JOIN results a ON a.source = b.source AND a.run = p.previous AND a.test_id = b.test_id
+                GROUP BY p.run
+                """,
+                [*(n for pair in pairs for n in pair), source]
+            )
+        }
+        totals = {t['run']: t for t in self.run_totals(source, runs)}
+
+        trend = []
+        for previous, run in pairs:
+            regressions, improvements = counts.get(run, (0, 0))
+            total = totals.get(run, {}).get('total', 0)
+            passed = totals.get(run, {}).get('passed', 0)
+            trend.append({
+                'run': run,
+                'previous': previous,
+                'regressions': regressions,
+                'improvements': improvements,
+                'pass_rate': passed / total if total else 0.0
+            })
+        return trend
+
+    def metric_values(self, runs: List[int], source: str) -> Dict[str, List[float]]:
+        """Valori (0-1) di ogni metrica nelle RUN indicate"""
+        if not runs:
+            return {name: [] for name in METRIC_COLUMNS}
+        rows = self._query(
+            f"SELECT {','.join(METRIC_COLUMNS)} FROM results WHERE source = ? AND run IN ({self._in(runs)})",
+            [source, *runs]
+        )
+        values: Dict[str, List[float]] = {name: [] for name in METRIC_COLUMNS}
+        for row in rows:
+            for name, value in zip(METRIC_COLUMNS, row):
+                if value is not None:
+                    values[name].append(value)
+        return values
+
+    def count_results(self, runs: List[int], source: str) -> int:
+        if not runs:
+            return 0
+        return self._query(f"SELECT COUNT(*) FROM results WHERE source = ? AND run IN ({self._in(runs)})",
+                           [source, *runs])[0][0]
+
+
+def _default(column: str) -> Any:
+    return 0 if column == 'duration_ms' else ""
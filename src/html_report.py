@@ -0,0 +1,169 @@
+"""
+Streaming HTML building blocks for large reports
+
+Handles:
+- Writing report items straight to the file handle, one at a time
+- Heavy per-item details (conversations, screenshots) stored in chunked
+  <script type="application/json"> blocks instead of inline markup
+- Client-side pagination and lazy rendering of expanded items
+
+The page stays standalone (a sidecar file could not be fetched from
+file://), but the browser only parses a chunk when one of its items is
+expanded, and only renders the expanded items. Writers hold at most one
+chunk of details in memory, whatever the number of tests.
+
+Usage:
+    writer = LazyItemWriter(f)
+    for result in results:
+        writer.add(lambda idx: f'<tr data-idx="{idx}">...</tr>', {"conversation": ...})
+    writer.close()
+    f.write(lazy_script(render_js))
+"""
+
+import json
+from typing import Any, Callable, List, TextIO
+
+# Items per details chunk (one JSON.parse when any of them is expanded)
+CHUNK_SIZE = 50
+
+# Items shown per page
+PAGE_SIZE = 100
+
+LAZY_CSS = """
+        .paged-out { display: none !important; }
+        .pager { display: flex; gap: 10px; align-items: center; justify-content: center; margin: 15px 0; }
+        .pager button, [data-expand] {
+            padding: 4px 10px;
+            border: 1px solid #e2e8f0;
+            border-radius: 6px;
+            background: white;
+            cursor: pointer;
+        }
+        .lazy-body:empty { display: none; }
+"""
+
+PAGER_HTML = """
+        <div class="pager">
+            <button type="button" data-page="-1">&lsaquo;</button>
+            <span class="pager-info"></span>
+            <button type="button" data-page="1">&rsaquo;</button>
+        </div>
+"""
+
+_LAZY_JS = """
+    <script>
+        const LazyReport = (function () {
+            const CHUNK = %(chunk)d, PAGE = %(page)d;
+            const chunks = {};
+            const items = Array.from(document.querySelectorAll('[data-idx]'));
+            let visible = items, page = 0;
+
+            function details(idx) {
+                const n = Math.floor(idx / CHUNK);
+                if (!(n in chunks)) {
+                    const block = document.querySelector('script.lazy-chunk[data-chunk="' + n + '"]');
+                    chunks[n] = block ? JSON.parse(block.textContent) : [];
+                }
+                return chunks[n][idx %% CHUNK];
+            }
+
+            function show() {
+                const pages = Math.max(1, Math.ceil(visible.length / PAGE));
+                page = Math.min(Math.max(page, 0), pages - 1);
+                const start = page * PAGE;
+                const shown = new Set(visible.slice(start, start + PAGE));
+                items.forEach(item => item.classList.toggle('paged-out', !shown.has(item)));
+                const end = Math.min(start + PAGE, visible.length);
+                document.querySelectorAll('.pager-info').forEach(el => {
+                    el.textContent = visible.length ? (start + 1) + '-' + end + ' / ' + visible.length : '0';
+                });
+            }
+
+            document.addEventListener('click', event => {
+                const pager = event.target.closest('[data-page]');
+                if (pager) {
+                    page += Number(pager.dataset.page);
+                    show();
+                    return;
+                }
+                const toggle = event.target.closest('[data-expand]');
+                if (!toggle) return;
+                const item = toggle.closest('[data-idx]');
+                const target = item.querySelector('.lazy-body');
+                const label = toggle.textContent;
+                toggle.textContent = toggle.dataset.expand;
+                toggle.dataset.expand = label;
+                if (target.firstChild) {
+                    target.replaceChildren();   // collapse: drop the rendered nodes
+                } else {
+                    LazyReport.render(details(Number(item.dataset.idx)) || {}, target);
+                }
+            });
+
+            show();
+            return {
+                details: details,
+                render: null,
+                filter: function (keep) { visible = items.filter(keep); page = 0; show(); }
+            };
+        })();
+%(render)s
+    </script>
+"""
+
+
+def json_script_text(data: Any) -> str:
+    """JSON safe to embed in a <script> block (no '</script>' or '<!--')"""
+    return json.dumps(data, ensure_ascii=False).replace('<', '\\u003c')
+
+
+def lazy_script(render_js: str, chunk_size: int = CHUNK_SIZE, page_size: int = PAGE_SIZE) -> str:
+    """
+    Pagination and lazy-details script.
+
+    Args:
+        render_js: JS assigning LazyReport.render = function (details, target) {...};
+                   it fills target (the item's .lazy-body) from the item's details
+        chunk_size: Must match the LazyItemWriter that wrote the page
+        page_size: Items per page
+    """
+    return _LAZY_JS % {'chunk': chunk_size, 'page': page_size, 'render': render_js}
+
+
+class LazyItemWriter:
+    """
+    Writes report items and their lazily loaded details to a file handle.
+
+    Every item must carry data-idx (passed to the render callable) and a
+    .lazy-body element plus a [data-expand] toggle to show its details.
+    Chunks are written between items, so the container must accept
+    <script> children (tbody and div both do).
+    """
+
+    def __init__(self, out: TextIO, chunk_size: int = CHUNK_SIZE):
+        self.out = out
+        self.chunk_size = max(1, chunk_size)
+        self.count = 0
+        self._chunk: List[Any] = []
+
+    def add(self, render_item: Callable[[int], str], details: Any) -> None:
+        """Write one item (render_item(idx) -> HTML) and queue its details"""
+        self.out.write(render_item(self.count))
+        self._chunk.append(details)
+        self.count += 1
+        if len(self._chunk) >= self.chunk_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._chunk:
+            return
+        n = (self.count - 1) // self.chunk_size
+        self.out.write(
+            f'<script type="application/json" class="lazy-chunk" data-chunk="{n}">'
+            f'{json_script_text(self._chunk)}</script>\n'
+        )
+        self._chunk = []
+
+    def close(self) -> None:
+        """Write the last (partial) chunk"""
+        self._flush()
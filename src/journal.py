@@ -0,0 +1,247 @@
+"""
+Run Journal - Log append-only dei test completati
+
+Ogni test completato viene scritto subito in reports/<progetto>/run_NNN/
+journal.jsonl (una riga JSON per evento), con fsync a blocchi. Se il
+processo muore a metà run i risultati restano su disco e:
+- ReportGenerator ricostruisce report.csv, summary.json e HTML dal journal
+- `--tests pending` salta i test già nel journal senza interrogare Sheets
+- le righe Sheets non ancora scritte vengono reinviate al riavvio
+
+Eventi:
+    {"event": "result", "ts": ..., "test_id": ..., "data": {...TestResult}}
+    {"event": "pending", "ts": ..., "target": "sheets", "test_id": ..., "data": {...}}
+    {"event": "synced", "ts": ..., "target": "sheets", "test_ids": [...]}
+
+Usage:
+    journal = RunJournal(report_dir / RunJournal.FILENAME)
+    journal.record_result(result)                 # subito su disco
+    journal.record_pending("sheets", sheets_row)
+    journal.sync_pending("sheets", write_rows)    # write_rows(rows) -> scritte
+
+    completed = journal.completed_ids()
+    for result in journal.iter_results():         # fold in streaming
+        ...
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, fields
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+
+from .models import ScreenshotUrls, TestResult
+
+_RESULT_FIELDS = {f.name for f in fields(TestResult)}
+
+
+def result_to_dict(result: TestResult) -> Dict[str, Any]:
+    """TestResult -> dict serializzabile"""
+    return asdict(result)
+
+
+def result_from_dict(data: Dict[str, Any]) -> TestResult:
+    """dict del journal -> TestResult (ignora campi sconosciuti)"""
+    values = {k: v for k, v in data.items() if k in _RESULT_FIELDS}
+    urls = values.get('screenshot_urls')
+    if isinstance(urls, dict):
+        values['screenshot_urls'] = ScreenshotUrls(**urls)
+    return TestResult(**values)
+
+
+class RunJournal:
+    """
+    Journal JSONL di un run, sicuro rispetto ai crash.
+
+    Ogni evento è scritto e passato al sistema operativo subito (un crash
+    del processo non perde nulla); l'fsync su disco avviene ogni
+    `fsync_every` eventi o `fsync_interval_s` secondi, e alla chiusura.
+    Una riga troncata da un crash viene scartata in lettura e rimossa
+    alla prima scrittura successiva. Le righe pending non sincronizzate
+    sono lette dal file una volta sola e poi tenute in memoria.
+    """
+
+    FILENAME = "journal.jsonl"
+
+    def __init__(self, path: Path, fsync_every: int = 20, fsync_interval_s: float = 2.0):
+        """
+        Args:
+            path: File journal (es. run_001/journal.jsonl)
+            fsync_every: Eventi tra due fsync
+            fsync_interval_s: Secondi massimi tra due fsync
+        """
+        self.path = Path(path)
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval_s = fsync_interval_s
+
+        self._file = None
+        self._lock = threading.RLock()
+        # target -> test_id -> riga pending (letto dal file al primo uso)
+        self._pending: Optional[Dict[str, Dict[str, TestResult]]] = None
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+
+    # ==================== SCRITTURA ====================
+
+    def record_result(self, result: TestResult) -> None:
+        """Registra un test completato"""
+        self._append({'event': 'result', 'test_id': result.test_id, 'data': result_to_dict(result)})
+
+    def record_pending(self, target: str, result: TestResult) -> None:
+        """Registra una riga da scrivere su una destinazione esterna (es. sheets)"""
+        with self._lock:
+            rows = self._pending_rows(target)
+            self._append({'event': 'pending', 'target': target, 'test_id': result.test_id,
+                          'data': result_to_dict(result)})
+            rows[result.test_id] = result
+
+    def mark_synced(self, target: str, test_ids: List[str]) -> None:
+        """Segna come scritte le righe pending di una destinazione"""
+        if not test_ids:
+            return
+        with self._lock:
+            rows = self._pending_rows(target)
+            self._append({'event': 'synced', 'target': target, 'test_ids': list(test_ids)})
+            for test_id in test_ids:
+                rows.pop(test_id, None)
+
+    def sync_pending(self, target: str, write: Callable[[List[TestResult]], int]) -> int:
+        """
+        Scrive le righe pending non ancora sincronizzate.
+
+        Args:
+            target: Destinazione (es. "sheets")
+            write: Scrive le righe in ordine, ritorna quante ne ha scritte
+
+        Returns:
+            Numero righe sincronizzate
+        """
+        rows = self.pending(target)
+        if not rows:
+            return 0
+        try:
+            written = write(rows)
+        except Exception as e:
+            print(f"! Sync {target} fallito, righe mantenute nel journal: {e}")
+            return 0
+        self.mark_synced(target, [r.test_id for r in rows[:written]])
+        return written
+
+    def flush(self) -> None:
+        """Forza l'fsync degli eventi scritti"""
+        with self._lock:
+            self._fsync()
+
+    def close(self) -> None:
+        """fsync e chiusura del file"""
+        with self._lock:
+            if self._file:
+                self._fsync()
+                self._file.close()
+                self._file = None
+
+    def _append(self, event: Dict[str, Any]) -> None:
+        event = {'event': event.pop('event'), 'ts': round(time.time(), 3), **event}
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._open()
+            self._file.write(line)
+            self._file.flush()
+            self._unsynced += 1
+            if (self._unsynced >= self.fsync_every
+                    or time.monotonic() - self._last_fsync >= self.fsync_interval_s):
+                self._fsync()
+
+    # Byte letti a ritroso per trovare l'ultima riga completa
+    _TAIL_CHUNK = 64 * 1024
+
+    def _open(self) -> None:
+        """Apre in append, eliminando un'eventuale riga finale troncata"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists() and self.path.stat().st_size > 0:
+            with open(self.path, 'rb+') as f:
+                end = f.seek(0, os.SEEK_END)
+                f.seek(end - 1)
+                if f.read(1) != b"\n":
+                    f.truncate(self._last_line_end(f, end))
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    @classmethod
+    def _last_line_end(cls, f, end: int) -> int:
+        """Posizione dopo l'ultimo newline (0 se assente), leggendo solo la coda"""
+        position = end
+        while position > 0:
+            start = max(0, position - cls._TAIL_CHUNK)
+            f.seek(start)
+            chunk = f.read(position - start)
+            newline = chunk.rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            position = start
+        return 0
+
+    def _fsync(self) -> None:
+        if self._file and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+
+    # ==================== LETTURA ====================
+
+    def events(self) -> Iterator[Dict[str, Any]]:
+        """Eventi in ordine di scrittura (righe corrotte ignorate)"""
+        if not self.path.exists():
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def completed_ids(self) -> Set[str]:
+        """ID dei test completati nel run"""
+        return {e['test_id'] for e in self.events() if e.get('event') == 'result'}
+
+    def iter_results(self) -> Iterator[TestResult]:
+        """
+        Risultati in streaming, uno per test (vale l'ultimo registrato).
+
+        Due passate sul file: la prima trova l'ultima occorrenza di ogni
+        test, la seconda produce i risultati senza tenerli in memoria.
+        """
+        last: Dict[str, int] = {}
+        for position, event in enumerate(self.events()):
+            if event.get('event') == 'result':
+                last[event['test_id']] = position
+
+        for position, event in enumerate(self.events()):
+            if event.get('event') == 'result' and last.get(event['test_id']) == position:
+                yield result_from_dict(event['data'])
+
+    def pending(self, target: str) -> List[TestResult]:
+        """Righe pending di una destinazione non ancora sincronizzate"""
+        with self._lock:
+            return list(self._pending_rows(target).values())
+
+    def _pending_rows(self, target: str) -> Dict[str, TestResult]:
+        """Righe pending in memoria di una destinazione (da chiamare col lock)"""
+        if self._pending is None:
+            self._pending = self._read_pending()
+        return self._pending.setdefault(target, {})
+
+    def _read_pending(self) -> Dict[str, Dict[str, TestResult]]:
+        """Righe pending non sincronizzate di ogni destinazione, dal file"""
+        pending: Dict[str, Dict[str, TestResult]] = {}
+        for event in self.events():
+            target = event.get('target')
+            if event.get('event') == 'pending':
+                pending.setdefault(target, {})[event['test_id']] = result_from_dict(event['data'])
+            elif event.get('event') == 'synced':
+                rows = pending.get(target, {})
+                for test_id in event.get('test_ids', []):
+                    rows.pop(test_id, None)
+        return pending
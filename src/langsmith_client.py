@@ -6,18 +6,89 @@ Handles:
 - Tool routing analysis
 - Performance metrics extraction
 - Context envelope inspection
+
+Trasporto: le coroutine usano i metodi a* (httpx asincrono, connessioni
+HTTP/2 condivise per event loop, backoff con asyncio.sleep); i metodi
+sincroni restano per CLI e thread. Entrambi passano dallo stesso token
+bucket per API key, che rispetta Retry-After per tutti i chiamanti.
 """
 
+import asyncio
 import requests
+import threading
 import time
-from typing import Optional, List, Dict, Any
+import weakref
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from .clients.base import BaseClient
+from .cache import TieredCache
 from .models.langsmith import (
-    TraceInfo, ToolCall, WaterfallStep, SourceDocument, LangSmithReport
+    TraceInfo, ToolCall, WaterfallStep, SourceDocument, LangSmithReport, TraceBundle
 )
 
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401 - abilita HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class TokenBucket:
+    """
+    Rate limit condiviso tra thread ed event loop.
+
+    reserve() prenota un token e restituisce quanti secondi attendere prima
+    di inviare; il chiamante dorme con time.sleep o asyncio.sleep. Un 429
+    con Retry-After sospende il bucket (pause) per tutti i chiamanti.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Prenota un token; secondi da attendere prima della richiesta"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    def pause(self, seconds: float) -> None:
+        """Nessuna richiesta per i prossimi `seconds` secondi"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def paused_for(self) -> float:
+        """Secondi residui di pausa"""
+        with self._lock:
+            return max(0.0, self._paused_until - time.monotonic())
+
+
+_BUCKETS: Dict[str, TokenBucket] = {}
+_BUCKETS_LOCK = threading.Lock()
+
+
+def shared_bucket(api_key: str, rate: float, capacity: float) -> TokenBucket:
+    """Token bucket condiviso da tutti i client con la stessa API key"""
+    with _BUCKETS_LOCK:
+        if api_key not in _BUCKETS:
+            _BUCKETS[api_key] = TokenBucket(rate, capacity)
+        return _BUCKETS[api_key]
+
 
 
 
@@ -45,11 +116,24 @@ class LangSmithClient(BaseClient):
 
     BASE_URL = "https://api.smith.langchain.com/api/v1"
 
+    # Paginazione /runs/query per i run di un trace
+    RUNS_PAGE_SIZE = 100
+    MAX_TRACE_RUNS = 2000
+
+    # Rate limit condiviso per API key (richieste/s e burst)
+    RATE_LIMIT_PER_SECOND = 10.0
+    RATE_LIMIT_BURST = 20
+    # Connessioni del client asincrono e attesa massima per chiuderlo su un altro loop
+    MAX_CONNECTIONS = 10
+    ASYNC_CLOSE_TIMEOUT_S = 5.0
+
     def __init__(self,
                  api_key: str,
                  project_id: str,
                  org_id: str = "",
-                 tool_names: Optional[List[str]] = None):
+                 tool_names: Optional[List[str]] = None,
+                 cache: Optional[TieredCache] = None,
+                 cache_ttl_seconds: int = 604800):
         """
         Inizializza il client.
 
@@ -58,11 +142,15 @@ class LangSmithClient(BaseClient):
             project_id: ID progetto LangSmith
             org_id: ID organizzazione (opzionale)
             tool_names: Lista nomi tool da tracciare (auto-detect se None)
+            cache: Cache per i run dei trace completati (opzionale)
+            cache_ttl_seconds: TTL su disco dei trace in cache
         """
         self.api_key = api_key
         self.project_id = project_id
         self.org_id = org_id
         self.tool_names = tool_names or []
+        self.cache = cache
+        self.cache_ttl_seconds = cache_ttl_seconds
 
         self._session = requests.Session()
         self._session.headers.update({
@@ -70,15 +158,58 @@ class LangSmithClient(BaseClient):
             'Content-Type': 'application/json'
         })
 
+        # Risposte 429 ricevute (letto dal controller di concorrenza adattiva)
+        self.throttled_count = 0
+
         # Retry config
         self._max_retries = 3
         self._base_delay = 1.0  # secondi
         self._max_delay = 30.0  # secondi
 
+        self._bucket = shared_bucket(api_key, self.RATE_LIMIT_PER_SECOND, self.RATE_LIMIT_BURST)
+        # Un client httpx per event loop, chiuso sul proprio loop (aclose)
+        self._async_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]' = \
+            weakref.WeakKeyDictionary()
+
+        # Poller condiviso dei root run (creato al primo uso, vedi trace_poller())
+        self._poller = None
+        self._poller_lock = threading.Lock()
+
+    def _throttled(self, response, attempt: int, delay: float) -> Optional[float]:
+        """
+        429: sospende il bucket per tutti i chiamanti (Retry-After o backoff).
+
+        Returns:
+            Backoff del tentativo successivo, None se i retry sono finiti
+        """
+        self.throttled_count += 1
+        if attempt >= self._max_retries:
+            print("! LangSmith rate limit, max retries reached")
+            return None
+        retry_after = response.headers.get('Retry-After')
+        if retry_after:
+            try:
+                delay = min(float(retry_after), self._max_delay)
+            except ValueError:
+                pass
+        self._bucket.pause(delay)
+        print(f"  ⏳ LangSmith rate limit, retry in {delay:.1f}s...")
+        return min(delay * 2, self._max_delay)
+
+    def _timed_out(self, attempt: int, delay: float) -> bool:
+        """Timeout: True se va ritentato dopo `delay` secondi"""
+        if attempt >= self._max_retries:
+            print("! LangSmith timeout, max retries reached")
+            return False
+        print(f"  ⏳ LangSmith timeout, retry in {delay:.1f}s...")
+        return True
+
     def _request_with_retry(self, method: str, url: str, **kwargs) -> Optional[requests.Response]:
         """
         Esegue richiesta HTTP con retry e exponential backoff per 429.
 
+        Bloccante: dalle coroutine usare _arequest_with_retry.
+
         Args:
             method: 'get' o 'post'
             url: URL da chiamare
@@ -90,6 +221,11 @@ class LangSmithClient(BaseClient):
         delay = self._base_delay
 
         for attempt in range(self._max_retries + 1):
+            wait = self._bucket.reserve()
+            while wait > 0:
+                time.sleep(wait)
+                wait = self._bucket.paused_for()
+
             try:
                 if method == 'get':
                     response = self._session.get(url, **kwargs)
@@ -100,41 +236,126 @@ class LangSmithClient(BaseClient):
                 if response.status_code == 200:
                     return response
 
-                # Rate limit - retry con backoff
+                # Rate limit - retry con backoff (il bucket attende per tutti)
                 if response.status_code == 429:
-                    if attempt < self._max_retries:
-                        # Cerca Retry-After header
-                        retry_after = response.headers.get('Retry-After')
-                        if retry_after:
-                            delay = min(float(retry_after), self._max_delay)
-
-                        print(f"  ⏳ LangSmith rate limit, retry in {delay:.1f}s...")
-                        time.sleep(delay)
-                        delay = min(delay * 2, self._max_delay)  # Exponential backoff
-                        continue
-                    else:
-                        print(f"! LangSmith rate limit, max retries reached")
+                    delay = self._throttled(response, attempt, delay)
+                    if delay is None:
                         return None
+                    continue
 
                 # Altri errori - non ritentare
                 print(f"! LangSmith API error: {response.status_code}")
                 return response
 
             except requests.exceptions.Timeout:
-                if attempt < self._max_retries:
-                    print(f"  ⏳ LangSmith timeout, retry in {delay:.1f}s...")
-                    time.sleep(delay)
-                    delay = min(delay * 2, self._max_delay)
-                    continue
-                print(f"! LangSmith timeout, max retries reached")
+                if not self._timed_out(attempt, delay):
+                    return None
+                time.sleep(delay)
+                delay = min(delay * 2, self._max_delay)  # Exponential backoff
+
+            except Exception as e:
+                print(f"! LangSmith request error: {e}")
                 return None
 
+        return None
+
+    # ==================== TRASPORTO ASINCRONO ====================
+
+    def _async_http(self) -> Optional[Any]:
+        """Client httpx dell'event loop corrente (connessioni HTTP/2 condivise)"""
+        if not HTTPX_AVAILABLE:
+            return None
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                headers=dict(self._session.headers),
+                limits=httpx.Limits(
+                    max_connections=self.MAX_CONNECTIONS,
+                    max_keepalive_connections=self.MAX_CONNECTIONS
+                )
+            )
+            self._async_clients[loop] = client
+        return client
+
+    async def _arequest_with_retry(self, method: str, url: str, **kwargs) -> Optional[Any]:
+        """
+        _request_with_retry() senza bloccare l'event loop.
+
+        Attese (rate limit, Retry-After, backoff) con asyncio.sleep: un
+        429 rallenta solo le richieste LangSmith, non i worker browser.
+
+        Returns:
+            Response (httpx, stessa interfaccia: status_code/json/headers) o None
+        """
+        client = self._async_http()
+        if client is None:
+            return await asyncio.to_thread(self._request_with_retry, method, url, **kwargs)
+
+        delay = self._base_delay
+
+        for attempt in range(self._max_retries + 1):
+            wait = self._bucket.reserve()
+            while wait > 0:
+                await asyncio.sleep(wait)
+                wait = self._bucket.paused_for()
+
+            try:
+                response = await client.request(method.upper(), url, **kwargs)
+
+                if response.status_code == 200:
+                    return response
+
+                if response.status_code == 429:
+                    delay = self._throttled(response, attempt, delay)
+                    if delay is None:
+                        return None
+                    continue
+
+                print(f"! LangSmith API error: {response.status_code}")
+                return response
+
+            except httpx.TimeoutException:
+                if not self._timed_out(attempt, delay):
+                    return None
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self._max_delay)
+
             except Exception as e:
                 print(f"! LangSmith request error: {e}")
                 return None
 
         return None
 
+    async def aclose(self) -> None:
+        """
+        Chiude poller e connessioni (sincrone e asincrone).
+
+        Ogni client httpx viene chiuso sul proprio event loop: quello
+        corrente direttamente, quelli in esecuzione in altri thread con
+        run_coroutine_threadsafe. I client di loop già chiusi vengono
+        scartati; quelli di loop fermi restano per un aclose() sul loop.
+        """
+        self.close()
+        current = asyncio.get_running_loop()
+        for loop, client in list(self._async_clients.items()):
+            if loop.is_closed():
+                self._async_clients.pop(loop, None)
+                continue
+            try:
+                if loop is current:
+                    await client.aclose()
+                elif loop.is_running():
+                    future = asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+                    await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.ASYNC_CLOSE_TIMEOUT_S)
+                else:
+                    continue
+            except Exception as e:
+                print(f"! Chiusura client LangSmith fallita: {e}")
+            self._async_clients.pop(loop, None)
+        self._session.close()
+
     @property
     def project_url(self) -> str:
         """URL del progetto in LangSmith"""
@@ -164,6 +385,30 @@ class LangSmithClient(BaseClient):
                    start_time: Optional[datetime] = None,
                    end_time: Optional[datetime] = None) -> List[TraceInfo]:
         """Ottiene i trace recenti."""
+        response = self._request_with_retry(
+            'post',
+            f"{self.BASE_URL}/runs/query",
+            json=self._traces_payload(limit, start_time, end_time),
+            timeout=30
+        )
+        return self._parse_traces(response)
+
+    async def aget_traces(self,
+                          limit: int = 10,
+                          start_time: Optional[datetime] = None,
+                          end_time: Optional[datetime] = None) -> List[TraceInfo]:
+        """get_traces() senza bloccare l'event loop"""
+        response = await self._arequest_with_retry(
+            'post',
+            f"{self.BASE_URL}/runs/query",
+            json=self._traces_payload(limit, start_time, end_time),
+            timeout=30
+        )
+        return self._parse_traces(response)
+
+    def _traces_payload(self, limit: int,
+                        start_time: Optional[datetime],
+                        end_time: Optional[datetime]) -> Dict[str, Any]:
         payload = {
             'session': [self.project_id],
             'limit': limit,
@@ -175,13 +420,9 @@ class LangSmithClient(BaseClient):
         if end_time:
             payload['end_time'] = end_time.isoformat()
 
-        response = self._request_with_retry(
-            'post',
-            f"{self.BASE_URL}/runs/query",
-            json=payload,
-            timeout=30
-        )
+        return payload
 
+    def _parse_traces(self, response) -> List[TraceInfo]:
         if not response or response.status_code != 200:
             return []
 
@@ -210,7 +451,18 @@ class LangSmithClient(BaseClient):
         """
         start_time = after or (datetime.utcnow() - timedelta(hours=1))
         traces = self.get_traces(limit=20, start_time=start_time)
+        return self._first_matching(traces, input_contains)
+
+    async def aget_latest_trace(self,
+                                after: Optional[datetime] = None,
+                                input_contains: Optional[str] = None) -> Optional[TraceInfo]:
+        """get_latest_trace() senza bloccare l'event loop"""
+        start_time = after or (datetime.utcnow() - timedelta(hours=1))
+        traces = await self.aget_traces(limit=20, start_time=start_time)
+        return self._first_matching(traces, input_contains)
 
+    @staticmethod
+    def _first_matching(traces: List[TraceInfo], input_contains: Optional[str]) -> Optional[TraceInfo]:
         for trace in traces:
             if input_contains:
                 if input_contains.lower() in trace.input.lower():
@@ -245,50 +497,133 @@ class LangSmithClient(BaseClient):
         """
         Ottiene tutti i run nel trace (tool calls, LLM, chain steps).
 
+        Segue il cursore di paginazione oltre la prima pagina, fino a
+        MAX_TRACE_RUNS run.
+
         Args:
             parent_id: ID del trace padre
 
         Returns:
             Lista di run nel trace
         """
-        response = self._request_with_retry(
-            'post',
-            f"{self.BASE_URL}/runs/query",
-            json={
-                'trace': parent_id,
-                'limit': 100
-            },
-            timeout=30
-        )
+        runs: List[Dict] = []
+        cursor = None
 
-        if response and response.status_code == 200:
-            return response.json().get('runs', [])
+        while len(runs) < self.MAX_TRACE_RUNS:
+            response = self._request_with_retry(
+                'post',
+                f"{self.BASE_URL}/runs/query",
+                json=self._child_runs_payload(parent_id, cursor),
+                timeout=30
+            )
+            page, cursor = self._runs_page(response)
+            runs.extend(page)
+            if not cursor or not page:
+                break
+
+        return runs
+
+    async def aget_child_runs(self, parent_id: str) -> List[Dict]:
+        """get_child_runs() senza bloccare l'event loop"""
+        runs: List[Dict] = []
+        cursor = None
+
+        while len(runs) < self.MAX_TRACE_RUNS:
+            response = await self._arequest_with_retry(
+                'post',
+                f"{self.BASE_URL}/runs/query",
+                json=self._child_runs_payload(parent_id, cursor),
+                timeout=30
+            )
+            page, cursor = self._runs_page(response)
+            runs.extend(page)
+            if not cursor or not page:
+                break
 
-        return []
+        return runs
 
-    def extract_tool_calls(self, trace: TraceInfo) -> List[ToolCall]:
+    def _child_runs_payload(self, parent_id: str, cursor: Optional[str]) -> Dict[str, Any]:
+        payload = {
+            'trace': parent_id,
+            'limit': self.RUNS_PAGE_SIZE
+        }
+        if cursor:
+            payload['cursor'] = cursor
+        return payload
+
+    @staticmethod
+    def _runs_page(response) -> Tuple[List[Dict], Optional[str]]:
+        """(run della pagina, cursore successivo)"""
+        if not response or response.status_code != 200:
+            return [], None
+        data = response.json()
+        return data.get('runs', []), (data.get('cursors') or {}).get('next')
+
+    def fetch_trace_bundle(self, trace_id: str) -> TraceBundle:
+        """
+        Scarica una sola volta tutti i run di un trace.
+
+        Il bundle risultante va passato agli estrattori (tool calls, modello,
+        waterfall, sources, vector store) per evitare query duplicate.
+        I trace completati non cambiano più: se è configurata una cache
+        vengono riletti da lì invece di riscaricarli.
+
+        Args:
+            trace_id: ID del trace
+
+        Returns:
+            TraceBundle con run indicizzati
+        """
+        bundle = self._cached_bundle(trace_id)
+        if bundle is None:
+            bundle = TraceBundle(trace_id=trace_id, runs=self.get_child_runs(trace_id))
+            self._store_bundle(bundle)
+        return bundle
+
+    async def afetch_trace_bundle(self, trace_id: str) -> TraceBundle:
+        """fetch_trace_bundle() senza bloccare l'event loop"""
+        bundle = self._cached_bundle(trace_id)
+        if bundle is None:
+            bundle = TraceBundle(trace_id=trace_id, runs=await self.aget_child_runs(trace_id))
+            self._store_bundle(bundle)
+        return bundle
+
+    def _cached_bundle(self, trace_id: str) -> Optional[TraceBundle]:
+        if self.cache:
+            cached_runs = self.cache.get(f"trace_runs:{trace_id}")
+            if cached_runs is not None:
+                return TraceBundle(trace_id=trace_id, runs=cached_runs)
+        return None
+
+    def _store_bundle(self, bundle: TraceBundle) -> None:
+        # Solo trace terminati: uno ancora in corso avrà nuovi run
+        if self.cache and bundle.is_complete:
+            self.cache.set(f"trace_runs:{bundle.trace_id}", bundle.runs, ttl=self.cache_ttl_seconds)
+
+    def extract_tool_calls(self, trace: TraceInfo,
+                           bundle: Optional[TraceBundle] = None) -> List[ToolCall]:
         """
         Estrae le chiamate ai tool da un trace.
 
         Args:
             trace: TraceInfo da analizzare
+            bundle: Run del trace già scaricati (opzionale)
 
         Returns:
             Lista ToolCall
         """
-        child_runs = self.get_child_runs(trace.id)
+        bundle = bundle or self.fetch_trace_bundle(trace.id)
 
         tool_calls = []
-        for run in child_runs:
-            if run.get('run_type') == 'tool':
-                tool = ToolCall(
-                    name=run.get('name', 'unknown'),
-                    input=run.get('inputs', {}),
-                    output=run.get('outputs'),
-                    duration_ms=self._calculate_duration(run),
-                    error=run.get('error')
-                )
-                tool_calls.append(tool)
+        for run in bundle.of_type('tool'):
+            tool = ToolCall(
+                name=run.get('name', 'unknown'),
+                input=run.get('inputs', {}),
+                output=run.get('outputs'),
+                duration_ms=self._calculate_duration(run),
+                error=run.get('error')
+            )
+            tool_calls.append(tool)
 
         return tool_calls
 
@@ -327,17 +662,19 @@ class LangSmithClient(BaseClient):
 
         return sorted(list(tool_names))
 
-    def analyze_trace(self, trace: TraceInfo) -> Dict[str, Any]:
+    def analyze_trace(self, trace: TraceInfo,
+                      bundle: Optional[TraceBundle] = None) -> Dict[str, Any]:
         """
         Analisi completa di un trace.
 
         Args:
             trace: TraceInfo da analizzare
+            bundle: Run del trace già scaricati (opzionale)
 
         Returns:
             Dict con analisi dettagliata
         """
-        tool_calls = self.extract_tool_calls(trace)
+        tool_calls = self.extract_tool_calls(trace, bundle)
 
         analysis = {
             'trace_id': trace.id,
@@ -366,44 +703,99 @@ class LangSmithClient(BaseClient):
 
         return analysis
 
+    def trace_poller(self):
+        """
+        Poller dei root run condiviso da tutti i test della RUN.
+
+        Avviato al primo uso, fermato da close().
+        """
+        with self._poller_lock:
+            if self._poller is None:
+                from .trace_poller import TracePoller
+                self._poller = TracePoller(self)
+            self._poller.start()
+            return self._poller
+
+    def close(self) -> None:
+        """Ferma il poller dei trace (se avviato)"""
+        with self._poller_lock:
+            poller, self._poller = self._poller, None
+        if poller:
+            poller.stop()
+
     def get_report_for_question(self,
                                  question: str,
-                                 search_window_minutes: int = 30) -> LangSmithReport:
+                                 search_window_minutes: int = 30,
+                                 sent_at: Optional[datetime] = None) -> LangSmithReport:
         """
         Ottiene report completo per una domanda, incluso modello.
 
         Args:
             question: Domanda inviata al chatbot
             search_window_minutes: Finestra temporale di ricerca
+            sent_at: Istante (UTC) di invio della domanda. Se presente il
+                trace è attribuito dal poller condiviso: primo root run con
+                lo stesso input iniziato dopo l'invio e non già assegnato
 
         Returns:
             LangSmithReport con tutti i dati estratti
         """
-        start_time = datetime.utcnow() - timedelta(minutes=search_window_minutes)
+        if sent_at and question:
+            trace = self.trace_poller().wait(question, sent_at)
+        else:
+            start_time = datetime.utcnow() - timedelta(minutes=search_window_minutes)
+
+            # Cerca il trace
+            trace = self.get_latest_trace(
+                after=start_time,
+                input_contains=question[:50] if question else None
+            )
 
-        # Cerca il trace
-        trace = self.get_latest_trace(
-            after=start_time,
-            input_contains=question[:50] if question else None
-        )
+        if not trace:
+            return LangSmithReport(error=f"Trace non trovato per: {question[:50]}...")
+
+        # Un solo fetch di tutti i run: gli estrattori lavorano in memoria
+        return self._build_report(trace, self.fetch_trace_bundle(trace.id))
+
+    async def aget_report_for_question(self,
+                                       question: str,
+                                       search_window_minutes: int = 30,
+                                       sent_at: Optional[datetime] = None) -> LangSmithReport:
+        """
+        get_report_for_question() senza bloccare l'event loop.
+
+        L'attesa del trace sul poller condiviso non occupa thread.
+        """
+        if sent_at and question:
+            trace = await asyncio.wrap_future(self.trace_poller().request(question, sent_at))
+        else:
+            start_time = datetime.utcnow() - timedelta(minutes=search_window_minutes)
+            trace = await self.aget_latest_trace(
+                after=start_time,
+                input_contains=question[:50] if question else None
+            )
 
         if not trace:
             return LangSmithReport(error=f"Trace non trovato per: {question[:50]}...")
 
+        return self._build_report(trace, await self.afetch_trace_bundle(trace.id))
+
+    def _build_report(self, trace: TraceInfo, bundle: TraceBundle) -> LangSmithReport:
+        """Report completo da trace e run già scaricati (solo calcolo)"""
         # Analizza il trace
-        analysis = self.analyze_trace(trace)
+        analysis = self.analyze_trace(trace, bundle)
 
         # Estrai info modello dai child runs
-        model_info = self._extract_model_info(trace.id)
+        model_info = self._extract_model_info(bundle, trace)
 
         # Estrai waterfall tree
-        waterfall = self._extract_waterfall(trace.id, trace.start_time)
+        waterfall = self._extract_waterfall(bundle, trace.start_time)
 
         # Estrai sources/documenti consultati
-        sources = self._extract_sources(trace.id)
+        sources = self._extract_sources(bundle)
 
         # Estrai vector store provider
-        vector_store = self._extract_vector_store(trace.id)
+        vector_store = self._extract_vector_store(bundle)
 
         # Calcola metriche di timing dal waterfall
         timing_metrics = self._calculate_timing_metrics(waterfall)
@@ -442,7 +834,8 @@ class LangSmithClient(BaseClient):
             tokens_per_second=tokens_per_second
         )
 
-    def _extract_model_info(self, trace_id: str) -> Dict[str, Any]:
+    def _extract_model_info(self, bundle: TraceBundle,
+                            trace: Optional[TraceInfo] = None) -> Dict[str, Any]:
         """
         Estrae informazioni sul modello dai child runs.
 
@@ -452,7 +845,6 @@ class LangSmithClient(BaseClient):
         - Token usage
         - Time to first token
         """
-        child_runs = self.get_child_runs(trace_id)
 
         model_info = {
             'model': '',
@@ -463,7 +855,7 @@ class LangSmithClient(BaseClient):
             'first_token_ms': 0
         }
 
-        for run in child_runs:
+        for run in bundle.runs:
             run_type = run.get('run_type', '')
 
             # Cerca LLM runs
@@ -524,17 +916,23 @@ class LangSmithClient(BaseClient):
                             pass
 
         # Se non trovato nei child, cerca nel run principale
+        # (già nel bundle o nel TraceInfo: nessuna richiesta aggiuntiva)
         if not model_info['model']:
-            response = self._request_with_retry(
-                'get',
-                f"{self.BASE_URL}/runs/{trace_id}",
-                timeout=10
-            )
-            if response and response.status_code == 200:
-                run_data = response.json()
-                extra = run_data.get('extra', {})
-                metadata = extra.get('metadata', {})
+            metadata = None
+            if bundle.root is not None:
+                metadata = bundle.root.get('extra', {}).get('metadata', {})
+            elif trace is not None:
+                metadata = trace.metadata
+            else:
+                response = self._request_with_retry(
+                    'get',
+                    f"{self.BASE_URL}/runs/{bundle.trace_id}",
+                    timeout=10
+                )
+                if response and response.status_code == 200:
+                    metadata = response.json().get('extra', {}).get('metadata', {})
 
+            if metadata:
                 model_info['model'] = metadata.get('model', '') or metadata.get('ls_model_name', '')
                 model_info['provider'] = metadata.get('ls_provider', '')
 
@@ -577,38 +975,23 @@ class LangSmithClient(BaseClient):
 
         return metrics
 
-    def _extract_waterfall(self, trace_id: str, trace_start: datetime) -> List[WaterfallStep]:
+    def _extract_waterfall(self, bundle: TraceBundle, trace_start: datetime) -> List[WaterfallStep]:
         """
         Estrae il waterfall tree (sequenza di step con timing).
 
         Args:
-            trace_id: ID del trace
+            bundle: Run del trace
             trace_start: Timestamp di inizio del trace
 
         Returns:
             Lista di WaterfallStep ordinati per tempo
         """
-        child_runs = self.get_child_runs(trace_id)
-
-        if not child_runs:
+        if not bundle.runs:
             return []
 
-        # Mappa parent_id -> depth per calcolare nesting
-        id_to_depth = {trace_id: 0}
         steps = []
 
-        # Prima passata: costruisci mappa depth
-        for run in child_runs:
-            run_id = run.get('id', '')
-            parent_id = run.get('parent_run_id', '')
-
-            if parent_id in id_to_depth:
-                id_to_depth[run_id] = id_to_depth[parent_id] + 1
-            else:
-                id_to_depth[run_id] = 1
-
-        # Seconda passata: estrai step
-        for run in child_runs:
+        for run in bundle.runs:
             run_id = run.get('id', '')
             run_type = run.get('run_type', 'unknown')
             name = run.get('name', 'unnamed')
@@ -654,7 +1037,7 @@ class LangSmithClient(BaseClient):
                 # Debug: print(f"Error parsing timestamps: {e}")
                 pass
 
-            depth = id_to_depth.get(run_id, 1)
+            depth = bundle.depth(run_id)
 
             steps.append(WaterfallStep(
                 name=name,
@@ -671,7 +1054,7 @@ class LangSmithClient(BaseClient):
 
         return steps
 
-    def _extract_sources(self, trace_id: str) -> List[SourceDocument]:
+    def _extract_sources(self, bundle: TraceBundle) -> List[SourceDocument]:
         """
         Estrae i documenti fonte consultati durante la ricerca.
 
@@ -679,16 +1062,15 @@ class LangSmithClient(BaseClient):
         i documenti recuperati dal vector store o altri sistemi RAG.
 
         Args:
-            trace_id: ID del trace
+            bundle: Run del trace
 
         Returns:
             Lista di SourceDocument
         """
-        child_runs = self.get_child_runs(trace_id)
         sources = []
         seen_sources = set()  # Per evitare duplicati
 
-        for run in child_runs:
+        for run in bundle.runs:
             run_type = run.get('run_type', '')
             run_name = run.get('name', '').lower()
 
@@ -774,21 +1156,19 @@ class LangSmithClient(BaseClient):
 
         return sources
 
-    def _extract_vector_store(self, trace_id: str) -> str:
+    def _extract_vector_store(self, bundle: TraceBundle) -> str:
         """
         Estrae il vector store provider dai retriever runs.
 
         Cerca nei run di tipo 'retriever' il campo metadata ls_vector_store_provider.
 
         Args:
-            trace_id: ID del trace
+            bundle: Run del trace
 
         Returns:
             Nome del vector store (es. "Qdrant", "FAISS") o stringa vuota
         """
-        child_runs = self.get_child_runs(trace_id)
-
-        for run in child_runs:
+        for run in bundle.runs:
             run_type = run.get('run_type', '')
             run_name = run.get('name', '').lower()
 
@@ -30,6 +30,73 @@ class TraceInfo:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class TraceBundle:
+    """
+    Tutti i run di un trace, scaricati una sola volta.
+
+    Gli estrattori del client lavorano su questo oggetto in memoria invece
+    di rifare POST /runs/query per ogni informazione. Gli indici
+    (id, figli per parent, run per tipo) sono costruiti una volta sola.
+    """
+    trace_id: str
+    runs: List[Dict[str, Any]] = field(default_factory=list)
+    root: Optional[Dict[str, Any]] = None
+
+    def __post_init__(self):
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.children: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_type: Dict[str, List[Dict[str, Any]]] = {}
+
+        for run in self.runs:
+            run_id = run.get('id', '')
+            self.by_id[run_id] = run
+            self.children.setdefault(run.get('parent_run_id') or '', []).append(run)
+            self.by_type.setdefault(run.get('run_type', ''), []).append(run)
+
+        if self.root is None:
+            self.root = self.by_id.get(self.trace_id)
+
+        self._depths: Dict[str, int] = {self.trace_id: 0}
+
+    @property
+    def is_complete(self) -> bool:
+        """True se il trace è terminato: root e tutti i run chiusi (immutabile)"""
+        if not self.root or self.root.get('status') not in ('success', 'error'):
+            return False
+        return all(run.get('end_time') for run in self.runs)
+
+    def of_type(self, *run_types: str) -> List[Dict[str, Any]]:
+        """Run dei tipi indicati, nell'ordine originale"""
+        if len(run_types) == 1:
+            return list(self.by_type.get(run_types[0], []))
+        wanted = set(run_types)
+        return [r for r in self.runs if r.get('run_type', '') in wanted]
+
+    def depth(self, run_id: str) -> int:
+        """Livello di nesting di un run (root = 0, parent sconosciuto = 1)"""
+        if run_id in self._depths:
+            return self._depths[run_id]
+
+        # Risale la catena dei parent fino a un nodo con depth nota
+        chain = []
+        current = run_id
+        while current not in self._depths:
+            chain.append(current)
+            parent = (self.by_id.get(current) or {}).get('parent_run_id')
+            if not parent or parent not in self.by_id and parent != self.trace_id or parent in chain:
+                self._depths[current] = 1
+                chain.pop()
+                break
+            current = parent
+
+        for node in reversed(chain):
+            parent = self.by_id[node].get('parent_run_id')
+            self._depths[node] = self._depths[parent] + 1
+
+        return self._depths[run_id]
+
+
 @dataclass
 class WaterfallStep:
     """Singolo step nel waterfall tree"""
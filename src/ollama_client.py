@@ -2,22 +2,64 @@
 Ollama Client - Local LLM integration
 
 Handles:
-- Ollama API communication
+- Ollama API communication (pooled keep-alive connections, sync and asyncio)
 - Response generation for Assisted/Auto modes
 - Conversation analysis and followup decisions
 - Response quality evaluation
 - Training data usage for in-context learning
+
+The async methods (agenerate, astream, adecide_response, aevaluate_test_result)
+share one httpx connection pool per event loop and never block it; at most
+num_parallel requests are in flight, matching the server's OLLAMA_NUM_PARALLEL.
+keep_alive is sent with every request so the model stays loaded between tests.
 """
 
+import asyncio
 import json
+import os
+import re
 import requests
-from typing import Optional, Generator, List, Dict, Any, TYPE_CHECKING
+from contextlib import aclosing
+from typing import Optional, Generator, AsyncIterator, Callable, List, Dict, Any, Tuple, TYPE_CHECKING
 from dataclasses import dataclass
 
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
 if TYPE_CHECKING:
     from .training import TrainingData
 
 
+# Reply meaning "conversation completed" (first word, as the prompts request)
+_DONE_REPLY = re.compile(r'^\W*DONE\b')
+
+
+def default_num_parallel() -> int:
+    """Concurrent requests the Ollama server serves (OLLAMA_NUM_PARALLEL, default 1)"""
+    try:
+        return max(1, int(os.getenv("OLLAMA_NUM_PARALLEL", "1")))
+    except ValueError:
+        return 1
+
+
+def is_done_reply(text: str) -> bool:
+    """True if the model answered DONE (possibly followed by an explanation)"""
+    return text.strip().upper() == "DONE" or bool(_DONE_REPLY.match(text))
+
+
+def _clean_json(response: str) -> str:
+    """Strip markdown code fences around a JSON answer"""
+    clean = response.strip()
+    if clean.startswith("```"):
+        clean = clean.split("```")[1]
+        if clean.startswith("json"):
+            clean = clean[4:]
+    return clean
+
+
 @dataclass
 class OllamaResponse:
     """Response from Ollama"""
@@ -56,7 +98,9 @@ class OllamaClient(BaseClient):
     def __init__(self,
                  model: str = "mistral",
                  url: str = "http://localhost:11434/api/generate",
-                 timeout: int = 120):
+                 timeout: int = 120,
+                 keep_alive: str = "30m",
+                 num_parallel: int = 0):
         """
         Initialize the Ollama client.
 
@@ -64,11 +108,22 @@ class OllamaClient(BaseClient):
             model: Model name (default: mistral)
             url: Ollama endpoint URL
             timeout: Request timeout in seconds
+            keep_alive: How long the server keeps the model loaded after a request
+                        (Ollama duration, e.g. "30m"; "-1" = until restart)
+            num_parallel: Max concurrent requests (0 = OLLAMA_NUM_PARALLEL or 1)
         """
         self.model = model
         self.url = url
         self.timeout = timeout
         self.base_url = url.replace("/api/generate", "")
+        self.keep_alive = keep_alive
+        self.num_parallel = num_parallel if num_parallel > 0 else default_num_parallel()
+
+        # Pooled connections: requests for sync calls, httpx per event loop for async
+        self._session = requests.Session()
+        self._async_client: Optional[Any] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slots: Optional[asyncio.Semaphore] = None
 
         # Training context for in-context learning
         self._training: Optional['TrainingData'] = None
@@ -91,7 +146,7 @@ class OllamaClient(BaseClient):
         """
         try:
             # Check server
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self._session.get(f"{self.base_url}/api/tags", timeout=5)
             if response.status_code != 200:
                 return False
 
@@ -106,7 +161,7 @@ class OllamaClient(BaseClient):
     def get_available_models(self) -> list[str]:
         """Return list of available models in Ollama"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self._session.get(f"{self.base_url}/api/tags", timeout=5)
             if response.status_code == 200:
                 models = response.json().get('models', [])
                 return [m.get('name', '') for m in models]
@@ -114,6 +169,29 @@ class OllamaClient(BaseClient):
             pass
         return []
 
+    def _payload(self,
+                 prompt: str,
+                 system: Optional[str],
+                 temperature: float,
+                 max_tokens: Optional[int],
+                 stream: bool) -> Dict[str, Any]:
+        """Request body for /api/generate"""
+        options: Dict[str, Any] = {"temperature": temperature}
+        if max_tokens:
+            options["num_predict"] = max_tokens
+
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+            "options": options
+        }
+
+        if system:
+            payload["system"] = system
+        return payload
+
     def generate(self,
                  prompt: str,
                  system: Optional[str] = None,
@@ -131,21 +209,10 @@ class OllamaClient(BaseClient):
         Returns:
             Generated text or None if error
         """
-        payload = {
-            "model": self.model,
-            "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": temperature,
-                "num_predict": max_tokens
-            }
-        }
-
-        if system:
-            payload["system"] = system
+        payload = self._payload(prompt, system, temperature, max_tokens, stream=False)
 
         try:
-            response = requests.post(
+            response = self._session.post(
                 self.url,
                 json=payload,
                 timeout=self.timeout
@@ -176,36 +243,125 @@ class OllamaClient(BaseClient):
         Yields:
             Text chunks
         """
-        payload = {
-            "model": self.model,
-            "prompt": prompt,
-            "stream": True,
-            "options": {
-                "temperature": temperature
-            }
-        }
-
-        if system:
-            payload["system"] = system
+        payload = self._payload(prompt, system, temperature, None, stream=True)
 
         try:
-            response = requests.post(
-                self.url,
-                json=payload,
-                stream=True,
-                timeout=self.timeout
-            )
-
-            for line in response.iter_lines():
-                if line:
-                    data = json.loads(line)
-                    if 'response' in data:
-                        yield data['response']
-                    if data.get('done', False):
-                        break
+            with self._session.post(self.url, json=payload, stream=True, timeout=self.timeout) as response:
+                for line in response.iter_lines():
+                    if line:
+                        data = json.loads(line)
+                        if 'response' in data:
+                            yield data['response']
+                        if data.get('done', False):
+                            break
         except Exception as e:
             print(f"Ollama streaming error: {e}")
 
+    # ========== ASYNC API ==========
+
+    def _async_state(self) -> Tuple[Optional[Any], asyncio.Semaphore]:
+        """httpx client and concurrency slots for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_loop = loop
+            self._slots = asyncio.Semaphore(self.num_parallel)
+            self._async_client = None
+            if HTTPX_AVAILABLE:
+                self._async_client = httpx.AsyncClient(
+                    timeout=self.timeout,
+                    limits=httpx.Limits(
+                        max_connections=self.num_parallel,
+                        max_keepalive_connections=self.num_parallel
+                    )
+                )
+        return self._async_client, self._slots
+
+    async def agenerate(self,
+                        prompt: str,
+                        system: Optional[str] = None,
+                        temperature: float = 0.7,
+                        max_tokens: int = 1000) -> Optional[str]:
+        """generate() without blocking the event loop"""
+        client, slots = self._async_state()
+        async with slots:
+            if client is None:
+                return await asyncio.to_thread(self.generate, prompt, system, temperature, max_tokens)
+
+            payload = self._payload(prompt, system, temperature, max_tokens, stream=False)
+            try:
+                response = await client.post(self.url, json=payload)
+                if response.status_code == 200:
+                    return response.json().get('response', '')
+                print(f"Ollama error: {response.status_code}")
+                return None
+            except Exception as e:
+                print(f"Ollama connection error: {e}")
+                return None
+
+    async def astream(self,
+                      prompt: str,
+                      system: Optional[str] = None,
+                      temperature: float = 0.7,
+                      max_tokens: Optional[int] = None) -> AsyncIterator[str]:
+        """
+        Stream response chunks.
+
+        Closing the iterator early (e.g. with contextlib.aclosing) closes the
+        connection, and Ollama stops generating.
+        """
+        client, slots = self._async_state()
+        async with slots:
+            if client is None:
+                text = await asyncio.to_thread(self.generate, prompt, system, temperature, max_tokens or 1000)
+                if text:
+                    yield text
+                return
+
+            payload = self._payload(prompt, system, temperature, max_tokens, stream=True)
+            try:
+                async with client.stream("POST", self.url, json=payload) as response:
+                    if response.status_code != 200:
+                        print(f"Ollama error: {response.status_code}")
+                        return
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        data = json.loads(line)
+                        if data.get('response'):
+                            yield data['response']
+                        if data.get('done', False):
+                            break
+            except Exception as e:
+                print(f"Ollama streaming error: {e}")
+
+    async def agenerate_until(self,
+                              prompt: str,
+                              stop: Callable[[str], bool],
+                              system: Optional[str] = None,
+                              temperature: float = 0.7,
+                              max_tokens: int = 1000) -> Optional[str]:
+        """
+        Stream a response and stop as soon as stop(text_so_far) is True.
+
+        Returns:
+            Text generated until then, or None if nothing was generated
+        """
+        text = ""
+        async with aclosing(self.astream(prompt, system, temperature, max_tokens)) as chunks:
+            async for chunk in chunks:
+                text += chunk
+                if stop(text):
+                    break
+        return text or None
+
+    async def aclose(self) -> None:
+        """Close the pooled connections"""
+        if self._async_client is not None and self._async_loop is asyncio.get_running_loop():
+            await self._async_client.aclose()
+        self._async_client = None
+        self._async_loop = None
+        self._session.close()
+
     # ========== IN-CONTEXT LEARNING FROM TRAINING ==========
 
     def _build_training_context(self) -> str:
@@ -222,12 +378,8 @@ class OllamaClient(BaseClient):
 
         for pattern in self._training.patterns:
             if pattern.responses:
-                # Get top 3 most used responses
-                top_responses = sorted(
-                    pattern.responses,
-                    key=lambda r: r.count,
-                    reverse=True
-                )[:3]
+                # Top 3 most used responses (kept sorted by count)
+                top_responses = pattern.get_suggestions(3)
 
                 responses_str = ", ".join([
                     f'"{r.text}" (used {r.count}x)'
@@ -291,18 +443,61 @@ class OllamaClient(BaseClient):
         Returns:
             Response to send, or None if conversation completed
         """
+        decided, response = self._decide_without_llm(bot_message)
+        if decided:
+            return response
+
+        system, prompt = self._decide_prompt(bot_message, conversation, followups, test_context)
+        response = self.generate(prompt, system=system, temperature=0.3, max_tokens=150)
+        return self._decide_result(bot_message, response, followups)
+
+    async def adecide_response(self,
+                               bot_message: str,
+                               conversation: List[Dict[str, str]],
+                               followups: Optional[List[str]] = None,
+                               test_context: Optional[str] = None) -> Optional[str]:
+        """
+        decide_response() for async test loops.
+
+        The answer is streamed and generation stops as soon as the model
+        starts with DONE, instead of waiting for the full completion.
+        """
+        decided, response = self._decide_without_llm(bot_message)
+        if decided:
+            return response
+
+        system, prompt = self._decide_prompt(bot_message, conversation, followups, test_context)
+        response = await self.agenerate_until(prompt, stop=lambda text: bool(_DONE_REPLY.match(text)),
+                                              system=system, temperature=0.3, max_tokens=150)
+        return self._decide_result(bot_message, response, followups)
+
+    def _decide_without_llm(self, bot_message: str) -> Tuple[bool, Optional[str]]:
+        """
+        Decisions that need no LLM call.
+
+        Returns:
+            (decided, response): final bot answer -> (True, None),
+            training pattern match -> (True, most used response)
+        """
         # Check if the bot gave a final response
         if self._is_final_response(bot_message):
-            return None
+            return True, None
 
         # First check if there's a pattern match in training
         if self._training:
             suggestions = self._training.get_suggestions(bot_message, limit=1)
             if suggestions:
                 # Pattern recognized - use most common response
-                return suggestions[0]['text']
+                return True, suggestions[0]['text']
+
+        return False, None
 
-        # Otherwise use LLM with training context
+    def _decide_prompt(self,
+                       bot_message: str,
+                       conversation: List[Dict[str, str]],
+                       followups: Optional[List[str]],
+                       test_context: Optional[str]) -> Tuple[str, str]:
+        """(system, prompt) for the LLM decision, with training context"""
         training_context = self._build_training_context()
 
         system = """Sei un tester automatico di chatbot. Il tuo compito è rispondere alle domande del bot per completare il test.
@@ -348,13 +543,18 @@ Rispondi SOLO con il testo da inviare, oppure "DONE" se il test è completato.""
 
         prompt = "\n".join(prompt_parts)
 
-        response = self.generate(prompt, system=system, temperature=0.3, max_tokens=150)
+        return system, prompt
 
+    def _decide_result(self,
+                       bot_message: str,
+                       response: Optional[str],
+                       followups: Optional[List[str]]) -> Optional[str]:
+        """Clean the LLM decision and learn it; first followup if the LLM failed"""
         if response:
             response = response.strip()
 
             # Check if conversation completed
-            if response.upper() == "DONE":
+            if is_done_reply(response):
                 return None
 
             # Remove quotes if present
@@ -598,6 +798,24 @@ Rispondi SOLO con il valore:"""
         Returns:
             Dict with: {passed, score, reason, details}
         """
+        system, prompt = self._evaluation_prompt(test_case, conversation, final_response)
+        response = self.generate(prompt, system=system, temperature=0.2, max_tokens=300)
+        return self._evaluation_result(response, final_response)
+
+    async def aevaluate_test_result(self,
+                                    test_case: dict,
+                                    conversation: list[dict],
+                                    final_response: str) -> dict:
+        """evaluate_test_result() without blocking the event loop"""
+        system, prompt = self._evaluation_prompt(test_case, conversation, final_response)
+        response = await self.agenerate(prompt, system=system, temperature=0.2, max_tokens=300)
+        return self._evaluation_result(response, final_response)
+
+    def _evaluation_prompt(self,
+                           test_case: dict,
+                           conversation: list[dict],
+                           final_response: str) -> Tuple[str, str]:
+        """(system, prompt) for the test evaluation"""
         system = """Sei un QA tester. Valuta se il test è passato basandoti su:
 - Completezza delle risposte
 - Pertinenza
@@ -633,16 +851,14 @@ Valuta e rispondi con:
     }}
 }}"""
 
-        response = self.generate(prompt, system=system, temperature=0.2, max_tokens=300)
+        return system, prompt
 
+    @staticmethod
+    def _evaluation_result(response: Optional[str], final_response: str) -> dict:
+        """Parse the evaluation JSON; default verdict if the LLM failed"""
         if response:
             try:
-                clean = response.strip()
-                if clean.startswith("```"):
-                    clean = clean.split("```")[1]
-                    if clean.startswith("json"):
-                        clean = clean[4:]
-                return json.loads(clean)
+                return json.loads(_clean_json(response))
             except:
                 pass
 
@@ -6,11 +6,13 @@ pool di browser Playwright. Ottimizza i tempi di esecuzione
 per suite di test grandi.
 
 Features:
-- Pool di browser riutilizzabili
+- Pool di browser riutilizzabili (processi dedicati o context su un Chromium condiviso)
 - Esecuzione parallela con asyncio
 - Retry automatico con backoff
 - Progress tracking in tempo reale
 - Rate limiting per evitare sovraccarico
+- Concorrenza adattiva (AIMD) sulle latenze del chatbot
+- Scheduling longest-first con work stealing e copie speculative
 """
 
 import asyncio
@@ -21,8 +23,12 @@ from enum import Enum
 from pathlib import Path
 import time
 
-from .browser import BrowserManager, BrowserSettings, ChatbotSelectors
+from .browser import BrowserManager, BrowserSettings, ChatbotSelectors, SharedBrowser
 from .tester import TestCase, TestExecution, ConversationTurn
+from .engine.pipeline import EvaluationPipeline, PostProcessJob
+from .concurrency import AdaptiveConcurrency
+from .scheduling import DurationEstimator, WorkStealingScheduler, ScheduledTest
+from .performance import PerformanceCollector, TestMetrics
 
 
 class RetryStrategy(Enum):
@@ -43,6 +49,48 @@ class ParallelConfig:
     rate_limit_per_minute: int = 60    # Limite richieste/minuto
     batch_size: int = 10               # Test per batch
     timeout_per_test_ms: int = 120000  # Timeout singolo test
+    pool_mode: str = "process"         # process | context
+    context_recycle_after: int = 25    # Test per context prima del riciclo (0 = mai)
+    context_max_heap_mb: int = 512     # Ricicla il context oltre questo heap JS (0 = no check)
+    adaptive: bool = False             # Limite worker regolato a runtime (max_workers = tetto)
+    min_workers: int = 1
+    adaptive_window: int = 5           # Test per decisione del controller
+    latency_tolerance: float = 1.5     # p50 / baseline oltre cui il chatbot è degradato
+    schedule: str = "longest_first"    # longest_first | input
+    speculative: bool = True           # Duplica i test in ritardo quando un worker è libero
+    straggler_factor: float = 2.0      # Tempo trascorso / stima oltre cui duplicare
+
+    @classmethod
+    def from_settings(cls, settings: Any, max_workers: Optional[int] = None) -> 'ParallelConfig':
+        """
+        Crea la configurazione dalla sezione parallel di settings.yaml.
+
+        Args:
+            settings: ParallelSettings
+            max_workers: Override da CLI (--workers)
+        """
+        try:
+            retry_strategy = RetryStrategy(settings.retry_strategy)
+        except ValueError:
+            retry_strategy = RetryStrategy.EXPONENTIAL
+
+        return cls(
+            max_workers=max_workers or settings.max_workers,
+            retry_strategy=retry_strategy,
+            max_retries=settings.max_retries,
+            base_delay_ms=settings.base_delay_ms,
+            rate_limit_per_minute=settings.rate_limit_per_minute,
+            pool_mode=settings.pool_mode,
+            context_recycle_after=settings.context_recycle_after,
+            context_max_heap_mb=settings.context_max_heap_mb,
+            adaptive=settings.adaptive,
+            min_workers=settings.min_workers,
+            adaptive_window=settings.adaptive_window,
+            latency_tolerance=settings.latency_tolerance,
+            schedule=settings.schedule,
+            speculative=settings.speculative,
+            straggler_factor=settings.straggler_factor
+        )
 
 
 @dataclass
@@ -54,6 +102,9 @@ class WorkerState:
     tests_completed: int = 0
     current_test: Optional[str] = None
     last_activity: float = 0.0
+    tests_in_context: int = 0          # Test eseguiti dal browser corrente
+    recycled: int = 0                  # Context sostituiti
+    spare: Optional[asyncio.Task] = None  # Prossimo browser in pre-warm
 
 
 @dataclass
@@ -68,6 +119,9 @@ class ParallelResult:
     duration_ms: int
     results: List[TestExecution] = field(default_factory=list)
     worker_stats: Dict[int, Dict] = field(default_factory=dict)
+    concurrency_timeline: List[Dict[str, Any]] = field(default_factory=list)
+    predicted_makespan_ms: int = 0     # Fase browser stimata dallo scheduler
+    actual_makespan_ms: int = 0
 
 
 class BrowserPool:
@@ -76,68 +130,57 @@ class BrowserPool:
 
     Gestisce un numero fisso di istanze browser che vengono
     riutilizzate tra i test per evitare l'overhead di avvio.
+
+    Modalità:
+    - process: un Chromium persistente per worker (user_data_dir/worker_N)
+    - context: un solo Chromium, un BrowserContext isolato per worker con
+      auth da state.json. I context vengono riciclati dopo N test o oltre
+      una soglia di heap JS; il sostituto viene preparato mentre il worker
+      esegue l'ultimo test prima del riciclo.
     """
 
     def __init__(self,
                  size: int,
                  settings: BrowserSettings,
-                 selectors: ChatbotSelectors):
+                 selectors: ChatbotSelectors,
+                 mode: str = "process",
+                 recycle_after: int = 25,
+                 max_heap_mb: int = 512,
+                 warm_url: Optional[str] = None):
         self.size = size
         self.settings = settings
         self.selectors = selectors
+        self.mode = mode
+        self.recycle_after = recycle_after
+        self.max_heap_mb = max_heap_mb
+        self.warm_url = warm_url
         self._workers: Dict[int, WorkerState] = {}
         self._available: asyncio.Queue = asyncio.Queue()
         self._lock = asyncio.Lock()
         self._initialized = False
+        self._shared: Optional[SharedBrowser] = None
+        self._closing: set = set()
 
     async def initialize(self) -> bool:
         """Inizializza il pool di browser"""
-        import shutil
-        from pathlib import Path
-
         if self._initialized:
             return True
 
-        print(f"Inizializzazione pool di {self.size} browser...")
-
-        for i in range(self.size):
-            worker = WorkerState(worker_id=i)
-
-            # Crea directory worker e copia auth state se presente
-            worker_data_dir = None
-            if self.settings.user_data_dir:
-                worker_data_dir = Path(self.settings.user_data_dir) / f"worker_{i}"
-                worker_data_dir.mkdir(parents=True, exist_ok=True)
-
-                # Copia state.json (auth) nella directory worker
-                parent_state = Path(self.settings.user_data_dir) / "state.json"
-                if parent_state.exists():
-                    worker_state = worker_data_dir / "state.json"
-                    shutil.copy2(parent_state, worker_state)
-                    print(f"  Worker {i}: auth state copiato")
-
-            # Crea una copia delle settings con user_data_dir univoco
-            worker_settings = BrowserSettings(
-                headless=self.settings.headless,
-                viewport_width=self.settings.viewport_width,
-                viewport_height=self.settings.viewport_height,
-                device_scale_factor=self.settings.device_scale_factor,
-                user_data_dir=worker_data_dir,
-                timeout_page_load=self.settings.timeout_page_load,
-                timeout_bot_response=self.settings.timeout_bot_response
-            )
-
-            worker.browser = BrowserManager(worker_settings, self.selectors)
-
+        if self.mode == "context":
+            print(f"Inizializzazione pool di {self.size} context (Chromium condiviso)...")
+            self._shared = SharedBrowser(self.settings)
             try:
-                await worker.browser.start()
-                worker.last_activity = time.time()
-                self._workers[i] = worker
-                await self._available.put(i)
-                print(f"  Worker {i}: pronto")
+                await self._shared.start()
             except Exception as e:
-                print(f"  Worker {i}: errore - {e}")
-                # Continua con gli altri worker
+                print(f"Errore avvio Chromium: {e}")
+                return False
+            if not self._shared.storage_state:
+                print("  ! state.json non trovato: i context partono senza login")
+        else:
+            print(f"Inizializzazione pool di {self.size} browser...")
+
+        # Avvio concorrente: il tempo totale è quello del worker più lento
+        await asyncio.gather(*[self._start_worker(i) for i in range(self.size)])
 
         self._initialized = len(self._workers) > 0
 
@@ -148,10 +191,77 @@ class BrowserPool:
 
         return self._initialized
 
+    async def _start_worker(self, worker_id: int) -> None:
+        """Avvia un worker e lo rende disponibile"""
+        worker = WorkerState(worker_id=worker_id)
+        try:
+            worker.browser = await self._new_browser(worker_id)
+            worker.last_activity = time.time()
+            self._workers[worker_id] = worker
+            await self._available.put(worker_id)
+            print(f"  Worker {worker_id}: pronto")
+        except Exception as e:
+            print(f"  Worker {worker_id}: errore - {e}")
+            # Continua con gli altri worker
+
+    async def _new_browser(self, worker_id: int) -> BrowserManager:
+        """Crea e avvia il BrowserManager di un worker"""
+        if self.mode == "context":
+            browser = BrowserManager(self.settings, self.selectors)
+            await browser.start(shared=self._shared)
+            return browser
+
+        browser = BrowserManager(self._worker_settings(worker_id), self.selectors)
+        await browser.start()
+        return browser
+
+    def _worker_settings(self, worker_id: int) -> BrowserSettings:
+        """Settings con user_data_dir dedicato (modalità process)"""
+        import shutil
+
+        # Crea directory worker e copia auth state se presente
+        worker_data_dir = None
+        if self.settings.user_data_dir:
+            worker_data_dir = Path(self.settings.user_data_dir) / f"worker_{worker_id}"
+            worker_data_dir.mkdir(parents=True, exist_ok=True)
+
+            # Copia state.json (auth) nella directory worker
+            parent_state = Path(self.settings.user_data_dir) / "state.json"
+            if parent_state.exists():
+                worker_state = worker_data_dir / "state.json"
+                shutil.copy2(parent_state, worker_state)
+                print(f"  Worker {worker_id}: auth state copiato")
+
+        # Crea una copia delle settings con user_data_dir univoco
+        return BrowserSettings(
+            headless=self.settings.headless,
+            viewport_width=self.settings.viewport_width,
+            viewport_height=self.settings.viewport_height,
+            device_scale_factor=self.settings.device_scale_factor,
+            user_data_dir=worker_data_dir,
+            timeout_page_load=self.settings.timeout_page_load,
+            timeout_bot_response=self.settings.timeout_bot_response,
+            response_detection=self.settings.response_detection,
+            observer_quiet_ms=self.settings.observer_quiet_ms,
+            reset_strategies=self.settings.reset_strategies,
+            reset_ready_timeout_ms=self.settings.reset_ready_timeout_ms,
+            screenshot=self.settings.screenshot
+        )
+
+    async def _warm_browser(self, worker_id: int) -> BrowserManager:
+        """Nuovo context già posizionato sul chatbot (pre-warm)"""
+        browser = await self._new_browser(worker_id)
+        if self.warm_url:
+            await browser.navigate(self.warm_url)
+        return browser
+
     async def acquire(self, timeout_seconds: float = 60) -> Optional[WorkerState]:
         """
         Ottiene un worker dal pool.
 
+        Se il worker verrà riciclato al rilascio, il sostituto viene
+        preparato in background mentre il test gira.
+
         Args:
             timeout_seconds: Timeout attesa worker
 
@@ -168,24 +278,88 @@ class BrowserPool:
                 worker = self._workers[worker_id]
                 worker.is_busy = True
                 worker.last_activity = time.time()
+
+                if self._recycle_due_by_count(worker, upcoming=1) and worker.spare is None:
+                    worker.spare = asyncio.create_task(self._warm_browser(worker_id))
+
                 return worker
 
         except asyncio.TimeoutError:
             return None
 
     async def release(self, worker: WorkerState) -> None:
-        """Rilascia un worker al pool"""
+        """Rilascia un worker al pool (riciclando il context se necessario)"""
+        worker.tests_in_context += 1
+        if self.mode == "context" and await self._should_recycle(worker):
+            await self._recycle(worker)
+
         async with self._lock:
             worker.is_busy = False
             worker.current_test = None
             worker.last_activity = time.time()
             await self._available.put(worker.worker_id)
 
+    def _recycle_due_by_count(self, worker: WorkerState, upcoming: int = 0) -> bool:
+        """True se il context ha raggiunto il limite di test"""
+        return (
+            self.mode == "context"
+            and self.recycle_after > 0
+            and worker.tests_in_context + upcoming >= self.recycle_after
+        )
+
+    async def _should_recycle(self, worker: WorkerState) -> bool:
+        """Limite test raggiunto o heap JS oltre soglia"""
+        if self._recycle_due_by_count(worker):
+            return True
+        if self.max_heap_mb > 0 and worker.browser:
+            heap_mb = await worker.browser.js_heap_mb()
+            if heap_mb and heap_mb > self.max_heap_mb:
+                print(f"  Worker {worker.worker_id}: heap {heap_mb:.0f}MB, riciclo context")
+                return True
+        return False
+
+    async def _recycle(self, worker: WorkerState) -> None:
+        """Sostituisce il browser del worker con il context pre-warm"""
+        spare = worker.spare or asyncio.create_task(self._warm_browser(worker.worker_id))
+        worker.spare = None
+        try:
+            replacement = await spare
+        except Exception as e:
+            # Il vecchio context resta in uso, riprova al prossimo rilascio
+            print(f"  Worker {worker.worker_id}: riciclo fallito - {e}")
+            return
+
+        old = worker.browser
+        worker.browser = replacement
+        worker.tests_in_context = 0
+        worker.recycled += 1
+
+        # La chiusura del vecchio context non blocca il worker
+        if old:
+            task = asyncio.create_task(self._close_browser(old))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    async def _close_browser(self, browser: BrowserManager) -> None:
+        """Chiude un browser ignorando gli errori"""
+        try:
+            await browser.stop()
+        except Exception:
+            pass
+
     async def shutdown(self) -> None:
         """Chiude tutti i browser nel pool"""
         print("Chiusura pool browser...")
 
         for worker_id, worker in self._workers.items():
+            if worker.spare:
+                worker.spare.cancel()
+                try:
+                    spare = await worker.spare
+                    await self._close_browser(spare)
+                except (asyncio.CancelledError, Exception):
+                    pass
+                worker.spare = None
             if worker.browser:
                 try:
                     await worker.browser.stop()
@@ -193,6 +367,16 @@ class BrowserPool:
                 except Exception as e:
                     print(f"  Worker {worker_id}: errore chiusura - {e}")
 
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+        if self._shared:
+            try:
+                await self._shared.stop()
+            except Exception as e:
+                print(f"  Errore chiusura Chromium: {e}")
+            self._shared = None
+
         self._workers.clear()
         self._initialized = False
 
@@ -204,7 +388,8 @@ class BrowserPool:
                 "tests_completed": worker.tests_completed,
                 "is_busy": worker.is_busy,
                 "current_test": worker.current_test,
-                "last_activity": worker.last_activity
+                "last_activity": worker.last_activity,
+                "contexts_recycled": worker.recycled
             }
         return stats
 
@@ -233,7 +418,13 @@ class ParallelTestRunner:
                  on_test_complete: Optional[Callable[[TestExecution], None]] = None,
                  report_dir: Optional[Path] = None,
                  run_config: Any = None,
-                 screenshot_css: str = ""):
+                 screenshot_css: str = "",
+                 evaluator: Any = None,
+                 pipeline_settings: Any = None,
+                 perf_collector: Optional[PerformanceCollector] = None,
+                 duration_estimator: Optional[DurationEstimator] = None,
+                 baselines: Any = None,
+                 settings: Any = None):
         """
         Args:
             browser_settings: Settings browser
@@ -246,6 +437,12 @@ class ParallelTestRunner:
             report_dir: Directory per salvare screenshots
             run_config: Configurazione run (per prompt_version, env)
             screenshot_css: CSS da iniettare per screenshots
+            evaluator: Evaluator (opzionale, priorità su Ollama)
+            pipeline_settings: PipelineSettings per il post-processing
+            perf_collector: Collector per metriche per-test e serie della concorrenza
+            duration_estimator: Stime durata test per lo scheduling (default: senza storico)
+            baselines: BaselinesCache con le golden answers (come nel sequenziale)
+            settings: GlobalSettings per la pipeline (contesto RAG automatico)
         """
         self.browser_settings = browser_settings
         self.selectors = selectors
@@ -257,8 +454,17 @@ class ParallelTestRunner:
         self.report_dir = report_dir
         self.run_config = run_config
         self.screenshot_css = screenshot_css
+        self.evaluator = evaluator
+        self.pipeline_settings = pipeline_settings
+        self.perf_collector = perf_collector
+        self.estimator = duration_estimator or DurationEstimator()
+        self.baselines = baselines
+        self.settings = settings
 
         self._pool: Optional[BrowserPool] = None
+        self._controller: Optional[AdaptiveConcurrency] = None
+        self._scheduler: Optional[WorkStealingScheduler] = None
+        self._pipeline: Optional[EvaluationPipeline] = None
         self._rate_limiter = RateLimiter(config.rate_limit_per_minute)
         self._completed = 0
         self._total = 0
@@ -299,7 +505,11 @@ class ParallelTestRunner:
         self._pool = BrowserPool(
             size=min(self.config.max_workers, len(tests)),
             settings=self.browser_settings,
-            selectors=self.selectors
+            selectors=self.selectors,
+            mode=self.config.pool_mode,
+            recycle_after=self.config.context_recycle_after,
+            max_heap_mb=self.config.context_max_heap_mb,
+            warm_url=chatbot_url
         )
 
         if not await self._pool.initialize():
@@ -313,19 +523,104 @@ class ParallelTestRunner:
                 duration_ms=0
             )
 
+        # Pipeline post-processing: LangSmith e valutazione non occupano i browser
+        self._pipeline = EvaluationPipeline(
+            config=self.pipeline_settings,
+            langsmith=self.langsmith,
+            evaluator=self.evaluator,
+            ollama=self.ollama,
+            baselines=self.baselines,
+            settings=self.settings,
+            on_status=print
+        )
+        await self._pipeline.start()
+
         try:
-            # Semaforo per limitare parallelismo PRIMA di creare i task
-            semaphore = asyncio.Semaphore(self.config.max_workers)
+            # Limite di parallelismo: fisso o adattivo
+            workers = len(self._pool.get_stats())
+            if self.config.adaptive:
+                self._controller = AdaptiveConcurrency(
+                    max_limit=workers,
+                    min_limit=self.config.min_workers,
+                    window=self.config.adaptive_window,
+                    latency_tolerance=self.config.latency_tolerance,
+                    throttle_source=lambda: getattr(self.langsmith, 'throttled_count', 0)
+                )
+                semaphore = self._controller
+            else:
+                semaphore = asyncio.Semaphore(self.config.max_workers)
+
+            # Ordine longest-first con work stealing ed esecuzione speculativa
+            self._scheduler = WorkStealingScheduler(
+                tests,
+                self.estimator,
+                workers=workers,
+                longest_first=self.config.schedule == "longest_first",
+                speculative=self.config.speculative,
+                straggler_factor=self.config.straggler_factor
+            )
+            copies: Dict[int, List[asyncio.Task]] = {}
+            finishing: Dict[int, asyncio.Task] = {}
 
-            async def run_with_semaphore(test):
-                """Esegue test con controllo semaforo"""
+            async def browser_phase(item: ScheduledTest):
                 async with semaphore:
-                    return await self._run_single_test(test, chatbot_url, single_turn)
-
-            # Esegui tutti i test con parallelismo controllato
-            print(f"Avvio {len(tests)} test con {self.config.max_workers} worker paralleli...")
+                    self._scheduler.start(item)
+                    return await self._run_single_test(item.test, chatbot_url, single_turn)
+
+            async def worker_loop(worker_id: int):
+                """Esegue test finché il run non è finito (anche rubando o duplicando)"""
+                while not self._scheduler.finished:
+                    item = self._scheduler.next(worker_id)
+                    if item is None:
+                        # Niente in coda: attende un test in ritardo da duplicare o la fine
+                        await asyncio.sleep(0.2)
+                        continue
+
+                    speculative_copy = item.copies > 1
+                    if speculative_copy:
+                        print(f"  Test {item.test.id}: copia speculativa (stima {item.predicted_ms / 1000:.0f}s superata)")
+
+                    task = asyncio.create_task(browser_phase(item))
+                    copies.setdefault(item.index, []).append(task)
+                    await asyncio.wait([task])
+
+                    if task.cancelled():
+                        continue  # L'altra copia ha finito prima
+                    try:
+                        outcome = task.result()
+                    except Exception as e:
+                        print(f"  Test {item.test.id}: EXCEPTION - {e}")
+                        outcome = TestExecution(
+                            test_case=item.test,
+                            conversation=[],
+                            result="ERROR",
+                            duration_ms=0,
+                            notes=f"Exception: {e}"
+                        )
+
+                    if not self._scheduler.complete(item, speculative_copy):
+                        continue
+                    for other in copies[item.index]:
+                        if other is not task:
+                            other.cancel()
+
+                    if isinstance(outcome, PostProcessJob):
+                        # Attende solo se la coda di post-processing è piena
+                        future = await self._pipeline.submit(outcome)
+                        finishing[item.index] = asyncio.create_task(
+                            self._finish_evaluated(future, outcome.metrics)
+                        )
+                    else:
+                        finishing[item.index] = asyncio.create_task(self._finish_test(outcome))
+
+            predicted_s = self._scheduler.predicted_makespan_ms / 1000
+            print(f"Avvio {len(tests)} test con {workers} worker paralleli "
+                  f"(makespan stimato {predicted_s:.0f}s)...")
+            await asyncio.gather(*[worker_loop(w) for w in range(workers)])
+
+            # Risultati nell'ordine originale dei test
             completed_results = await asyncio.gather(
-                *[run_with_semaphore(test) for test in tests],
+                *[finishing[i] for i in range(len(tests))],
                 return_exceptions=True
             )
 
@@ -347,8 +642,22 @@ class ParallelTestRunner:
                     print(f"  Test {tests[i].id}: risultato inatteso - {type(result)}")
 
         finally:
+            await self._pipeline.close()
             await self._pool.shutdown()
 
+        timeline = self._controller.get_timeline() if self._controller else []
+        if self.perf_collector and timeline:
+            self.perf_collector.record_concurrency_timeline(timeline)
+
+        predicted_makespan_ms = int(self._scheduler.predicted_makespan_ms) if self._scheduler else 0
+        actual_makespan_ms = int(self._scheduler.actual_makespan_ms) if self._scheduler else 0
+        if self._scheduler:
+            print(f"Makespan: stimato {predicted_makespan_ms / 1000:.0f}s, reale {actual_makespan_ms / 1000:.0f}s "
+                  f"(furti {self._scheduler.steals}, copie speculative {self._scheduler.speculations}, "
+                  f"vinte {self._scheduler.speculation_wins})")
+            if self.perf_collector:
+                self.perf_collector.record_makespan(predicted_makespan_ms, actual_makespan_ms)
+
         # Calcola statistiche
         duration_ms = int((time.time() - start_time) * 1000)
         passed = sum(1 for r in results if r.result == "PASS")
@@ -365,14 +674,52 @@ class ParallelTestRunner:
             skipped=skipped,
             duration_ms=duration_ms,
             results=results,
-            worker_stats=self._pool.get_stats() if self._pool else {}
+            worker_stats=self._pool.get_stats() if self._pool else {},
+            concurrency_timeline=timeline,
+            predicted_makespan_ms=predicted_makespan_ms,
+            actual_makespan_ms=actual_makespan_ms
         )
 
+    async def _finish_evaluated(self, future: 'asyncio.Future[TestExecution]',
+                                metrics: Optional[TestMetrics] = None) -> TestExecution:
+        """Attende la valutazione dalla pipeline e chiude il test"""
+        result = await future
+        # Compatibilità: in parallelo le note contengono il motivo della valutazione
+        result.notes = (result.llm_evaluation or {}).get('reason', '')
+        return await self._finish_test(result, metrics)
+
+    async def _finish_test(self, result: TestExecution,
+                           metrics: Optional[TestMetrics] = None) -> TestExecution:
+        """Aggiorna progress e notifica un test completato (valutazione inclusa)"""
+        async with self._results_lock:
+            self._completed += 1
+            self.on_progress(self._completed, self._total, result.test_case.id)
+
+        if self.perf_collector:
+            # Metriche della fase browser (reset incluso), se il test ci è arrivato
+            if metrics is None:
+                metrics = TestMetrics(test_id=result.test_case.id)
+            metrics.end_time = datetime.now()
+            metrics.total_duration_ms = result.duration_ms
+            metrics.status = result.result
+            metrics.error_occurred = result.result == "ERROR"
+            self.perf_collector.add_test_metrics(metrics)
+
+        if self.on_test_complete:
+            self.on_test_complete(result)
+
+        return result
+
     async def _run_single_test(self,
                                 test: TestCase,
                                 chatbot_url: str,
-                                single_turn: bool) -> TestExecution:
-        """Esegue un singolo test con retry"""
+                                single_turn: bool) -> Any:
+        """
+        Esegue la fase browser di un test con retry.
+
+        Returns:
+            PostProcessJob da valutare, o TestExecution ERROR se i retry falliscono
+        """
         last_error = None
 
         for attempt in range(self.config.max_retries + 1):
@@ -389,29 +736,23 @@ class ParallelTestRunner:
                 worker.current_test = test.id
 
                 try:
-                    result = await self._execute_test(
+                    job = await self._execute_test(
                         worker, test, chatbot_url, single_turn
                     )
 
                     # Aggiorna statistiche worker
                     worker.tests_completed += 1
+                    await self._record_latency(worker, job)
 
-                    # Progress callback
-                    async with self._results_lock:
-                        self._completed += 1
-                        self.on_progress(self._completed, self._total, test.id)
-
-                    # Test complete callback
-                    if self.on_test_complete:
-                        self.on_test_complete(result)
-
-                    return result
+                    return job
 
                 finally:
                     await self._pool.release(worker)
 
             except Exception as e:
                 last_error = e
+                if self._controller:
+                    await self._controller.record(0, timed_out=True)
 
                 # Calcola delay per retry
                 if attempt < self.config.max_retries:
@@ -429,20 +770,43 @@ class ParallelTestRunner:
             notes=f"Fallito dopo {self.config.max_retries + 1} tentativi: {last_error}"
         )
 
+    async def _record_latency(self, worker: WorkerState, job: PostProcessJob) -> None:
+        """Passa al controller adattivo la latenza dell'ultima risposta del test"""
+        if not self._controller:
+            return
+
+        timed_out = not job.conversation or job.conversation[-1].role != 'assistant'
+        timing = worker.browser.last_response_timing
+        latency_ms = timing.total_ms if timing and timing.total_ms else job.duration_ms
+        decision = await self._controller.record(latency_ms, timed_out=timed_out)
+        if decision and decision.limit != decision.previous:
+            print(f"  Concorrenza: {decision.previous} → {decision.limit} worker ({decision.reason})")
+
     async def _execute_test(self,
                             worker: WorkerState,
                             test: TestCase,
                             chatbot_url: str,
-                            single_turn: bool) -> TestExecution:
-        """Esecuzione effettiva di un test"""
+                            single_turn: bool) -> PostProcessJob:
+        """Fase browser di un test: conversazione, screenshot, HTML e timing"""
         conversation = []
         start_time = time.time()
 
         browser = worker.browser
-
-        # Naviga al chatbot
-        await browser.navigate(chatbot_url)
-        await asyncio.sleep(0.5)
+        metrics = None
+        if self.perf_collector:
+            metrics = TestMetrics(test_id=test.id, environment=self.perf_collector.run_metrics.environment,
+                                  start_time=datetime.now())
+
+        # Pagina già caricata (test precedente o pre-warm): reset veloce
+        if browser.current_url == chatbot_url:
+            reset = await browser.reset_session()
+            if reset and self.perf_collector:
+                self.perf_collector.record_reset(reset.strategy, reset.duration_ms,
+                                                 success=reset.ready, metrics=metrics)
+            if not reset or not reset.ready:
+                await browser.navigate(chatbot_url)
+        else:
+            await browser.navigate(chatbot_url)
 
         # Invia domanda iniziale
         await browser.send_message(test.question)
@@ -473,7 +837,7 @@ class ParallelTestRunner:
                 turn += 1
 
                 # Decidi prossimo messaggio
-                next_msg = self._decide_next(
+                next_msg = await self._decide_next(
                     conversation, remaining_followups, test
                 )
 
@@ -508,7 +872,7 @@ class ParallelTestRunner:
             try:
                 ss_dir = self.report_dir / "screenshots"
                 ss_dir.mkdir(parents=True, exist_ok=True)
-                ss_path = ss_dir / f"{test.id}.png"
+                ss_path = ss_dir / f"{test.id}{getattr(browser, 'screenshot_extension', '.png')}"
 
                 # Usa take_conversation_screenshot se disponibile
                 if hasattr(browser, 'take_conversation_screenshot'):
@@ -525,21 +889,13 @@ class ParallelTestRunner:
             except Exception as e:
                 print(f"  Screenshot error for {test.id}: {e}")
 
-        # LangSmith
-        langsmith_url = ""
-        langsmith_report = ""
-        model_version = ""
-        vector_store = ""
-        if self.langsmith:
+        # HTML per la validazione strutturata (solo con evaluator)
+        html_response = None
+        if self.evaluator:
             try:
-                report = self.langsmith.get_report_for_question(test.question)
-                if report and report.trace_url:
-                    langsmith_url = report.trace_url
-                    langsmith_report = report.format_for_sheets()
-                    model_version = report.get_model_version()
-                    vector_store = report.vector_store
+                html_response = await browser.get_thread_html()
             except Exception as e:
-                print(f"  LangSmith error for {test.id}: {e}")
+                print(f"  HTML error for {test.id}: {e}")
 
         # Timing from browser
         timing_str = ""
@@ -550,16 +906,6 @@ class ParallelTestRunner:
                 total_sec = timing.total_ms / 1000
                 timing_str = f"{ttfr_sec:.1f}s → {total_sec:.1f}s"
 
-        # Valutazione
-        evaluation = {"passed": None, "reason": ""}
-        if self.ollama and conversation:
-            final_response = conversation[-1].content if conversation[-1].role == 'assistant' else ""
-            evaluation = self.ollama.evaluate_test_result(
-                test_case={'question': test.question, 'category': test.category, 'expected': test.expected},
-                conversation=[{'role': t.role, 'content': t.content} for t in conversation],
-                final_response=final_response
-            )
-
         duration_ms = int((time.time() - start_time) * 1000)
 
         # Prompt version from run_config
@@ -567,26 +913,21 @@ class ParallelTestRunner:
         if self.run_config and hasattr(self.run_config, 'prompt_version'):
             prompt_version = self.run_config.prompt_version
 
-        return TestExecution(
-            test_case=test,
+        return PostProcessJob(
+            test=test,
             conversation=conversation,
-            result="PASS" if evaluation.get('passed', False) else "FAIL",
             duration_ms=duration_ms,
             screenshot_path=screenshot_path,
-            notes=evaluation.get('reason', ''),
-            langsmith_url=langsmith_url,
-            langsmith_report=langsmith_report,
-            llm_evaluation=evaluation,
-            model_version=model_version,
-            prompt_version=prompt_version,
+            html_response=html_response,
             timing=timing_str,
-            vector_store=vector_store
+            prompt_version=prompt_version,
+            metrics=metrics
         )
 
-    def _decide_next(self,
-                     conversation: List[ConversationTurn],
-                     followups: List[str],
-                     test: TestCase) -> Optional[str]:
+    async def _decide_next(self,
+                           conversation: List[ConversationTurn],
+                           followups: List[str],
+                           test: TestCase) -> Optional[str]:
         """Decide prossimo messaggio (versione semplificata)"""
         if self.ollama:
             bot_message = ""
@@ -596,7 +937,7 @@ class ParallelTestRunner:
                     break
 
             conv_dicts = [{'role': t.role, 'content': t.content} for t in conversation]
-            return self.ollama.decide_response(
+            return await self.ollama.adecide_response(
                 bot_message=bot_message,
                 conversation=conv_dicts,
                 followups=followups if followups else None,
@@ -637,17 +978,19 @@ class RateLimiter:
         async with self._lock:
             now = time.time()
 
-            # Rimuovi timestamp vecchi (> 1 minuto)
+            # Rimuovi timestamp vecchi (> 1 minuto); restano anche gli slot prenotati nel futuro
             self._timestamps = [t for t in self._timestamps if now - t < 60]
 
+            wait_time = 0.0
             if len(self._timestamps) >= self.max_per_minute:
-                # Attendi che il timestamp piu vecchio scada
-                oldest = self._timestamps[0]
-                wait_time = 60 - (now - oldest) + 0.1
-                if wait_time > 0:
-                    await asyncio.sleep(wait_time)
+                # Primo istante in cui la finestra scende sotto il limite
+                wait_time = max(0.0, self._timestamps[-self.max_per_minute] + 60 - now + 0.1)
+
+            # Prenota lo slot: l'attesa avviene fuori dal lock
+            self._timestamps.append(now + wait_time)
 
-            self._timestamps.append(time.time())
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
 
 
 @dataclass
@@ -0,0 +1,201 @@
+"""
+Pattern Matcher - Riconoscimento compilato dei pattern del Train Mode
+
+Con centinaia di pattern personalizzati, cercare ogni regex su ogni turno
+del bot costa O(pattern × lunghezza messaggio) e satura la cache interna
+di `re` (ricompilazioni continue). Il matcher:
+
+- compila una volta le regex di ogni pattern
+- estrae da ogni regex i letterali obbligatori (es. "country" da
+  r"select.{0,20}country") e li indicizza in un automa Aho-Corasick
+- scansiona il messaggio una sola volta (O(lunghezza messaggio)) per
+  trovare i pattern candidati, e verifica con la regex solo quelli
+
+Le regex senza letterali utili (es. r"\\d+") vengono verificate sempre.
+Il risultato è identico alla scansione sequenziale: il primo pattern,
+in ordine, che matcha il messaggio.
+
+Usage:
+    matcher = PatternMatcher(training.patterns)
+    pattern = matcher.match("Which country are you in?")
+"""
+
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:                         # pragma: no cover - Python 3.10
+    import sre_parse
+
+
+# Letterali più corti non filtrano nulla (quasi ogni messaggio li contiene)
+MIN_LITERAL_LENGTH = 2
+
+_REPEATS = ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT')
+
+
+def _best(current: Optional[Set[str]], candidate: Optional[Set[str]]) -> Optional[Set[str]]:
+    """Sceglie l'insieme di letterali più selettivo (letterale minimo più lungo)"""
+    if not candidate:
+        return current
+    if not current or min(map(len, candidate)) > min(map(len, current)):
+        return candidate
+    return current
+
+
+def _sequence_literals(items) -> Optional[Set[str]]:
+    """
+    Letterali di cui almeno uno compare in ogni match della sequenza.
+
+    Considera i run di LITERAL consecutivi, i gruppi, le ripetizioni
+    obbligatorie (min >= 1) e le alternative (un letterale per ramo).
+    """
+    best: Optional[Set[str]] = None
+    run: List[str] = []
+
+    for op, av in list(items) + [(None, None)]:
+        name = getattr(op, 'name', None)
+        if name == 'LITERAL':
+            run.append(chr(av))
+            continue
+
+        if len(run) >= MIN_LITERAL_LENGTH:
+            best = _best(best, {''.join(run)})
+        run = []
+
+        candidate = None
+        if name == 'SUBPATTERN':
+            add_flags, sub = av[1], av[-1]
+            if not add_flags & re.IGNORECASE:
+                candidate = _sequence_literals(sub)
+        elif name == 'BRANCH':
+            branches = [_sequence_literals(branch) for branch in av[1]]
+            if all(branches):
+                candidate = set().union(*branches)
+        elif name in _REPEATS:
+            low, _, sub = av
+            if low >= 1:
+                candidate = _sequence_literals(sub)
+        best = _best(best, candidate)
+
+    return best
+
+
+def required_literals(regex: str) -> Optional[Set[str]]:
+    """
+    Letterali obbligatori di una regex: ogni match ne contiene almeno uno.
+
+    Returns:
+        Insieme di letterali, o None se la regex va verificata sempre
+        (nessun letterale utile, IGNORECASE, sintassi non analizzabile)
+    """
+    try:
+        parsed = sre_parse.parse(regex)
+    except (re.error, RecursionError):
+        return None
+    if parsed.state.flags & re.IGNORECASE:
+        return None
+    return _sequence_literals(parsed)
+
+
+class AhoCorasick:
+    """Automa Aho-Corasick: tutte le chiavi presenti in un testo in una passata"""
+
+    def __init__(self, keywords: Dict[str, Iterable[int]]):
+        """
+        Args:
+            keywords: letterale -> indici dei pattern che lo richiedono
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[Set[int]] = [set()]
+
+        for word, owners in keywords.items():
+            state = 0
+            for ch in word:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._out.append(set())
+                state = nxt
+            self._out[state].update(owners)
+
+        # Link di fallimento (BFS), output ereditati dal suffisso più lungo
+        self._fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] |= self._out[self._fail[nxt]]
+
+        self._outputs: List[FrozenSet[int]] = [frozenset(o) for o in self._out]
+        del self._out
+
+    def search(self, text: str) -> Set[int]:
+        """Indici dei pattern con almeno un letterale presente nel testo"""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        found: Set[int] = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if outputs[state]:
+                found |= outputs[state]
+        return found
+
+
+def compile_patterns(regexes: Sequence[str], owner: str = "") -> Tuple['re.Pattern', ...]:
+    """Compila le regex di un pattern, saltando (con avviso) quelle non valide"""
+    compiled = []
+    for regex in regexes:
+        try:
+            compiled.append(re.compile(regex))
+        except re.error as e:
+            print(f"! Regex non valida nel pattern {owner or '?'}: {regex!r} ({e})")
+    return tuple(compiled)
+
+
+class PatternMatcher:
+    """
+    Matcher compilato per una lista di Pattern (vedi training.Pattern).
+
+    Costruito una volta per la lista; va ricostruito se cambiano i pattern
+    o le loro bot_patterns.
+    """
+
+    def __init__(self, patterns: Sequence):
+        self.patterns = list(patterns)
+        self._regexes = [p.compiled_patterns() for p in self.patterns]
+
+        keywords: Dict[str, Set[int]] = {}
+        always: List[int] = []
+        for index, pattern in enumerate(self.patterns):
+            literals = [required_literals(regex) for regex in pattern.bot_patterns]
+            if not literals or not all(literals):
+                always.append(index)
+                continue
+            for word in set().union(*literals):
+                keywords.setdefault(word, set()).add(index)
+
+        self._always: FrozenSet[int] = frozenset(always)
+        self._automaton = AhoCorasick(keywords)
+
+    def candidates(self, message: str) -> List[int]:
+        """Indici (in ordine) dei pattern che potrebbero matchare il messaggio"""
+        return sorted(self._automaton.search(message) | self._always)
+
+    def match(self, bot_message: str) -> Optional[object]:
+        """Primo pattern, in ordine, che matcha il messaggio del bot"""
+        msg_lower = bot_message.lower()
+        for index in self.candidates(msg_lower):
+            if any(regex.search(msg_lower) for regex in self._regexes[index]):
+                return self.patterns[index]
+        return None
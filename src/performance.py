@@ -22,6 +22,7 @@ from enum import Enum
 class MetricPhase(Enum):
     """Fasi di esecuzione di un test"""
     SETUP = "setup"
+    RESET = "reset"
     SEND_QUESTION = "send_question"
     WAIT_RESPONSE = "wait_response"
     SCREENSHOT = "screenshot"
@@ -49,7 +50,7 @@ class PhaseMetric:
 @dataclass
 class ExternalServiceMetric:
     """Metrica per un servizio esterno"""
-    service: str  # chatbot, google_sheets, langsmith
+    service: str  # chatbot, google_sheets, langsmith, cache
     operation: str  # send, write, trace
     duration_ms: float
     success: bool = True
@@ -155,6 +156,21 @@ class RunMetrics:
     sheets_avg_latency_ms: float = 0
     langsmith_avg_latency_ms: float = 0
 
+    # Cache (lookup registrati come service "cache", operation "<nome>.hit|miss")
+    cache_lookups: int = 0
+    cache_hit_ratio: float = 0
+
+    # Reset sessione tra test (service "browser", operation "reset.<strategia>")
+    reset_avg_ms: float = 0
+    reset_strategies: Dict[str, int] = field(default_factory=dict)
+
+    # Concorrenza adattiva: decisioni del controller (vedi concurrency.ConcurrencyDecision)
+    concurrency_timeline: List[Dict[str, Any]] = field(default_factory=list)
+
+    # Scheduling parallelo: makespan della fase browser stimato vs reale
+    predicted_makespan_ms: float = 0
+    actual_makespan_ms: float = 0
+
     def calculate_aggregates(self):
         """Calcola tutte le metriche aggregate"""
         if not self.test_metrics:
@@ -192,6 +208,10 @@ class RunMetrics:
         chatbot_ttfr = []
         sheets_latencies = []
         langsmith_latencies = []
+        cache_hits = 0
+        cache_lookups = 0
+        reset_durations = []
+        reset_strategies: Dict[str, int] = {}
 
         for t in self.test_metrics:
             for s in t.external_services:
@@ -204,11 +224,23 @@ class RunMetrics:
                     sheets_latencies.append(s.duration_ms)
                 elif s.service == "langsmith":
                     langsmith_latencies.append(s.duration_ms)
+                elif s.service == "cache":
+                    cache_lookups += 1
+                    if s.operation.endswith(".hit"):
+                        cache_hits += 1
+                elif s.service == "browser" and s.operation.startswith("reset."):
+                    reset_durations.append(s.duration_ms)
+                    strategy = s.operation.split(".", 1)[1]
+                    reset_strategies[strategy] = reset_strategies.get(strategy, 0) + 1
 
         self.chatbot_avg_latency_ms = statistics.mean(chatbot_latencies) if chatbot_latencies else 0
         self.chatbot_ttfr_avg_ms = statistics.mean(chatbot_ttfr) if chatbot_ttfr else 0
         self.sheets_avg_latency_ms = statistics.mean(sheets_latencies) if sheets_latencies else 0
         self.langsmith_avg_latency_ms = statistics.mean(langsmith_latencies) if langsmith_latencies else 0
+        self.cache_lookups = cache_lookups
+        self.cache_hit_ratio = cache_hits / cache_lookups if cache_lookups else 0
+        self.reset_avg_ms = statistics.mean(reset_durations) if reset_durations else 0
+        self.reset_strategies = reset_strategies
 
 
 @dataclass
@@ -292,6 +324,37 @@ class PerformanceCollector:
                 error=error
             )
 
+    def record_reset(self, strategy: str, duration_ms: float, success: bool = True,
+                     metrics: Optional[TestMetrics] = None):
+        """
+        Registra il reset sessione prima del test (fase + strategia usata)
+
+        Args:
+            metrics: Metriche del test (runner paralleli), default il test corrente
+        """
+        target = metrics if metrics is not None else self._current_test
+        if target:
+            target.add_phase(MetricPhase.RESET.value, duration_ms, success=success)
+            target.add_service_call(
+                service="browser",
+                operation=f"reset.{strategy}",
+                duration_ms=duration_ms,
+                success=success
+            )
+
+    def add_test_metrics(self, metrics: TestMetrics):
+        """Aggiunge metriche di un test già chiuso (runner paralleli)"""
+        self.run_metrics.test_metrics.append(metrics)
+
+    def record_concurrency_timeline(self, timeline: List[Dict[str, Any]]):
+        """Registra la serie temporale del limite di concorrenza"""
+        self.run_metrics.concurrency_timeline = list(timeline)
+
+    def record_makespan(self, predicted_ms: float, actual_ms: float):
+        """Registra makespan stimato e reale di un run parallelo"""
+        self.run_metrics.predicted_makespan_ms = predicted_ms
+        self.run_metrics.actual_makespan_ms = actual_ms
+
     def record_retry(self):
         """Registra un retry"""
         if self._current_test:
@@ -308,8 +371,8 @@ class PerformanceCollector:
             self._current_test.error_occurred = True
             self._current_test.error_message = message
 
-    def end_test(self, status: str):
-        """Termina raccolta metriche per un test"""
+    def end_test(self, status: str) -> Optional[TestMetrics]:
+        """Termina raccolta metriche per un test (ritorna le metriche chiuse)"""
         if self._current_test:
             self._current_test.end_time = datetime.now()
             self._current_test.status = status
@@ -320,7 +383,9 @@ class PerformanceCollector:
                 self._current_test.total_duration_ms = delta.total_seconds() * 1000
 
             self.run_metrics.test_metrics.append(self._current_test)
-            self._current_test = None
+            metrics, self._current_test = self._current_test, None
+            return metrics
+        return None
 
     def finalize(self) -> RunMetrics:
         """Finalizza e calcola aggregati"""
@@ -379,6 +444,9 @@ class PerformanceReporter:
         lines.append(f"   Durata totale: {self._format_duration(self.metrics.total_duration_ms)}")
         lines.append(f"   Media per test: {self._format_duration(self.metrics.avg_test_duration_ms)}")
         lines.append(f"   Min/Max: {self._format_duration(self.metrics.min_test_duration_ms)} / {self._format_duration(self.metrics.max_test_duration_ms)}")
+        if self.metrics.actual_makespan_ms > 0:
+            lines.append(f"   Makespan: {self._format_duration(self.metrics.actual_makespan_ms)} "
+                         f"(stimato {self._format_duration(self.metrics.predicted_makespan_ms)})")
         lines.append("")
 
         # Breakdown per fase
@@ -415,6 +483,31 @@ class PerformanceReporter:
             lines.append(f"   LangSmith: {self._format_duration(self.metrics.langsmith_avg_latency_ms)}")
         lines.append("")
 
+        # Cache
+        if self.metrics.cache_lookups > 0:
+            lines.append("💾 CACHE")
+            lines.append(f"   Lookup: {self.metrics.cache_lookups}")
+            lines.append(f"   Hit ratio: {self.metrics.cache_hit_ratio:.1%}")
+            lines.append("")
+
+        # Concorrenza adattiva
+        if self.metrics.concurrency_timeline:
+            limits = [d['limit'] for d in self.metrics.concurrency_timeline]
+            lines.append("🎚️ CONCORRENZA ADATTIVA")
+            lines.append(f"   Worker: {limits[0]} → {limits[-1]} (max {max(limits)})")
+            for d in self.metrics.concurrency_timeline[1:]:
+                p50 = self._format_duration(d['p50_ms']) if d.get('p50_ms') else "-"
+                lines.append(f"     • {d['elapsed_s']:>6.0f}s  {d['previous']} → {d['limit']}  {d['reason']} (p50 {p50})")
+            lines.append("")
+
+        # Reset sessione
+        if self.metrics.reset_strategies:
+            used = ", ".join(f"{k} {v}x" for k, v in sorted(self.metrics.reset_strategies.items()))
+            lines.append("🔄 RESET SESSIONE")
+            lines.append(f"   Media: {self._format_duration(self.metrics.reset_avg_ms)}")
+            lines.append(f"   Strategie: {used}")
+            lines.append("")
+
         lines.append(f"{'='*60}")
 
         return "\n".join(lines)
@@ -469,6 +562,7 @@ class PerformanceReporter:
                     <div class="metric-value">{self._format_duration(self.metrics.avg_test_duration_ms)}</div>
                     <div class="metric-label">Media per Test</div>
                 </div>
+                {self._generate_makespan_metric()}
             </div>
 
             <div class="card">
@@ -531,6 +625,8 @@ class PerformanceReporter:
             <h2>📈 Breakdown per Fase</h2>
             {self._generate_phase_chart()}
         </div>
+
+        {self._generate_concurrency_card()}
     </div>
 </body>
 </html>
@@ -581,6 +677,52 @@ class PerformanceReporter:
             """)
         return "\n".join(bars)
 
+    def _generate_makespan_metric(self) -> str:
+        """Makespan reale vs stimato (solo run paralleli)"""
+        if self.metrics.actual_makespan_ms <= 0:
+            return ""
+        return f"""
+                <div class="metric">
+                    <div class="metric-value">{self._format_duration(self.metrics.actual_makespan_ms)}</div>
+                    <div class="metric-label">Makespan (stimato {self._format_duration(self.metrics.predicted_makespan_ms)})</div>
+                </div>
+"""
+
+    def _generate_concurrency_card(self) -> str:
+        """Genera card con la serie temporale della concorrenza adattiva"""
+        timeline = self.metrics.concurrency_timeline
+        if not timeline:
+            return ""
+
+        max_limit = max(d['limit'] for d in timeline) or 1
+        rows = []
+        for d in timeline:
+            pct = d['limit'] / max_limit * 100
+            p50 = self._format_duration(d['p50_ms']) if d.get('p50_ms') else "-"
+            rows.append(f"""
+                <tr>
+                    <td>{d['elapsed_s']:.0f}s</td>
+                    <td style="width: 40%"><div class="bar"><div class="bar-fill" style="width: {pct}%"></div></div></td>
+                    <td>{d['limit']}</td>
+                    <td>{d['reason']}</td>
+                    <td>{p50}</td>
+                    <td>{d.get('timeout_rate', 0):.0%}</td>
+                </tr>
+            """)
+        return f"""
+        <div class="card">
+            <h2>🎚️ Concorrenza Adattiva</h2>
+            <table>
+                <thead>
+                    <tr><th>Tempo</th><th></th><th>Worker</th><th>Motivo</th><th>p50</th><th>Timeout</th></tr>
+                </thead>
+                <tbody>
+                    {"".join(rows)}
+                </tbody>
+            </table>
+        </div>
+"""
+
     def _calculate_phase_stats(self) -> Dict[str, Dict[str, float]]:
         """Calcola statistiche per fase"""
         phase_durations: Dict[str, List[float]] = {}
@@ -732,6 +874,12 @@ class PerformanceHistory:
             chatbot_ttfr_avg_ms=data.get('chatbot_ttfr_avg_ms', 0),
             sheets_avg_latency_ms=data.get('sheets_avg_latency_ms', 0),
             langsmith_avg_latency_ms=data.get('langsmith_avg_latency_ms', 0),
+            cache_lookups=data.get('cache_lookups', 0),
+            cache_hit_ratio=data.get('cache_hit_ratio', 0),
+            reset_avg_ms=data.get('reset_avg_ms', 0),
+            reset_strategies=data.get('reset_strategies', {}),
+            predicted_makespan_ms=data.get('predicted_makespan_ms', 0),
+            actual_makespan_ms=data.get('actual_makespan_ms', 0),
         )
 
         # Parse dates
@@ -6,18 +6,30 @@ Handles:
 - CSV export for analysis
 - Summary JSON with run metadata
 - Results aggregation
+
+Results are appended to the run journal (journal.jsonl) as they arrive,
+so a crashed or resumed run keeps everything already executed; reports
+are a single streaming pass over the journal. HTML rows are streamed to
+disk and conversations are loaded by the page only when expanded, so
+memory stays flat however many tests the run has.
 """
 
 import csv
+import html
 import json
+import shutil
+import tempfile
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, TextIO
 from datetime import datetime
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from collections import Counter
 
 
 from .models import TestResult
+from .journal import RunJournal
+from .html_report import LAZY_CSS, PAGER_HTML, LazyItemWriter, lazy_script
+from .history import RunHistoryStore, journal_fingerprint, run_dir_number
 
 
 @dataclass
@@ -38,6 +50,32 @@ class RunSummary:
     categories: Dict[str, Dict[str, int]]  # {category: {passed, failed}}
 
 
+@dataclass
+class _RunTotals:
+    """Running statistics folded over the results"""
+    esiti: Counter = field(default_factory=Counter)
+    categories: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    total: int = 0
+    duration_sum: int = 0
+    duration_count: int = 0
+
+    def add(self, r: TestResult) -> None:
+        self.total += 1
+        self.esiti[r.result.upper()] += 1
+
+        cat = r.category or 'uncategorized'
+        stats = self.categories.setdefault(cat, {'passed': 0, 'failed': 0, 'total': 0})
+        stats['total'] += 1
+        if r.result.upper() == 'PASS':
+            stats['passed'] += 1
+        elif r.result.upper() == 'FAIL':
+            stats['failed'] += 1
+
+        if r.duration_ms > 0:
+            self.duration_sum += r.duration_ms
+            self.duration_count += 1
+
+
 class ReportGenerator:
     """
     Local report generator.
@@ -47,6 +85,7 @@ class ReportGenerator:
     - Excel-compatible CSV export
     - Summary JSON for automation
     - Statistics by category
+    - Crash-safe: results go to the run journal immediately
 
     Usage:
         generator = ReportGenerator(output_dir)
@@ -54,10 +93,30 @@ class ReportGenerator:
         generator.generate()
     """
 
+    # Expanded conversation: plain text, one <br> per line (never parsed as HTML)
+    RENDER_JS = """
+        LazyReport.render = function (details, target) {
+            (details.conversation || '').split('\\n').forEach((line, i) => {
+                if (i) target.appendChild(document.createElement('br'));
+                target.appendChild(document.createTextNode(line));
+            });
+        };
+"""
+
+    CSV_FIELDS = [
+        'test_id', 'date', 'mode', 'category', 'question',
+        'result', 'duration_ms', 'followups_count', 'notes',
+        'conversation', 'screenshot_path', 'langsmith_url',
+        'prompt_version', 'model_version', 'environment'
+    ]
+
     def __init__(self, output_dir: Path, project_name: str = ""):
         """
         Initialize the generator.
 
+        Results already in the run journal (previous session of the same
+        run) are included in the generated reports.
+
         Args:
             output_dir: Output directory (e.g., reports/project/run_001)
             project_name: Project name
@@ -70,8 +129,8 @@ class ReportGenerator:
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.screenshots_dir.mkdir(exist_ok=True)
 
-        # Results
-        self.results: List[TestResult] = []
+        # Results (append-only journal)
+        self.journal = RunJournal(self.output_dir / RunJournal.FILENAME)
 
         # Timing
         self.start_time = datetime.utcnow()
@@ -81,6 +140,11 @@ class ReportGenerator:
         self.mode = ""
         self.run_number = self._extract_run_number()
 
+    @property
+    def results(self) -> List[TestResult]:
+        """All results in the journal (one per test)"""
+        return list(self.journal.iter_results())
+
     def _extract_run_number(self) -> int:
         """Extract run number from path"""
         try:
@@ -92,8 +156,8 @@ class ReportGenerator:
         return 0
 
     def add_result(self, result: TestResult) -> None:
-        """Add a result"""
-        self.results.append(result)
+        """Add a result (written to the journal immediately)"""
+        self.journal.record_result(result)
 
         # Set mode from first run
         if not self.mode and result.mode:
@@ -106,41 +170,63 @@ class ReportGenerator:
 
     def generate(self) -> Dict[str, Path]:
         """
-        Generate all reports.
+        Generate all reports in one pass over the journal.
 
         Returns:
             Dict with paths: {html, csv, summary}
         """
         self.end_time = datetime.utcnow()
+        self.journal.flush()
+
+        totals = _RunTotals()
+
+        # Le righe HTML vanno su un file temporaneo: l'header (statistiche)
+        # si conosce solo a fine passata
+        csv_path = self.output_dir / "report.csv"
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f, \
+                tempfile.TemporaryFile('w+', encoding='utf-8', dir=self.output_dir) as rows:
+            writer = csv.DictWriter(f, fieldnames=self.CSV_FIELDS)
+            writer.writeheader()
+            html_rows = LazyItemWriter(rows)
+
+            for r in self.journal.iter_results():
+                if not self.mode and r.mode:
+                    self.mode = r.mode
+                totals.add(r)
+                writer.writerow(self._csv_row(r))
+                html_rows.add(lambda idx, r=r: self._html_row(r, idx), {'conversation': r.conversation})
+
+            html_rows.close()
+            rows.seek(0)
+            html_path = self._generate_html(totals, rows)
 
         paths = {
-            'html': self._generate_html(),
-            'csv': self._generate_csv(),
-            'summary': self._generate_summary()
+            'html': html_path,
+            'csv': csv_path,
+            'summary': self._generate_summary(totals)
         }
 
+        self._update_history()
+
         return paths
 
-    def _generate_summary(self) -> Path:
+    def _update_history(self) -> None:
+        """Upsert this run into the project's run history (reports/<project>/history.sqlite)"""
+        if not self.run_number:
+            return
+        try:
+            store = RunHistoryStore(self.output_dir.parent / RunHistoryStore.FILENAME)
+            try:
+                store.ingest_results(self.run_number, self.journal.iter_results(), "local",
+                                     journal_fingerprint(self.output_dir))
+            finally:
+                store.close()
+        except Exception as e:
+            print(f"! Run history not updated: {e}")
+
+    def _generate_summary(self, totals: _RunTotals) -> Path:
         """Generate summary JSON"""
-        # Calculate statistics
-        esiti = Counter(r.result.upper() for r in self.results)
-
-        # Statistics by category
-        categories: Dict[str, Dict[str, int]] = {}
-        for r in self.results:
-            cat = r.category or 'uncategorized'
-            if cat not in categories:
-                categories[cat] = {'passed': 0, 'failed': 0, 'total': 0}
-            categories[cat]['total'] += 1
-            if r.result.upper() == 'PASS':
-                categories[cat]['passed'] += 1
-            elif r.result.upper() == 'FAIL':
-                categories[cat]['failed'] += 1
-
-        # Average response time
-        durations = [r.duration_ms for r in self.results if r.duration_ms > 0]
-        avg_duration = int(sum(durations) / len(durations)) if durations else 0
+        avg_duration = int(totals.duration_sum / totals.duration_count) if totals.duration_count else 0
 
         summary = RunSummary(
             run_number=self.run_number,
@@ -148,14 +234,14 @@ class ReportGenerator:
             start_time=self.start_time.isoformat(),
             end_time=self.end_time.isoformat() if self.end_time else "",
             mode=self.mode,
-            total_tests=len(self.results),
-            passed=esiti.get('PASS', 0),
-            failed=esiti.get('FAIL', 0),
-            skipped=esiti.get('SKIP', 0),
-            errors=esiti.get('ERROR', 0),
+            total_tests=totals.total,
+            passed=totals.esiti.get('PASS', 0),
+            failed=totals.esiti.get('FAIL', 0),
+            skipped=totals.esiti.get('SKIP', 0),
+            errors=totals.esiti.get('ERROR', 0),
             duration_seconds=int((self.end_time - self.start_time).total_seconds()) if self.end_time else 0,
             avg_response_time_ms=avg_duration,
-            categories=categories
+            categories=totals.categories
         )
 
         path = self.output_dir / "summary.json"
@@ -164,49 +250,71 @@ class ReportGenerator:
 
         return path
 
-    def _generate_csv(self) -> Path:
-        """Generate CSV report"""
-        path = self.output_dir / "report.csv"
-
-        fieldnames = [
-            'test_id', 'date', 'mode', 'category', 'question',
-            'result', 'duration_ms', 'followups_count', 'notes',
-            'conversation', 'screenshot_path', 'langsmith_url',
-            'prompt_version', 'model_version', 'environment'
-        ]
-
-        with open(path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-
-            for r in self.results:
-                writer.writerow({
-                    'test_id': r.test_id,
-                    'date': r.date,
-                    'mode': r.mode,
-                    'category': r.category,
-                    'question': r.question,
-                    'result': r.result,
-                    'duration_ms': r.duration_ms,
-                    'followups_count': r.followups_count,
-                    'notes': r.notes,
-                    'conversation': r.conversation[:1000],  # Truncate
-                    'screenshot_path': r.screenshot_path or "",
-                    'langsmith_url': r.langsmith_url,
-                    'prompt_version': r.prompt_version,
-                    'model_version': r.model_version,
-                    'environment': r.environment
-                })
+    @staticmethod
+    def _csv_row(r: TestResult) -> Dict[str, Any]:
+        """CSV row for a result"""
+        return {
+            'test_id': r.test_id,
+            'date': r.date,
+            'mode': r.mode,
+            'category': r.category,
+            'question': r.question,
+            'result': r.result,
+            'duration_ms': r.duration_ms,
+            'followups_count': r.followups_count,
+            'notes': r.notes,
+            'conversation': r.conversation[:1000],  # Truncate
+            'screenshot_path': r.screenshot_path or "",
+            'langsmith_url': r.langsmith_url,
+            'prompt_version': r.prompt_version,
+            'model_version': r.model_version,
+            'environment': r.environment
+        }
 
-        return path
+    @staticmethod
+    def _html_row(r: TestResult, idx: int) -> str:
+        """HTML table row for a result (the conversation is loaded on expand)"""
+        esito_class = {
+            'PASS': 'pass',
+            'FAIL': 'fail',
+            'SKIP': 'skip',
+            'ERROR': 'error'
+        }.get(r.result.upper(), '')
+
+        # Screenshot link
+        screenshot_html = ""
+        if r.screenshot_path:
+            screenshot_html = f'<a href="{html.escape(r.screenshot_path)}" target="_blank">[img]</a>'
+
+        # LangSmith link
+        langsmith_html = ""
+        if r.langsmith_url:
+            langsmith_html = f'<a href="{html.escape(r.langsmith_url)}" target="_blank">[trace]</a>'
+
+        conversation_html = ""
+        if r.conversation:
+            conversation_html = '<button type="button" data-expand="Nascondi">Mostra</button><div class="lazy-body"></div>'
+
+        category = html.escape(r.category)
+        return f"""
+            <tr class="{esito_class}" data-idx="{idx}" data-category="{category}" data-esito="{r.result.upper()}">
+                <td>{html.escape(r.test_id)}</td>
+                <td>{category}</td>
+                <td class="question">{html.escape(r.question)}</td>
+                <td class="esito {esito_class}">{html.escape(r.result)}</td>
+                <td>{r.duration_ms}ms</td>
+                <td class="icons">{screenshot_html} {langsmith_html}</td>
+                <td class="notes">{html.escape(r.notes)}</td>
+                <td class="conversation">{conversation_html}</td>
+            </tr>
+            """
 
-    def _generate_html(self) -> Path:
-        """Generate interactive HTML report"""
+    def _generate_html(self, totals: _RunTotals, rows: TextIO) -> Path:
+        """Generate interactive HTML report around the streamed rows"""
         # Statistics for header
-        esiti = Counter(r.result.upper() for r in self.results)
-        total = len(self.results)
-        passed = esiti.get('PASS', 0)
-        failed = esiti.get('FAIL', 0)
+        total = totals.total
+        passed = totals.esiti.get('PASS', 0)
+        failed = totals.esiti.get('FAIL', 0)
         pass_rate = (passed / total * 100) if total > 0 else 0
 
         # Run duration
@@ -217,52 +325,13 @@ class ReportGenerator:
             secs = secs % 60
             duration = f"{mins}m {secs}s"
 
-        # Generate table rows
-        rows_html = ""
-        for r in self.results:
-            esito_class = {
-                'PASS': 'pass',
-                'FAIL': 'fail',
-                'SKIP': 'skip',
-                'ERROR': 'error'
-            }.get(r.result.upper(), '')
-
-            # Format conversation (escape HTML)
-            conv_escaped = (r.conversation
-                .replace('&', '&amp;')
-                .replace('<', '&lt;')
-                .replace('>', '&gt;')
-                .replace('\n', '<br>')
-            )
-
-            # Screenshot link
-            screenshot_html = ""
-            if r.screenshot_path:
-                screenshot_html = f'<a href="{r.screenshot_path}" target="_blank">[img]</a>'
-
-            # LangSmith link
-            langsmith_html = ""
-            if r.langsmith_url:
-                langsmith_html = f'<a href="{r.langsmith_url}" target="_blank">[trace]</a>'
-
-            rows_html += f"""
-            <tr class="{esito_class}" data-category="{r.category}" data-esito="{r.result.upper()}">
-                <td>{r.test_id}</td>
-                <td>{r.category}</td>
-                <td class="question">{r.question}</td>
-                <td class="esito {esito_class}">{r.result}</td>
-                <td>{r.duration_ms}ms</td>
-                <td class="icons">{screenshot_html} {langsmith_html}</td>
-                <td class="notes">{r.notes}</td>
-                <td class="conversation">{conv_escaped}</td>
-            </tr>
-            """
-
         # Categories for filter
-        categories = sorted(set(r.category for r in self.results if r.category))
-        categories_options = "\n".join(f'<option value="{c}">{c}</option>' for c in categories)
+        categories = sorted(c for c in totals.categories if c != 'uncategorized')
+        categories_options = "\n".join(
+            f'<option value="{html.escape(c)}">{html.escape(c)}</option>' for c in categories
+        )
 
-        html = f"""<!DOCTYPE html>
+        head = f"""<!DOCTYPE html>
 <html lang="it">
 <head>
     <meta charset="UTF-8">
@@ -419,7 +488,7 @@ class ReportGenerator:
             margin-right: 5px;
         }}
 
-        tr.hidden {{ display: none; }}
+        .conversation button {{ font-size: 0.8rem; }}
 
         @media (max-width: 768px) {{
             .stats {{ flex-direction: column; }}
@@ -427,6 +496,7 @@ class ReportGenerator:
             table {{ font-size: 0.85rem; }}
             td, th {{ padding: 8px; }}
         }}
+{LAZY_CSS}
     </style>
 </head>
 <body>
@@ -487,34 +557,29 @@ class ReportGenerator:
                 </tr>
             </thead>
             <tbody id="resultsBody">
-                {rows_html}
+"""
+
+        tail = f"""
             </tbody>
         </table>
+{PAGER_HTML}
     </div>
-
+{lazy_script(self.RENDER_JS)}
     <script>
         const filterEsito = document.getElementById('filterEsito');
         const filterCategory = document.getElementById('filterCategory');
         const searchText = document.getElementById('searchText');
-        const rows = document.querySelectorAll('#resultsBody tr');
 
         function applyFilters() {{
             const esito = filterEsito.value;
             const category = filterCategory.value;
             const search = searchText.value.toLowerCase();
 
-            rows.forEach(row => {{
-                const rowEsito = row.dataset.result;
-                const rowCategory = row.dataset.category;
-                const rowText = row.textContent.toLowerCase();
-
-                let show = true;
-
-                if (esito && rowEsito !== esito) show = false;
-                if (category && rowCategory !== category) show = false;
-                if (search && !rowText.includes(search)) show = false;
-
-                row.classList.toggle('hidden', !show);
+            LazyReport.filter(row => {{
+                if (esito && row.dataset.esito !== esito) return false;
+                if (category && row.dataset.category !== category) return false;
+                if (search && !row.textContent.toLowerCase().includes(search)) return false;
+                return true;
             }});
         }}
 
@@ -527,13 +592,24 @@ class ReportGenerator:
 
         path = self.output_dir / "report.html"
         with open(path, 'w', encoding='utf-8') as f:
-            f.write(html)
+            f.write(head)
+            shutil.copyfileobj(rows, f)
+            f.write(tail)
 
         return path
 
-    def get_screenshot_path(self, test_id: str) -> Path:
-        """Return path to save screenshot for a test"""
-        return self.screenshots_dir / f"{test_id}.png"
+    def get_screenshot_path(self, test_id: str, extension: str = ".png") -> Path:
+        """Return path to save screenshot for a test (extension follows the encoding)"""
+        return self.screenshots_dir / f"{test_id}{extension}"
+
+
+def _load_summary(run_dir: Path) -> Optional[Dict[str, Any]]:
+    """summary.json of a run directory (None if missing or unreadable)"""
+    try:
+        with open(run_dir / "summary.json") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
 
 
 def aggregate_reports(reports_dir: Path, project_name: str) -> Dict[str, Any]:
@@ -547,36 +623,59 @@ def aggregate_reports(reports_dir: Path, project_name: str) -> Dict[str, Any]:
     Returns:
         Aggregated statistics
     """
-    runs = []
-
+    # Runs new or changed since the last call are imported; totals are one query.
+    # The store also holds runs read from Sheets: only local ones count here.
+    store = RunHistoryStore(reports_dir / RunHistoryStore.FILENAME)
+    try:
+        store.sync_local_runs(reports_dir)
+        runs = store.run_totals("local")
+    finally:
+        store.close()
+
+    # Runs with only a summary.json (no journal or per-test results)
+    known = {r['run'] for r in runs}
     for run_dir in sorted(reports_dir.iterdir()):
-        if not run_dir.is_dir() or not run_dir.name.startswith('run_'):
+        run = run_dir_number(run_dir)
+        if run is None or run in known:
             continue
-
-        summary_file = run_dir / "summary.json"
-        if summary_file.exists():
-            with open(summary_file) as f:
-                runs.append(json.load(f))
+        summary = _load_summary(run_dir)
+        if summary:
+            runs.append({
+                'run': run,
+                'total': summary.get('total_tests', 0),
+                'passed': summary.get('passed', 0),
+                'failed': summary.get('failed', 0),
+                'date': (summary.get('start_time') or '')[:10]
+            })
+    runs.sort(key=lambda r: r['run'])
 
     if not runs:
         return {'error': 'No runs found'}
 
     # Calculate trend
-    total_tests = sum(r['total_tests'] for r in runs)
+    total_tests = sum(r['total'] for r in runs)
     total_passed = sum(r['passed'] for r in runs)
 
+    last = runs[-1]
+    latest_run = _load_summary(reports_dir / f"run_{last['run']:03d}") or {
+        'run_number': last['run'],
+        'total_tests': last['total'],
+        'passed': last['passed'],
+        'failed': last['failed'],
+    }
+
     return {
         'project': project_name,
         'total_runs': len(runs),
         'total_tests': total_tests,
         'total_passed': total_passed,
         'overall_pass_rate': (total_passed / total_tests * 100) if total_tests > 0 else 0,
-        'latest_run': runs[-1] if runs else None,
+        'latest_run': latest_run,
         'trend': [
             {
-                'run': r['run_number'],
-                'date': r['start_time'][:10],
-                'pass_rate': (r['passed'] / r['total_tests'] * 100) if r['total_tests'] > 0 else 0
+                'run': r['run'],
+                'date': r['date'],
+                'pass_rate': (r['passed'] / r['total'] * 100) if r['total'] > 0 else 0
             }
             for r in runs[-10:]  # Last 10 runs
         ]
@@ -0,0 +1,289 @@
+"""
+Test Scheduling - Ordinamento longest-first e work stealing
+
+Riduce il makespan dei run paralleli:
+- DurationEstimator stima la durata di ogni test dallo storico
+  (metriche performance salvate e report.csv dei run precedenti)
+- WorkStealingScheduler assegna i test ai worker con LPT (longest
+  processing time first); un worker senza lavoro ruba dalla coda del
+  worker più carico e, a code vuote, duplica il test più in ritardo
+  rispetto alla stima (esecuzione speculativa, vince la prima copia)
+
+Usage:
+    estimator = DurationEstimator.from_history(project.name, Path("reports"))
+    scheduler = WorkStealingScheduler(tests, estimator, workers=4)
+
+    item = scheduler.next(worker_id)      # None: niente da fare ora
+    scheduler.start(item)                 # slot acquisito, parte davvero
+    ...
+    if scheduler.complete(item):          # False: un'altra copia ha già finito
+        ...
+"""
+
+import csv
+import heapq
+import json
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Deque, Dict, List, Optional
+
+from .models import TestCase
+
+
+class DurationEstimator:
+    """
+    Stima la durata di un test (ms).
+
+    Priorità:
+    1. Mediana delle durate passate dello stesso test ID
+    2. Turni del test (domanda + followup) x mediana per turno dei test noti
+    3. Turni x default_turn_ms
+    """
+
+    def __init__(self, durations: Optional[Dict[str, List[float]]] = None,
+                 default_turn_ms: float = 15000):
+        """
+        Args:
+            durations: test_id -> durate osservate in ms
+            default_turn_ms: Durata per turno senza storico
+        """
+        self.durations = durations or {}
+        self.default_turn_ms = default_turn_ms
+        self._per_turn_ms: Optional[float] = None
+
+    @classmethod
+    def from_history(cls, project: str, reports_dir: Path, last_runs: int = 10) -> 'DurationEstimator':
+        """
+        Carica le durate dagli ultimi run del progetto.
+
+        Legge i performance_*.json (storico e cartelle run) e, per i run
+        senza metriche, i report.csv.
+
+        Args:
+            project: Nome progetto
+            reports_dir: Directory radice dei report (reports/)
+            last_runs: Run più recenti da considerare per sorgente
+        """
+        project_dir = Path(reports_dir) / project
+        durations: Dict[str, List[float]] = {}
+
+        def add(test_id: str, value) -> None:
+            try:
+                duration = float(value)
+            except (TypeError, ValueError):
+                return
+            if test_id and duration > 0:
+                durations.setdefault(test_id, []).append(duration)
+
+        if not project_dir.exists():
+            return cls(durations)
+
+        perf_files = sorted(project_dir.glob("**/performance_*.json"),
+                            key=lambda p: p.stat().st_mtime, reverse=True)[:last_runs]
+        for path in perf_files:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                for test in data.get('test_metrics', []):
+                    add(test.get('test_id', ''), test.get('total_duration_ms'))
+            except Exception:
+                continue
+
+        csv_files = sorted(project_dir.glob("run_*/report.csv"),
+                           key=lambda p: p.stat().st_mtime, reverse=True)[:last_runs]
+        for path in csv_files:
+            if (path.parent / "performance").exists():
+                continue  # Già coperto dalle metriche performance
+            try:
+                with open(path, 'r', encoding='utf-8', newline='') as f:
+                    for row in csv.DictReader(f):
+                        add(row.get('test_id', ''), row.get('duration_ms'))
+            except Exception:
+                continue
+
+        return cls(durations)
+
+    @staticmethod
+    def turns(test: TestCase) -> int:
+        """Turni utente previsti (domanda + followup)"""
+        return 1 + len(test.followups or [])
+
+    def prepare(self, tests: List[TestCase]) -> None:
+        """Calcola la durata per turno dai test con storico"""
+        per_turn = [
+            statistics.median(self.durations[t.id]) / self.turns(t)
+            for t in tests if self.durations.get(t.id)
+        ]
+        self._per_turn_ms = statistics.median(per_turn) if per_turn else None
+
+    def estimate(self, test: TestCase) -> float:
+        """Durata stimata del test in ms"""
+        known = self.durations.get(test.id)
+        if known:
+            return statistics.median(known)
+        return self.turns(test) * (self._per_turn_ms or self.default_turn_ms)
+
+
+@dataclass
+class ScheduledTest:
+    """Test in coda/in esecuzione con la sua stima"""
+    test: TestCase
+    index: int                        # Posizione nella lista originale
+    predicted_ms: float
+    started_at: Optional[float] = None
+    copies: int = 0                   # Esecuzioni avviate (>1 = speculativa)
+    done: bool = False
+
+
+class WorkStealingScheduler:
+    """
+    Code per worker con assegnazione LPT e furto dal worker più carico.
+
+    Con asyncio non c'è contesa sulle code: il furto serve a bilanciare
+    quando le durate reali differiscono dalle stime.
+    """
+
+    # Tempo minimo trascorso prima di duplicare un test
+    MIN_STRAGGLER_MS = 5000
+
+    def __init__(self,
+                 tests: List[TestCase],
+                 estimator: DurationEstimator,
+                 workers: int,
+                 longest_first: bool = True,
+                 speculative: bool = True,
+                 straggler_factor: float = 2.0,
+                 min_straggler_ms: Optional[float] = None):
+        """
+        Args:
+            tests: Test da eseguire
+            estimator: Stima delle durate
+            workers: Numero di worker
+            longest_first: False = ordine originale, round-robin
+            speculative: Duplica i test in ritardo quando un worker è libero
+            straggler_factor: Ritardo (tempo trascorso / stima) oltre cui duplicare
+            min_straggler_ms: Tempo minimo trascorso prima di duplicare (default MIN_STRAGGLER_MS)
+        """
+        self.workers = max(1, workers)
+        self.speculative = speculative
+        self.straggler_factor = straggler_factor
+        self.min_straggler_ms = self.MIN_STRAGGLER_MS if min_straggler_ms is None else min_straggler_ms
+
+        estimator.prepare(tests)
+        self.items = [
+            ScheduledTest(test=t, index=i, predicted_ms=estimator.estimate(t))
+            for i, t in enumerate(tests)
+        ]
+
+        self._queues: List[Deque[ScheduledTest]] = [deque() for _ in range(self.workers)]
+        loads = [0.0] * self.workers
+
+        if longest_first:
+            # LPT: il prossimo test più lungo va al worker meno carico
+            heap = [(0.0, w) for w in range(self.workers)]
+            for item in sorted(self.items, key=lambda it: it.predicted_ms, reverse=True):
+                load, worker = heapq.heappop(heap)
+                self._queues[worker].append(item)
+                loads[worker] = load + item.predicted_ms
+                heapq.heappush(heap, (loads[worker], worker))
+        else:
+            for item in self.items:
+                worker = item.index % self.workers
+                self._queues[worker].append(item)
+                loads[worker] += item.predicted_ms
+
+        self.predicted_makespan_ms = max(loads) if self.items else 0.0
+        self.steals = 0
+        self.speculations = 0
+        self.speculation_wins = 0
+        self._first_start: Optional[float] = None
+        self._last_end: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        """Tutti i test completati"""
+        return all(item.done for item in self.items)
+
+    @property
+    def actual_makespan_ms(self) -> float:
+        """Dal primo avvio all'ultimo completamento"""
+        if self._first_start is None or self._last_end is None:
+            return 0.0
+        return (self._last_end - self._first_start) * 1000
+
+    def next(self, worker_id: int) -> Optional[ScheduledTest]:
+        """
+        Prossimo test per un worker: coda propria, furto, poi speculazione.
+
+        Returns:
+            ScheduledTest (copies > 1 se speculativo) o None se non c'è lavoro ora
+        """
+        queue = self._queues[worker_id % self.workers]
+        item = queue.popleft() if queue else self._steal()
+        if item is None and self.speculative:
+            item = self._straggler()
+            if item is not None:
+                self.speculations += 1
+
+        if item is None:
+            return None
+
+        item.copies += 1
+        return item
+
+    def start(self, item: ScheduledTest) -> None:
+        """
+        Segna l'avvio reale di un test (slot di concorrenza acquisito).
+
+        L'attesa dello slot non conta come esecuzione: né per il ritardo
+        rispetto alla stima né per il makespan.
+        """
+        now = time.time()
+        if item.started_at is None:
+            item.started_at = now
+        if self._first_start is None:
+            self._first_start = now
+
+    def complete(self, item: ScheduledTest, speculative_copy: bool = False) -> bool:
+        """
+        Segna un test come completato.
+
+        Args:
+            item: Test completato
+            speculative_copy: True se ha finito la copia speculativa
+
+        Returns:
+            True per la prima copia che finisce, False per le successive
+        """
+        if item.done:
+            return False
+        item.done = True
+        self._last_end = time.time()
+        if speculative_copy:
+            self.speculation_wins += 1
+        return True
+
+    def _steal(self) -> Optional[ScheduledTest]:
+        """Ruba dal fondo (test più corti) della coda con più lavoro stimato"""
+        victim = max(self._queues, key=lambda q: sum(it.predicted_ms for it in q))
+        if not victim:
+            return None
+        self.steals += 1
+        return victim.pop()
+
+    def _straggler(self) -> Optional[ScheduledTest]:
+        """Test in esecuzione più in ritardo rispetto alla stima (una sola copia extra)"""
+        now = time.time()
+        candidates = []
+        for item in self.items:
+            if item.done or item.started_at is None or item.copies != 1:
+                continue
+            elapsed_ms = (now - item.started_at) * 1000
+            if elapsed_ms >= self.min_straggler_ms and elapsed_ms > item.predicted_ms * self.straggler_factor:
+                candidates.append((elapsed_ms / max(item.predicted_ms, 1), item))
+        if not candidates:
+            return None
+        return max(candidates, key=lambda c: c[0])[1]
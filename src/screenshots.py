@@ -0,0 +1,254 @@
+"""
+Screenshots - Codifica compatta e buffer in memoria degli screenshot
+
+Lo screenshot catturato da Playwright resta in memoria: viene codificato
+una volta sola (PNG, WebP o JPEG, con altezza massima e riduzione
+opzionale) in un thread, scritto su disco e registrato in un buffer.
+Upload Drive e validazione vision leggono lo stesso buffer invece di
+rileggere il file e ricalcolare base64 a ogni uso.
+
+Contains:
+- ScreenshotEncoding: formato e qualità di codifica
+- EncodedScreenshot: bytes codificati con mime type, digest e base64 (calcolati una volta)
+- ScreenshotBuffers: LRU thread-safe path -> EncodedScreenshot, limitata in byte
+- encode_screenshot / save_screenshot / load_screenshot
+
+Usage:
+    encoding = ScreenshotEncoding(format="webp", quality=80, max_height=8000)
+    path = report.get_screenshot_path(test_id, screenshot_extension(encoding))
+
+    raw = await page.screenshot()
+    await save_screenshot(raw, path, encoding)   # encode + write in un thread
+
+    shot = load_screenshot(path)                 # dal buffer, o dal disco
+    shot.base64, shot.mime_type, shot.digest
+"""
+
+import asyncio
+import base64
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Optional, Union
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+
+# formato -> (estensione, mime type, formato PIL)
+FORMATS = {
+    'png': ('.png', 'image/png', 'PNG'),
+    'webp': ('.webp', 'image/webp', 'WEBP'),
+    'jpeg': ('.jpg', 'image/jpeg', 'JPEG'),
+}
+
+_MIME_BY_EXTENSION = {ext: mime for ext, mime, _ in FORMATS.values()}
+_MIME_BY_EXTENSION['.jpeg'] = 'image/jpeg'
+
+# Estensioni cercate per uno screenshot salvato (export, report)
+SCREENSHOT_EXTENSIONS = ('.png', '.webp', '.jpg', '.jpeg')
+
+
+@dataclass
+class ScreenshotEncoding:
+    """Codifica degli screenshot salvati"""
+    format: str = "png"        # png | webp | jpeg
+    quality: int = 80          # Solo webp/jpeg
+    max_height: int = 0        # Altezza massima in pixel (0 = nessun limite), ridimensiona in proporzione
+    scale: float = 1.0         # Riduzione aggiuntiva (es. 0.5 con device_scale_factor 2)
+
+    @property
+    def needs_pil(self) -> bool:
+        return self.format != 'png' or self.max_height > 0 or self.scale < 1.0
+
+
+def effective_format(encoding: Optional[ScreenshotEncoding]) -> str:
+    """Formato realmente prodotto (PNG originale se Pillow manca o formato sconosciuto)"""
+    if encoding is None or encoding.format not in FORMATS:
+        return 'png'
+    if encoding.needs_pil and not PIL_AVAILABLE:
+        return 'png'
+    return encoding.format
+
+
+def screenshot_extension(encoding: Optional[ScreenshotEncoding]) -> str:
+    """Estensione file per una codifica (es. '.webp')"""
+    return FORMATS[effective_format(encoding)][0]
+
+
+def mime_type_for(path: Union[str, Path]) -> str:
+    """Mime type di uno screenshot dalla sua estensione"""
+    return _MIME_BY_EXTENSION.get(Path(path).suffix.lower(), 'image/png')
+
+
+def find_screenshot(directory: Path, test_id: str) -> Optional[Path]:
+    """Screenshot di un test in una cartella, qualunque sia il formato"""
+    for ext in SCREENSHOT_EXTENSIONS:
+        candidate = directory / f"{test_id}{ext}"
+        if candidate.exists():
+            return candidate
+    return None
+
+
+@dataclass
+class EncodedScreenshot:
+    """Screenshot codificato, pronto per disco, Drive e vision"""
+    data: bytes
+    mime_type: str = "image/png"
+
+    @cached_property
+    def base64(self) -> str:
+        return base64.b64encode(self.data).decode('ascii')
+
+    @cached_property
+    def digest(self) -> str:
+        return hashlib.sha256(self.data).hexdigest()
+
+    @property
+    def data_url(self) -> str:
+        return f"data:{self.mime_type};base64,{self.base64}"
+
+    def stream(self) -> io.BytesIO:
+        return io.BytesIO(self.data)
+
+
+def encode_screenshot(image: Union[bytes, Any], encoding: Optional[ScreenshotEncoding] = None) -> EncodedScreenshot:
+    """
+    Codifica uno screenshot (bloccante: da eseguire in un thread).
+
+    Args:
+        image: PNG grezzo di Playwright o immagine PIL (screenshot cuciti)
+        encoding: Codifica (None = PNG originale)
+
+    Returns:
+        EncodedScreenshot
+    """
+    fmt = effective_format(encoding)
+    _, mime, pil_format = FORMATS[fmt]
+
+    # PNG senza ridimensionamento: i bytes di Playwright vanno bene così
+    if isinstance(image, (bytes, bytearray)) and (encoding is None or not encoding.needs_pil or not PIL_AVAILABLE):
+        return EncodedScreenshot(data=bytes(image), mime_type='image/png')
+
+    img = Image.open(io.BytesIO(image)) if isinstance(image, (bytes, bytearray)) else image
+    scale = encoding.scale if encoding and 0 < encoding.scale < 1.0 else 1.0
+    if encoding and encoding.max_height and img.height * scale > encoding.max_height:
+        scale = encoding.max_height / img.height
+    if scale < 1.0:
+        size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        img = img.resize(size, Image.LANCZOS)
+
+    options = {}
+    if fmt == 'jpeg':
+        img = img.convert('RGB')
+        options = {'quality': encoding.quality, 'optimize': True}
+    elif fmt == 'webp':
+        options = {'quality': encoding.quality, 'method': 4}
+    else:
+        options = {'optimize': True}
+
+    out = io.BytesIO()
+    img.save(out, format=pil_format, **options)
+    return EncodedScreenshot(data=out.getvalue(), mime_type=mime)
+
+
+class ScreenshotBuffers:
+    """
+    Buffer LRU degli screenshot codificati, per path.
+
+    Limitato in byte: gli screenshot più vecchi escono dalla memoria e
+    vengono riletti dal disco solo se servono ancora.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items: 'OrderedDict[str, EncodedScreenshot]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        # Statistiche
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(path: Union[str, Path]) -> str:
+        return str(Path(path).resolve())
+
+    def put(self, path: Union[str, Path], shot: EncodedScreenshot) -> None:
+        key = self._key(path)
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= len(old.data)
+            if len(shot.data) > self.max_bytes:
+                return
+            self._items[key] = shot
+            self._size += len(shot.data)
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted.data)
+
+    def get(self, path: Union[str, Path]) -> Optional[EncodedScreenshot]:
+        key = self._key(path)
+        with self._lock:
+            shot = self._items.get(key)
+            if shot is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return shot
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+_buffers = ScreenshotBuffers()
+
+
+def get_screenshot_buffers() -> ScreenshotBuffers:
+    """Buffer globale del processo"""
+    return _buffers
+
+
+def write_screenshot(image: Union[bytes, Any], path: Path,
+                     encoding: Optional[ScreenshotEncoding] = None) -> EncodedScreenshot:
+    """Codifica, scrive su disco e registra nel buffer (bloccante)"""
+    shot = encode_screenshot(image, encoding)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(shot.data)
+    _buffers.put(path, shot)
+    return shot
+
+
+async def save_screenshot(image: Union[bytes, Any], path: Path,
+                          encoding: Optional[ScreenshotEncoding] = None) -> EncodedScreenshot:
+    """write_screenshot in un thread: il loop asyncio non attende la codifica"""
+    return await asyncio.to_thread(write_screenshot, image, path, encoding)
+
+
+def load_screenshot(path: Union[str, Path]) -> Optional[EncodedScreenshot]:
+    """Screenshot dal buffer, o dal disco (e registrato) se non in memoria"""
+    shot = _buffers.get(path)
+    if shot is not None:
+        return shot
+    path = Path(path)
+    try:
+        shot = EncodedScreenshot(data=path.read_bytes(), mime_type=mime_type_for(path))
+    except OSError:
+        return None
+    _buffers.put(path, shot)
+    return shot
@@ -13,8 +13,10 @@ Handles:
 import os
 import re
 import json
+import hashlib
 import threading
 import asyncio
+import time
 from pathlib import Path
 from typing import Optional, List, Dict, Any, TYPE_CHECKING
 from datetime import datetime
@@ -27,13 +29,17 @@ try:
     from google.auth.transport.requests import Request
     from google_auth_oauthlib.flow import InstalledAppFlow
     from googleapiclient.discovery import build
-    from googleapiclient.http import MediaFileUpload
+    from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
     GOOGLE_AVAILABLE = True
 except ImportError:
     GOOGLE_AVAILABLE = False
 
+from .cache import TieredCache
+from .screenshots import get_screenshot_buffers, mime_type_for
+
 # Per type hints senza import circolari
 if TYPE_CHECKING:
+    from .baselines import BaselineIndex
     from .config_loader import RunConfig
 
 
@@ -109,7 +115,10 @@ class GoogleSheetsClient(BaseClient):
                  drive_folder_id: str = "",
                  token_path: Optional[str] = None,
                  column_preset: str = "standard",
-                 column_list: Optional[List[str]] = None):
+                 column_list: Optional[List[str]] = None,
+                 cache: Optional[TieredCache] = None,
+                 cache_ttl_seconds: int = 604800,
+                 worksheets_ttl_seconds: float = 0):
         """
         Inizializza il client.
 
@@ -120,6 +129,11 @@ class GoogleSheetsClient(BaseClient):
             token_path: Path per salvare il token (default: accanto a credentials)
             column_preset: Preset colonne (standard, minimal, custom) - per compatibilità
             column_list: Lista colonne custom - per compatibilità
+            cache: Cache per i valori dei fogli RUN chiusi (opzionale)
+            cache_ttl_seconds: TTL su disco dei fogli in cache
+            worksheets_ttl_seconds: Per quanto riusare l'elenco dei fogli
+                (0 = rileggilo a ogni chiamata). Utile ai processi
+                long-lived (server MCP) che interrogano spesso le RUN
         """
         # Store column config for future use
         self.column_preset = column_preset
@@ -150,6 +164,25 @@ class GoogleSheetsClient(BaseClient):
         # Cache test esistenti nella RUN corrente
         self._existing_tests: set = set()
 
+        # Drive service per thread (upload concorrenti)
+        self._thread_local = threading.local()
+
+        # Cache fogli RUN chiusi (non cambiano più)
+        self.cache = cache
+        self.cache_ttl_seconds = cache_ttl_seconds
+
+        # Elenco fogli e info delle RUN chiuse, in memoria
+        self.worksheets_ttl_seconds = worksheets_ttl_seconds
+        self._worksheets_list: Optional[List[Any]] = None
+        self._worksheets_at = 0.0
+        self._closed_run_info: Dict[int, Dict[str, Any]] = {}
+
+        # Versione Drive (riusata per worksheets_ttl_seconds) e fingerprint
+        # della colonna BASELINE per foglio (sheet id), dall'ultima batchGet
+        self._version: Optional[str] = None
+        self._version_at = 0.0
+        self._baseline_fingerprints: Dict[int, str] = {}
+
     @property
     def is_authenticated(self) -> bool:
         """Verifica se autenticato"""
@@ -173,6 +206,44 @@ class GoogleSheetsClient(BaseClient):
         """Check availability."""
         return self.authenticate()
 
+    def ensure_authenticated(self) -> bool:
+        """
+        Mantiene valida l'autenticazione di un client long-lived.
+
+        Rinnova il token se scaduto (senza ricreare i client gspread/Drive);
+        se il rinnovo fallisce, o non c'è ancora autenticazione, la rifà.
+
+        Returns:
+            True se autenticato
+        """
+        creds = self._credentials
+        if creds is None or self._spreadsheet is None:
+            return self.authenticate()
+
+        # I Service Account partono senza token: lo ottiene la prima richiesta
+        if not getattr(creds, 'expired', False):
+            return True
+
+        try:
+            creds.refresh(Request())
+            return True
+        except Exception as e:
+            print(f"! Rinnovo token Google fallito, nuova autenticazione: {e}")
+            return self.authenticate()
+
+    def _worksheets(self) -> List[Any]:
+        """Fogli dello spreadsheet (riusati per worksheets_ttl_seconds)"""
+        now = time.monotonic()
+        if (self._worksheets_list is None or self.worksheets_ttl_seconds <= 0
+                or now - self._worksheets_at > self.worksheets_ttl_seconds):
+            self._worksheets_list = self._spreadsheet.worksheets()
+            self._worksheets_at = now
+        return self._worksheets_list
+
+    def invalidate_worksheets(self) -> None:
+        """Forza la rilettura dell'elenco fogli alla prossima chiamata"""
+        self._worksheets_list = None
+
     def authenticate(self) -> bool:
         """
         Esegue autenticazione Google (Service Account o OAuth).
@@ -264,7 +335,7 @@ class GoogleSheetsClient(BaseClient):
             return 1
 
         run_numbers = []
-        for worksheet in self._spreadsheet.worksheets():
+        for worksheet in self._worksheets():
             match = re.match(r'^Run (\d{3})', worksheet.title)
             if match:
                 run_numbers.append(int(match.group(1)))
@@ -291,12 +362,12 @@ class GoogleSheetsClient(BaseClient):
         number_pattern = f"{run_number:03d}"
 
         # Prima cerca con prefisso "Run" (priorità ai test standard)
-        for worksheet in self._spreadsheet.worksheets():
+        for worksheet in self._worksheets():
             if worksheet.title.startswith(f"Run {number_pattern}"):
                 return worksheet
 
         # Se non trova, cerca qualsiasi foglio con quel numero (GGP, PARA, ecc.)
-        for worksheet in self._spreadsheet.worksheets():
+        for worksheet in self._worksheets():
             if number_pattern in worksheet.title:
                 return worksheet
 
@@ -335,6 +406,7 @@ class GoogleSheetsClient(BaseClient):
                 rows=1000,
                 cols=len(self.COLUMNS)
             )
+            self.invalidate_worksheets()
 
             # Aggiungi header
             worksheet.update('A1', [self.COLUMNS])
@@ -436,7 +508,7 @@ class GoogleSheetsClient(BaseClient):
             return []
 
         run_numbers = []
-        for worksheet in self._spreadsheet.worksheets():
+        for worksheet in self._worksheets():
             match = re.match(r'^Run (\d{3})', worksheet.title)
             if match:
                 run_numbers.append(int(match.group(1)))
@@ -453,6 +525,10 @@ class GoogleSheetsClient(BaseClient):
         Returns:
             Dizionario con info o None
         """
+        # Le RUN chiuse non cambiano: info contate una volta sola
+        if run_number in self._closed_run_info:
+            return dict(self._closed_run_info[run_number])
+
         worksheet = self.get_run_sheet(run_number)
         if not worksheet:
             return None
@@ -481,6 +557,8 @@ class GoogleSheetsClient(BaseClient):
                 info['mode'] = match.group(3)
                 info['timestamp'] = match.group(4)
 
+            if self.is_closed_run(run_number, self.get_next_run_number() - 1):
+                self._closed_run_info[run_number] = dict(info)
             return info
 
         except Exception as e:
@@ -555,6 +633,68 @@ class GoogleSheetsClient(BaseClient):
     # Altezza default per righe con screenshot (in pixel)
     DEFAULT_ROW_HEIGHT = 120
 
+    @staticmethod
+    def _result_row(result: TestResult) -> List[str]:
+        """
+        Valori di una riga del foglio RUN (24 colonne).
+
+        Returns:
+            Lista valori in formato USER_ENTERED
+        """
+        # Prepara valori screenshot
+        screenshot_formula = ""
+        screenshot_view_url = ""
+
+        if result.screenshot_urls:
+            # Nuovo formato: usa IMAGE() per thumbnail
+            if result.screenshot_urls.image_url:
+                # =IMAGE(url, 2) -> mode 2 = fit to cell
+                screenshot_formula = f'=IMAGE("{result.screenshot_urls.image_url}", 2)'
+            screenshot_view_url = result.screenshot_urls.view_url
+        elif result.screenshot_url:
+            # Legacy: URL singolo (mantieni retrocompatibilità)
+            screenshot_view_url = result.screenshot_url
+
+        # Helper per formattare score (0-1 -> percentuale)
+        def fmt_score(val):
+            return f"{val:.0%}" if val is not None else ""
+
+        # 24 colonne: TEST ID, DATE, MODE, QUESTION, EXPECTED ANSWER, CONVERSATION, SCREENSHOT,
+        # SCREENSHOT URL, PROMPT VER, MODEL VER, ENV, TIMING, RESULT, BASELINE, NOTES, LS REPORT, LS TRACE LINK,
+        # SEMANTIC, JUDGE, GROUND, FAITH, RELEV, OVERALL, JUDGE REASON
+        return [
+            result.test_id,
+            result.date,
+            result.mode,
+            result.question,
+            result.expected or "",                  # EXPECTED ANSWER: golden answer dal test set
+            result.conversation,
+            screenshot_formula,                     # SCREENSHOT: immagine inline
+            screenshot_view_url,                    # SCREENSHOT URL: link alta risoluzione
+            result.prompt_version,                  # PROMPT VER: da run config
+            result.model_version,                   # MODEL VER: provider/modello
+            result.environment or "DEV",            # ENV: default DEV
+            result.timing,                          # TIMING: "TTFR → Total"
+            "",                                     # RESULT: vuoto (compilato dal reviewer)
+            "",                                     # BASELINE: vuoto (checkbox golden answer)
+            "",                                     # NOTES: vuoto (note del reviewer)
+            escape_formula(result.langsmith_report), # LS REPORT: report LangSmith (escaped)
+            result.langsmith_url,                   # LS TRACE LINK: link al trace
+            # Evaluation metrics
+            fmt_score(result.semantic_score),       # SEMANTIC
+            fmt_score(result.judge_score),          # JUDGE
+            fmt_score(result.groundedness),         # GROUND
+            fmt_score(result.faithfulness),         # FAITH
+            fmt_score(result.relevance),            # RELEV
+            fmt_score(result.overall_score),        # OVERALL
+            result.judge_reasoning                  # JUDGE REASON
+        ]
+
+    @staticmethod
+    def _has_screenshot(result: TestResult) -> bool:
+        """True se la riga mostra una thumbnail (serve altezza maggiore)"""
+        return bool(result.screenshot_urls and result.screenshot_urls.image_url)
+
     def append_result(self, result: TestResult, row_height: Optional[int] = None) -> bool:
         """
         Aggiunge un risultato al report.
@@ -571,62 +711,11 @@ class GoogleSheetsClient(BaseClient):
             return False
 
         try:
-            # Prepara valori screenshot
-            screenshot_formula = ""
-            screenshot_view_url = ""
-            has_screenshot = False
-
-            if result.screenshot_urls:
-                # Nuovo formato: usa IMAGE() per thumbnail
-                if result.screenshot_urls.image_url:
-                    # =IMAGE(url, 2) -> mode 2 = fit to cell
-                    screenshot_formula = f'=IMAGE("{result.screenshot_urls.image_url}", 2)'
-                    has_screenshot = True
-                screenshot_view_url = result.screenshot_urls.view_url
-            elif result.screenshot_url:
-                # Legacy: URL singolo (mantieni retrocompatibilità)
-                screenshot_view_url = result.screenshot_url
-
-            # Helper per formattare score (0-1 -> percentuale)
-            def fmt_score(val):
-                return f"{val:.0%}" if val is not None else ""
-
-            # 24 colonne: TEST ID, DATE, MODE, QUESTION, EXPECTED ANSWER, CONVERSATION, SCREENSHOT,
-            # SCREENSHOT URL, PROMPT VER, MODEL VER, ENV, TIMING, RESULT, BASELINE, NOTES, LS REPORT, LS TRACE LINK,
-            # SEMANTIC, JUDGE, GROUND, FAITH, RELEV, OVERALL, JUDGE REASON
-            row = [
-                result.test_id,
-                result.date,
-                result.mode,
-                result.question,
-                result.expected or "",                  # EXPECTED ANSWER: golden answer dal test set
-                result.conversation,
-                screenshot_formula,                     # SCREENSHOT: immagine inline
-                screenshot_view_url,                    # SCREENSHOT URL: link alta risoluzione
-                result.prompt_version,                  # PROMPT VER: da run config
-                result.model_version,                   # MODEL VER: provider/modello
-                result.environment or "DEV",            # ENV: default DEV
-                result.timing,                          # TIMING: "TTFR → Total"
-                "",                                     # RESULT: vuoto (compilato dal reviewer)
-                "",                                     # BASELINE: vuoto (checkbox golden answer)
-                "",                                     # NOTES: vuoto (note del reviewer)
-                escape_formula(result.langsmith_report), # LS REPORT: report LangSmith (escaped)
-                result.langsmith_url,                   # LS TRACE LINK: link al trace
-                # Evaluation metrics
-                fmt_score(result.semantic_score),       # SEMANTIC
-                fmt_score(result.judge_score),          # JUDGE
-                fmt_score(result.groundedness),         # GROUND
-                fmt_score(result.faithfulness),         # FAITH
-                fmt_score(result.relevance),            # RELEV
-                fmt_score(result.overall_score),        # OVERALL
-                result.judge_reasoning                  # JUDGE REASON
-            ]
-
-            self._worksheet.append_row(row, value_input_option='USER_ENTERED')
+            self._worksheet.append_row(self._result_row(result), value_input_option='USER_ENTERED')
             self._existing_tests.add(result.test_id)
 
             # Auto-resize riga se c'è screenshot
-            if has_screenshot:
+            if self._has_screenshot(result):
                 # Trova il numero della riga appena aggiunta
                 row_count = len(self._worksheet.col_values(1))
                 height = row_height or self.DEFAULT_ROW_HEIGHT
@@ -659,55 +748,14 @@ class GoogleSheetsClient(BaseClient):
             # Trova prima riga disponibile
             start_row = len(self._worksheet.col_values(1)) + 1
 
-            rows = []
-            has_any_screenshot = False
-
-            for r in results:
-                # Prepara valori screenshot
-                screenshot_formula = ""
-                screenshot_view_url = ""
-
-                if r.screenshot_urls:
-                    if r.screenshot_urls.image_url:
-                        screenshot_formula = f'=IMAGE("{r.screenshot_urls.image_url}", 2)'
-                        has_any_screenshot = True
-                    screenshot_view_url = r.screenshot_urls.view_url
-                elif r.screenshot_url:
-                    screenshot_view_url = r.screenshot_url
-
-                # Helper per formattare score (0-1 -> percentuale)
-                def fmt_score(val):
-                    return f"{val:.0%}" if val is not None else ""
-
-                # 24 colonne
-                rows.append([
-                    r.test_id, r.date, r.mode, r.question, r.expected or "",
-                    r.conversation, screenshot_formula, screenshot_view_url,
-                    r.prompt_version, r.model_version,
-                    r.environment or "DEV",           # ENV: default DEV
-                    r.timing,                         # TIMING: "TTFR → Total"
-                    "",                               # RESULT: vuoto (reviewer)
-                    "",                               # BASELINE: vuoto (golden answer)
-                    "",                               # NOTES: vuoto (reviewer)
-                    escape_formula(r.langsmith_report), # LS REPORT (escaped)
-                    r.langsmith_url,                  # LS TRACE LINK
-                    # Evaluation metrics
-                    fmt_score(r.semantic_score),      # SEMANTIC
-                    fmt_score(r.judge_score),         # JUDGE
-                    fmt_score(r.groundedness),        # GROUND
-                    fmt_score(r.faithfulness),        # FAITH
-                    fmt_score(r.relevance),           # RELEV
-                    fmt_score(r.overall_score),       # OVERALL
-                    r.judge_reasoning                 # JUDGE REASON
-                ])
-
+            rows = [self._result_row(r) for r in results]
             self._worksheet.append_rows(rows, value_input_option='USER_ENTERED')
 
             for r in results:
                 self._existing_tests.add(r.test_id)
 
             # Auto-resize righe se ci sono screenshot
-            if has_any_screenshot:
+            if any(self._has_screenshot(r) for r in results):
                 end_row = start_row + len(results) - 1
                 height = row_height or self.DEFAULT_ROW_HEIGHT
                 self.set_rows_height(start_row, end_row, height)
@@ -717,15 +765,114 @@ class GoogleSheetsClient(BaseClient):
             print(f"✗ Errore batch append: {e}")
             return 0
 
+    def write_results_batch(self, results: List[TestResult], row_height: Optional[int] = None) -> int:
+        """
+        Scrive più risultati con due chiamate API.
+
+        Le righe vanno con values.append in formato USER_ENTERED (come
+        append_results: score e date restano numeri e date). Le righe
+        effettivamente scritte si leggono da updates.updatedRange, poi le
+        altezze delle righe con screenshot viaggiano in una sola
+        spreadsheets.batchUpdate. Funziona anche se altri scrivono sullo
+        stesso foglio.
+
+        A differenza di append_results non intercetta gli errori di
+        scrittura delle righe: chi chiama (SheetsWriter) gestisce quota e
+        retry. Un errore sulle altezze viene solo segnalato.
+
+        Args:
+            results: Lista TestResult
+            row_height: Altezza righe con screenshot (default: DEFAULT_ROW_HEIGHT)
+
+        Returns:
+            Numero risultati scritti
+        """
+        if not results:
+            return 0
+
+        if not self._worksheet or not self._spreadsheet:
+            print("✗ Nessun foglio RUN attivo")
+            return 0
+
+        response = self._worksheet.append_rows(
+            [self._result_row(r) for r in results],
+            value_input_option='USER_ENTERED'
+        )
+        for r in results:
+            self._existing_tests.add(r.test_id)
+
+        if not any(self._has_screenshot(r) for r in results):
+            return len(results)
+
+        start_row = self._updated_start_row(response)
+        if start_row is None:
+            print("! Righe scritte non note: altezza righe screenshot non impostata")
+            return len(results)
+
+        # Altezza per i blocchi contigui di righe con screenshot
+        sheet_id = self._worksheet.id
+        height = row_height or self.DEFAULT_ROW_HEIGHT
+        requests: List[Dict[str, Any]] = []
+        block_start = None
+        for i, r in enumerate(results + [None]):
+            if r is not None and self._has_screenshot(r):
+                if block_start is None:
+                    block_start = i
+                continue
+            if block_start is not None:
+                requests.append({
+                    "updateDimensionProperties": {
+                        "range": {
+                            "sheetId": sheet_id,
+                            "dimension": "ROWS",
+                            "startIndex": start_row - 1 + block_start,  # 0-indexed
+                            "endIndex": start_row - 1 + i
+                        },
+                        "properties": {"pixelSize": height},
+                        "fields": "pixelSize"
+                    }
+                })
+                block_start = None
+
+        try:
+            self._spreadsheet.batch_update({"requests": requests})
+        except Exception as e:
+            # Righe già scritte: un retry dell'intera batch le duplicherebbe
+            print(f"! Altezza righe screenshot non impostata: {e}")
+        return len(results)
+
+    @staticmethod
+    def _updated_start_row(response: Optional[Dict[str, Any]]) -> Optional[int]:
+        """Prima riga scritta da values.append ('RUN 001'!A5:X7 -> 5)"""
+        updated_range = ((response or {}).get("updates") or {}).get("updatedRange", "")
+        match = re.search(r"!\$?[A-Za-z]+\$?(\d+)", updated_range)
+        return int(match.group(1)) if match else None
+
     # ==================== BASELINES (GOLDEN ANSWERS) ====================
 
-    def get_all_baselines(self) -> List[Dict[str, Any]]:
+    # Valori della colonna BASELINE che marcano una golden answer
+    BASELINE_MARKS = ('TRUE', '✓', '✔', 'X', '1', 'YES', 'SI', 'SÌ')
+
+    # Range massimi per chiamata values.batchGet
+    BATCH_GET_RANGES = 100
+
+    def get_all_baselines(self, index: Optional['BaselineIndex'] = None) -> List[Dict[str, Any]]:
         """
         Recupera tutte le baseline (golden answers) da tutti i fogli RUN.
 
         Cerca in ogni foglio RUN le righe dove la colonna BASELINE
         contiene un valore truthy (✓, TRUE, 1, X, ecc.).
 
+        Con un BaselineIndex la lettura è incrementale: se la versione
+        Drive dello spreadsheet non è cambiata non si legge nulla, altrimenti
+        una values.batchGet legge la sola colonna BASELINE di tutti i fogli
+        e vengono scaricate solo le righe marcate: quelle dei fogli con la
+        colonna cambiata e quelle dei fogli che hanno baseline (il testo di
+        una golden answer può cambiare senza toccare la colonna BASELINE).
+
+        Args:
+            index: Indice locale persistente (None = scansione completa)
+
         Returns:
             Lista di dizionari con i dati delle baseline:
             {
@@ -742,84 +889,316 @@ class GoogleSheetsClient(BaseClient):
         if not self._spreadsheet:
             return []
 
-        baselines = []
+        if index is not None:
+            try:
+                return self._refresh_baseline_index(index)
+            except Exception as e:
+                print(f"Errore lettura baseline: {e}")
+                return index.baselines(self.spreadsheet_id)
 
-        # Indici colonne (0-based)
-        col_indices = {col: i for i, col in enumerate(self.COLUMNS)}
-        baseline_col = col_indices.get('BASELINE', 12)
-        test_id_col = col_indices.get('TEST ID', 0)
-        date_col = col_indices.get('DATE', 1)
-        question_col = col_indices.get('QUESTION', 3)
-        conversation_col = col_indices.get('CONVERSATION', 4)
-        prompt_ver_col = col_indices.get('PROMPT VER', 7)
-        model_ver_col = col_indices.get('MODEL VER', 8)
-        notes_col = col_indices.get('NOTES', 13)
+        baselines = []
+        baseline_col = COLUMN_INDEX.get('BASELINE', 13)
 
         try:
-            for worksheet in self._spreadsheet.worksheets():
-                # Estrai numero RUN dal titolo (es. "Run 038 [DEV] auto - 2024-01-15")
-                match = re.match(r'^(?:Run|GGP|PARA)\s*(\d{3})', worksheet.title)
-                if not match:
-                    continue
+            run_sheets = self._run_sheets()
+            latest_run = max((number for number, _ in run_sheets), default=0)
 
-                run_number = int(match.group(1))
-
-                # Leggi tutti i dati del foglio
+            for run_number, worksheet in run_sheets:
+                # Leggi tutti i dati del foglio (da cache se RUN chiusa)
                 try:
-                    all_values = worksheet.get_all_values()
+                    all_values = self.get_run_values(
+                        worksheet,
+                        closed=self.is_closed_run(run_number, latest_run)
+                    )
                 except Exception:
                     continue
 
-                if len(all_values) < 2:
-                    continue  # Solo header o vuoto
-
                 # Salta header
                 for row in all_values[1:]:
-                    # Verifica che la riga abbia abbastanza colonne
-                    if len(row) <= baseline_col:
-                        continue
-
-                    # Controlla se BASELINE è marcata
-                    baseline_value = row[baseline_col].strip().upper()
-                    is_baseline = baseline_value in ('TRUE', '✓', '✔', 'X', '1', 'YES', 'SI', 'SÌ')
-
-                    if not is_baseline:
-                        continue
-
-                    # Estrai dati
-                    def safe_get(idx: int) -> str:
-                        return row[idx] if idx < len(row) else ""
-
-                    baselines.append({
-                        'test_id': safe_get(test_id_col),
-                        'question': safe_get(question_col),
-                        'conversation': safe_get(conversation_col),
-                        'run_number': run_number,
-                        'date': safe_get(date_col),
-                        'prompt_version': safe_get(prompt_ver_col),
-                        'model_version': safe_get(model_ver_col),
-                        'notes': safe_get(notes_col)
-                    })
+                    if len(row) > baseline_col and self._is_baseline_mark(row[baseline_col]):
+                        baselines.append(self._baseline_record(row, run_number))
 
         except Exception as e:
             print(f"Errore lettura baseline: {e}")
 
         return baselines
 
+    def _refresh_baseline_index(self, index: 'BaselineIndex') -> List[Dict[str, Any]]:
+        """Aggiorna l'indice leggendo solo i fogli nuovi o modificati"""
+        version = self.get_spreadsheet_version()
+        if version and index.is_current(self.spreadsheet_id, version):
+            index.last_scan = {'sheets': 0, 'changed': 0, 'rows_read': 0}
+            self._remember_baseline_fingerprints(index.sheets)
+            return index.baselines(self.spreadsheet_id)
+
+        baseline_col = COLUMN_INDEX.get('BASELINE', 13)
+        col_letter = chr(ord('A') + baseline_col)
+        last_letter = chr(ord('A') + max(COLUMN_INDEX.get(name, 0) for name in self._BASELINE_FIELDS.values()))
+
+        run_sheets = self._run_sheets()
+
+        # 1. Colonna BASELINE di tutti i fogli in una batchGet: marcature e
+        #    fingerprint. Un foglio si riusa solo se invariato e senza baseline
+        columns = self.batch_get_values(
+            [self._a1(ws.title, f"{col_letter}:{col_letter}") for _, ws in run_sheets]
+        )
+
+        sheets: Dict[str, Dict[str, Any]] = {}
+        changed = []
+        for (run_number, ws), column in zip(run_sheets, columns):
+            fingerprint = self._column_fingerprint(column)
+            marked = [i + 1 for i, cells in enumerate(column)
+                      if i > 0 and cells and self._is_baseline_mark(cells[0])]
+            entry = index.get_sheet(self.spreadsheet_id, ws.id)
+            if entry and entry['fingerprint'] == fingerprint and entry['title'] == ws.title and not marked:
+                sheets[str(ws.id)] = entry
+                continue
+            entry = {'title': ws.title, 'run_number': run_number,
+                     'fingerprint': fingerprint, 'baselines': []}
+            sheets[str(ws.id)] = entry
+            changed.append((entry, marked))
+
+        # 2. Solo le righe marcate dei fogli cambiati, in una batchGet
+        ranges = []
+        owners = []
+        for entry, marked in changed:
+            for row_number in marked:
+                ranges.append(self._a1(entry['title'], f"A{row_number}:{last_letter}{row_number}"))
+                owners.append(entry)
+        for entry, rows in zip(owners, self.batch_get_values(ranges)):
+            if rows:
+                entry['baselines'].append(self._baseline_record(rows[0], entry['run_number']))
+
+        index.replace(self.spreadsheet_id, version, sheets)
+        index.last_scan = {'sheets': len(run_sheets), 'changed': len(changed), 'rows_read': len(ranges)}
+        index.save()
+        self._remember_baseline_fingerprints(sheets)
+        return index.baselines(self.spreadsheet_id)
+
+    @staticmethod
+    def _column_fingerprint(column: List[List[str]]) -> str:
+        """Fingerprint di una colonna nel formato di values.batchGet"""
+        return hashlib.sha1(json.dumps(column, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    @classmethod
+    def _baseline_column_fingerprint(cls, values: List[List[str]]) -> str:
+        """Fingerprint della colonna BASELINE da tutte le righe di un foglio"""
+        baseline_col = COLUMN_INDEX.get('BASELINE', 13)
+        column = [[row[baseline_col]] if len(row) > baseline_col and row[baseline_col] else []
+                  for row in values]
+        # values.batchGet omette le righe vuote in coda
+        while column and not column[-1]:
+            column.pop()
+        return cls._column_fingerprint(column)
+
+    def _remember_baseline_fingerprints(self, sheets: Dict[str, Dict[str, Any]]) -> None:
+        """Fingerprint BASELINE correnti (sheet id -> fingerprint) per la cache delle RUN chiuse"""
+        self._baseline_fingerprints = {
+            int(sheet_id): entry['fingerprint'] for sheet_id, entry in sheets.items()
+            if entry.get('fingerprint')
+        }
+
+    def get_spreadsheet_version(self) -> Optional[str]:
+        """
+        Versione Drive dello spreadsheet (cambia a ogni modifica).
+
+        Riusata per worksheets_ttl_seconds, come l'elenco dei fogli.
+
+        Returns:
+            Versione (o modifiedTime), None se Drive non è disponibile
+        """
+        if not self._drive_service:
+            return None
+        now = time.monotonic()
+        if (self._version is not None and self.worksheets_ttl_seconds > 0
+                and now - self._version_at <= self.worksheets_ttl_seconds):
+            return self._version
+        try:
+            meta = self._drive().files().get(
+                fileId=self.spreadsheet_id,
+                fields='version, modifiedTime'
+            ).execute()
+        except Exception:
+            return None
+        version = meta.get('version') or meta.get('modifiedTime')
+        self._version = str(version) if version else None
+        self._version_at = now
+        return self._version
+
+    def batch_get_values(self, ranges: List[str]) -> List[List[List[str]]]:
+        """
+        Legge più range con values.batchGet (BATCH_GET_RANGES range per chiamata).
+
+        Args:
+            ranges: Range A1 (es. "'Run 001'!N:N")
+
+        Returns:
+            Valori di ogni range, nello stesso ordine
+        """
+        results: List[List[List[str]]] = []
+        for start in range(0, len(ranges), self.BATCH_GET_RANGES):
+            chunk = ranges[start:start + self.BATCH_GET_RANGES]
+            response = self._spreadsheet.values_batch_get(chunk)
+            value_ranges = response.get('valueRanges', [])
+            results.extend(vr.get('values', []) for vr in value_ranges)
+            # Range vuoti in coda possono mancare dalla risposta
+            results.extend([] for _ in range(len(chunk) - len(value_ranges)))
+        return results
+
+    @staticmethod
+    def _a1(title: str, cells: str) -> str:
+        """Range A1 con il titolo del foglio quotato"""
+        return "'" + title.replace("'", "''") + "'!" + cells
+
+    def _run_sheets(self) -> List[Any]:
+        """Fogli RUN dello spreadsheet come (numero RUN, worksheet)"""
+        run_sheets = []
+        for worksheet in self._worksheets():
+            # Estrai numero RUN dal titolo (es. "Run 038 [DEV] auto - 2024-01-15")
+            match = re.match(r'^(?:Run|GGP|PARA)\s*(\d{3})', worksheet.title)
+            if match:
+                run_sheets.append((int(match.group(1)), worksheet))
+        return run_sheets
+
+    @classmethod
+    def _is_baseline_mark(cls, value: str) -> bool:
+        return value.strip().upper() in cls.BASELINE_MARKS
+
+    # Campo baseline -> colonna del foglio
+    _BASELINE_FIELDS = {
+        'test_id': 'TEST ID',
+        'question': 'QUESTION',
+        'conversation': 'CONVERSATION',
+        'date': 'DATE',
+        'prompt_version': 'PROMPT VER',
+        'model_version': 'MODEL VER',
+        'notes': 'NOTES',
+    }
+
+    @classmethod
+    def _baseline_record(cls, row: List[str], run_number: int) -> Dict[str, Any]:
+        """Riga del foglio -> dizionario baseline"""
+        record: Dict[str, Any] = {}
+        for key, column in cls._BASELINE_FIELDS.items():
+            idx = COLUMN_INDEX[column]
+            record[key] = row[idx] if idx < len(row) else ""
+        record['run_number'] = run_number
+        return record
+
+    def is_closed_run(self, run_number: int, latest_run: int) -> bool:
+        """
+        Una RUN è chiusa se non è quella corrente né l'ultima creata
+        (che potrebbe essere in corso su un'altra macchina).
+        """
+        return run_number != self._current_run and run_number < latest_run
+
+    def get_run_values(self, worksheet, closed: bool) -> List[List[str]]:
+        """
+        Legge tutti i valori di un foglio RUN.
+
+        I fogli delle RUN chiuse vengono letti dalla cache se disponibile,
+        con chiave id + titolo del foglio: le righe scritte nella RUN
+        corrente non la invalidano. Una baseline marcata dopo la chiusura
+        sì: la voce registra il fingerprint della colonna BASELINE e viene
+        scartata se quello dell'ultima batchGet delle baseline è diverso.
+        I fogli aperti sono sempre riletti da Sheets.
+
+        Args:
+            worksheet: Foglio da leggere
+            closed: True se la RUN è chiusa
+
+        Returns:
+            Righe del foglio (header incluso)
+        """
+        if not self.cache or not closed:
+            return worksheet.get_all_values()
+
+        cache_key = f"run_values:{self.spreadsheet_id}:{worksheet.id}:{worksheet.title}"
+        current = self._baseline_fingerprints.get(worksheet.id)
+        entry = self.cache.get(cache_key)
+        if isinstance(entry, dict) and (current is None or entry.get('fingerprint') == current):
+            return entry['values']
+
+        values = worksheet.get_all_values()
+        self.cache.set(cache_key, {
+            'fingerprint': self._baseline_column_fingerprint(values),
+            'values': values
+        }, ttl=self.cache_ttl_seconds)
+        return values
+
+    def get_run_records(self, run_number: int) -> List[Dict[str, Any]]:
+        """
+        Ottiene i risultati di una RUN come dizionari (header -> valore).
+
+        Per le RUN chiuse usa la cache (finché la colonna BASELINE non
+        cambia), quindi confronti e calibrazioni ripetute non riscaricano
+        gli stessi fogli.
+
+        Args:
+            run_number: Numero RUN
+
+        Returns:
+            Lista di dizionari con i risultati (vuota se RUN non trovata)
+        """
+        worksheet = self.get_run_sheet(run_number)
+        if not worksheet:
+            return []
+
+        try:
+            values = self.get_run_values(
+                worksheet,
+                closed=self.is_closed_run(run_number, self.get_next_run_number() - 1)
+            )
+        except Exception as e:
+            print(f"! Errore lettura RUN {run_number}: {e}")
+            return []
+
+        if len(values) < 2:
+            return []
+
+        header = values[0]
+        return [
+            {col: (row[i] if i < len(row) else "") for i, col in enumerate(header)}
+            for row in values[1:]
+        ]
+
     # ==================== UPLOAD & UTILITY ====================
 
-    def upload_screenshot(self,
-                          file_path: Path,
-                          test_id: str) -> Optional[ScreenshotUrls]:
+    # Oltre questa dimensione l'upload Drive usa una sessione resumable
+    RESUMABLE_UPLOAD_BYTES = 5 * 1024 * 1024
+
+    # Richieste per batch HTTP Drive (limite API: 100)
+    DRIVE_BATCH_SIZE = 100
+
+    def _drive(self):
+        """
+        Drive service del thread corrente.
+
+        Gli oggetti googleapiclient non sono thread-safe: i thread di upload
+        usano un service proprio, il thread principale quello creato in
+        authenticate().
+        """
+        if threading.current_thread() is threading.main_thread() or not self._credentials:
+            return self._drive_service
+        service = getattr(self._thread_local, 'drive', None)
+        if service is None:
+            service = build('drive', 'v3', credentials=self._credentials, cache_discovery=False)
+            self._thread_local.drive = service
+        return service
+
+    def create_drive_file(self, file_path: Path, test_id: str) -> Optional[Dict[str, str]]:
         """
-        Carica screenshot su Google Drive.
+        Carica un file nella cartella Drive (senza permessi).
+
+        Upload semplice (una richiesta) per gli screenshot, resumable
+        solo per file grandi. Sicuro da chiamare da più thread.
 
         Args:
             file_path: Path al file screenshot
             test_id: ID del test (per nome file)
 
         Returns:
-            ScreenshotUrls con URL immagine e URL visualizzazione, o None
+            Dict con id e webViewLink, o None
         """
         if not self._drive_service or not self.drive_folder_id:
             return None
@@ -837,41 +1216,108 @@ class GoogleSheetsClient(BaseClient):
                 'parents': [self.drive_folder_id]
             }
 
-            # Upload
-            media = MediaFileUpload(
-                str(file_path),
-                mimetype='image/png',
-                resumable=True
-            )
+            # Upload: bytes già codificati in memoria se presenti, altrimenti dal disco
+            shot = get_screenshot_buffers().get(file_path)
+            if shot is not None:
+                media = MediaIoBaseUpload(
+                    shot.stream(),
+                    mimetype=shot.mime_type,
+                    resumable=len(shot.data) > self.RESUMABLE_UPLOAD_BYTES
+                )
+            else:
+                media = MediaFileUpload(
+                    str(file_path),
+                    mimetype=mime_type_for(file_path),
+                    resumable=file_path.stat().st_size > self.RESUMABLE_UPLOAD_BYTES
+                )
 
-            file = self._drive_service.files().create(
+            return self._drive().files().create(
                 body=file_metadata,
                 media_body=media,
                 fields='id, webViewLink'
             ).execute()
 
-            # Rendi pubblico
-            self._drive_service.permissions().create(
-                fileId=file['id'],
-                body={'type': 'anyone', 'role': 'reader'}
-            ).execute()
+        except Exception as e:
+            print(f"! Errore upload screenshot: {e}")
+            return None
 
-            file_id = file.get('id', '')
-            web_view_link = file.get('webViewLink', '')
+    def grant_public_read(self, file_ids: List[str]) -> set:
+        """
+        Rende pubblici (lettura) più file con batch HTTP Drive.
 
-            # URL diretto per embedding con =IMAGE()
-            # Formato: https://drive.google.com/uc?export=view&id=FILE_ID
-            image_url = f"https://drive.google.com/uc?export=view&id={file_id}" if file_id else ""
+        Args:
+            file_ids: ID dei file Drive
 
-            return ScreenshotUrls(
-                image_url=image_url,
-                view_url=web_view_link
-            )
+        Returns:
+            Set degli ID per cui il permesso è stato creato
+        """
+        granted: set = set()
+        if not file_ids or not self._drive_service:
+            return granted
+
+        def on_response(request_id, response, exception):
+            if exception is None:
+                granted.add(request_id)
+            else:
+                print(f"! Errore permesso screenshot {request_id}: {exception}")
+
+        service = self._drive()
+        for i in range(0, len(file_ids), self.DRIVE_BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=on_response)
+            for file_id in file_ids[i:i + self.DRIVE_BATCH_SIZE]:
+                batch.add(
+                    service.permissions().create(
+                        fileId=file_id,
+                        body={'type': 'anyone', 'role': 'reader'},
+                        fields='id'
+                    ),
+                    request_id=file_id
+                )
+            try:
+                batch.execute()
+            except Exception as e:
+                print(f"! Errore batch permessi screenshot: {e}")
 
-        except Exception as e:
-            print(f"! Errore upload screenshot: {e}")
+        return granted
+
+    @staticmethod
+    def screenshot_urls(file: Dict[str, str]) -> ScreenshotUrls:
+        """ScreenshotUrls da un file Drive (id, webViewLink)"""
+        file_id = file.get('id', '')
+
+        # URL diretto per embedding con =IMAGE()
+        # Formato: https://drive.google.com/uc?export=view&id=FILE_ID
+        image_url = f"https://drive.google.com/uc?export=view&id={file_id}" if file_id else ""
+
+        return ScreenshotUrls(
+            image_url=image_url,
+            view_url=file.get('webViewLink', '')
+        )
+
+    def upload_screenshot(self,
+                          file_path: Path,
+                          test_id: str) -> Optional[ScreenshotUrls]:
+        """
+        Carica screenshot su Google Drive e lo rende pubblico.
+
+        Per molti screenshot usare ScreenshotUploader (upload concorrenti,
+        permessi in batch, deduplica per contenuto).
+
+        Args:
+            file_path: Path al file screenshot
+            test_id: ID del test (per nome file)
+
+        Returns:
+            ScreenshotUrls con URL immagine e URL visualizzazione, o None
+        """
+        file = self.create_drive_file(file_path, test_id)
+        if not file:
             return None
 
+        # Rendi pubblico
+        self.grant_public_read([file['id']])
+        return self.screenshot_urls(file)
+
     def update_cell(self, row: int, col: int, value: str) -> bool:
         """
         Aggiorna una cella specifica.
@@ -12,7 +12,7 @@ import asyncio
 import time
 import json
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Callable
+from typing import Optional, List, Dict, Any, Callable, Tuple
 from datetime import datetime
 from dataclasses import dataclass, field
 from enum import Enum
@@ -22,8 +22,10 @@ from .config_loader import (
     load_tests, save_tests
 )
 from .browser import BrowserManager, BrowserSettings, ChatbotSelectors
+from .screenshots import ScreenshotEncoding
 from .ollama_client import OllamaClient
 from .langsmith_client import LangSmithClient, LangSmithDebugger, LangSmithReport
+from .trace_poller import question_sent_at
 from .models import (
     TestResult, ScreenshotUrls, TestMode,
     ConversationTurn, TestCase, TestExecution, ExecutionContext
@@ -33,13 +35,65 @@ from .report_local import ReportGenerator
 from .engine.executor import TestExecutor
 from .training import TrainingData, TrainModeUI
 from .performance import PerformanceCollector, PerformanceReporter, PerformanceAlerter, PerformanceHistory
+from .cache import configure_caches, get_cache_directory, get_tiered_cache, set_performance_collector
 from .evaluation import Evaluator, EvaluationConfig, EvaluationResult, create_evaluator_from_settings
-from .baselines import BaselinesCache, get_baseline, preload_baselines
+from .embeddings import EmbeddingStore
+from .baselines import BaselinesCache, BaselineIndex, get_baseline, preload_baselines
 from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
 
 
+def browser_config(project: ProjectConfig,
+                   settings: GlobalSettings) -> Tuple[BrowserSettings, ChatbotSelectors]:
+    """Settings e selettori del browser di una sessione di test"""
+    browser_settings = BrowserSettings(
+        headless=settings.browser.headless,
+        viewport_width=settings.browser.viewport_width,
+        viewport_height=settings.browser.viewport_height,
+        device_scale_factor=settings.browser.device_scale_factor,
+        response_detection=settings.browser.response_detection,
+        observer_quiet_ms=settings.browser.observer_quiet_ms,
+        reset_strategies=settings.browser.reset_strategies,
+        reset_ready_timeout_ms=settings.browser.reset_ready_timeout_ms,
+        screenshot=ScreenshotEncoding(
+            format=settings.browser.screenshot_format,
+            quality=settings.browser.screenshot_quality,
+            max_height=settings.browser.screenshot_max_height,
+            scale=settings.browser.screenshot_scale
+        ),
+        user_data_dir=project.browser_data_dir,
+        timeout_page_load=project.chatbot.timeouts.page_load,
+        timeout_bot_response=project.chatbot.timeouts.bot_response
+    )
+
+    selectors = ChatbotSelectors(
+        textarea=project.chatbot.selectors.textarea,
+        submit_button=project.chatbot.selectors.submit_button,
+        bot_messages=project.chatbot.selectors.bot_messages,
+        thread_container=project.chatbot.selectors.thread_container,
+        loading_indicator=project.chatbot.selectors.loading_indicator,
+        new_chat_button=project.chatbot.selectors.new_chat_button
+    )
+
+    return browser_settings, selectors
+
+
+async def launch_browser(project: ProjectConfig, settings: GlobalSettings) -> BrowserManager:
+    """Avvia il browser della sessione (usato anche dal probe warm dell'health check)"""
+    browser = BrowserManager(*browser_config(project, settings))
+    try:
+        await browser.start()
+    except BaseException:
+        # Avvio fallito o annullato (deadline del probe): niente Chromium orfani
+        try:
+            await browser.stop()
+        except Exception:
+            pass
+        raise
+    return browser
+
+
 class ChatbotTester:
     """
     Engine principale per testing chatbot.
@@ -67,7 +121,8 @@ class ChatbotTester:
                  dry_run: bool = False,
                  use_langsmith: bool = True,
                  single_turn: bool = False,
-                 run_config: Optional[RunConfig] = None):
+                 run_config: Optional[RunConfig] = None,
+                 browser: Optional[BrowserManager] = None):
         """
         Inizializza il tester.
 
@@ -80,6 +135,8 @@ class ChatbotTester:
             use_langsmith: Se False, disabilita LangSmith
             single_turn: Se True, modalità AUTO esegue solo domanda iniziale (no followup)
             run_config: Configurazione run corrente (per prompt_version, env, etc.)
+            browser: Browser già avviato da riusare (es. launch_browser() nel
+                     probe warm dell'health check); chiuso da shutdown()
         """
         self.project = project
         self.settings = settings
@@ -93,13 +150,14 @@ class ChatbotTester:
         self.run_config = run_config
 
         # Browser
-        self.browser: Optional[BrowserManager] = None
+        self.browser: Optional[BrowserManager] = browser
 
         # Clients opzionali
         self.ollama: Optional[OllamaClient] = None
         self.langsmith: Optional[LangSmithClient] = None
         self.sheets: Optional[GoogleSheetsClient] = None
         self.baselines_cache: Optional[BaselinesCache] = None
+        self._embedding_prefetch: Optional[asyncio.Task] = None
 
         # Report locale
         self.report: Optional[ReportGenerator] = None
@@ -130,33 +188,20 @@ class ChatbotTester:
         """
         self.on_status("Inizializzazione componenti...")
 
-        # Browser
-        browser_settings = BrowserSettings(
-            headless=self.settings.browser.headless,
-            viewport_width=self.settings.browser.viewport_width,
-            viewport_height=self.settings.browser.viewport_height,
-            device_scale_factor=self.settings.browser.device_scale_factor,
-            user_data_dir=self.project.browser_data_dir,
-            timeout_page_load=self.project.chatbot.timeouts.page_load,
-            timeout_bot_response=self.project.chatbot.timeouts.bot_response
-        )
-
-        selectors = ChatbotSelectors(
-            textarea=self.project.chatbot.selectors.textarea,
-            submit_button=self.project.chatbot.selectors.submit_button,
-            bot_messages=self.project.chatbot.selectors.bot_messages,
-            thread_container=self.project.chatbot.selectors.thread_container,
-            loading_indicator=self.project.chatbot.selectors.loading_indicator
-        )
-
-        self.browser = BrowserManager(browser_settings, selectors)
+        # Cache a due livelli (trace completati, RUN chiuse, embeddings)
+        configure_caches(self.settings.cache)
+        cache_settings = self.settings.cache
 
-        try:
-            await self.browser.start()
-            self.on_status("✓ Browser avviato")
-        except Exception as e:
-            self.on_status(f"✗ Errore browser: {e}")
-            return False
+        # Browser (già avviato se ricevuto dal probe warm dell'health check)
+        if self.browser:
+            self.on_status("✓ Browser avviato (health check)")
+        else:
+            try:
+                self.browser = await launch_browser(self.project, self.settings)
+                self.on_status("✓ Browser avviato")
+            except Exception as e:
+                self.on_status(f"✗ Errore browser: {e}")
+                return False
 
         # Carica training data PRIMA di Ollama (serve per in-context learning)
         self.training = TrainingData.load(self.project.training_file)
@@ -165,7 +210,10 @@ class ChatbotTester:
         if self.project.ollama.enabled:
             self.ollama = OllamaClient(
                 model=self.project.ollama.model,
-                url=self.project.ollama.url
+                url=self.project.ollama.url,
+                timeout=self.project.ollama.timeout_seconds,
+                keep_alive=self.project.ollama.keep_alive,
+                num_parallel=self.project.ollama.num_parallel
             )
             if self.ollama.is_available():
                 self.on_status(f"✓ Ollama ({self.project.ollama.model}) disponibile")
@@ -179,9 +227,14 @@ class ChatbotTester:
         # Evaluation system (opzionale - usa OpenAI GPT-4o-mini)
         if self.settings.evaluation.enabled:
             try:
+                cache_dir = get_cache_directory()
                 self.evaluator = create_evaluator_from_settings(
                     self.settings.evaluation,
-                    self.project.project_dir
+                    self.project.project_dir,
+                    embedding_store=EmbeddingStore(
+                        cache_dir / EmbeddingStore.FILENAME,
+                        ttl_seconds=cache_settings.embedding_ttl_seconds
+                    ) if cache_dir else None
                 )
                 self.on_status("✓ Evaluation system attivo (OpenAI)")
             except Exception as e:
@@ -194,7 +247,9 @@ class ChatbotTester:
                 api_key=self.project.langsmith.api_key,
                 project_id=self.project.langsmith.project_id,
                 org_id=self.project.langsmith.org_id,
-                tool_names=self.project.langsmith.tool_names
+                tool_names=self.project.langsmith.tool_names,
+                cache=get_tiered_cache("langsmith_traces"),
+                cache_ttl_seconds=cache_settings.trace_ttl_seconds
             )
             if self.langsmith.is_available():
                 self.on_status("✓ LangSmith connesso")
@@ -220,7 +275,9 @@ class ChatbotTester:
                     spreadsheet_id=self.project.google_sheets.spreadsheet_id,
                     drive_folder_id=self.project.google_sheets.drive_folder_id,
                     column_preset=column_preset,
-                    column_list=column_list
+                    column_list=column_list,
+                    cache=get_tiered_cache("sheets_runs"),
+                    cache_ttl_seconds=cache_settings.sheets_ttl_seconds
                 )
 
                 # Applica configurazione colonne per test file specifico se configurato
@@ -240,7 +297,10 @@ class ChatbotTester:
 
                     # Precarica baseline (golden answers) per evaluation
                     try:
-                        self.baselines_cache = BaselinesCache(ttl_seconds=300)
+                        self.baselines_cache = BaselinesCache(
+                            ttl_seconds=300,
+                            index=BaselineIndex(self.project.project_dir / BaselineIndex.FILENAME)
+                        )
                         baseline_count = self.baselines_cache.load(
                             self.sheets,
                             self.project.name,
@@ -261,9 +321,17 @@ class ChatbotTester:
 
     async def shutdown(self) -> None:
         """Chiude tutti i componenti"""
+        await self._stop_embedding_prefetch()
+
         if self.browser:
             await self.browser.stop()
 
+        if self.ollama:
+            await self.ollama.aclose()
+
+        if self.langsmith:
+            await self.langsmith.aclose()
+
         # Salva training data
         if self.training:
             self.training.save(self.project.training_file)
@@ -413,6 +481,7 @@ class ChatbotTester:
 
         # Genera report finale
         report_paths = self.report.generate()
+        self.report.journal.close()
         self.on_status(f"\nReport generato: {report_paths['html']}")
 
         return results
@@ -639,7 +708,7 @@ class ChatbotTester:
         skip_ss = getattr(self.project.chatbot, 'skip_screenshot', False)
         skip_ss = skip_ss or (self.run_config and getattr(self.run_config, 'skip_screenshots', False))
         if self.settings.screenshot_on_complete and self.report and not skip_ss:
-            ss_path = self.report.get_screenshot_path(test.id)
+            ss_path = self.report.get_screenshot_path(test.id, self.browser.screenshot_extension)
             if await self.browser.take_screenshot(
                 ss_path,
                 inject_css=self.project.chatbot.screenshot_css
@@ -671,7 +740,9 @@ class ChatbotTester:
         model_version = ""
         if self.langsmith:
             try:
-                report = self.langsmith.get_report_for_question(test.question)
+                report = await self.langsmith.aget_report_for_question(
+                    test.question, sent_at=question_sent_at(conversation)
+                )
                 if report.trace_url:
                     langsmith_url = report.trace_url
                     langsmith_report = report.format_for_sheets()
@@ -737,9 +808,10 @@ class ChatbotTester:
 
         self.on_status(f"AUTO MODE - {len(tests)} test")
 
-        # Setup report
+        # Setup report (stessa RUN -> stesso journal: riprende dopo un crash)
         loader = ConfigLoader()
-        report_dir = loader.get_report_dir(self.project.name)
+        active_run = self.run_config.active_run if self.run_config else None
+        report_dir = loader.get_report_dir(self.project.name, active_run or None)
         self.report = ReportGenerator(report_dir, self.project.name)
         self.report.mode = "AUTO"
 
@@ -750,6 +822,7 @@ class ChatbotTester:
             project=self.project.name,
             environment="cloud" if self.settings.browser.headless else "local"
         )
+        set_performance_collector(self.perf_collector)
 
         # Update executor with session components
         self.executor.report = self.report
@@ -757,31 +830,60 @@ class ChatbotTester:
         if self.perf_collector:
             self.executor.perf_collector = self.perf_collector
 
+        # Sheets in background; prima le righe rimaste nel journal da una sessione interrotta
+        resumed = self.executor.start_sheets_writer()
+        if resumed:
+            self.on_status(f"✓ {resumed} risultati ripresi dal journal per Sheets")
+
         results = []
 
-        for i, test in enumerate(tests):
-            self.on_progress(i + 1, len(tests))
-            self.current_test = test
+        # Il browser passa al test successivo mentre LangSmith e valutazione
+        # del precedente girano nella pipeline; i risultati vengono salvati
+        # nell'ordine dei test appena pronti.
+        pipeline = self.executor.pipeline
+        await pipeline.start()
+        pending: List[asyncio.Future] = []
 
-            self.on_status(f"\n--- Test {i+1}/{len(tests)}: {test.id} ---")
+        # Embedding delle risposte attese in batch, mentre gira il primo test
+        self._embedding_prefetch = self._prefetch_expected_embeddings(tests)
 
-            result = await self.executor.execute_auto_test(test, max_turns)
-            results.append(result)
+        def save_ready(wait_all: bool = False) -> None:
+            while pending and (wait_all or pending[0].done()):
+                result = pending.pop(0).result()
+                results.append(result)
+                self._save_result(result)
 
-            # Check quit
-            if self._quit_requested:
-                self.on_status("\nSessione interrotta")
-                break
+        try:
+            for i, test in enumerate(tests):
+                self.on_progress(i + 1, len(tests))
+                self.current_test = test
 
-            # Salva nel report
-            self._save_result(result)
+                self.on_status(f"\n--- Test {i+1}/{len(tests)}: {test.id} ---")
+
+                job = await self.executor.run_conversation(test, max_turns)
+                pending.append(await pipeline.submit(job))
+                save_ready()
+
+                # Check quit
+                if self._quit_requested:
+                    self.on_status("\nSessione interrotta")
+                    break
+
+                # Pausa tra test
+                await asyncio.sleep(1)
 
-            # Pausa tra test
-            await asyncio.sleep(1)
+            # Attendi le valutazioni ancora in coda
+            await pipeline.close()
+            save_ready(wait_all=True)
+        finally:
+            await pipeline.close()
+            await self._stop_embedding_prefetch()
+            await asyncio.to_thread(self.executor.stop_sheets_writer)
 
         # Finalizza e salva metriche performance
         if self.perf_collector:
             run_metrics = self.perf_collector.finalize()
+            set_performance_collector(None)
 
             # Salva metriche
             perf_dir = report_dir / "performance"
@@ -803,10 +905,53 @@ class ChatbotTester:
 
         # Genera report finale
         report_paths = self.report.generate()
+        self.report.journal.close()
         self.on_status(f"\nReport generato: {report_paths['html']}")
 
         return results
 
+    def _prefetch_expected_embeddings(self, tests: List[TestCase]) -> Optional[asyncio.Task]:
+        """
+        Calcola in background gli embedding delle risposte attese
+        (expected_answer o baseline) con poche richieste batch.
+
+        Dalla seconda RUN arrivano dallo store persistente; le valutazioni
+        che li chiedono mentre sono in calcolo attendono la stessa richiesta.
+        """
+        if not self.evaluator:
+            return None
+
+        texts = []
+        for test in tests:
+            answer = test.expected_answer
+            if not answer and self.baselines_cache:
+                baseline = self.baselines_cache.get(test.id)
+                answer = baseline.answer if baseline else None
+            if answer:
+                texts.append(answer)
+
+        if not texts:
+            return None
+        return asyncio.create_task(asyncio.to_thread(self.evaluator.semantic_matcher.prefetch, texts))
+
+    async def _stop_embedding_prefetch(self) -> None:
+        """
+        Chiude il prefetch degli embedding: raccoglie l'esito se è finito,
+        altrimenti smette di attenderlo (il thread completa da solo e salva
+        nello store).
+        """
+        task, self._embedding_prefetch = self._embedding_prefetch, None
+        if task is None:
+            return
+        if not task.done():
+            task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.on_status(f"! Prefetch embedding fallito: {e}")
+
     # ==================== MODALITÀ ASSISTED ====================
 
     async def run_assisted_session(self,
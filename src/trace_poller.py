@@ -0,0 +1,346 @@
+"""
+Trace Poller - Attribuzione deterministica dei trace LangSmith ai test
+
+Cercare il trace di ogni test con una query "ultimi 20 root run della
+mezz'ora, input che contiene question[:50]" costa una /runs/query per
+test, perde trace quando nella finestra ne arrivano più di 20 e confonde
+test con lo stesso prefisso.
+
+Il poller è unico per RUN (per client LangSmith):
+- un thread pagina /runs/query sui root run con un cursore start_time
+  che avanza (con una sovrapposizione per i run indicizzati in ritardo)
+- i root run sono indicizzati per hash dell'input normalizzato e ordinati
+  per start_time
+- ogni test chiede "il trace di questa domanda inviata all'istante T" e
+  riceve un Future: il primo trace non ancora assegnato con quell'input
+  e iniziato dopo T (meno una tolleranza sull'orologio); richieste con
+  la stessa domanda ricevono trace distinti nell'ordine di invio
+
+Se l'input del trace non coincide esattamente (es. domanda incapsulata
+dal backend), a ogni poll si ripiega sul primo trace non assegnato dopo
+T il cui input contiene la domanda. Senza alcun trace la richiesta si
+risolve con None dopo un breve periodo di grazia: chi attende occupa
+uno slot LangSmith della pipeline (o il test in modalità train).
+
+Usage:
+    poller = TracePoller(client)
+    poller.start()
+    trace = poller.wait(question, sent_at)      # o poller.request(...) -> Future
+    poller.stop()
+"""
+
+import hashlib
+import threading
+import time
+from bisect import insort
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+from .models.langsmith import TraceInfo
+
+if TYPE_CHECKING:
+    from .langsmith_client import LangSmithClient
+
+
+def normalize_input(text: str) -> str:
+    """Testo confrontabile: minuscolo, spazi compattati"""
+    return " ".join(str(text or "").casefold().split())
+
+
+def input_key(text: str) -> str:
+    """Chiave dell'indice: hash dell'input normalizzato"""
+    return hashlib.sha1(normalize_input(text).encode('utf-8')).hexdigest()
+
+
+def to_utc(value: datetime) -> datetime:
+    """datetime naive UTC (i timestamp dei turni sono utcnow() naive)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def question_sent_at(conversation) -> Optional[datetime]:
+    """Istante di invio della domanda: timestamp del primo turno utente"""
+    for turn in conversation or ():
+        if turn.role == 'user' and turn.timestamp:
+            try:
+                return to_utc(datetime.fromisoformat(turn.timestamp.replace('Z', '+00:00')))
+            except ValueError:
+                return None
+    return None
+
+
+class _Waiter:
+    """Richiesta di un test in attesa del suo trace"""
+
+    __slots__ = ('key', 'question', 'sent_at', 'deadline', 'future')
+
+    def __init__(self, question: str, sent_at: datetime, deadline: float):
+        self.key = input_key(question)
+        self.question = normalize_input(question)
+        self.sent_at = to_utc(sent_at)
+        self.deadline = deadline
+        self.future: Future = Future()
+
+
+class TracePoller:
+    """
+    Poller condiviso dei root run di un progetto LangSmith.
+
+    Thread-safe: request()/wait() possono essere chiamati da più worker
+    (thread o asyncio.to_thread) contemporaneamente.
+    """
+
+    # Intervallo tra due poll mentre ci sono richieste in attesa
+    POLL_INTERVAL_SECONDS = 2.0
+    # Finestra riletta a ogni poll: run che compaiono in ritardo nell'API
+    OVERLAP_SECONDS = 30.0
+    # Tolleranza tra l'orologio locale e quello di LangSmith
+    CLOCK_SKEW_SECONDS = 5.0
+    # Attesa massima di un trace: la richiesta arriva a conversazione
+    # finita, di norma il trace è già indicizzato o lo sarà a breve
+    GRACE_SECONDS = 10.0
+    # Paginazione di un singolo poll
+    PAGE_SIZE = 100
+    MAX_PAGES = 20
+
+    def __init__(self,
+                 client: 'LangSmithClient',
+                 start_time: Optional[datetime] = None,
+                 poll_interval: Optional[float] = None,
+                 timeout_seconds: Optional[float] = None):
+        """
+        Args:
+            client: Client LangSmith (per le richieste e il parsing dei run)
+            start_time: Primo istante indicizzato (default: ora - OVERLAP)
+            poll_interval: Secondi tra due poll
+            timeout_seconds: Attesa massima di un trace (default GRACE_SECONDS)
+        """
+        self.client = client
+        self.poll_interval = poll_interval if poll_interval is not None else self.POLL_INTERVAL_SECONDS
+        self.timeout_seconds = timeout_seconds if timeout_seconds is not None else self.GRACE_SECONDS
+
+        self._cursor = to_utc(start_time) if start_time else (
+            datetime.utcnow() - timedelta(seconds=self.OVERLAP_SECONDS)
+        )
+        self._latest: Optional[datetime] = None
+
+        # input hash -> [(start_time, trace id)] ordinati
+        self._index: Dict[str, List[Tuple[datetime, str]]] = {}
+        self._traces: Dict[str, TraceInfo] = {}
+        self._claimed: Set[str] = set()
+        self._waiters: List[_Waiter] = []
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Statistiche
+        self.queries = 0
+        self.indexed = 0
+
+    # ==================== CICLO DI VITA ====================
+
+    def start(self) -> None:
+        """Avvia il thread di polling (idempotente)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="langsmith-trace-poller", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Ferma il polling; le richieste pendenti ricevono il fallback"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._expire(force=True)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive() and not self._stopped.is_set())
+
+    # ==================== RICHIESTE ====================
+
+    def request(self, question: str, sent_at: datetime,
+                timeout: Optional[float] = None) -> 'Future[Optional[TraceInfo]]':
+        """
+        Richiede il trace di una domanda inviata all'istante sent_at.
+
+        Returns:
+            Future risolto con il TraceInfo (None se non trovato in tempo)
+        """
+        waiter = _Waiter(question, sent_at, time.monotonic() + (timeout if timeout is not None else self.timeout_seconds))
+        with self._lock:
+            # Domanda inviata prima dell'ultimo poll: rileggi da lì (dedup per id)
+            self._cursor = min(self._cursor, waiter.sent_at - timedelta(seconds=self.CLOCK_SKEW_SECONDS))
+            self._waiters.append(waiter)
+            self._waiters.sort(key=lambda w: w.sent_at)
+            self._assign()
+        self._wakeup.set()
+        return waiter.future
+
+    def wait(self, question: str, sent_at: datetime,
+             timeout: Optional[float] = None) -> Optional[TraceInfo]:
+        """request() bloccante"""
+        future = self.request(question, sent_at, timeout)
+        if not self.running:
+            # Senza thread (es. test o poller fermo): poll sincroni
+            while not future.done():
+                self.poll_once()
+                if future.done() or self._stopped.is_set():
+                    break
+                self._expire()
+                if not future.done():
+                    time.sleep(self.poll_interval)
+        return future.result()
+
+    # ==================== POLLING ====================
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            with self._lock:
+                pending = bool(self._waiters)
+            if pending:
+                try:
+                    self.poll_once()
+                except Exception as e:
+                    print(f"! Errore poll trace LangSmith: {e}")
+                self._expire()
+                self._stopped.wait(self.poll_interval)
+            else:
+                self._wakeup.wait()
+                self._wakeup.clear()
+
+    def poll_once(self) -> int:
+        """
+        Un passo incrementale: root run iniziati dal cursore in poi.
+
+        Returns:
+            Numero di trace nuovi indicizzati
+        """
+        since = self._cursor
+        api_cursor = None
+        new_traces: List[TraceInfo] = []
+
+        for _ in range(self.MAX_PAGES):
+            payload = {
+                'session': [self.client.project_id],
+                'is_root': True,
+                'start_time': since.isoformat(),
+                'limit': self.PAGE_SIZE
+            }
+            if api_cursor:
+                payload['cursor'] = api_cursor
+
+            self.queries += 1
+            response = self.client._request_with_retry(
+                'post',
+                f"{self.client.BASE_URL}/runs/query",
+                json=payload,
+                timeout=30
+            )
+            if not response or response.status_code != 200:
+                break
+
+            data = response.json()
+            page = data.get('runs', [])
+            for run in page:
+                if run.get('id') in self._traces:
+                    continue
+                trace = self.client._parse_run(run)
+                if trace:
+                    new_traces.append(trace)
+
+            api_cursor = (data.get('cursors') or {}).get('next')
+            if not api_cursor or not page:
+                break
+
+        with self._lock:
+            for trace in new_traces:
+                if trace.id in self._traces:
+                    continue
+                started = to_utc(trace.start_time)
+                self._traces[trace.id] = trace
+                insort(self._index.setdefault(input_key(trace.input), []), (started, trace.id))
+                if self._latest is None or started > self._latest:
+                    self._latest = started
+            self.indexed += len(new_traces)
+
+            # Il cursore avanza, ma rilegge sempre l'ultima finestra
+            if self._latest:
+                self._cursor = max(self._cursor, self._latest - timedelta(seconds=self.OVERLAP_SECONDS))
+            self._assign(containment=True)
+
+        return len(new_traces)
+
+    # ==================== ATTRIBUZIONE ====================
+
+    def _earliest(self, candidates, sent_at: datetime) -> Optional[str]:
+        """Primo trace non assegnato iniziato dopo sent_at (meno la tolleranza)"""
+        threshold = sent_at - timedelta(seconds=self.CLOCK_SKEW_SECONDS)
+        for started, trace_id in candidates:
+            if started >= threshold and trace_id not in self._claimed:
+                return trace_id
+        return None
+
+    def _assign(self, containment: bool = False) -> None:
+        """
+        Risolve le richieste (in ordine di invio). Lock tenuto.
+
+        Args:
+            containment: Dopo il match esatto prova quello per contenimento
+                         (solo dopo un poll: il trace esatto potrebbe non
+                         essere ancora indicizzato al momento della richiesta)
+        """
+        remaining = []
+        for waiter in self._waiters:
+            trace_id = self._earliest(self._index.get(waiter.key, ()), waiter.sent_at)
+            if trace_id is None:
+                remaining.append(waiter)
+                continue
+            self._claimed.add(trace_id)
+            waiter.future.set_result(self._traces[trace_id])
+        self._waiters = remaining
+
+        if not containment:
+            return
+        # Dopo tutti i match esatti: un trace esatto non viene sottratto
+        remaining = []
+        for waiter in self._waiters:
+            trace_id = self._fallback(waiter)
+            if trace_id is None:
+                remaining.append(waiter)
+                continue
+            self._claimed.add(trace_id)
+            waiter.future.set_result(self._traces[trace_id])
+        self._waiters = remaining
+
+    def _expire(self, force: bool = False) -> None:
+        """Richieste scadute: fallback su input che contiene la domanda, poi None"""
+        now = time.monotonic()
+        with self._lock:
+            remaining = []
+            for waiter in self._waiters:
+                if not force and now < waiter.deadline:
+                    remaining.append(waiter)
+                    continue
+                trace_id = self._fallback(waiter)
+                if trace_id:
+                    self._claimed.add(trace_id)
+                waiter.future.set_result(self._traces[trace_id] if trace_id else None)
+            self._waiters = remaining
+
+    def _fallback(self, waiter: _Waiter) -> Optional[str]:
+        if not waiter.question:
+            return None
+        candidates = sorted(
+            (to_utc(trace.start_time), trace_id)
+            for trace_id, trace in self._traces.items()
+            if waiter.question in normalize_input(trace.input)
+        )
+        return self._earliest(candidates, waiter.sent_at)
@@ -8,13 +8,15 @@ Gestisce:
 - Persistenza in training_data.json
 """
 
-import re
 import json
+from bisect import bisect_left, bisect_right
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, List, Dict, Any, Tuple
 from dataclasses import dataclass, field, asdict
 
+from .pattern_matcher import PatternMatcher, compile_patterns
+
 
 @dataclass
 class LearnedResponse:
@@ -33,44 +35,78 @@ class LearnedResponse:
         self.last_used = datetime.utcnow().isoformat()
 
 
+def _response_key(text: str) -> str:
+    """Chiave di confronto delle risposte (case-insensitive)"""
+    return text.casefold()
+
+
 @dataclass
 class Pattern:
     """Pattern riconosciuto nelle domande del bot"""
     id: str
     name: str  # Nome human-readable (es. "country", "email", "confirmation")
     bot_patterns: List[str]  # Regex patterns per riconoscere la domanda
-    responses: List[LearnedResponse] = field(default_factory=list)
-    
+    responses: List[LearnedResponse] = field(default_factory=list)  # Ordinate per count decrescente
+
+    # Indice risposte per testo e regex compilate (derivati, non serializzati)
+    _by_text: Dict[str, LearnedResponse] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _compiled: Tuple = field(default=(), init=False, repr=False, compare=False)
+    _compiled_source: Tuple[str, ...] = field(default=(), init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Ordinamento stabile: a parità di count resta l'ordine originale
+        self.responses.sort(key=lambda r: r.count, reverse=True)
+        self._by_text = {}
+        for resp in self.responses:
+            self._by_text.setdefault(_response_key(resp.text), resp)
+
+    def compiled_patterns(self) -> Tuple:
+        """Regex compilate (ricompilate solo se bot_patterns cambia)"""
+        source = tuple(self.bot_patterns)
+        if source != self._compiled_source:
+            self._compiled = compile_patterns(source, self.id)
+            self._compiled_source = source
+        return self._compiled
+
     def matches(self, bot_message: str) -> bool:
         """Verifica se il messaggio del bot matcha questo pattern"""
         msg_lower = bot_message.lower()
-        for pattern in self.bot_patterns:
-            if re.search(pattern, msg_lower):
-                return True
-        return False
-    
+        return any(regex.search(msg_lower) for regex in self.compiled_patterns())
+
+    def get_response(self, text: str) -> Optional[LearnedResponse]:
+        """Risposta già appresa con lo stesso testo (case-insensitive)"""
+        return self._by_text.get(_response_key(text))
+
     def get_suggestions(self, limit: int = 5) -> List[LearnedResponse]:
         """Ritorna le risposte più usate"""
-        sorted_responses = sorted(
-            self.responses, 
-            key=lambda r: r.count, 
-            reverse=True
-        )
-        return sorted_responses[:limit]
-    
+        return self.responses[:limit]
+
     def add_response(self, text: str) -> LearnedResponse:
         """Aggiunge o aggiorna una risposta"""
-        # Cerca risposta esistente
-        for resp in self.responses:
-            if resp.text.lower() == text.lower():
-                resp.use()
-                return resp
-        
-        # Nuova risposta
+        resp = self.get_response(text)
+        if resp is not None:
+            # Sposta la risposta davanti a quelle con count ora inferiore
+            index = self._position(resp)
+            resp.use()
+            target = bisect_right(self.responses, -resp.count, hi=index, key=lambda r: -r.count)
+            if target < index:
+                self.responses.insert(target, self.responses.pop(index))
+            return resp
+
+        # Nuova risposta: count 1, in coda
         new_resp = LearnedResponse(text=text)
         self.responses.append(new_resp)
+        self._by_text[_response_key(text)] = new_resp
         return new_resp
 
+    def _position(self, resp: LearnedResponse) -> int:
+        """Indice di resp in responses (cercato nel blocco con lo stesso count)"""
+        start = bisect_left(self.responses, -resp.count, key=lambda r: -r.count)
+        for i in range(start, len(self.responses)):
+            if self.responses[i] is resp:
+                return i
+        return next(i for i, r in enumerate(self.responses) if r is resp)
+
 
 @dataclass
 class ConversationTurn:
@@ -174,6 +210,8 @@ class TrainingData:
     def __init__(self):
         self.patterns: List[Pattern] = []
         self.conversations: List[RecordedConversation] = []
+        self._matcher: Optional[PatternMatcher] = None
+        self._matcher_source: Optional[List[Pattern]] = None
         self._initialize_default_patterns()
     
     def _initialize_default_patterns(self):
@@ -308,6 +346,20 @@ class TrainingData:
             print(f"✗ Errore salvataggio training_data: {e}")
             return False
     
+    @property
+    def matcher(self) -> PatternMatcher:
+        """Matcher compilato, ricostruito se self.patterns viene sostituita o estesa"""
+        matcher = self._matcher
+        if matcher is None or self._matcher_source is not self.patterns \
+                or len(matcher.patterns) != len(self.patterns):
+            matcher = self._matcher = PatternMatcher(self.patterns)
+            self._matcher_source = self.patterns
+        return matcher
+
+    def invalidate_matcher(self) -> None:
+        """Da chiamare dopo modifiche dirette a bot_patterns di un pattern"""
+        self._matcher = None
+
     def match_pattern(self, bot_message: str) -> Optional[Pattern]:
         """
         Trova il pattern che matcha il messaggio del bot.
@@ -316,12 +368,9 @@ class TrainingData:
             bot_message: Messaggio del bot
             
         Returns:
-            Pattern matchato o None
+            Primo pattern (in ordine) che matcha, o None
         """
-        for pattern in self.patterns:
-            if pattern.matches(bot_message):
-                return pattern
-        return None
+        return self.matcher.match(bot_message)
     
     def learn(self, bot_message: str, user_response: str) -> Tuple[Optional[Pattern], bool]:
         """
@@ -337,14 +386,9 @@ class TrainingData:
         pattern = self.match_pattern(bot_message)
         
         if pattern:
-            # Verifica se è nuova
-            existing = any(
-                r.text.lower() == user_response.lower() 
-                for r in pattern.responses
-            )
-            
+            is_new = pattern.get_response(user_response) is None
             pattern.add_response(user_response)
-            return pattern, not existing
+            return pattern, is_new
         
         return None, False
     
@@ -449,6 +493,7 @@ class TrainingData:
             if p.id == pattern_id:
                 # Aggiorna patterns esistente
                 p.bot_patterns = list(set(p.bot_patterns + bot_patterns))
+                self.invalidate_matcher()
                 return p
         
         # Crea nuovo
@@ -459,6 +504,7 @@ class TrainingData:
             responses=[]
         )
         self.patterns.append(new_pattern)
+        self.invalidate_matcher()
         return new_pattern
 
 
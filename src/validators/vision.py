@@ -8,12 +8,11 @@ when HTML parsing is not possible (rendered widgets, canvas, etc.)
 import os
 import re
 import json
-import base64
 import logging
-from pathlib import Path
 from typing import Optional, Dict, Any, List
 
 from .structured import StructuredValidationResult
+from ..screenshots import load_screenshot
 
 logger = logging.getLogger(__name__)
 
@@ -127,8 +126,8 @@ Only include fields that are actually visible. Return valid JSON only."""
             return result
 
         # Load and encode image
-        image_data = self._load_image(screenshot_path)
-        if not image_data:
+        image_url = self._load_image(screenshot_path)
+        if not image_url:
             result.errors.append(f"Failed to load image: {screenshot_path}")
             return result
 
@@ -137,7 +136,7 @@ Only include fields that are actually visible. Return valid JSON only."""
 
         # Call Vision API
         try:
-            extracted = self._call_vision_api(image_data, prompt)
+            extracted = self._call_vision_api(image_url, prompt)
             if not extracted:
                 result.errors.append("Vision API returned no data")
                 return result
@@ -157,17 +156,15 @@ Only include fields that are actually visible. Return valid JSON only."""
         return result
 
     def _load_image(self, path: str) -> Optional[str]:
-        """Load image and encode as base64."""
+        """Load image as a data URL (shared in-memory buffer, disk as fallback)."""
         try:
-            image_path = Path(path)
-            if not image_path.exists():
+            shot = load_screenshot(path)
+            if shot is None:
                 logger.error(f"Image not found: {path}")
                 return None
 
-            with open(image_path, "rb") as f:
-                image_bytes = f.read()
-
-            return base64.b64encode(image_bytes).decode("utf-8")
+            # base64 is computed once per screenshot and reused
+            return shot.data_url
 
         except Exception as e:
             logger.error(f"Failed to load image: {e}")
@@ -192,14 +189,11 @@ Return only valid JSON, no other text."""
 
     def _call_vision_api(
         self,
-        image_data: str,
+        image_url: str,
         prompt: str
     ) -> Optional[Dict[str, Any]]:
         """Call GPT-4 Vision API."""
         try:
-            # Determine image type from data
-            image_url = f"data:image/png;base64,{image_data}"
-
             response = self._client.chat.completions.create(
                 model=self._get_model(),
                 messages=[
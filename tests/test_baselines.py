@@ -0,0 +1,216 @@
+"""
+Unit Tests - Baselines
+
+Testa l'indice locale delle baseline: letture incrementali con
+values.batchGet, salto completo a versione Drive invariata, persistenza.
+"""
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.baselines import BaselineIndex, BaselinesCache
+from src.models.sheet_schema import COLUMN_INDEX, COLUMNS
+
+
+def _row(test_id: str, baseline: str = "", conversation: str = "") -> list:
+    row = [""] * len(COLUMNS)
+    row[COLUMN_INDEX['TEST ID']] = test_id
+    row[COLUMN_INDEX['BASELINE']] = baseline
+    row[COLUMN_INDEX['CONVERSATION']] = conversation or f"USER: q\nBOT: risposta {test_id}"
+    return row
+
+
+class FakeWorksheet:
+    def __init__(self, sheet_id, title, rows):
+        self.id = sheet_id
+        self.title = title
+        self.rows = [list(COLUMNS)] + rows
+
+
+class FakeSpreadsheet:
+    """Risponde a values_batch_get su colonne intere e singole righe"""
+
+    def __init__(self, worksheets):
+        self._worksheets = worksheets
+        self.batch_calls = []
+
+    def worksheets(self):
+        return self._worksheets
+
+    def values_batch_get(self, ranges):
+        self.batch_calls.append(list(ranges))
+        value_ranges = []
+        for a1 in ranges:
+            title, cells = re.match(r"^'(.*)'!(.+)$", a1).groups()
+            ws = next(w for w in self._worksheets if w.title == title.replace("''", "'"))
+            column = re.match(r"^([A-Z]):\1$", cells)
+            if column:
+                idx = ord(column.group(1)) - ord('A')
+                values = [[row[idx]] if row[idx] else [] for row in ws.rows]
+                # Come l'API: righe vuote in coda omesse
+                while values and not values[-1]:
+                    values.pop()
+            else:
+                start, end, number = re.match(r"^([A-Z])(\d+):([A-Z])\2$", cells).group(1, 3, 2)
+                row = ws.rows[int(number) - 1]
+                values = [row[ord(start) - ord('A'):ord(end) - ord('A') + 1]]
+            value_ranges.append({'range': a1, 'values': values})
+        return {'valueRanges': value_ranges}
+
+
+@pytest.fixture
+def client():
+    sheets_client = pytest.importorskip("src.sheets_client")
+    if not sheets_client.GOOGLE_AVAILABLE:
+        pytest.skip("Dipendenze Google non installate")
+
+    client = sheets_client.GoogleSheetsClient(credentials_path="creds.json", spreadsheet_id="sheet-1")
+    client._spreadsheet = FakeSpreadsheet([
+        FakeWorksheet(1, "Run 001 [DEV] auto", [_row("T1", "✓"), _row("T2")]),
+        FakeWorksheet(2, "Run 002 [DEV] auto", [_row("T1"), _row("T3", "TRUE")]),
+        FakeWorksheet(3, "Note", [_row("X", "✓")]),
+    ])
+    client.version = "10"
+    client.get_spreadsheet_version = lambda: client.version
+    return client
+
+
+class TestBaselineIndex:
+    """Test refresh incrementale"""
+
+    def test_first_scan_reads_only_marked_rows(self, client, tmp_path):
+        index = BaselineIndex(tmp_path / BaselineIndex.FILENAME)
+
+        baselines = client.get_all_baselines(index=index)
+
+        assert sorted((b['test_id'], b['run_number']) for b in baselines) == [("T1", 1), ("T3", 2)]
+        # Una batchGet per le colonne BASELINE, una per le righe marcate
+        assert len(client._spreadsheet.batch_calls) == 2
+        assert index.last_scan == {'sheets': 2, 'changed': 2, 'rows_read': 2}
+
+    def test_same_drive_version_reads_nothing(self, client, tmp_path):
+        path = tmp_path / BaselineIndex.FILENAME
+        client.get_all_baselines(index=BaselineIndex(path))
+        client._spreadsheet.batch_calls.clear()
+
+        # Nuovo processo: indice riletto dal disco
+        baselines = client.get_all_baselines(index=BaselineIndex(path))
+
+        assert client._spreadsheet.batch_calls == []
+        assert len(baselines) == 2
+
+    def test_only_changed_sheet_is_reread(self, client, tmp_path):
+        # RUN 2 senza baseline: invariata, non viene riletta
+        client._spreadsheet._worksheets[1].rows[2][COLUMN_INDEX['BASELINE']] = ""
+        index = BaselineIndex(tmp_path / BaselineIndex.FILENAME)
+        client.get_all_baselines(index=index)
+        client._spreadsheet.batch_calls.clear()
+
+        # Reviewer marca T2 nella RUN 1
+        client._spreadsheet._worksheets[0].rows[2][COLUMN_INDEX['BASELINE']] = "✓"
+        client.version = "11"
+        baselines = client.get_all_baselines(index=index)
+
+        row_ranges = client._spreadsheet.batch_calls[1]
+        assert all(r.startswith("'Run 001") for r in row_ranges)
+        assert index.last_scan['changed'] == 1
+        assert sorted(b['test_id'] for b in baselines) == ["T1", "T2"]
+
+    def test_edited_baseline_row_is_reread(self, client, tmp_path):
+        """Risposta golden corretta senza toccare la colonna BASELINE"""
+        index = BaselineIndex(tmp_path / BaselineIndex.FILENAME)
+        client.get_all_baselines(index=index)
+
+        run_1 = client._spreadsheet._worksheets[0]
+        run_1.rows[1][COLUMN_INDEX['CONVERSATION']] = "USER: q\nBOT: risposta corretta"
+        client.version = "11"
+        baselines = {b['test_id']: b for b in client.get_all_baselines(index=index)}
+
+        assert baselines["T1"]['conversation'].endswith("risposta corretta")
+        assert index.last_scan['rows_read'] == 2
+
+    def test_other_spreadsheet_starts_over(self, client, tmp_path):
+        index = BaselineIndex(tmp_path / BaselineIndex.FILENAME)
+        index.replace("other", "10", {"1": {"title": "Run 001", "run_number": 1,
+                                            "fingerprint": "x", "baselines": [{"test_id": "OLD"}]}})
+
+        assert index.baselines("sheet-1") == []
+        assert "OLD" not in [b['test_id'] for b in client.get_all_baselines(index=index)]
+
+    def test_cache_uses_index(self, client, tmp_path):
+        cache = BaselinesCache(index=BaselineIndex(tmp_path / BaselineIndex.FILENAME))
+
+        assert cache.load(client, "demo") == 2
+        assert cache.get("T3").answer == "risposta T3"
+
+
+class FakeCache:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.data[key] = value
+
+
+class CountingWorksheet(FakeWorksheet):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.reads = 0
+
+    def get_all_values(self):
+        self.reads += 1
+        return [list(row) for row in self.rows]
+
+
+class TestClosedRunCache:
+    """Test cache dei fogli RUN chiusi"""
+
+    def test_cache_survives_writes_to_other_sheets(self, client):
+        """Righe accodate alla RUN corrente cambiano la versione Drive, non la cache"""
+        worksheet = CountingWorksheet(1, "Run 001 [DEV] auto", [_row("T1")])
+        client.cache = FakeCache()
+
+        client.get_run_values(worksheet, closed=True)
+        client.version = "11"
+        client.get_run_values(worksheet, closed=True)
+
+        assert worksheet.reads == 1
+
+    def test_cache_follows_baseline_column(self, client, tmp_path):
+        client.cache = FakeCache()
+        worksheet = client._spreadsheet._worksheets[0] = CountingWorksheet(
+            1, "Run 001 [DEV] auto", [_row("T1", "✓"), _row("T2")]
+        )
+        index = BaselineIndex(tmp_path / BaselineIndex.FILENAME)
+        client.get_all_baselines(index=index)
+
+        client.get_run_values(worksheet, closed=True)
+        client.get_run_values(worksheet, closed=True)
+        assert worksheet.reads == 1
+
+        # Baseline marcata dopo la chiusura: fingerprint diverso, foglio riletto
+        worksheet.rows[2][COLUMN_INDEX['BASELINE']] = "✓"
+        client.version = "11"
+        client.get_all_baselines(index=index)
+        values = client.get_run_values(worksheet, closed=True)
+        client.get_run_values(worksheet, closed=True)
+
+        assert worksheet.reads == 2
+        assert values[2][COLUMN_INDEX['BASELINE']] == "✓"
+
+    def test_open_run_is_always_read(self, client):
+        worksheet = CountingWorksheet(1, "Run 001 [DEV] auto", [_row("T1")])
+        client.cache = FakeCache()
+
+        client.get_run_values(worksheet, closed=False)
+        client.get_run_values(worksheet, closed=False)
+
+        assert worksheet.reads == 2
+        assert client.cache.data == {}
@@ -0,0 +1,136 @@
+"""
+Unit Tests - Batch multi-progetto
+
+Testa la matrice progetto -> test (CLI e YAML) e l'esecuzione in-process:
+una sola sessione per progetto, progetti in concorrenza, errori isolati.
+"""
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.batch import BatchTarget, build_batch_matrix, load_batch_matrix, run_batch
+
+
+def _results(*outcomes):
+    return [SimpleNamespace(result=o) for o in outcomes]
+
+
+class TestBatchMatrix:
+    """Test costruzione matrice"""
+
+    def test_cli_matrix_shares_test_ids(self):
+        targets = build_batch_matrix("silicon-a, silicon-b,silicon-a", "TEST_006,TEST_007")
+
+        assert [t.project for t in targets] == ["silicon-a", "silicon-b"]
+        assert all(t.test_ids == ["TEST_006", "TEST_007"] for t in targets)
+
+    def test_yaml_mapping_and_list(self, tmp_path):
+        mapping = tmp_path / "matrix.yaml"
+        mapping.write_text("silicon-a: [TEST_006, TEST_007]\nsilicon-b: all\n")
+        listed = tmp_path / "list.yaml"
+        listed.write_text("- project: silicon-prod\n  tests: TEST_001,TEST_002\n")
+
+        assert load_batch_matrix(mapping) == [
+            BatchTarget("silicon-a", ["TEST_006", "TEST_007"]),
+            BatchTarget("silicon-b", []),
+        ]
+        assert load_batch_matrix(listed) == [BatchTarget("silicon-prod", ["TEST_001", "TEST_002"])]
+
+    def test_yaml_entry_without_project(self, tmp_path):
+        path = tmp_path / "matrix.yaml"
+        path.write_text("- tests: [TEST_001]\n")
+
+        with pytest.raises(ValueError):
+            load_batch_matrix(path)
+
+
+class TestRunBatch:
+    """Test esecuzione batch"""
+
+    def test_projects_run_concurrently_in_matrix_order(self):
+        running = {'now': 0, 'max': 0}
+
+        async def run_project(target):
+            running['now'] += 1
+            running['max'] = max(running['max'], running['now'])
+            await asyncio.sleep(0.02 if target.project == "a" else 0.01)
+            running['now'] -= 1
+            return _results("PASS", "FAIL" if target.project == "b" else "PASS")
+
+        result = asyncio.run(run_batch(build_batch_matrix("a,b,c"), run_project))
+
+        assert running['max'] == 3
+        assert [p.project for p in result.projects] == ["a", "b", "c"]
+        assert (result.total, result.passed, result.failed) == (6, 5, 1)
+        assert not result.ok
+
+    def test_max_projects_limits_concurrency(self):
+        running = {'now': 0, 'max': 0}
+
+        async def run_project(target):
+            running['now'] += 1
+            running['max'] = max(running['max'], running['now'])
+            await asyncio.sleep(0.01)
+            running['now'] -= 1
+            return []
+
+        asyncio.run(run_batch(build_batch_matrix("a,b,c,d"), run_project, max_projects=2))
+
+        assert running['max'] == 2
+
+    def test_project_error_does_not_stop_others(self):
+        async def run_project(target):
+            if target.project == "broken":
+                raise RuntimeError("login fallito")
+            if target.project == "idle":
+                return None
+            return _results("PASS")
+
+        result = asyncio.run(run_batch(build_batch_matrix("broken,ok,idle"), run_project))
+
+        broken, ok, idle = result.projects
+        assert broken.error == "login fallito"
+        assert ok.ok and ok.passed == 1
+        assert idle.error == "sessione non avviata"
+        assert "ERRORE - login fallito" in result.format_summary()
+
+
+class TestRunBatchSessions:
+    """Test integrazione con run.py: una sessione per progetto"""
+
+    def test_one_session_per_project(self, monkeypatch):
+        import run
+        run.load_core()
+
+        sessions = []
+
+        async def fake_session(project, settings, mode, **kwargs):
+            sessions.append((project.name, mode.value, kwargs['test_ids'], kwargs['no_interactive']))
+            return _results("PASS", "PASS")
+
+        class FakeLoader:
+            def load_project(self, name):
+                return SimpleNamespace(name=name)
+
+        monkeypatch.setattr(run, "run_test_session", fake_session)
+        monkeypatch.setattr(run, "ConfigLoader", FakeLoader)
+
+        args = SimpleNamespace(
+            skip_health_check=True, tests='pending', new_run=True, single_turn=True,
+            test_limit=0, parallel=False, workers=3, prompt_version='', sheet_prefix='Run',
+            skip_screenshots=False, batch_concurrency=0
+        )
+        targets = build_batch_matrix("silicon-a,silicon-b,silicon-prod", "TEST_006,TEST_007")
+
+        result = asyncio.run(run.run_batch_sessions(targets, settings=None, args=args))
+
+        assert sorted(sessions) == [
+            (name, "auto", "TEST_006,TEST_007", True)
+            for name in ("silicon-a", "silicon-b", "silicon-prod")
+        ]
+        assert result.ok and result.total == 6
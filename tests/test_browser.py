@@ -0,0 +1,188 @@
+"""
+Unit Tests - BrowserManager
+
+Testa la logica di rilevamento risposta senza avviare Chromium.
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.browser import BrowserManager, BrowserSettings, ChatbotSelectors
+from src.performance import PerformanceCollector
+
+
+def _make_manager(quiet_ms: int = 50) -> BrowserManager:
+    settings = BrowserSettings(headless=True, response_detection="observer", observer_quiet_ms=quiet_ms)
+    selectors = ChatbotSelectors(textarea="#t", submit_button="#b", bot_messages=".bot")
+    manager = BrowserManager(settings, selectors)
+    manager._observer_installed = True
+
+    async def fake_extract():
+        return "  risposta completa  "
+
+    manager._extract_last_message_text = fake_extract
+    return manager
+
+
+class TestObserverDetection:
+    """Test rilevamento push via MutationObserver"""
+
+    def test_completes_after_quiet_window(self):
+        """La risposta è completa dopo il silenzio DOM, con timing dagli eventi"""
+        async def scenario():
+            manager = _make_manager()
+            manager._observer_events = asyncio.Queue()
+            manager._last_message_count = 1
+            manager._send_wall_ms = 1000.0
+
+            for event in [
+                {"type": "new_message", "count": 2, "ts": 1250.0, "loading": False},
+                {"type": "text_changed", "count": 2, "ts": 1400.0, "loading": False},
+            ]:
+                manager._observer_events.put_nowait(event)
+
+            text = await manager.wait_for_response(timeout_ms=2000)
+            return manager, text
+
+        manager, text = asyncio.run(scenario())
+
+        assert text == "risposta completa"
+        assert manager.last_response_timing.ttfr_ms == 250.0
+        assert manager.last_response_timing.total_ms == 400.0
+        assert manager._last_message_count == 2
+
+    def test_ignores_events_for_existing_messages(self):
+        """Eventi che non aumentano il conteggio non completano la risposta"""
+        async def scenario():
+            manager = _make_manager()
+            manager._observer_events = asyncio.Queue()
+            manager._last_message_count = 2
+            manager._observer_events.put_nowait(
+                {"type": "text_changed", "count": 2, "ts": time.time() * 1000, "loading": False}
+            )
+            return await manager.wait_for_response(timeout_ms=200)
+
+        assert asyncio.run(scenario()) is None
+
+    def test_waits_while_loading(self):
+        """Con loading indicator visibile la risposta non è ancora completa"""
+        async def scenario():
+            manager = _make_manager()
+            manager._observer_events = asyncio.Queue()
+            manager._last_message_count = 0
+            manager._send_wall_ms = 0.0
+
+            async def still_loading():
+                return True
+
+            manager._is_loading_visible = still_loading
+            manager._observer_events.put_nowait(
+                {"type": "new_message", "count": 1, "ts": 10.0, "loading": True}
+            )
+            return await manager.wait_for_response(timeout_ms=300)
+
+        assert asyncio.run(scenario()) is None
+
+
+def _make_reset_manager(outcomes: dict, new_chat_button: str = ".new") -> BrowserManager:
+    settings = BrowserSettings(headless=True)
+    selectors = ChatbotSelectors(textarea="#t", submit_button="#b", bot_messages=".bot",
+                                 new_chat_button=new_chat_button)
+    manager = BrowserManager(settings, selectors)
+    manager._page = object()
+    manager.applied = []
+
+    async def fake_apply(strategy):
+        manager.applied.append(strategy)
+        return outcomes[strategy]
+
+    manager._apply_reset = fake_apply
+    return manager
+
+
+class StaleThreadPage:
+    """Pagina con una conversazione precedente, ripristinata da sessionStorage al caricamento"""
+
+    def __init__(self):
+        self.storage = {"thread": "precedente"}
+        self.bot_messages = 3
+        self.gotos = []
+
+    async def evaluate(self, script, arg=None):
+        if "sessionStorage.clear" in script:
+            self.storage.clear()
+
+    async def goto(self, url, **kwargs):
+        self.gotos.append(url)
+        self.bot_messages = 3 if self.storage else 0
+
+    async def reload(self, **kwargs):
+        self.bot_messages = 3 if self.storage else 0
+
+    async def wait_for_function(self, script, arg=None, timeout=None):
+        if self.bot_messages > arg['maxMessages']:
+            raise TimeoutError("messaggi della chat precedente ancora visibili")
+
+
+class TestResetSession:
+    """Test strategie di reset veloce"""
+
+    def test_uses_first_ready_strategy(self):
+        """new_chat verificato: nessun reload"""
+        manager = _make_reset_manager({"new_chat": True, "clear_storage": True, "reload": True})
+
+        result = asyncio.run(manager.reset_session())
+
+        assert result.strategy == "new_chat"
+        assert result.ready
+        assert manager.applied == ["new_chat"]
+
+    def test_failed_strategy_is_not_retried(self):
+        """Una strategia che non supera la readiness viene saltata ai test successivi"""
+        manager = _make_reset_manager({"new_chat": False, "clear_storage": True, "reload": True})
+
+        first = asyncio.run(manager.reset_session())
+        manager.applied.clear()
+        second = asyncio.run(manager.reset_session())
+
+        assert first.strategy == "clear_storage"
+        assert second.strategy == "clear_storage"
+        assert manager.applied == ["clear_storage"]
+
+    def test_new_chat_skipped_without_selector(self):
+        """Senza new_chat_button si passa direttamente alle altre strategie"""
+        manager = _make_reset_manager({"clear_storage": False, "reload": True}, new_chat_button="")
+
+        result = asyncio.run(manager.reset_session())
+
+        assert result.strategy == "reload"
+        assert manager.applied == ["clear_storage", "reload"]
+
+    def test_clear_storage_resets_stale_thread(self):
+        """La vecchia chat resta a schermo finché la pagina non viene riaperta"""
+        page = StaleThreadPage()
+        manager = BrowserManager(BrowserSettings(headless=True),
+                                 ChatbotSelectors(textarea="#t", submit_button="#b", bot_messages=".bot"))
+        manager._page = page
+        manager._current_url = "https://bot.example"
+
+        assert asyncio.run(manager._apply_reset("clear_storage"))
+        assert page.gotos == ["https://bot.example"]
+        assert page.bot_messages == 0
+
+    def test_reset_recorded_in_collector(self):
+        """Durata e strategia finiscono nelle metriche del run"""
+        collector = PerformanceCollector(run_id="1", project="test")
+        for strategy, ms in [("new_chat", 100), ("new_chat", 300), ("reload", 2000)]:
+            collector.start_test("T")
+            collector.record_reset(strategy, ms)
+            collector.end_test("PASS")
+
+        metrics = collector.finalize()
+
+        assert metrics.reset_strategies == {"new_chat": 2, "reload": 1}
+        assert metrics.reset_avg_ms == 800
+        assert metrics.test_metrics[0].get_phase_duration("reset") == 100
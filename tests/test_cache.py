@@ -0,0 +1,183 @@
+"""
+Unit Tests - Cache
+
+Testa LRU, limiti su disco, cache a due livelli e integrazione con
+PerformanceCollector / LangSmithClient.
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import performance
+from src.cache import (
+    DiskCache,
+    MemoryCache,
+    TieredCache,
+    cache_metrics_scope,
+    set_performance_collector,
+)
+from src.models.langsmith import TraceBundle
+from src.performance import PerformanceCollector
+from tests.test_langsmith import LLM, RETRIEVER, ROOT, TOOL, _make_client
+
+
+class TestMemoryCache:
+    """Test LRU in memoria"""
+
+    def test_evicts_least_recently_used(self):
+        """L'entry letta di recente sopravvive all'eviction"""
+        cache = MemoryCache(max_size=2, default_ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.get_stats()['evictions'] == 1
+
+    def test_overwrite_does_not_evict(self):
+        """Riscrivere una chiave esistente non libera spazio"""
+        cache = MemoryCache(max_size=2, default_ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("a", 10)
+
+        assert cache.get("a") == 10
+        assert cache.get("b") == 2
+        assert cache.get_stats()['evictions'] == 0
+
+
+class TestDiskCache:
+    """Test cache persistente"""
+
+    def test_bounded_by_max_entries(self, tmp_path):
+        """Oltre max_entries vengono rimossi i file meno usati"""
+        cache = DiskCache(tmp_path, max_entries=3)
+        for i, key in enumerate(["a", "b", "c"]):
+            cache.set(key, i)
+            path = cache._key_to_path(key)
+            os.utime(path, (1000 + i, 1000 + i))
+
+        cache.set("d", 3)
+
+        assert cache.get("a") is None
+        assert cache.get("d") == 3
+        assert cache.get_size()[0] <= 3
+
+    def test_survives_new_instance(self, tmp_path):
+        """I valori restano disponibili tra sessioni"""
+        DiskCache(tmp_path).set("trace", {"runs": [1, 2]})
+
+        assert DiskCache(tmp_path).get("trace") == {"runs": [1, 2]}
+
+
+class TestTieredCache:
+    """Test cache a due livelli"""
+
+    def test_disk_hit_is_promoted_to_memory(self, tmp_path):
+        """Un hit su disco finisce in memoria"""
+        DiskCache(tmp_path).set("k", [0.1, 0.2])
+        cache = TieredCache("embeddings", MemoryCache(10, 60), DiskCache(tmp_path))
+
+        assert cache.get("k") == [0.1, 0.2]
+        assert cache.memory.get("k") == [0.1, 0.2]
+
+    def test_hit_ratio_reported_to_collector(self, tmp_path):
+        """Hit e miss arrivano nelle metriche del run"""
+        collector = PerformanceCollector(run_id="1", project="test")
+        cache = TieredCache("sheets_runs", MemoryCache(10, 60), DiskCache(tmp_path))
+        set_performance_collector(collector)
+        try:
+            collector.start_test("T001")
+            cache.get("run:1")
+            cache.set("run:1", [["TEST ID"]])
+            cache.get("run:1")
+            cache.get("run:1")
+            collector.end_test("PASS")
+        finally:
+            set_performance_collector(None)
+
+        metrics = collector.finalize()
+
+        assert metrics.cache_lookups == 3
+        assert round(metrics.cache_hit_ratio, 2) == 0.67
+
+    def test_scope_attributes_lookups_to_job_test(self, tmp_path):
+        """I lookup della pipeline (anche nei thread) vanno al test del job"""
+        collector = PerformanceCollector(run_id="1", project="test")
+        cache = TieredCache("embeddings", MemoryCache(10, 60), DiskCache(tmp_path))
+        job_metrics = performance.TestMetrics(test_id="T001")
+
+        async def pipeline_job():
+            with cache_metrics_scope(job_metrics):
+                await asyncio.to_thread(cache.get, "k")
+            with cache_metrics_scope(None):
+                cache.get("k")
+
+        set_performance_collector(collector)
+        try:
+            collector.start_test("T002")  # il browser è già sul test successivo
+            asyncio.run(pipeline_job())
+            current = collector.end_test("PASS")
+        finally:
+            set_performance_collector(None)
+
+        assert [c.operation for c in job_metrics.external_services] == ["embeddings.miss"]
+        assert current.external_services == []
+
+    def test_concurrent_runs_keep_their_collector(self, tmp_path):
+        """Due tester in parallelo (run_batch): ognuno vede solo i propri lookup"""
+        cache = TieredCache("sheets_runs", MemoryCache(10, 60), DiskCache(tmp_path))
+        collectors = {}
+
+        async def tester(name, lookups):
+            collector = PerformanceCollector(run_id="1", project=name)
+            collectors[name] = collector
+            set_performance_collector(collector)
+            collector.start_test("T001")
+            for _ in range(lookups):
+                cache.get(f"{name}:k")
+                await asyncio.sleep(0)
+            collector.end_test("PASS")
+            set_performance_collector(None)
+
+        async def batch():
+            await asyncio.gather(tester("a", 2), tester("b", 5))
+
+        asyncio.run(batch())
+
+        assert collectors["a"].finalize().cache_lookups == 2
+        assert collectors["b"].finalize().cache_lookups == 5
+
+
+class TestLangSmithTraceCache:
+    """Test cache dei trace completati"""
+
+    def test_completed_trace_is_not_downloaded_twice(self, tmp_path):
+        """Il secondo report sullo stesso trace non rifà /runs/query"""
+        client, calls = _make_client([[ROOT, LLM], [TOOL, RETRIEVER]])
+        client.cache = TieredCache("langsmith_traces", MemoryCache(10, 60), DiskCache(tmp_path))
+
+        first = client.fetch_trace_bundle('root')
+        second = client.fetch_trace_bundle('root')
+
+        assert len(calls) == 2  # solo le due pagine del primo fetch
+        assert [r['id'] for r in second.runs] == [r['id'] for r in first.runs]
+
+    def test_running_trace_is_not_cached(self, tmp_path):
+        """Un trace ancora in corso viene sempre riscaricato"""
+        running_root = dict(ROOT, status='pending', end_time=None)
+        client, calls = _make_client([[running_root, LLM]])
+        client.cache = TieredCache("langsmith_traces", MemoryCache(10, 60), DiskCache(tmp_path))
+
+        client.fetch_trace_bundle('root')
+        client.fetch_trace_bundle('root')
+
+        assert len(calls) == 2
+        assert not TraceBundle(trace_id='root', runs=[running_root]).is_complete
@@ -5,6 +5,7 @@ import pytest
 from pathlib import Path
 import subprocess
 import sys
+import time
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -33,6 +34,63 @@ class TestCLIHelp:
         assert result.returncode == 0
 
 
+# Budget di avvio: costo di `run.py --help` oltre l'avvio dell'interprete
+STARTUP_BUDGET_MS = 150
+HEAVY_MODULES = ('playwright', 'googleapiclient', 'gspread', 'rich', 'src.tester', 'src.browser')
+
+
+def _imported_modules(*args):
+    """Moduli importati da un comando (da -X importtime)"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args],
+        capture_output=True,
+        text=True
+    )
+    return {
+        line.rsplit('|', 1)[-1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith('import time:')
+    }
+
+
+def _best_of(cmd, runs=3):
+    """Tempo minimo (ms) su più esecuzioni, per ridurre il rumore"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, capture_output=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+class TestCLIStartup:
+    """Test tempo di avvio e import lazy"""
+
+    def test_help_skips_heavy_imports(self):
+        """--help non importa Playwright, Google, Rich né il tester"""
+        modules = _imported_modules('run.py', '--help')
+        assert 'src.cli_utils' in modules
+        assert not [m for m in HEAVY_MODULES if m in modules]
+
+    def test_package_exports_are_lazy(self):
+        """import src.config_loader non carica l'intero package"""
+        modules = _imported_modules('-c', 'import src.config_loader')
+        assert not [m for m in HEAVY_MODULES if m in modules]
+
+        import src
+        from src.config_loader import ConfigLoader
+        assert src.ConfigLoader is ConfigLoader
+        assert 'ChatbotTester' in dir(src)
+        with pytest.raises(AttributeError):
+            src.NotExported
+
+    def test_help_startup_budget(self):
+        """--help entro il budget di avvio"""
+        baseline = _best_of([sys.executable, '-c', 'pass'])
+        elapsed = _best_of([sys.executable, 'run.py', '--help'])
+        assert elapsed - baseline < STARTUP_BUDGET_MS, f"{elapsed - baseline:.0f}ms"
+
+
 class TestCLIExport:
     """Test per opzioni export"""
 
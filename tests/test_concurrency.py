@@ -0,0 +1,108 @@
+"""
+Unit Tests - AdaptiveConcurrency
+
+Testa le decisioni AIMD con latenze e carico host simulati.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.concurrency import AdaptiveConcurrency
+from src.performance import PerformanceCollector, PerformanceReporter
+
+
+def _idle_host():
+    return 20.0, 40.0
+
+
+def _controller(**kwargs) -> AdaptiveConcurrency:
+    kwargs.setdefault('host_probe', _idle_host)
+    return AdaptiveConcurrency(window=3, **kwargs)
+
+
+async def _feed(controller, latencies, timed_out=False):
+    decisions = []
+    for latency in latencies:
+        decision = await controller.record(latency, timed_out=timed_out)
+        if decision:
+            decisions.append(decision)
+    return decisions
+
+
+class TestAdaptiveConcurrency:
+    """Test controller AIMD"""
+
+    def test_grows_while_latency_is_flat(self):
+        """Latenza stabile: +1 worker per finestra fino al tetto"""
+        controller = _controller(max_limit=4)
+
+        decisions = asyncio.run(_feed(controller, [1000] * 12))
+
+        assert [d.limit for d in decisions] == [3, 4, 4, 4]
+        assert decisions[0].reason == "stable"
+        assert decisions[-1].reason == "max"
+
+    def test_backs_off_when_latency_degrades(self):
+        """p50 oltre baseline * tolerance riduce il limite"""
+        controller = _controller(max_limit=8, initial=6)
+
+        decisions = asyncio.run(_feed(controller, [1000, 1000, 1000, 2500, 2600, 2400]))
+
+        assert [d.limit for d in decisions] == [7, 4]  # +1, poi 7 * 0.7
+        assert decisions[-1].reason == "latency"
+        assert decisions[-1].baseline_ms == 1000
+
+    def test_backs_off_on_timeouts_and_throttling(self):
+        """Timeout del chatbot e 429 LangSmith riducono il limite"""
+        throttled = {'count': 0}
+        controller = _controller(max_limit=8, initial=8, throttle_source=lambda: throttled['count'])
+
+        async def scenario():
+            first = await _feed(controller, [0, 0, 0], timed_out=True)
+            throttled['count'] = 3
+            second = await _feed(controller, [900, 900, 900])
+            return first + second
+
+        decisions = asyncio.run(scenario())
+
+        assert [(d.reason, d.limit) for d in decisions] == [("timeout", 5), ("langsmith_429", 3)]
+
+    def test_backs_off_on_host_pressure(self):
+        """CPU host oltre soglia riduce anche con latenza stabile"""
+        controller = _controller(max_limit=4, initial=4, host_probe=lambda: (97.0, 50.0))
+
+        decisions = asyncio.run(_feed(controller, [1000] * 3))
+
+        assert decisions[0].reason == "host_cpu"
+        assert decisions[0].limit == 2
+
+    def test_acquire_respects_current_limit(self):
+        """Oltre il limite i test attendono uno slot libero"""
+        async def scenario():
+            controller = _controller(max_limit=4, initial=1)
+            await controller.acquire()
+            waiter = asyncio.create_task(controller.acquire())
+            await asyncio.sleep(0.01)
+            blocked = not waiter.done()
+            await controller.release()
+            await asyncio.wait_for(waiter, timeout=1)
+            return blocked, controller.active
+
+        blocked, active = asyncio.run(scenario())
+
+        assert blocked
+        assert active == 1
+
+    def test_timeline_in_performance_report(self):
+        """La serie delle decisioni arriva nel report performance"""
+        controller = _controller(max_limit=3)
+        asyncio.run(_feed(controller, [1000] * 3))
+
+        collector = PerformanceCollector(run_id="1", project="test")
+        collector.record_concurrency_timeline(controller.get_timeline())
+        reporter = PerformanceReporter(collector.finalize())
+
+        assert "CONCORRENZA ADATTIVA" in reporter.generate_summary()
+        assert "Concorrenza Adattiva" in reporter.generate_html_report()
@@ -0,0 +1,202 @@
+"""
+Unit Tests - Embeddings
+
+Testa il servizio embedding: richieste batch, store persistente per
+(modello, hash testo), richieste concorrenti unite, similarità coseno
+vettorializzata.
+"""
+import math
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import embeddings
+from src.cache import set_performance_collector
+from src.embeddings import EmbeddingService, EmbeddingStore, cosine_similarities
+from src.evaluation import EvaluationConfig, SemanticMatcher
+from src.performance import PerformanceCollector
+
+
+class FakeBackend:
+    """Embedding deterministici: un vettore per parola nota"""
+
+    model = "fake-embedding"
+    max_batch = 100
+    VOCAB = ["italy", "france", "spain", "product", "price", "hello"]
+
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.calls = []
+        self.delay = delay
+        self.fail = fail
+
+    def available(self):
+        return True
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("quota exceeded")
+        return [[float(text.lower().count(word)) for word in self.VOCAB] for text in texts]
+
+
+class TestEmbeddingService:
+    """Test batch e cache"""
+
+    def test_batches_unique_missing_texts(self):
+        backend = FakeBackend()
+        service = EmbeddingService(backend, batch_size=2)
+
+        vectors = service.embed_many(["italy", "france", "italy", "spain"])
+
+        assert backend.calls == [["italy", "france"], ["spain"]]
+        assert vectors[0] is vectors[2]
+        assert vectors[0].tobytes() == embeddings.to_vector([1, 0, 0, 0, 0, 0]).tobytes()
+
+    def test_store_survives_new_process(self, tmp_path):
+        path = tmp_path / EmbeddingStore.FILENAME
+        EmbeddingService(FakeBackend(), store=EmbeddingStore(path)).prefetch(["italy", "france"])
+
+        backend = FakeBackend()
+        service = EmbeddingService(backend, store=EmbeddingStore(path))
+        service.embed_many(["italy", "france", "spain"])
+
+        assert backend.calls == [["spain"]]
+        assert service.store_hits == 2
+
+    def test_lookups_reported_as_cache_calls(self, tmp_path):
+        """Hit (memoria o store) e miss arrivano nel hit ratio del run"""
+        path = tmp_path / EmbeddingStore.FILENAME
+        EmbeddingService(FakeBackend(), store=EmbeddingStore(path)).embed("italy")
+
+        collector = PerformanceCollector(run_id="1", project="test")
+        service = EmbeddingService(FakeBackend(), store=EmbeddingStore(path))
+        set_performance_collector(collector)
+        try:
+            collector.start_test("T001")
+            service.embed_many(["italy", "france", ""])  # store hit, miss, vuoto non cercato
+            service.embed("france")                      # memoria
+            collector.end_test("PASS")
+        finally:
+            set_performance_collector(None)
+
+        metrics = collector.finalize()
+        operations = [s.operation for s in metrics.test_metrics[0].external_services if s.service == "cache"]
+        assert operations == ["embeddings.hit", "embeddings.miss", "embeddings.hit"]
+        assert metrics.cache_lookups == 3
+        assert round(metrics.cache_hit_ratio, 2) == 0.67
+
+    def test_store_is_keyed_by_model(self, tmp_path):
+        store = EmbeddingStore(tmp_path / EmbeddingStore.FILENAME)
+        EmbeddingService(FakeBackend(), store=store).embed("italy")
+
+        other = FakeBackend()
+        other.model = "other-model"
+        EmbeddingService(other, store=store).embed("italy")
+
+        assert other.calls == [["italy"]]
+        assert store.count() == 2
+
+    def test_concurrent_requests_share_calls(self):
+        backend = FakeBackend(delay=0.05)
+        service = EmbeddingService(backend)
+        results = {}
+
+        def worker(i):
+            results[i] = service.similarities([("italy price", f"italy product {i}")])
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        embedded = [text for call in backend.calls for text in call]
+        assert len(results) == 8
+        assert embedded.count("italy price") == 1
+        assert len(backend.calls) < 8
+
+    def test_backend_failure_returns_none_and_is_not_cached(self):
+        backend = FakeBackend(fail=True)
+        service = EmbeddingService(backend)
+
+        assert service.similarities([("italy", "france")]) == [None]
+        backend.fail = False
+        assert math.isclose(service.similarities([("italy", "italy")])[0], 1.0, rel_tol=1e-6)
+
+    def test_blank_texts_are_not_sent(self):
+        backend = FakeBackend()
+        service = EmbeddingService(backend)
+
+        vectors = service.embed_many(["", "   ", "italy"])
+
+        assert vectors[0] is None and vectors[1] is None
+        assert vectors[2] is not None
+        assert backend.calls == [["italy"]]
+
+    def test_failed_batch_is_retried_per_item(self):
+        class PickyBackend(FakeBackend):
+            def embed(self, texts):
+                self.calls.append(list(texts))
+                if "bad" in texts:
+                    raise RuntimeError("invalid input")
+                return [[float(text.count(word)) for word in self.VOCAB] for text in texts]
+
+        backend = PickyBackend()
+        service = EmbeddingService(backend)
+
+        vectors = service.embed_many(["italy", "bad", "france"])
+
+        assert vectors[0] is not None and vectors[2] is not None
+        assert vectors[1] is None
+        assert backend.calls == [["italy", "bad", "france"], ["italy"], ["bad"], ["france"]]
+        # I vettori riusciti restano in cache
+        service.embed_many(["italy", "france"])
+        assert len(backend.calls) == 4
+
+
+class TestSimilarity:
+    """Test similarità coseno vettorializzata"""
+
+    def test_matches_pure_python_cosine(self):
+        left = [embeddings.to_vector([1, 2, 3]), embeddings.to_vector([0, 0, 0])]
+        right = [embeddings.to_vector([3, 2, 1]), embeddings.to_vector([1, 1, 1])]
+
+        scores = cosine_similarities(left, right)
+
+        assert math.isclose(scores[0], 10 / 14, rel_tol=1e-6)
+        assert scores[1] == 0.0
+
+    def test_without_numpy(self, monkeypatch):
+        monkeypatch.setattr(embeddings, "NUMPY_AVAILABLE", False)
+        service = EmbeddingService(FakeBackend())
+
+        score = service.similarities([("italy price", "italy")])[0]
+
+        assert isinstance(service.embed("italy"), embeddings.array)
+        assert math.isclose(score, 1 / math.sqrt(2), rel_tol=1e-6)
+
+    def test_semantic_matcher_batch(self):
+        matcher = SemanticMatcher(EvaluationConfig())
+        backend = FakeBackend()
+        matcher.service = EmbeddingService(backend)
+
+        scores = matcher.similarities([("Italy", "italy italy"), ("Italy", "France"), ("price", "price hello")])
+
+        assert len(backend.calls) == 1
+        assert math.isclose(scores[0], 1.0, rel_tol=1e-6)
+        assert scores[1] == 0.0
+        assert math.isclose(scores[2], 1 / math.sqrt(2), rel_tol=1e-6)
+        assert math.isclose(matcher.similarity("Italy", "italy"), 1.0, rel_tol=1e-6)
+
+    def test_ollama_provider_from_config(self):
+        matcher = SemanticMatcher(EvaluationConfig(embedding_provider="ollama", embedding_model="nomic-embed-text",
+                                                   embedding_url="http://localhost:11434/api/generate"))
+
+        backend = matcher.service.backend
+        assert isinstance(backend, embeddings.OllamaEmbeddingBackend)
+        assert backend.base_url == "http://localhost:11434"
@@ -0,0 +1,201 @@
+"""
+Unit Tests - Health Check
+
+Testa i probe in parallelo con deadline, la cache su disco condivisa tra
+processi e la modalità warm (browser del probe passato alla sessione).
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import health as health_module
+from src.health import HealthChecker, HealthCheckResult, ServiceStatus
+
+
+def _slow_probe(service, delay, status=ServiceStatus.HEALTHY):
+    def probe(force=False):
+        time.sleep(delay)
+        return HealthCheckResult(service=service, status=status, message="OK")
+    return probe
+
+
+def _checker(delays, **kwargs):
+    checker = HealthChecker(**kwargs)
+    for service in HealthChecker.SERVICES:
+        setattr(checker, f"check_{service}", _slow_probe(service, delays.get(service, 0)))
+    return checker
+
+
+class TestConcurrentProbes:
+    """Test probe in parallelo"""
+
+    def test_probes_run_concurrently(self):
+        checker = _checker({s: 0.2 for s in HealthChecker.SERVICES})
+
+        start = time.monotonic()
+        result = checker.check_all()
+        elapsed = time.monotonic() - start
+
+        assert list(result.checks) == list(HealthChecker.SERVICES)
+        assert result.all_healthy
+        assert elapsed < 0.6  # 5 probe da 0.2s: in serie sarebbe 1s
+
+    def test_probe_deadline(self, monkeypatch):
+        monkeypatch.setitem(HealthChecker.PROBE_DEADLINES, "ollama", 0.1)
+        checker = _checker({"ollama": 1.0})
+
+        start = time.monotonic()
+        result = checker.check_all()
+
+        assert time.monotonic() - start < 0.5
+        assert result.checks["ollama"].status == ServiceStatus.UNHEALTHY
+        assert "Timeout" in result.checks["ollama"].message
+        assert result.can_run
+
+
+class FakeTagsResponse:
+    status_code = 200
+
+    def json(self):
+        return {"models": [{"name": "llama3"}]}
+
+
+class TestSharedCache:
+    """Test cache su disco tra processi"""
+
+    def test_sibling_reuses_result(self, tmp_path, monkeypatch):
+        calls = []
+        monkeypatch.setattr(health_module.requests, "get",
+                            lambda url, timeout: calls.append(url) or FakeTagsResponse())
+        cache = tmp_path / "health.json"
+
+        first = HealthChecker(cache_path=cache, cache_ttl=60).check_ollama()
+        sibling = HealthChecker(cache_path=cache, cache_ttl=60).check_ollama()
+
+        assert len(calls) == 1
+        assert sibling.status == ServiceStatus.HEALTHY
+        assert sibling.details == first.details
+
+        HealthChecker(cache_path=cache, cache_ttl=60).check_ollama(force=True)
+        assert len(calls) == 2
+
+    def test_config_change_and_failures_not_shared(self, tmp_path, monkeypatch):
+        calls = []
+
+        def get(url, timeout):
+            calls.append(url)
+            raise health_module.requests.ConnectionError("down")
+
+        monkeypatch.setattr(health_module.requests, "get", get)
+        cache = tmp_path / "health.json"
+
+        HealthChecker(cache_path=cache).check_ollama()
+        HealthChecker(cache_path=cache).check_ollama()
+        assert len(calls) == 2  # un guasto viene sempre ricontrollato
+
+        monkeypatch.setattr(health_module.requests, "get",
+                            lambda url, timeout: calls.append(url) or FakeTagsResponse())
+        HealthChecker(cache_path=cache).check_ollama()
+        HealthChecker(ollama_url="http://gpu:11434", cache_path=cache).check_ollama()
+        assert calls[-1].startswith("http://gpu")
+        assert len(calls) == 4
+
+    def test_expired_entries(self, tmp_path):
+        cache = health_module.HealthResultCache(tmp_path / "health.json", ttl_seconds=0.05)
+        cache.put("ollama:x", HealthCheckResult("ollama", ServiceStatus.HEALTHY))
+
+        assert cache.get("ollama:x").status == ServiceStatus.HEALTHY
+        time.sleep(0.06)
+        assert cache.get("ollama:x") is None
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.stopped = False
+
+    async def stop(self):
+        self.stopped = True
+
+
+class TestWarmBrowser:
+    """Test modalità warm"""
+
+    def test_warm_probe_hands_browser_over(self):
+        checker = _checker({s: 0.1 for s in HealthChecker.SERVICES})
+        browser = FakeBrowser()
+        loop_threads = []
+
+        async def launch():
+            loop_threads.append(asyncio.get_running_loop())
+            await asyncio.sleep(0.1)
+            return browser
+
+        async def scenario():
+            start = time.monotonic()
+            result = await checker.acheck_all(warm_browser=launch)
+            return result, time.monotonic() - start, asyncio.get_running_loop()
+
+        result, elapsed, loop = asyncio.run(scenario())
+
+        assert checker.warm_browser is browser
+        assert loop_threads == [loop]  # avviato nel loop della sessione
+        assert result.checks["browser"].details == {"warm": True}
+        assert list(result.checks) == list(HealthChecker.SERVICES)
+        assert elapsed < 0.35
+
+    def test_warm_launch_failure_blocks_run(self):
+        checker = _checker({})
+
+        async def launch():
+            raise RuntimeError("Executable doesn't exist")
+
+        result = asyncio.run(checker.acheck_all(warm_browser=launch))
+
+        assert checker.warm_browser is None
+        assert not result.can_run
+        assert "Chromium" in result.checks["browser"].message
+
+    def test_tester_reuses_warm_browser(self, monkeypatch):
+        tester_module = pytest.importorskip("src.tester")
+        launched = []
+
+        async def launch_browser(project, settings):
+            launched.append(project)
+            return FakeBrowser()
+
+        monkeypatch.setattr(tester_module, "launch_browser", launch_browser)
+        warm = FakeBrowser()
+        tester = tester_module.ChatbotTester(SimpleNamespace(), SimpleNamespace(), browser=warm)
+
+        assert tester.browser is warm
+        assert launched == []
+
+    def test_cancelled_launch_stops_browser(self, monkeypatch):
+        """Deadline scaduta durante start(): il browser a metà avvio viene chiuso"""
+        tester_module = pytest.importorskip("src.tester")
+        browsers = []
+
+        class SlowBrowser(FakeBrowser):
+            def __init__(self, *args):
+                super().__init__()
+                browsers.append(self)
+
+            async def start(self):
+                await asyncio.sleep(10)
+
+        monkeypatch.setattr(tester_module, "browser_config", lambda project, settings: ())
+        monkeypatch.setattr(tester_module, "BrowserManager", SlowBrowser)
+
+        async def probe():
+            await asyncio.wait_for(tester_module.launch_browser(None, None), timeout=0.05)
+
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(probe())
+
+        assert browsers[0].stopped
@@ -0,0 +1,199 @@
+"""
+Unit Tests - RunHistoryStore
+
+Testa lo storico locale delle RUN: flaky test, trend regressioni e
+stabilità come query, sincronizzazione incrementale da report locali
+e da Sheets.
+"""
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import models
+from src.comparison import FlakyTestDetector, RegressionDetector, RunComparator
+from src.history import RunHistoryStore
+from src.report_local import ReportGenerator, aggregate_reports
+
+
+def _rows(results):
+    return [{'test_id': test_id, 'result': esito} for test_id, esito in results.items()]
+
+
+def _store(runs):
+    store = RunHistoryStore()
+    for run, results in runs.items():
+        store.ingest_rows(run, _rows(results), "local")
+    return store
+
+
+class TestHistoryQueries:
+    """Test query sullo storico"""
+
+    def test_flaky_score_and_history(self):
+        store = _store({
+            1: {"T1": "PASS", "T2": "PASS", "T3": "FAIL"},
+            2: {"T1": "FAIL", "T2": "PASS", "T3": "FAIL"},
+            3: {"T1": "PASS", "T2": "PASS", "T3": "PASS"},
+            4: {"T1": "FAIL", "T2": "PASS"},
+        })
+
+        flaky = store.flaky_tests([1, 2, 3, 4], "local", threshold=0.3)
+
+        assert [f['test_id'] for f in flaky] == ["T1", "T3"]
+        assert flaky[0]['score'] == 1.0
+        assert flaky[0]['history'] == [(1, "PASS"), (2, "FAIL"), (3, "PASS"), (4, "FAIL")]
+        assert round(flaky[1]['score'], 3) == 0.667
+
+    def test_transitions_between_consecutive_runs(self):
+        store = _store({
+            1: {"T1": "PASS", "T2": "FAIL"},
+            2: {"T1": "FAIL", "T2": "PASS", "T3": "PASS"},
+            3: {"T1": "FAIL", "T2": "PASS", "T3": "FAIL"},
+        })
+
+        trend = store.transitions([1, 2, 3], "local")
+
+        assert [(t['run'], t['regressions'], t['improvements']) for t in trend] == [(2, 1, 1), (3, 1, 0)]
+        assert round(trend[0]['pass_rate'], 3) == 0.667
+
+    def test_stability_counts(self):
+        store = _store({
+            1: {"T1": "PASS", "T2": "FAIL", "T3": "PASS"},
+            2: {"T1": "PASS", "T2": "FAIL", "T3": "FAIL"},
+        })
+
+        assert store.stability([1, 2], "local") == {'total_tests': 3, 'stable_pass': 1, 'stable_fail': 1}
+
+    def test_flaky_on_100_runs_by_1000_tests_is_fast(self):
+        rng = random.Random(7)
+        store = RunHistoryStore()
+        for run in range(1, 101):
+            store.ingest_rows(run, ({'test_id': f"T{i:04d}", 'result': rng.choice(["PASS", "PASS", "FAIL"])}
+                                    for i in range(1000)), "local")
+
+        start = time.perf_counter()
+        flaky = store.flaky_tests(list(range(1, 101)), "local", threshold=0.5)
+        elapsed = time.perf_counter() - start
+
+        assert flaky
+        assert elapsed < 1.0
+
+
+class FakeSheetsClient:
+    """RUN su Sheets; registra le letture"""
+
+    def __init__(self, runs, current_run=None):
+        self.runs = runs
+        self.reads = []
+        self._current_run = current_run
+
+    def get_all_run_numbers(self):
+        return sorted(self.runs)
+
+    def get_run_records(self, run_number):
+        self.reads.append(run_number)
+        return [{'TEST ID': t, 'RESULT': r, 'SEMANTIC': '0.8'} for t, r in self.runs[run_number].items()]
+
+    def is_closed_run(self, run_number, latest_run):
+        return run_number != self._current_run and run_number < latest_run
+
+
+class TestComparatorHistory:
+    """Test sincronizzazione incrementale"""
+
+    def test_closed_sheet_runs_are_read_once(self, tmp_path):
+        sheets = FakeSheetsClient({
+            1: {"T1": "PASS", "T2": "PASS"},
+            2: {"T1": "FAIL", "T2": "PASS"},
+            3: {"T1": "PASS", "T2": "FAIL"},
+        })
+        path = tmp_path / RunHistoryStore.FILENAME
+
+        flaky = FlakyTestDetector(RunComparator(sheets, history=RunHistoryStore(path))).detect_flaky_tests(10)
+        assert [f.test_id for f in flaky] == ["T1", "T2"]
+
+        # Nuova sessione: solo l'ultima RUN (ancora aperta) viene riletta
+        sheets.reads.clear()
+        comparator = RunComparator(sheets, history=RunHistoryStore(path))
+        trend = RegressionDetector(comparator).get_regression_trend(last_n_runs=3)
+
+        assert sheets.reads == [3]
+        assert trend['total_regressions'] == 2
+        assert trend['total_improvements'] == 1
+        assert comparator.history.metric_values([1], "sheets")['semantic'] == [0.8, 0.8]
+
+    def test_local_reports_feed_history_and_compare(self, tmp_path):
+        reports = tmp_path / "demo"
+        for run, esiti in {1: ["PASS", "PASS"], 2: ["FAIL", "PASS"]}.items():
+            generator = ReportGenerator(reports / f"run_{run:03d}", "demo")
+            for i, esito in enumerate(esiti):
+                generator.add_result(models.TestResult(test_id=f"T{i}", result=esito, date="2026-01-0%d" % run))
+            generator.generate()
+            generator.journal.close()
+
+        comparator = RunComparator(local_reports_path=reports)
+        result = comparator.compare(1, 2)
+
+        assert [r.test_id for r in result.regressions] == ["T0"]
+        # Il report ha già aggiornato lo storico: nessuna rilettura dei journal
+        assert comparator.sync_history([1, 2]) == []
+
+        stats = aggregate_reports(reports, "demo")
+        assert stats['total_runs'] == 2
+        assert stats['total_passed'] == 3
+        assert [t['pass_rate'] for t in stats['trend']] == [100.0, 50.0]
+        assert stats['trend'][0]['date'] == "2026-01-01"
+
+    def test_local_and_sheet_runs_with_same_number_stay_separate(self, tmp_path):
+        reports = tmp_path / "demo"
+        generator = ReportGenerator(reports / "run_007", "demo")
+        generator.add_result(models.TestResult(test_id="T1", result="PASS"))
+        generator.generate()
+        generator.journal.close()
+
+        sheets = FakeSheetsClient({7: {"T1": "FAIL"}, 8: {"T1": "PASS"}})
+        store = RunHistoryStore(reports / RunHistoryStore.FILENAME)
+        comparator = RunComparator(sheets, local_reports_path=reports, history=store)
+        comparator.sync_history([7, 8])
+        store.sync_local_runs(reports)
+
+        assert store.run_results(7, "sheets")['T1']['result'] == "FAIL"
+        assert store.run_results(7, "local")['T1']['result'] == "PASS"
+
+        # RUN 7 chiusa su Sheets: non viene riletta
+        sheets.reads.clear()
+        comparator.sync_history([7], latest_run=8)
+        assert sheets.reads == []
+        assert aggregate_reports(reports, "demo")['total_passed'] == 1
+
+    def test_aggregate_includes_legacy_runs_only_local(self, tmp_path):
+        """RUN senza journal (report.csv / solo summary.json) incluse, RUN da Sheets escluse"""
+        reports = tmp_path / "demo"
+        csv_run = reports / "run_001"
+        csv_run.mkdir(parents=True)
+        (csv_run / "report.csv").write_text("test_id,result,date,duration_ms\nT1,pass,2025-01-01,1000\nT2,FAIL,,\n")
+        summary_run = reports / "run_002"
+        summary_run.mkdir()
+        (summary_run / "summary.json").write_text(json.dumps({
+            'run_number': 2, 'total_tests': 4, 'passed': 4, 'failed': 0, 'start_time': "2025-01-02T10:00:00"
+        }))
+
+        store = RunHistoryStore(reports / RunHistoryStore.FILENAME)
+        store.ingest_rows(9, _rows({"T1": "FAIL"}), "sheets")
+        store.close()
+
+        stats = aggregate_reports(reports, "demo")
+
+        assert [t['run'] for t in stats['trend']] == [1, 2]
+        assert stats['total_tests'] == 6 and stats['total_passed'] == 5
+        assert stats['latest_run']['total_tests'] == 4
+        assert stats['trend'][1]['date'] == "2025-01-02"
+
+        # Seconda chiamata: report.csv invariato, nessuna reimportazione
+        store = RunHistoryStore(reports / RunHistoryStore.FILENAME)
+        assert store.sync_local_runs(reports) == []
+        assert store.run_results(1, "local")['T1']['result'] == "PASS"
@@ -0,0 +1,113 @@
+"""
+Unit Tests - Report HTML in streaming
+
+Testa la scrittura incrementale degli item con i dettagli in blocchi JSON
+caricati su richiesta, l'escape dei dati nei <script> e i due report HTML
+(locale ed export) che non incorporano più conversazioni e screenshot.
+"""
+import io
+import json
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import models
+from src.export import HTMLExporter, RunReport
+from src.html_report import LazyItemWriter, json_script_text, lazy_script
+from src.report_local import ReportGenerator
+
+CHUNK_RE = re.compile(r'<script type="application/json" class="lazy-chunk" data-chunk="(\d+)">(.*?)</script>', re.S)
+
+
+def _chunks(text):
+    return {int(n): json.loads(body) for n, body in CHUNK_RE.findall(text)}
+
+
+class TestLazyItemWriter:
+    """Test writer incrementale"""
+
+    def test_items_and_chunks(self):
+        out = io.StringIO()
+        writer = LazyItemWriter(out, chunk_size=2)
+        for i in range(5):
+            writer.add(lambda idx: f'<div data-idx="{idx}"></div>', {'n': i})
+        writer.close()
+
+        text = out.getvalue()
+        chunks = _chunks(text)
+
+        assert writer.count == 5
+        assert re.findall(r'data-idx="(\d+)"', text) == ['0', '1', '2', '3', '4']
+        assert chunks == {0: [{'n': 0}, {'n': 1}], 1: [{'n': 2}, {'n': 3}], 2: [{'n': 4}]}
+        # Il chunk segue l'ultimo item che contiene
+        assert text.index('data-chunk="0"') > text.index('data-idx="1"')
+        assert text.index('data-chunk="0"') < text.index('data-idx="2"')
+
+    def test_script_content_is_escaped(self):
+        payload = {'conversation': 'ciao </script><script>alert(1)</script> <!-- x'}
+        text = json_script_text([payload])
+
+        assert '</script' not in text and '<!--' not in text
+        assert json.loads(text) == [payload]
+
+    def test_lazy_script_parameters(self):
+        script = lazy_script("LazyReport.render = null;", chunk_size=7, page_size=30)
+
+        assert 'CHUNK = 7, PAGE = 30' in script
+        assert 'LazyReport.render = null;' in script
+        assert 'idx % CHUNK' in script
+
+
+class TestLocalReport:
+    """Test report HTML locale"""
+
+    def test_conversations_are_lazy(self, tmp_path):
+        generator = ReportGenerator(tmp_path / "run_001", "demo")
+        for i in range(120):
+            generator.add_result(models.TestResult(
+                test_id=f"T{i:03d}", result="PASS" if i % 3 else "FAIL",
+                question=f"domanda {i}", conversation=f"USER: <b>{i}</b>\nBOT: risposta {i}",
+            ))
+        html_path = generator.generate()['html']
+        text = html_path.read_text(encoding='utf-8')
+
+        chunks = _chunks(text)
+        details = [d for n in sorted(chunks) for d in chunks[n]]
+
+        assert len(re.findall(r'<tr [^>]*data-idx=', text)) == 120
+        assert len(details) == 120
+        assert details[5]['conversation'] == "USER: <b>5</b>\nBOT: risposta 5"
+        # Nessuna conversazione nel markup delle righe
+        assert 'risposta 5' not in CHUNK_RE.sub('', text)
+        assert '<b>5</b>' not in text
+        assert 'data-esito="FAIL"' in text
+
+
+class TestHTMLExporter:
+    """Test export HTML"""
+
+    def test_screenshots_not_inlined(self, tmp_path):
+        shot = tmp_path / "T1.png"
+        shot.write_bytes(b'\x89PNG\r\n\x1a\nfake')
+        tests = [
+            models.TestResult(test_id="T1", status="PASS", question="<domanda>",
+                              actual_response="risposta", screenshot_path=str(shot)),
+            models.TestResult(test_id="T2", status="FAIL", question="altra", actual_response="no"),
+        ]
+        report = RunReport(project="demo", run_number=1, timestamp="2025-01-01T10:00:00", env="DEV",
+                           prompt_version="v1", model_version="m1", total_tests=2, passed=1,
+                           failed=1, skipped=0, pass_rate=50.0, duration_seconds=10, tests=tests)
+
+        path = HTMLExporter(tmp_path / "report.html").export(report)
+        text = path.read_text(encoding='utf-8')
+        chunks = _chunks(text)
+        markup = CHUNK_RE.sub('', text)
+
+        assert chunks[0][0]['screenshot'].startswith('data:image/png;base64,')
+        assert chunks[0][1]['screenshot'] is None
+        assert 'base64,' not in markup
+        assert '&lt;domanda&gt;' in markup
+        assert markup.count('data-expand=') == 1
+        assert not hasattr(tests[0], 'screenshot_base64')
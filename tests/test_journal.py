@@ -0,0 +1,155 @@
+"""
+Unit Tests - RunJournal
+
+Testa scrittura immediata, ripresa dopo crash, sync Sheets dal journal
+e report generati dal journal.
+"""
+import csv
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import models
+from src.journal import RunJournal
+from src.models import ScreenshotUrls
+from src.report_local import ReportGenerator
+
+
+def _result(test_id: str, esito: str = "PASS", **kwargs) -> models.TestResult:
+    return models.TestResult(test_id=test_id, result=esito, question=f"domanda {test_id}", **kwargs)
+
+
+class TestRunJournal:
+    """Test journal append-only"""
+
+    def test_results_are_on_disk_before_close(self, tmp_path):
+        """Ogni risultato è leggibile subito, anche senza close()"""
+        journal = RunJournal(tmp_path / RunJournal.FILENAME, fsync_every=100)
+        journal.record_result(_result("T1"))
+        journal.record_result(_result("T2", "FAIL"))
+
+        reader = RunJournal(tmp_path / RunJournal.FILENAME)
+
+        assert reader.completed_ids() == {"T1", "T2"}
+
+    def test_truncated_line_is_dropped(self, tmp_path):
+        """Una riga scritta a metà da un crash non rompe lettura e append"""
+        path = tmp_path / RunJournal.FILENAME
+        journal = RunJournal(path)
+        journal.record_result(_result("T1"))
+        journal.close()
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('{"event": "result", "test_id": "T2", "da')
+
+        resumed = RunJournal(path)
+        assert resumed.completed_ids() == {"T1"}
+        resumed.record_result(_result("T3"))
+        resumed.close()
+
+        assert [r.test_id for r in RunJournal(path).iter_results()] == ["T1", "T3"]
+
+    def test_truncated_line_after_long_tail(self, tmp_path, monkeypatch):
+        """La riga troncata si trova leggendo a ritroso più blocchi"""
+        monkeypatch.setattr(RunJournal, "_TAIL_CHUNK", 16)
+        path = tmp_path / RunJournal.FILENAME
+        journal = RunJournal(path)
+        journal.record_result(_result("T1"))
+        journal.close()
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('{"event": "result", "test_id": "T2", "data": {"question": "' + "x" * 100)
+
+        resumed = RunJournal(path)
+        resumed.record_result(_result("T3"))
+        resumed.close()
+
+        assert [r.test_id for r in RunJournal(path).iter_results()] == ["T1", "T3"]
+
+    def test_last_result_wins(self, tmp_path):
+        """Un test rieseguito nella stessa RUN compare una volta, con l'ultimo esito"""
+        journal = RunJournal(tmp_path / RunJournal.FILENAME)
+        journal.record_result(_result("T1", "FAIL"))
+        journal.record_result(_result("T2"))
+        journal.record_result(_result("T1", "PASS"))
+
+        results = list(journal.iter_results())
+
+        assert [(r.test_id, r.result) for r in results] == [("T2", "PASS"), ("T1", "PASS")]
+
+    def test_pending_rows_survive_until_synced(self, tmp_path):
+        """Le righe non scritte restano pending (screenshot inclusi) fino al sync"""
+        journal = RunJournal(tmp_path / RunJournal.FILENAME)
+        urls = ScreenshotUrls(image_url="https://img", view_url="https://view")
+        journal.record_pending("sheets", _result("T1", screenshot_urls=urls))
+        journal.record_pending("sheets", _result("T2"))
+        journal.record_pending("sheets", _result("T3"))
+
+        # Solo la prima riga va a buon fine
+        assert journal.sync_pending("sheets", lambda rows: 1) == 1
+        pending = RunJournal(tmp_path / RunJournal.FILENAME).pending("sheets")
+
+        assert [r.test_id for r in pending] == ["T2", "T3"]
+
+        written = []
+        journal.sync_pending("sheets", lambda rows: written.extend(rows) or len(rows))
+
+        assert [r.test_id for r in written] == ["T2", "T3"]
+        assert journal.pending("sheets") == []
+
+    def test_pending_read_from_file_once(self, tmp_path, monkeypatch):
+        """Dopo la prima lettura le righe pending restano in memoria"""
+        path = tmp_path / RunJournal.FILENAME
+        previous = RunJournal(path)
+        previous.record_pending("sheets", _result("T1"))
+        previous.close()
+
+        journal = RunJournal(path)
+        reads = []
+        events = journal.events
+        monkeypatch.setattr(journal, "events", lambda: reads.append(1) or events())
+
+        for i in range(2, 50):
+            journal.record_pending("sheets", _result(f"T{i}"))
+            journal.sync_pending("sheets", lambda rows: len(rows))
+
+        assert len(reads) == 1
+        assert journal.pending("sheets") == []
+
+    def test_failed_sync_keeps_rows(self, tmp_path):
+        """Un errore di scrittura non perde le righe"""
+        journal = RunJournal(tmp_path / RunJournal.FILENAME)
+        journal.record_pending("sheets", _result("T1"))
+
+        def broken(rows):
+            raise ConnectionError("429")
+
+        assert journal.sync_pending("sheets", broken) == 0
+        assert [r.test_id for r in journal.pending("sheets")] == ["T1"]
+
+
+class TestReportFromJournal:
+    """Test report generati dal journal"""
+
+    def test_resumed_run_reports_both_sessions(self, tmp_path):
+        """Un ReportGenerator sulla stessa cartella include i risultati già scritti"""
+        run_dir = tmp_path / "run_003"
+        first = ReportGenerator(run_dir, "demo")
+        first.add_result(_result("T1", category="A", duration_ms=1000, mode="AUTO"))
+        # crash: nessun generate()
+
+        second = ReportGenerator(run_dir, "demo")
+        second.add_result(_result("T2", "FAIL", category="B", duration_ms=3000))
+        paths = second.generate()
+
+        with open(paths['csv'], encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+        summary = json.loads(paths['summary'].read_text(encoding='utf-8'))
+
+        assert [r['test_id'] for r in rows] == ["T1", "T2"]
+        assert summary['total_tests'] == 2
+        assert summary['passed'] == 1 and summary['failed'] == 1
+        assert summary['avg_response_time_ms'] == 2000
+        assert summary['run_number'] == 3
+        assert summary['mode'] == "AUTO"
+        assert "T2" in paths['html'].read_text(encoding='utf-8')
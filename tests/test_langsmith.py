@@ -0,0 +1,232 @@
+"""
+Unit Tests - LangSmith Client
+
+Testa l'estrazione dei report senza chiamare l'API reale.
+"""
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import langsmith_client
+from src.langsmith_client import LangSmithClient, TokenBucket
+from src.models.langsmith import TraceBundle
+
+
+class FakeResponse:
+    def __init__(self, data, status_code=200):
+        self._data = data
+        self.status_code = status_code
+        self.headers = {}
+
+    def json(self):
+        return self._data
+
+
+ROOT = {
+    'id': 'root', 'name': 'Agent', 'run_type': 'chain', 'parent_run_id': None,
+    'start_time': '2025-01-01T10:00:00', 'end_time': '2025-01-01T10:00:05',
+    'inputs': {'input': 'Quali sono gli orari del negozio?'}, 'outputs': {'output': 'Dalle 9 alle 18'},
+    'status': 'success', 'extra': {'metadata': {}},
+}
+LLM = {
+    'id': 'llm1', 'name': 'ChatOpenAI', 'run_type': 'llm', 'parent_run_id': 'root',
+    'start_time': '2025-01-01T10:00:01', 'end_time': '2025-01-01T10:00:03', 'status': 'success',
+    'extra': {'invocation_params': {'model': 'gpt-4o-mini'}, 'metadata': {'ls_provider': 'openai'}},
+    'outputs': {'llm_output': {'token_usage': {'prompt_tokens': 10, 'completion_tokens': 20, 'total_tokens': 30}}},
+}
+RETRIEVER = {
+    'id': 'ret1', 'name': 'Retriever', 'run_type': 'retriever', 'parent_run_id': 'tool1',
+    'start_time': '2025-01-01T10:00:00.500', 'end_time': '2025-01-01T10:00:01', 'status': 'success',
+    'extra': {'metadata': {'ls_vector_store_provider': 'QdrantVectorStore'}},
+    'outputs': {'documents': [{'page_content': 'Orari: 9-18', 'metadata': {'source': 'orari.md'}}]},
+}
+TOOL = {
+    'id': 'tool1', 'name': 'lookup_docs', 'run_type': 'tool', 'parent_run_id': 'root',
+    'start_time': '2025-01-01T10:00:00.200', 'end_time': '2025-01-01T10:00:01', 'status': 'success',
+    'inputs': {'query': 'orari'}, 'outputs': {'output': 'short'},
+}
+
+
+def _make_client(pages):
+    client = LangSmithClient(api_key="test", project_id="proj")
+    calls = []
+
+    def fake_request(method, url, **kwargs):
+        calls.append((method, url, kwargs.get('json')))
+        payload = kwargs.get('json') or {}
+        if payload.get('is_root'):
+            return FakeResponse({'runs': [ROOT]})
+        if 'trace' in payload:
+            index = int(payload.get('cursor') or 0)
+            cursor = str(index + 1) if index + 1 < len(pages) else None
+            return FakeResponse({'runs': pages[index], 'cursors': {'next': cursor}})
+        return FakeResponse({}, status_code=404)
+
+    client._request_with_retry = fake_request
+    return client, calls
+
+
+class TestTraceBundle:
+    """Test fetch unico del trace"""
+
+    def test_report_fetches_trace_runs_once(self):
+        """Un report = 1 ricerca trace + 1 query runs (paginata)"""
+        client, calls = _make_client([[ROOT, LLM], [TOOL, RETRIEVER]])
+
+        report = client.get_report_for_question("Quali sono gli orari del negozio?")
+
+        trace_queries = [c for c in calls if c[2] and 'trace' in c[2]]
+        assert len(trace_queries) == 2  # due pagine, un solo passaggio
+        assert len(calls) == 3
+        assert report.model == 'gpt-4o-mini'
+        assert report.tools_used == ['lookup_docs']
+        assert report.vector_store == 'Qdrant'
+        assert [s.source for s in report.sources] == ['orari.md']
+        assert report.tokens_output == 20
+
+    def test_depth_follows_parent_chain(self):
+        """La depth non dipende dall'ordine dei run"""
+        bundle = TraceBundle(trace_id='root', runs=[RETRIEVER, TOOL, LLM, ROOT])
+
+        assert bundle.depth('root') == 0
+        assert bundle.depth('tool1') == 1
+        assert bundle.depth('ret1') == 2
+        assert bundle.root is ROOT
+        assert [r['id'] for r in bundle.of_type('tool')] == ['tool1']
+
+
+class TestTokenBucket:
+    """Test rate limit condiviso"""
+
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=100, capacity=2)
+
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0
+        assert 0 < bucket.reserve() <= 0.01
+
+    def test_retry_after_pauses_every_caller(self):
+        bucket = TokenBucket(rate=1000, capacity=10)
+        bucket.pause(0.5)
+
+        assert bucket.reserve() > 0.4
+        assert bucket.paused_for() > 0.4
+
+    def test_bucket_shared_per_api_key(self):
+        a = LangSmithClient(api_key="shared-key", project_id="p1")
+        b = LangSmithClient(api_key="shared-key", project_id="p2")
+        c = LangSmithClient(api_key="other-key", project_id="p1")
+
+        assert a._bucket is b._bucket
+        assert a._bucket is not c._bucket
+
+
+@pytest.mark.skipif(not langsmith_client.HTTPX_AVAILABLE, reason="httpx non installato")
+class TestAsyncTransport:
+    """Test trasporto asincrono: backoff senza bloccare l'event loop"""
+
+    def _client(self, handler, api_key):
+        import httpx
+
+        client = LangSmithClient(api_key=api_key, project_id="proj")
+        client._base_delay = 0.05
+
+        def bind():
+            client._async_clients[asyncio.get_running_loop()] = httpx.AsyncClient(
+                transport=httpx.MockTransport(handler)
+            )
+        return client, bind
+
+    def test_rate_limited_call_does_not_block_loop(self):
+        import httpx
+
+        attempts = []
+
+        def handler(request):
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                return httpx.Response(429, headers={'Retry-After': '0.2'})
+            return httpx.Response(200, json={'runs': [ROOT]})
+
+        client, bind = self._client(handler, "async-429")
+
+        async def scenario():
+            bind()
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            task = asyncio.create_task(ticker())
+            traces = await client.aget_traces(limit=5)
+            task.cancel()
+            await client.aclose()
+            return traces, ticks
+
+        traces, ticks = asyncio.run(scenario())
+
+        assert [t.id for t in traces] == ['root']
+        assert client.throttled_count == 1
+        assert attempts[1] - attempts[0] >= 0.19   # Retry-After rispettato
+        assert ticks >= 10                          # il loop ha continuato a girare
+
+    def test_async_report_matches_sync(self):
+        import httpx
+
+        def handler(request):
+            payload = json.loads(request.content)
+            if payload.get('is_root'):
+                return httpx.Response(200, json={'runs': [ROOT]})
+            return httpx.Response(200, json={'runs': [ROOT, LLM, TOOL, RETRIEVER]})
+
+        client, bind = self._client(handler, "async-report")
+
+        async def scenario():
+            bind()
+            report = await client.aget_report_for_question("Quali sono gli orari del negozio?")
+            await client.aclose()
+            return report
+
+        report = asyncio.run(scenario())
+
+        assert report.model == 'gpt-4o-mini'
+        assert report.tools_used == ['lookup_docs']
+        assert report.vector_store == 'Qdrant'
+
+    def test_each_loop_client_closed_on_its_loop(self):
+        import threading
+
+        client = LangSmithClient(api_key="async-loops", project_id="proj")
+        other_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=other_loop.run_forever, daemon=True)
+        thread.start()
+        try:
+            other = asyncio.run_coroutine_threadsafe(self._http(client), other_loop).result(5)
+
+            async def scenario():
+                current = await self._http(client)
+                assert current is not other
+                await client.aclose()
+                return current
+
+            current = asyncio.run(scenario())
+        finally:
+            other_loop.call_soon_threadsafe(other_loop.stop)
+            thread.join(5)
+            other_loop.close()
+
+        assert current.is_closed and other.is_closed
+        assert len(client._async_clients) == 0
+
+    @staticmethod
+    async def _http(client):
+        return client._async_http()
@@ -0,0 +1,203 @@
+"""
+Unit Tests - Client MCP condivisi
+
+Testa il pool di client Sheets del server MCP (un client autenticato per
+progetto, rinnovo token, chiamate fuori dall'event loop serializzate per
+progetto) e le cache del client per le RUN chiuse.
+"""
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp_server.clients import SheetsClientPool
+
+
+class FakeClient:
+    def __init__(self, project):
+        self.project = project
+        self.auth_ok = True
+        self.auth_checks = 0
+
+    def ensure_authenticated(self):
+        self.auth_checks += 1
+        return self.auth_ok
+
+
+class TestSheetsClientPool:
+    """Test pool client per progetto"""
+
+    def test_client_built_once_per_project(self):
+        built = []
+        pool = SheetsClientPool(factory=lambda p: built.append(p) or FakeClient(p))
+
+        first = pool.get("silicon-a")
+        assert pool.get("silicon-a") is first
+        assert pool.get("silicon-b") is not first
+        assert built == ["silicon-a", "silicon-b"]
+        assert first.auth_checks == 1
+
+    def test_failed_refresh_drops_client(self):
+        pool = SheetsClientPool(factory=FakeClient)
+        client = pool.get("silicon-a")
+        client.auth_ok = False
+
+        with pytest.raises(Exception):
+            pool.get("silicon-a")
+        assert pool.get("silicon-a") is not client
+
+    def test_handlers_run_off_loop_serialised_per_project(self):
+        pool = SheetsClientPool(factory=FakeClient, max_workers=4)
+        active = {}
+        overlap = {}
+        loop_threads = set()
+
+        async def handler(arguments):
+            project = arguments["project"]
+            loop_threads.add(threading.get_ident())
+            pool.get(project)                       # rientrante sul lock
+            active[project] = active.get(project, 0) + 1
+            overlap[project] = max(overlap.get(project, 0), active[project])
+            time.sleep(0.02)                        # I/O bloccante di gspread
+            active[project] -= 1
+            return project
+
+        async def scenario():
+            main = threading.get_ident()
+            calls = [pool.run_handler(p, handler, {"project": p}) for p in ["a", "a", "a", "b", "b"]]
+            return main, await asyncio.gather(*calls)
+
+        main, results = asyncio.run(scenario())
+        pool.shutdown()
+
+        assert results == ["a", "a", "a", "b", "b"]
+        assert main not in loop_threads
+        assert overlap == {"a": 1, "b": 1}
+
+
+class FakeWorksheet:
+    def __init__(self, sheet_id, title, rows):
+        self.id = sheet_id
+        self.title = title
+        self.rows = rows
+        self.reads = 0
+
+    def col_values(self, col):
+        self.reads += 1
+        return [row[col - 1] for row in self.rows]
+
+
+class TestSuggestProject:
+    """suggest_project legge i client di tutti i progetti"""
+
+    def test_reads_each_project_under_its_lock(self, monkeypatch):
+        tools = pytest.importorskip("mcp_server.tools")
+        pool = SheetsClientPool(factory=FakeClient)
+        held = []
+
+        class LockedClient(FakeClient):
+            def get_all_run_numbers(self):
+                held.append(pool.lock(self.project)._is_owned())
+                return []
+
+        pool._factory = LockedClient
+        monkeypatch.setattr(tools, "SHEETS_POOL", pool)
+        monkeypatch.setattr(tools, "get_available_projects", lambda: ["silicon-a", "silicon-b"])
+        monkeypatch.setattr(tools, "get_project_tests", lambda project: [])
+
+        asyncio.run(pool.run_handler("", lambda _: tools.handle_suggest_project(), {}))
+
+        assert held == [True, True]
+
+
+class FakeSpreadsheet:
+    def __init__(self, worksheets):
+        self._worksheets = worksheets
+        self.list_calls = 0
+
+    def worksheets(self):
+        self.list_calls += 1
+        return list(self._worksheets)
+
+
+@pytest.fixture
+def sheets():
+    sheets_client = pytest.importorskip("src.sheets_client")
+    if not sheets_client.GOOGLE_AVAILABLE:
+        pytest.skip("Dipendenze Google non installate")
+
+    client = sheets_client.GoogleSheetsClient(
+        credentials_path="creds.json", spreadsheet_id="sheet-1", worksheets_ttl_seconds=60
+    )
+    client._spreadsheet = FakeSpreadsheet([
+        FakeWorksheet(1, "Run 001 [DEV] auto - 2025-01-01 10:00", [["TEST ID"], ["T1"], ["T2"]]),
+        FakeWorksheet(2, "Run 002 [DEV] auto - 2025-01-02 10:00", [["TEST ID"], ["T1"]]),
+    ])
+    return client
+
+
+class TestSheetsClientCaches:
+    """Test cache elenco fogli e info RUN chiuse"""
+
+    def test_worksheet_list_reused_within_ttl(self, sheets):
+        sheets.get_all_run_numbers()
+        sheets.get_run_sheet(1)
+        sheets.get_next_run_number()
+
+        assert sheets._spreadsheet.list_calls == 1
+
+        sheets.invalidate_worksheets()
+        sheets.get_all_run_numbers()
+        assert sheets._spreadsheet.list_calls == 2
+
+    def test_closed_run_info_read_once(self, sheets):
+        closed, latest = sheets._spreadsheet._worksheets
+
+        for _ in range(3):
+            assert sheets.get_run_info(1)['tests_count'] == 2
+            assert sheets.get_run_info(2)['tests_count'] == 1
+
+        assert closed.reads == 1
+        assert latest.reads == 3
+
+    def test_drive_version_reused_within_ttl(self, sheets):
+        class Files:
+            calls = 0
+
+            def get(self, **kwargs):
+                Files.calls += 1
+                return self
+
+            def execute(self):
+                return {'version': str(Files.calls)}
+
+        class Drive:
+            def files(self):
+                return Files()
+
+        sheets._drive_service = Drive()
+
+        assert [sheets.get_spreadsheet_version() for _ in range(3)] == ["1", "1", "1"]
+        assert Files.calls == 1
+
+    def test_ensure_authenticated_refreshes_expired_token(self, sheets, monkeypatch):
+        class Creds:
+            expired = True
+            refreshed = 0
+
+            def refresh(self, request):
+                self.refreshed += 1
+                self.expired = False
+
+        creds = Creds()
+        sheets._credentials = creds
+        monkeypatch.setattr(sheets, "authenticate", lambda: pytest.fail("nuova autenticazione"))
+
+        assert sheets.ensure_authenticated()
+        assert sheets.ensure_authenticated()
+        assert creds.refreshed == 1
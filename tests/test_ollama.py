@@ -0,0 +1,138 @@
+"""
+Unit Tests - OllamaClient asincrono
+
+Testa il client Ollama su trasporto httpx finto: keep_alive nelle
+richieste, limite di richieste simultanee, streaming interrotto appena
+il modello risponde DONE.
+"""
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import ollama_client
+from src.ollama_client import OllamaClient, is_done_reply
+
+httpx = pytest.importorskip("httpx")
+
+
+class ChunkStream(httpx.AsyncByteStream):
+    """Risposta NDJSON a chunk; registra quanti ne vengono letti"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.sent = 0
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            self.sent += 1
+            yield (json.dumps({'response': chunk, 'done': False}) + "\n").encode()
+        yield (json.dumps({'response': "", 'done': True}) + "\n").encode()
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    """Sostituisce il trasporto di rete di httpx.AsyncClient"""
+    state = {'requests': [], 'handler': None}
+    real_client = httpx.AsyncClient
+
+    async def handler(request):
+        state['requests'].append(json.loads(request.content))
+        return await state['handler'](request)
+
+    monkeypatch.setattr(ollama_client.httpx, "AsyncClient",
+                        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs))
+    return state
+
+
+class TestAsyncOllama:
+    """Test API asincrona"""
+
+    def test_generate_sends_keep_alive(self, transport):
+        async def reply(request):
+            return httpx.Response(200, json={'response': "ciao"})
+        transport['handler'] = reply
+
+        async def scenario():
+            client = OllamaClient(model="llama3.2:3b", keep_alive="1h", num_parallel=1)
+            text = await client.agenerate("prompt", system="sys", max_tokens=20)
+            await client.aclose()
+            return text
+
+        assert asyncio.run(scenario()) == "ciao"
+        body = transport['requests'][0]
+        assert body['keep_alive'] == "1h"
+        assert body['options']['num_predict'] == 20
+        assert body['system'] == "sys"
+
+    def test_concurrency_limited_to_num_parallel(self, transport):
+        in_flight = {'now': 0, 'max': 0}
+
+        async def slow(request):
+            in_flight['now'] += 1
+            in_flight['max'] = max(in_flight['max'], in_flight['now'])
+            await asyncio.sleep(0.02)
+            in_flight['now'] -= 1
+            return httpx.Response(200, json={'response': "ok"})
+        transport['handler'] = slow
+
+        async def scenario():
+            client = OllamaClient(num_parallel=2)
+            results = await asyncio.gather(*(client.agenerate(f"p{i}") for i in range(6)))
+            await client.aclose()
+            return results
+
+        assert asyncio.run(scenario()) == ["ok"] * 6
+        assert in_flight['max'] == 2
+
+    def test_decision_stops_streaming_on_done(self, transport):
+        stream = ChunkStream(["DONE", ".", " The", " conversation", " is", " complete"])
+
+        async def streaming(request):
+            return httpx.Response(200, stream=stream)
+        transport['handler'] = streaming
+
+        async def scenario():
+            client = OllamaClient()
+            decision = await client.adecide_response("Can I help with anything else?", [], followups=["Grazie"])
+            await client.aclose()
+            return decision
+
+        assert asyncio.run(scenario()) is None
+        assert transport['requests'][0]['stream'] is True
+        assert stream.sent < len(stream.chunks)
+
+    def test_decision_uses_full_streamed_reply(self, transport):
+        async def streaming(request):
+            return httpx.Response(200, stream=ChunkStream(["\"Ita", "ly\""]))
+        transport['handler'] = streaming
+
+        async def scenario():
+            return await OllamaClient().adecide_response("Where are you based?", [])
+
+        assert asyncio.run(scenario()) == "Italy"
+
+    def test_evaluation_falls_back_on_error(self, transport):
+        async def failing(request):
+            return httpx.Response(500)
+        transport['handler'] = failing
+
+        async def scenario():
+            return await OllamaClient().aevaluate_test_result({'question': "q"}, [], "risposta")
+
+        result = asyncio.run(scenario())
+        assert result['passed'] is True
+        assert result['reason'] == "Automatic evaluation failed"
+
+
+class TestDoneReply:
+    def test_done_detection(self):
+        assert is_done_reply("DONE")
+        assert is_done_reply("done")
+        assert is_done_reply("DONE. Conversation complete")
+        assert not is_done_reply("Done with my order, thanks")
+        assert not is_done_reply("Italy")
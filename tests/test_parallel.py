@@ -0,0 +1,256 @@
+"""
+Unit Tests - BrowserPool
+
+Testa riciclo e pre-warm dei context senza avviare Chromium.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import models, parallel
+from src.browser import BrowserSettings, ChatbotSelectors, ResetResult
+from src.config_loader import ParallelSettings
+from src.parallel import BrowserPool, ParallelConfig, ParallelTestRunner, RetryStrategy, WorkerState
+from src.performance import PerformanceCollector
+
+
+class FakeBrowser:
+    """BrowserManager finto: traccia navigazione, heap e chiusura"""
+
+    def __init__(self, name: str, heap_mb: float = 50.0):
+        self.name = name
+        self.heap_mb = heap_mb
+        self.navigated = []
+        self.stopped = False
+
+    async def navigate(self, url):
+        self.navigated.append(url)
+
+    async def js_heap_mb(self):
+        return self.heap_mb
+
+    async def stop(self):
+        self.stopped = True
+
+
+class FakeSharedBrowser:
+    """SharedBrowser finto: nessun Chromium"""
+
+    def __init__(self, settings):
+        self.storage_state = "state.json"
+        self.stopped = False
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        self.stopped = True
+
+
+def _make_pool(recycle_after: int = 2, max_heap_mb: int = 0, size: int = 1):
+    pool = BrowserPool(
+        size=size,
+        settings=BrowserSettings(headless=True),
+        selectors=ChatbotSelectors(textarea="#t", submit_button="#b", bot_messages=".bot"),
+        mode="context",
+        recycle_after=recycle_after,
+        max_heap_mb=max_heap_mb,
+        warm_url="https://chat.example.com"
+    )
+    created = []
+
+    async def fake_new_browser(worker_id):
+        browser = FakeBrowser(f"w{worker_id}-{len(created)}")
+        created.append(browser)
+        return browser
+
+    pool._new_browser = fake_new_browser
+    return pool, created
+
+
+class TestBrowserPoolContexts:
+    """Test pool in modalità context"""
+
+    def test_recycles_after_n_tests_with_prewarmed_context(self, monkeypatch):
+        """Il sostituto è pronto (e navigato) prima del rilascio"""
+        monkeypatch.setattr(parallel, "SharedBrowser", FakeSharedBrowser)
+
+        async def scenario():
+            pool, created = _make_pool(recycle_after=2)
+            await pool.initialize()
+            first = created[0]
+
+            worker = await pool.acquire()
+            assert worker.spare is None
+            await pool.release(worker)
+
+            worker = await pool.acquire()
+            assert worker.spare is not None  # pre-warm durante l'ultimo test
+            await asyncio.sleep(0)
+            await pool.release(worker)
+            await asyncio.sleep(0)
+
+            stats = pool.get_stats()
+            await pool.shutdown()
+            return first, worker, created, stats
+
+        first, worker, created, stats = asyncio.run(scenario())
+
+        assert len(created) == 2
+        assert worker.browser is created[1]
+        assert created[1].navigated == ["https://chat.example.com"]
+        assert first.stopped
+        assert worker.tests_in_context == 0
+        assert stats[0]["contexts_recycled"] == 1
+
+    def test_recycles_on_heap_growth(self, monkeypatch):
+        """Heap JS oltre soglia forza il riciclo anche sotto il limite test"""
+        monkeypatch.setattr(parallel, "SharedBrowser", FakeSharedBrowser)
+
+        async def scenario():
+            pool, created = _make_pool(recycle_after=0, max_heap_mb=100)
+            await pool.initialize()
+            created[0].heap_mb = 300
+
+            worker = await pool.acquire()
+            assert worker.spare is None
+            await pool.release(worker)
+            browser = worker.browser
+            await pool.shutdown()
+            return browser, created
+
+        browser, created = asyncio.run(scenario())
+
+        assert browser is created[1]
+        assert created[0].stopped
+
+    def test_failed_replacement_keeps_current_context(self, monkeypatch):
+        """Se il nuovo context non parte, il worker continua col vecchio"""
+        monkeypatch.setattr(parallel, "SharedBrowser", FakeSharedBrowser)
+
+        async def scenario():
+            pool, created = _make_pool(recycle_after=1)
+            await pool.initialize()
+
+            async def broken(worker_id):
+                raise RuntimeError("context crash")
+
+            pool._warm_browser = broken
+            worker = await pool.acquire()
+            await pool.release(worker)
+            again = await pool.acquire(timeout_seconds=1)
+            browser = again.browser
+            await pool.shutdown()
+            return worker, again, browser, created
+
+        worker, again, browser, created = asyncio.run(scenario())
+
+        assert again is worker
+        assert browser is created[0]
+        assert worker.recycled == 0
+
+
+class TestParallelConfig:
+    """Test conversione da settings.yaml"""
+
+    def test_from_settings_converts_retry_strategy(self):
+        settings = ParallelSettings(retry_strategy="linear", max_retries=5, pool_mode="context")
+
+        config = ParallelConfig.from_settings(settings, max_workers=4)
+
+        assert config.retry_strategy is RetryStrategy.LINEAR
+        assert config.max_retries == 5
+        assert config.max_workers == 4
+        assert config.pool_mode == "context"
+
+    def test_unknown_retry_strategy_falls_back(self):
+        config = ParallelConfig.from_settings(ParallelSettings(retry_strategy="boh"))
+
+        assert config.retry_strategy is RetryStrategy.EXPONENTIAL
+        assert config.max_workers == 3
+
+
+class FakeChatBrowser:
+    """Pagina del chatbot già aperta: reset invece di una nuova navigazione"""
+
+    current_url = "https://chat.example.com"
+    last_response_timing = None
+
+    def __init__(self):
+        self.navigated = []
+
+    async def reset_session(self):
+        return ResetResult(strategy="new_chat", duration_ms=120)
+
+    async def navigate(self, url):
+        self.navigated.append(url)
+
+    async def send_message(self, text):
+        pass
+
+    async def wait_for_response(self):
+        return "risposta"
+
+
+def _make_runner(**kwargs):
+    return ParallelTestRunner(
+        browser_settings=BrowserSettings(headless=True),
+        selectors=ChatbotSelectors(textarea="#t", submit_button="#b", bot_messages=".bot"),
+        config=ParallelConfig(),
+        **kwargs
+    )
+
+
+class TestExecuteTest:
+    """Test fase browser di un test"""
+
+    def test_reset_is_recorded_in_test_metrics(self):
+        runner = _make_runner(perf_collector=PerformanceCollector(run_id="1", project="test"))
+        browser = FakeChatBrowser()
+
+        job = asyncio.run(runner._execute_test(
+            WorkerState(worker_id=0, browser=browser), models.TestCase(id="T1", question="ciao"),
+            "https://chat.example.com", single_turn=True
+        ))
+
+        assert browser.navigated == []
+        assert job.metrics.get_phase_duration("reset") == 120
+        assert [c.operation for c in job.metrics.external_services] == ["reset.new_chat"]
+
+
+class PipelineBuilt(Exception):
+    pass
+
+
+class TestRunnerPipeline:
+    """Test pipeline di valutazione del run parallelo"""
+
+    def test_pipeline_gets_baselines_and_settings(self, monkeypatch):
+        """Golden answers e contesto RAG come nel percorso sequenziale"""
+        captured = {}
+
+        class ReadyPool:
+            def __init__(self, **kwargs):
+                pass
+
+            async def initialize(self):
+                return True
+
+        def fake_pipeline(**kwargs):
+            captured.update(kwargs)
+            raise PipelineBuilt()
+
+        monkeypatch.setattr(parallel, "BrowserPool", ReadyPool)
+        monkeypatch.setattr(parallel, "EvaluationPipeline", fake_pipeline)
+        baselines, settings = object(), object()
+        runner = _make_runner(baselines=baselines, settings=settings)
+
+        with pytest.raises(PipelineBuilt):
+            asyncio.run(runner.run([models.TestCase(id="T1", question="ciao")], "https://chat.example.com"))
+
+        assert captured["baselines"] is baselines
+        assert captured["settings"] is settings
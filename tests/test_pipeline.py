@@ -0,0 +1,114 @@
+"""
+Unit Tests - EvaluationPipeline
+
+Testa il post-processing fuori dal percorso browser con client finti.
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import models, performance
+from src.engine.pipeline import EvaluationPipeline, PostProcessJob
+from src.models import ConversationTurn
+
+
+class SlowLangSmith:
+    """get_report_for_question bloccante, come il client reale (requests)"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def get_report_for_question(self, question, sent_at=None):
+        time.sleep(self.delay)
+        return SimpleNamespace(
+            trace_url=f"https://smith/{question}",
+            vector_store="Qdrant",
+            format_for_sheets=lambda: "report",
+            get_model_version=lambda: "gpt-4o-mini"
+        )
+
+
+class FakeOllama:
+    def evaluate_test_result(self, test_case, conversation, final_response):
+        return {'passed': final_response == "ok", 'reason': f"risposta: {final_response}"}
+
+    async def aevaluate_test_result(self, test_case, conversation, final_response):
+        return self.evaluate_test_result(test_case, conversation, final_response)
+
+
+def _job(test_id: str, answer: str = "ok", **kwargs) -> PostProcessJob:
+    test = models.TestCase(id=test_id, question=f"domanda {test_id}")
+    conversation = [
+        ConversationTurn(role='user', content=test.question),
+        ConversationTurn(role='assistant', content=answer),
+    ]
+    return PostProcessJob(test=test, conversation=conversation, duration_ms=100, **kwargs)
+
+
+class TestEvaluationPipeline:
+    """Test pipeline di post-processing"""
+
+    def test_blocking_clients_do_not_stall_loop(self):
+        """Le chiamate LangSmith girano in parallelo e il loop resta libero"""
+        config = SimpleNamespace(queue_size=4, workers=4, langsmith_concurrency=4)
+
+        async def scenario():
+            pipeline = EvaluationPipeline(config, langsmith=SlowLangSmith(0.2), ollama=FakeOllama())
+            await pipeline.start()
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            ticker_task = asyncio.create_task(ticker())
+            start = time.perf_counter()
+            futures = [await pipeline.submit(_job(f"T{i}")) for i in range(4)]
+            results = [await f for f in futures]
+            elapsed = time.perf_counter() - start
+            ticker_task.cancel()
+            await pipeline.close()
+            return results, elapsed, ticks
+
+        results, elapsed, ticks = asyncio.run(scenario())
+
+        assert elapsed < 0.6  # 4 x 0.2s in parallelo, non in serie
+        assert ticks >= 5
+        assert [r.test_case.id for r in results] == ["T0", "T1", "T2", "T3"]
+        assert all(r.result == "PASS" for r in results)
+        assert results[0].langsmith_url == "https://smith/domanda T0"
+        assert results[0].model_version == "gpt-4o-mini"
+
+    def test_metrics_receive_final_status(self):
+        """Le metriche del test vengono completate dalla pipeline"""
+        metrics = performance.TestMetrics(test_id="T1", status="PENDING")
+
+        async def scenario():
+            pipeline = EvaluationPipeline(ollama=FakeOllama())
+            return await pipeline.process(_job("T1", answer="ko", metrics=metrics, timing="1.0s → 2.0s"))
+
+        result = asyncio.run(scenario())
+
+        assert result.result == "FAIL"
+        assert result.timing == "1.0s → 2.0s"
+        assert metrics.status == "FAIL"
+        assert metrics.get_phase_duration("post_process") >= 0
+
+    def test_browser_error_skips_enrichment(self):
+        """Un job fallito nel browser diventa ERROR senza chiamare i servizi"""
+        langsmith = SlowLangSmith(5)
+
+        async def scenario():
+            pipeline = EvaluationPipeline(langsmith=langsmith)
+            return await pipeline.process(_job("T1", error="timeout"))
+
+        result = asyncio.run(scenario())
+
+        assert result.result == "ERROR"
+        assert "timeout" in result.notes
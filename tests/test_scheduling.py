@@ -0,0 +1,158 @@
+"""
+Unit Tests - Scheduling
+
+Testa stime di durata, assegnazione LPT, work stealing e copie
+speculative, anche dentro ParallelTestRunner con un pool finto.
+"""
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import models, parallel
+from src.scheduling import DurationEstimator, WorkStealingScheduler
+
+
+def _test(test_id: str, followups: int = 0) -> models.TestCase:
+    return models.TestCase(id=test_id, question=f"domanda {test_id}",
+                           followups=[f"f{i}" for i in range(followups)])
+
+
+class TestDurationEstimator:
+    """Test stime da storico"""
+
+    def test_reads_performance_and_csv_history(self, tmp_path):
+        """Durate da performance_*.json e da report.csv dei run senza metriche"""
+        perf_dir = tmp_path / "demo" / "run_1" / "performance"
+        perf_dir.mkdir(parents=True)
+        (perf_dir / "performance_1.json").write_text(json.dumps({
+            "test_metrics": [{"test_id": "T1", "total_duration_ms": 40000}]
+        }))
+        run_2 = tmp_path / "demo" / "run_2"
+        run_2.mkdir()
+        (run_2 / "report.csv").write_text("test_id,duration_ms\nT2,9000\nT1,\n")
+
+        estimator = DurationEstimator.from_history("demo", tmp_path)
+
+        assert estimator.estimate(_test("T1")) == 40000
+        assert estimator.estimate(_test("T2")) == 9000
+
+    def test_unknown_tests_scale_with_turns(self):
+        """Senza storico la stima usa la durata per turno dei test noti"""
+        estimator = DurationEstimator({"T1": [10000, 12000]})
+        tests = [_test("T1", followups=1), _test("T2", followups=3)]
+        estimator.prepare(tests)
+
+        assert estimator.estimate(tests[1]) == 4 * 5500
+
+
+class TestWorkStealingScheduler:
+    """Test assegnazione e bilanciamento"""
+
+    def test_longest_first_assignment(self):
+        """LPT: il test più lungo parte per primo, makespan stimato bilanciato"""
+        estimator = DurationEstimator({"A": [10], "B": [40], "C": [30], "D": [20]})
+        scheduler = WorkStealingScheduler([_test(t) for t in "ABCD"], estimator, workers=2,
+                                          speculative=False)
+
+        first = [scheduler.next(0).test.id, scheduler.next(1).test.id]
+
+        assert first == ["B", "C"]
+        assert scheduler.predicted_makespan_ms == 50
+
+    def test_idle_worker_steals(self):
+        """Un worker con la coda vuota prende lavoro dal più carico"""
+        estimator = DurationEstimator({"A": [100], "B": [10], "C": [10]})
+        scheduler = WorkStealingScheduler([_test(t) for t in "ABC"], estimator, workers=2,
+                                          speculative=False)
+        scheduler.next(0)  # A
+
+        ids = [scheduler.next(0).test.id, scheduler.next(0).test.id]
+
+        assert sorted(ids) == ["B", "C"]
+        assert scheduler.steals >= 1
+        assert scheduler.next(1) is None
+
+    def test_straggler_is_duplicated_once(self):
+        """A code vuote il test in ritardo viene duplicato, vince la prima copia"""
+        estimator = DurationEstimator({"A": [1000]})
+        scheduler = WorkStealingScheduler([_test("A")], estimator, workers=2,
+                                          straggler_factor=2.0, min_straggler_ms=0)
+        item = scheduler.next(0)
+        scheduler.start(item)
+        item.started_at = time.time() - 5
+
+        copy = scheduler.next(1)
+
+        assert copy is item and copy.copies == 2
+        assert scheduler.next(1) is None
+        assert scheduler.complete(item, speculative_copy=True)
+        assert not scheduler.complete(item)
+        assert scheduler.speculation_wins == 1
+
+
+    def test_queue_wait_is_not_run_time(self):
+        """Un test estratto ma in attesa dello slot non viene duplicato"""
+        estimator = DurationEstimator({"A": [1000]})
+        scheduler = WorkStealingScheduler([_test("A")], estimator, workers=2, min_straggler_ms=0)
+        item = scheduler.next(0)
+
+        assert item.started_at is None
+        assert scheduler.next(1) is None
+        assert scheduler.actual_makespan_ms == 0
+
+        scheduler.start(item)
+        item.started_at = time.time() - 5
+        assert scheduler.next(1) is item
+
+
+class FakePool:
+    def __init__(self, size, **kwargs):
+        self.size = size
+
+    async def initialize(self):
+        return True
+
+    def get_stats(self):
+        return {i: {} for i in range(self.size)}
+
+    async def shutdown(self):
+        pass
+
+
+class TestParallelRunnerScheduling:
+    """Test scheduler dentro ParallelTestRunner"""
+
+    def test_stuck_test_is_rescued_by_speculative_copy(self, monkeypatch):
+        """La copia speculativa chiude il test bloccato; risultati in ordine originale"""
+        monkeypatch.setattr(parallel, "BrowserPool", FakePool)
+        config = parallel.ParallelConfig(max_workers=2, rate_limit_per_minute=1000,
+                                         straggler_factor=1.5)
+        estimator = DurationEstimator({"SLOW": [50], "A": [50], "B": [50]})
+        runner = parallel.ParallelTestRunner(
+            browser_settings=None, selectors=None, config=config, duration_estimator=estimator
+        )
+        attempts = {"SLOW": 0}
+
+        async def fake_run(test, chatbot_url, single_turn):
+            if test.id == "SLOW":
+                attempts["SLOW"] += 1
+                await asyncio.sleep(30 if attempts["SLOW"] == 1 else 0.05)
+            else:
+                await asyncio.sleep(0.05)
+            return models.TestExecution(test_case=test, conversation=[], result="PASS", duration_ms=50)
+
+        runner._run_single_test = fake_run
+        monkeypatch.setattr(parallel.WorkStealingScheduler, "MIN_STRAGGLER_MS", 0)
+
+        start = time.perf_counter()
+        result = asyncio.run(runner.run([_test("SLOW"), _test("A"), _test("B")], "https://chat"))
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 5
+        assert [r.test_case.id for r in result.results] == ["SLOW", "A", "B"]
+        assert attempts["SLOW"] == 2
+        assert result.actual_makespan_ms > 0
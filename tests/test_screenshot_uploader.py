@@ -0,0 +1,153 @@
+"""
+Unit Tests - ScreenshotUploader
+
+Testa upload concorrenti, deduplica per contenuto e permessi in batch
+con un client Drive finto.
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.clients.screenshot_uploader import ScreenshotUploader
+from src.clients.sheets_writer import SheetsWriter
+from src.models import ScreenshotUrls
+
+
+class FakeDriveClient:
+    """Upload lenti (50ms), permessi registrati per batch"""
+
+    def __init__(self, fail_ids=(), deny_ids=()):
+        self.created = []
+        self.permission_batches = []
+        self.fail_ids = set(fail_ids)
+        self.deny_ids = set(deny_ids)
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def create_drive_file(self, file_path, test_id):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.05)
+        with self._lock:
+            self.active -= 1
+            self.created.append(test_id)
+        if test_id in self.fail_ids:
+            return None
+        return {'id': f"id-{test_id}", 'webViewLink': f"https://view/{test_id}"}
+
+    def grant_public_read(self, file_ids):
+        self.permission_batches.append(list(file_ids))
+        return set(file_ids) - self.deny_ids
+
+    @staticmethod
+    def screenshot_urls(file):
+        return ScreenshotUrls(image_url=f"https://img/{file['id']}", view_url=file['webViewLink'])
+
+
+def _shots(tmp_path, n, same_content=False):
+    paths = []
+    for i in range(n):
+        path = tmp_path / f"T{i}.png"
+        path.write_bytes(b"same" if same_content else f"png-{i}".encode())
+        paths.append((path, f"T{i}"))
+    return paths
+
+
+class TestScreenshotUploader:
+    """Test pipeline upload"""
+
+    def test_uploads_concurrently_with_batched_permissions(self, tmp_path):
+        """20 upload da 50ms con 5 thread: ~0.2s, permessi in pochi batch"""
+        client = FakeDriveClient()
+        uploader = ScreenshotUploader(client, max_workers=5, permission_window_s=0.1)
+
+        start = time.perf_counter()
+        urls = uploader.upload_many(_shots(tmp_path, 20))
+        elapsed = time.perf_counter() - start
+        uploader.close()
+
+        assert elapsed < 0.8
+        assert client.max_active == 5
+        assert urls["T3"].image_url == "https://img/id-T3"
+        assert sum(len(b) for b in client.permission_batches) == 20
+        assert len(client.permission_batches) < 20
+
+    def test_identical_screenshots_uploaded_once(self, tmp_path):
+        """Stesso contenuto: un upload, stessi URL per tutti i test"""
+        client = FakeDriveClient()
+        uploader = ScreenshotUploader(client, max_workers=4)
+
+        urls = uploader.upload_many(_shots(tmp_path, 5, same_content=True))
+        uploader.close()
+
+        assert len(client.created) == 1
+        assert len({u.image_url for u in urls.values()}) == 1
+        assert uploader.deduplicated == 4
+
+    def test_failed_upload_is_retried_by_next_duplicate(self, tmp_path):
+        """Un upload fallito non viene riusato dalla deduplica"""
+        client = FakeDriveClient(fail_ids={"T0"})
+        uploader = ScreenshotUploader(client, max_workers=1)
+        shots = _shots(tmp_path, 2, same_content=True)
+
+        first = uploader.upload(*shots[0])
+        second = uploader.upload(*shots[1])
+        uploader.close()
+
+        assert first is None
+        assert second.image_url == "https://img/id-T1"
+        assert uploader.failed == 1
+
+    def test_missing_permission_fails_only_that_file(self, tmp_path):
+        """Permesso non creato: niente URL e il duplicato successivo riprova"""
+        client = FakeDriveClient(deny_ids={"id-T0"})
+        uploader = ScreenshotUploader(client, max_workers=2)
+
+        urls = uploader.upload_many(_shots(tmp_path, 2))
+        retry = uploader.upload(*_shots(tmp_path, 1)[0])
+        uploader.close()
+
+        assert urls["T0"] is None
+        assert urls["T1"].image_url == "https://img/id-T1"
+        assert retry is None
+        assert client.created.count("T0") == 2
+        assert uploader.failed == 2
+        assert uploader.uploaded == 1
+
+
+class FakeSheetsClient(FakeDriveClient):
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def write_results_batch(self, results):
+        self.batches.append([(r.test_id, r.screenshot_urls.image_url) for r in results])
+        return len(results)
+
+
+class TestWriterWithUploader:
+    """Test upload sovrapposto al ciclo dei test"""
+
+    def test_upload_starts_on_submit(self, tmp_path):
+        """L'upload parte al submit, la riga esce con gli URL"""
+        from src import models
+
+        client = FakeSheetsClient()
+        uploader = ScreenshotUploader(client, max_workers=2)
+        writer = SheetsWriter(client, flush_interval_s=0.5, requests_per_minute=600, uploader=uploader)
+        writer.start()
+
+        (path, test_id), = _shots(tmp_path, 1)
+        writer.submit(models.TestResult(test_id=test_id, screenshot_path=str(path)))
+        time.sleep(0.2)
+        started_before_flush = client.created == ["T0"]
+        writer.close(timeout=5)
+        uploader.close()
+
+        assert started_before_flush
+        assert client.batches == [[("T0", "https://img/id-T0")]]
@@ -0,0 +1,117 @@
+"""
+Unit Tests - Screenshots
+
+Testa codifica, buffer in memoria condiviso (disco, Drive, vision)
+e ricerca degli screenshot per estensione.
+"""
+import asyncio
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import screenshots
+from src.clients.screenshot_uploader import file_digest
+from src.screenshots import (
+    EncodedScreenshot,
+    ScreenshotBuffers,
+    ScreenshotEncoding,
+    encode_screenshot,
+    find_screenshot,
+    get_screenshot_buffers,
+    load_screenshot,
+    save_screenshot,
+    screenshot_extension,
+)
+from src.validators.vision import VisionValidator
+
+RAW_PNG = b"\x89PNG\r\n\x1a\n" + b"x" * 64
+
+
+@pytest.fixture(autouse=True)
+def clear_buffers():
+    get_screenshot_buffers().clear()
+    yield
+    get_screenshot_buffers().clear()
+
+
+class TestSharedBuffer:
+    """Test buffer condiviso tra disco, Drive e vision"""
+
+    def test_save_writes_once_and_serves_from_memory(self, tmp_path):
+        """Dopo il salvataggio i consumer leggono i bytes dal buffer, non dal disco"""
+        path = tmp_path / "T1.png"
+        shot = asyncio.run(save_screenshot(RAW_PNG, path))
+
+        assert path.read_bytes() == RAW_PNG
+        path.unlink()  # nessuna rilettura dal disco
+
+        loaded = load_screenshot(path)
+        assert loaded is shot
+        assert file_digest(path) == shot.digest
+        assert VisionValidator()._load_image(str(path)) == shot.data_url
+
+    def test_base64_is_computed_once(self):
+        shot = EncodedScreenshot(data=RAW_PNG)
+
+        assert shot.base64 is shot.base64
+        assert shot.data_url.startswith("data:image/png;base64,")
+
+    def test_disk_fallback_uses_extension_mime(self, tmp_path):
+        path = tmp_path / "T1.webp"
+        path.write_bytes(b"RIFF")
+
+        assert load_screenshot(path).mime_type == "image/webp"
+        assert load_screenshot(tmp_path / "missing.png") is None
+
+    def test_lru_is_bounded_in_bytes(self, tmp_path):
+        buffers = ScreenshotBuffers(max_bytes=100)
+        for i in range(3):
+            buffers.put(tmp_path / f"T{i}.png", EncodedScreenshot(data=b"x" * 40))
+
+        assert buffers.get(tmp_path / "T0.png") is None
+        assert buffers.get(tmp_path / "T2.png") is not None
+        assert len(buffers) == 2
+
+
+class TestEncoding:
+    """Test codifica"""
+
+    def test_png_passthrough_without_resize(self):
+        """PNG senza ridimensionamento: nessuna decodifica"""
+        shot = encode_screenshot(RAW_PNG, ScreenshotEncoding())
+
+        assert shot.data == RAW_PNG
+        assert shot.mime_type == "image/png"
+
+    def test_falls_back_to_png_without_pillow(self, monkeypatch):
+        monkeypatch.setattr(screenshots, "PIL_AVAILABLE", False)
+        encoding = ScreenshotEncoding(format="webp")
+
+        assert screenshot_extension(encoding) == ".png"
+        assert encode_screenshot(RAW_PNG, encoding).data == RAW_PNG
+
+    def test_webp_with_max_height(self):
+        Image = pytest.importorskip("PIL.Image")
+        raw = io.BytesIO()
+        Image.new("RGB", (200, 1000), "white").save(raw, format="PNG")
+
+        shot = encode_screenshot(raw.getvalue(), ScreenshotEncoding(format="webp", quality=60, max_height=500))
+        decoded = Image.open(io.BytesIO(shot.data))
+
+        assert shot.mime_type == "image/webp"
+        assert decoded.size == (100, 500)
+        assert screenshot_extension(ScreenshotEncoding(format="jpeg")) == ".jpg"
+
+
+class TestFindScreenshot:
+    """Test ricerca screenshot nei report"""
+
+    def test_finds_any_format(self, tmp_path):
+        (tmp_path / "T1.webp").write_bytes(b"RIFF")
+
+        assert find_screenshot(tmp_path, "T1") == tmp_path / "T1.webp"
+        assert find_screenshot(tmp_path, "T2") is None
@@ -0,0 +1,224 @@
+"""
+Unit Tests - SheetsWriter
+
+Testa batching, retry su 429, token bucket e le chiamate di
+GoogleSheetsClient.write_results_batch senza chiamare Google.
+"""
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import models
+from src.clients.sheets_writer import SheetsWriter, TokenBucket
+from src.models import ScreenshotUrls
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class QuotaError(Exception):
+    def __init__(self, status_code=429):
+        super().__init__(f"APIError [{status_code}]")
+        self.response = FakeResponse(status_code)
+
+
+class FakeSheetsClient:
+    """Registra le batch scritte; può fallire le prime N chiamate"""
+
+    def __init__(self, failures=0, status_code=429):
+        self.batches = []
+        self.failures = failures
+        self.status_code = status_code
+        self.uploads = []
+
+    def write_results_batch(self, results):
+        if self.failures:
+            self.failures -= 1
+            raise QuotaError(self.status_code)
+        self.batches.append([r.test_id for r in results])
+        return len(results)
+
+    def upload_screenshot(self, path, test_id):
+        self.uploads.append(test_id)
+        return ScreenshotUrls(image_url=f"https://img/{test_id}", view_url="")
+
+
+def _rows(n):
+    return [models.TestResult(test_id=f"T{i:03d}") for i in range(n)]
+
+
+class TestSheetsWriter:
+    """Test writer in background"""
+
+    def test_coalesces_rows_into_few_batches(self):
+        """120 righe con max_batch 50: 3 batchUpdate, submit non blocca"""
+        client = FakeSheetsClient()
+        written = []
+        writer = SheetsWriter(client, flush_interval_s=0.2, max_batch=50, requests_per_minute=600,
+                              on_written=lambda rows: written.extend(r.test_id for r in rows))
+        writer.start()
+
+        start = time.perf_counter()
+        for row in _rows(120):
+            writer.submit(row)
+        submit_time = time.perf_counter() - start
+        writer.close(timeout=5)
+
+        assert submit_time < 0.1
+        assert [len(b) for b in client.batches] == [50, 50, 20]
+        assert writer.api_calls == 3
+        assert written == [f"T{i:03d}" for i in range(120)]
+
+    def test_retries_on_quota_error(self):
+        """Un 429 viene ritentato con backoff, nessuna riga persa"""
+        client = FakeSheetsClient(failures=2)
+        writer = SheetsWriter(client, flush_interval_s=0.01, requests_per_minute=600, base_delay_s=0.01)
+        writer.start()
+        for row in _rows(3):
+            writer.submit(row)
+        writer.close(timeout=5)
+
+        assert client.batches == [["T000", "T001", "T002"]]
+        assert writer.retries == 2
+        assert writer.rows_failed == 0
+
+    def test_non_retryable_error_leaves_rows_unwritten(self):
+        """Errori non di quota non vengono ritentati né segnati come scritti"""
+        client = FakeSheetsClient(failures=1, status_code=400)
+        written = []
+        writer = SheetsWriter(client, flush_interval_s=0.01, requests_per_minute=600,
+                              on_written=written.extend)
+        writer.start()
+        writer.submit(_rows(1)[0])
+        writer.close(timeout=5)
+
+        assert writer.retries == 0
+        assert writer.rows_failed == 1
+        assert written == []
+
+    def test_uploads_missing_screenshots(self, tmp_path):
+        """Lo screenshot viene caricato nel thread del writer prima della riga"""
+        shot = tmp_path / "T1.png"
+        shot.write_bytes(b"png")
+        client = FakeSheetsClient()
+        row = models.TestResult(test_id="T1", screenshot_path=str(shot))
+        writer = SheetsWriter(client, flush_interval_s=0.01, requests_per_minute=600)
+        writer.start()
+        writer.submit(row)
+        writer.close(timeout=5)
+
+        assert client.uploads == ["T1"]
+        assert row.screenshot_urls.image_url == "https://img/T1"
+
+
+class TestTokenBucket:
+    """Test limite richieste"""
+
+    def test_waits_when_burst_is_exhausted(self):
+        bucket = TokenBucket(rate_per_minute=600, capacity=2)  # 10/s
+
+        start = time.perf_counter()
+        for _ in range(4):
+            bucket.acquire()
+        elapsed = time.perf_counter() - start
+
+        assert 0.15 <= elapsed < 1.0
+
+
+class FakeWorksheet:
+    """values.append: righe accodate dopo `last_row` (anche scritte da altri)"""
+    id = 7
+    title = "Run 001"
+
+    def __init__(self, last_row=2):
+        self.last_row = last_row
+        self.appends = []
+
+    def append_rows(self, values, value_input_option='RAW'):
+        self.appends.append((values, value_input_option))
+        first = self.last_row + 1
+        self.last_row += len(values)
+        return {"updates": {"updatedRange": f"'{self.title}'!A{first}:X{self.last_row}"}}
+
+
+class FakeSpreadsheet:
+    def __init__(self):
+        self.bodies = []
+
+    def batch_update(self, body):
+        self.bodies.append(body)
+
+
+def _client():
+    sheets_client = pytest.importorskip("src.sheets_client")
+    if not sheets_client.GOOGLE_AVAILABLE:
+        pytest.skip("Dipendenze Google non installate")
+
+    client = sheets_client.GoogleSheetsClient(credentials_path="creds.json", spreadsheet_id="x")
+    client._worksheet = FakeWorksheet()
+    client._spreadsheet = FakeSpreadsheet()
+    return client
+
+
+class TestWriteResultsBatch:
+    """Test values.append + batchUpdate di GoogleSheetsClient"""
+
+    def test_heights_follow_rows_actually_written(self):
+        client = _client()
+        shot = ScreenshotUrls(image_url="https://img", view_url="https://view")
+        results = [
+            models.TestResult(test_id="T1", screenshot_urls=shot, langsmith_report="=1+1"),
+            models.TestResult(test_id="T2", screenshot_urls=shot),
+            models.TestResult(test_id="T3"),
+        ]
+
+        assert client.write_results_batch(results) == 3
+        # Un altro writer accoda 4 righe allo stesso foglio
+        client._worksheet.last_row += 4
+        assert client.write_results_batch([models.TestResult(test_id="T4", screenshot_urls=shot)]) == 1
+        assert client.write_results_batch([models.TestResult(test_id="T5")]) == 1
+
+        (rows, option), _, _ = client._worksheet.appends
+        assert option == 'USER_ENTERED'
+        assert len(rows) == 3
+        assert rows[0][6] == '=IMAGE("https://img", 2)'
+        assert rows[0][15] == "'=1+1"
+
+        # Solo le batch con screenshot impostano le altezze
+        first, second = client._spreadsheet.bodies
+        height = first["requests"][0]["updateDimensionProperties"]["range"]
+        # Righe 3-4 (T1, T2) del foglio: indici 2-4 esclusivo
+        assert (height["startIndex"], height["endIndex"]) == (2, 4)
+        # T4 scritta alla riga 10, dopo le righe dell'altro writer
+        height = second["requests"][0]["updateDimensionProperties"]["range"]
+        assert (height["startIndex"], height["endIndex"]) == (9, 10)
+        assert client.is_test_completed("T4")
+
+    def test_score_and_date_sent_as_user_entered(self):
+        """Come append_results: Sheets interpreta score e data come numero e data"""
+        client = _client()
+        result = models.TestResult(test_id="T1", date="2026-01-15 10:30", semantic_score=0.85)
+
+        client.write_results_batch([result])
+
+        (rows, option), = client._worksheet.appends
+        assert option == 'USER_ENTERED'
+        assert rows == [client._result_row(result)]
+        assert rows[0][1] == "2026-01-15 10:30"  # DATE
+        assert rows[0][17] == "85%"              # SEMANTIC: numero 0.85 in formato percentuale
+
+    def test_height_error_does_not_fail_written_rows(self):
+        client = _client()
+
+        def fail(body):
+            raise RuntimeError("quota")
+        client._spreadsheet.batch_update = fail
+        shot = ScreenshotUrls(image_url="https://img", view_url="")
+
+        assert client.write_results_batch([models.TestResult(test_id="T1", screenshot_urls=shot)]) == 1
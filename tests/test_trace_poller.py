@@ -0,0 +1,218 @@
+"""
+Unit Tests - Trace Poller LangSmith
+
+Testa il poller condiviso dei root run: un solo flusso incrementale di
+query per tutti i test, attribuzione deterministica per input e istante
+di invio, paginazione oltre i 20 run e fallback alla scadenza.
+"""
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.langsmith_client import LangSmithClient
+from src.models import ConversationTurn
+from src.trace_poller import TracePoller, question_sent_at
+
+T0 = datetime(2025, 1, 1, 10, 0, 0)
+
+
+class FakeResponse:
+    def __init__(self, data, status_code=200):
+        self._data = data
+        self.status_code = status_code
+        self.headers = {}
+
+    def json(self):
+        return self._data
+
+
+def _run(run_id, question, seconds):
+    return {
+        'id': run_id, 'name': 'Agent', 'run_type': 'chain', 'parent_run_id': None,
+        'start_time': (T0 + timedelta(seconds=seconds)).isoformat(),
+        'inputs': {'input': question}, 'outputs': {'output': 'ok'},
+        'status': 'success', 'extra': {'metadata': {}},
+    }
+
+
+class FakeLangSmith:
+    """Simula /runs/query sui root run: filtro start_time e pagine da page_size"""
+
+    def __init__(self, runs, page_size=2):
+        self.client = LangSmithClient(api_key="test", project_id="proj")
+        self.runs = list(runs)
+        self.page_size = page_size
+        self.payloads = []
+        self.client._request_with_retry = self.request
+
+    def request(self, method, url, **kwargs):
+        payload = kwargs.get('json') or {}
+        if 'start_time' not in payload:
+            return FakeResponse({'runs': []})  # run figli del trace
+        self.payloads.append(payload)
+        since = datetime.fromisoformat(payload['start_time'])
+        matching = [r for r in self.runs if datetime.fromisoformat(r['start_time'].rstrip('Z')) >= since]
+        index = int(payload.get('cursor') or 0)
+        page = matching[index:index + self.page_size]
+        cursor = str(index + self.page_size) if index + self.page_size < len(matching) else None
+        return FakeResponse({'runs': page, 'cursors': {'next': cursor}})
+
+
+def _poller(api, **kwargs):
+    kwargs.setdefault('poll_interval', 0)
+    kwargs.setdefault('timeout_seconds', 5)
+    return TracePoller(api.client, start_time=T0 - timedelta(minutes=1), **kwargs)
+
+
+class TestTraceAttribution:
+    """Test attribuzione trace -> test"""
+
+    def test_shared_prefix_is_not_confused(self):
+        """Due domande con gli stessi primi 50 caratteri ricevono il proprio trace"""
+        prefix = "Vorrei sapere quali sono gli orari di apertura del negozio "
+        api = FakeLangSmith([
+            _run('t-centro', prefix + "in centro", 1),
+            _run('t-stazione', prefix + "in stazione", 2),
+        ])
+        poller = _poller(api)
+
+        stazione = poller.request(prefix + "in stazione", T0)
+        centro = poller.request(prefix + "in centro", T0)
+        poller.poll_once()
+
+        assert stazione.result(0).id == 't-stazione'
+        assert centro.result(0).id == 't-centro'
+
+    def test_repeated_question_assigned_in_send_order(self):
+        """Stessa domanda inviata più volte: trace distinti, in ordine di invio"""
+        api = FakeLangSmith([
+            _run('old', "Ciao", -120),
+            _run('first', "ciao ", 1),
+            _run('second', "Ciao", 31),
+        ])
+        poller = _poller(api)
+
+        later = poller.request("Ciao", T0 + timedelta(seconds=30))
+        earlier = poller.request("Ciao", T0)
+        poller.poll_once()
+
+        assert earlier.result(0).id == 'first'
+        assert later.result(0).id == 'second'
+
+    def test_aware_and_naive_timestamps(self):
+        api = FakeLangSmith([_run('t1', "Orari?", 1)])
+        api.runs[0]['start_time'] = (T0 + timedelta(seconds=1)).isoformat() + 'Z'
+        poller = _poller(api)
+
+        future = poller.request("Orari?", T0.replace(tzinfo=timezone.utc))
+        poller.poll_once()
+
+        assert future.result(0).id == 't1'
+
+    def test_timeout_falls_back_to_containment(self):
+        """Input incapsulato dal backend: match per contenimento alla scadenza"""
+        api = FakeLangSmith([_run('wrapped', "[system] Utente: Quali sono gli orari?", 1)])
+        poller = _poller(api, timeout_seconds=0)
+
+        assert poller.wait("Quali sono gli orari?", T0).id == 'wrapped'
+        assert poller.wait("Domanda mai arrivata", T0) is None
+
+
+    def test_containment_resolves_on_poll(self):
+        """Input incapsulato: risolto al primo poll, senza attendere la scadenza"""
+        api = FakeLangSmith([_run('wrapped', "{'input': 'Quali sono gli orari?', 'lang': 'it'}", 1)])
+        poller = _poller(api, timeout_seconds=60)
+
+        future = poller.request("Quali sono gli orari?", T0)
+        assert not future.done()  # nessun poll ancora
+        poller.poll_once()
+
+        assert future.result(0).id == 'wrapped'
+
+    def test_exact_match_wins_over_containment(self):
+        api = FakeLangSmith([
+            _run('longer', "Ciao, quali sono gli orari?", 1),
+            _run('exact', "Ciao", 2),
+        ])
+        poller = _poller(api, timeout_seconds=60)
+
+        future = poller.request("Ciao", T0)
+        poller.poll_once()
+
+        assert future.result(0).id == 'exact'
+
+    def test_missing_trace_gives_up_after_grace(self):
+        api = FakeLangSmith([])
+        poller = _poller(api, poll_interval=0.01, timeout_seconds=0.1)
+
+        start = time.monotonic()
+        assert poller.wait("Domanda senza trace", T0) is None
+        assert time.monotonic() - start < 1
+        assert TracePoller(api.client).timeout_seconds == TracePoller.GRACE_SECONDS <= 10
+
+
+class TestTracePolling:
+    """Test flusso incrementale delle query"""
+
+    def test_many_waiters_share_one_stream(self):
+        """25 test in attesa: una sola paginazione, nessuna query per test"""
+        questions = [f"domanda {i}" for i in range(25)]
+        api = FakeLangSmith([_run(f"t{i}", q, i) for i, q in enumerate(questions)], page_size=10)
+        poller = _poller(api)
+
+        futures = [poller.request(q, T0) for q in questions]
+        poller.poll_once()
+
+        assert [f.result(0).id for f in futures] == [f"t{i}" for i in range(25)]
+        assert len(api.payloads) == 3  # 25 run > limite 20 del vecchio percorso
+        assert all(p['is_root'] and p['session'] == ['proj'] for p in api.payloads)
+
+    def test_cursor_moves_forward_with_overlap(self):
+        api = FakeLangSmith([_run('t1', "prima", 0)])
+        poller = _poller(api)
+
+        poller.poll_once()
+        api.runs.append(_run('t2', "seconda", 100))
+        poller.poll_once()
+        api.payloads.clear()
+        poller.poll_once()
+
+        since = datetime.fromisoformat(api.payloads[0]['start_time'])
+        assert since == T0 + timedelta(seconds=100 - TracePoller.OVERLAP_SECONDS)
+        assert poller.indexed == 2
+
+    def test_background_thread_resolves_futures(self):
+        api = FakeLangSmith([_run('t1', "Orari?", 1)])
+        poller = _poller(api, poll_interval=0.01)
+        poller.start()
+        try:
+            future = poller.request("Orari?", T0)
+            assert future.result(timeout=2).id == 't1'
+        finally:
+            poller.stop()
+        assert not poller.running
+
+
+class TestClientIntegration:
+    """Test integrazione con LangSmithClient"""
+
+    def test_report_with_sent_at_uses_poller(self):
+        api = FakeLangSmith([_run('t1', "Orari?", 1)])
+
+        report = api.client.get_report_for_question("Orari?", sent_at=T0)
+        api.client.close()
+
+        assert report.trace_url.endswith('t1')
+        assert api.client._poller is None
+
+    def test_question_sent_at_from_conversation(self):
+        conversation = [
+            ConversationTurn(role='user', content="Orari?", timestamp=T0.isoformat()),
+            ConversationTurn(role='assistant', content="9-18", timestamp=(T0 + timedelta(seconds=3)).isoformat()),
+        ]
+
+        assert question_sent_at(conversation) == T0
+        assert question_sent_at([]) is None
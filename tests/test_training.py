@@ -0,0 +1,118 @@
+"""
+Unit Tests - Training
+
+Testa il matcher compilato dei pattern (prefiltro Aho-Corasick sui
+letterali, stesso risultato della scansione sequenziale) e l'indice
+delle risposte apprese.
+"""
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.pattern_matcher import AhoCorasick, required_literals
+from src.training import LearnedResponse, Pattern, TrainingData
+
+
+def _sequential(training, message):
+    """Scansione originale: ogni regex di ogni pattern, in ordine"""
+    msg_lower = message.lower()
+    for pattern in training.patterns:
+        if any(re.search(regex, msg_lower) for regex in pattern.bot_patterns):
+            return pattern
+    return None
+
+
+class TestRequiredLiterals:
+    """Test estrazione letterali obbligatori"""
+
+    def test_literals_from_regex(self):
+        assert required_literals(r"select.{0,20}country") == {"country"}
+        assert required_literals(r"(yes|no)\??$") == {"yes", "no"}
+        assert required_literals(r"(your )?(full )?name") == {"name"}
+        assert required_literals(r"(e-?mail|email address)") == {"mail", "mail address"}
+
+    def test_no_literal_means_always_checked(self):
+        assert required_literals(r"\d+") is None
+        assert required_literals(r"(?i)country") is None
+        assert required_literals(r"(country") is None
+
+    def test_aho_corasick_overlapping_keys(self):
+        automaton = AhoCorasick({"email": [0], "mail": [1], "address": [2]})
+
+        assert automaton.search("your e-mail please") == {1}
+        assert automaton.search("email address") == {0, 1, 2}
+
+
+class TestPatternMatcher:
+    """Test matcher compilato"""
+
+    def test_same_result_as_sequential_scan(self):
+        training = TrainingData()
+        for i in range(200):
+            training.add_custom_pattern(f"c{i}", f"c{i}", [f"order {i} status", rf"ticket\s+#?{i}\b"])
+        training.add_custom_pattern("digits", "digits", [r"\d{5}"])
+
+        messages = [
+            "Which country are you in?",
+            "What's your name? Shall I proceed?",
+            "Your order 17 status is shipped",
+            "Please quote ticket #42",
+            "Reference 98765",
+            "Hello there",
+        ]
+        for message in messages:
+            assert training.match_pattern(message) is _sequential(training, message), message
+
+    def test_first_pattern_in_order_wins(self):
+        training = TrainingData()
+        # "name" viene prima nel messaggio, ma "confirmation" prima nella lista
+        assert training.match_pattern("Your name? Shall I proceed?").id == "confirmation"
+
+    def test_custom_patterns_invalidate_matcher(self):
+        training = TrainingData()
+        assert training.match_pattern("Pick a shipping slot") is None
+
+        training.add_custom_pattern("slot", "slot", ["shipping slot"])
+        assert training.match_pattern("Pick a shipping slot").id == "slot"
+
+        training.add_custom_pattern("slot", "slot", ["delivery window"])
+        assert training.match_pattern("Choose a delivery window").id == "slot"
+
+    def test_invalid_regex_is_skipped(self):
+        training = TrainingData()
+        training.add_custom_pattern("broken", "broken", ["(unclosed", "valid phrase"])
+
+        assert training.match_pattern("a valid phrase").id == "broken"
+
+
+class TestLearnedResponses:
+    """Test indice e ordinamento risposte"""
+
+    def test_case_insensitive_dedup_and_top_k(self):
+        pattern = Pattern(id="country", name="country", bot_patterns=["country"])
+        for text in ["Italy", "France", "italy", "Spain", "ITALY", "france"]:
+            pattern.add_response(text)
+
+        assert [(r.text, r.count) for r in pattern.get_suggestions(2)] == [("Italy", 3), ("France", 2)]
+        assert [r.text for r in pattern.responses] == ["Italy", "France", "Spain"]
+
+    def test_learn_reports_new_responses(self):
+        training = TrainingData()
+
+        assert training.learn("Which country?", "Italy")[1] is True
+        assert training.learn("Which country?", "italy")[1] is False
+        assert training.get_suggestions("Which country?") == [{'text': "Italy", 'count': 2, 'pattern': "country"}]
+
+    def test_loaded_responses_are_ordered(self, tmp_path):
+        training = TrainingData()
+        pattern = training.match_pattern("Which country?")
+        pattern.responses = [LearnedResponse("Spain", 1), LearnedResponse("Italy", 5)]
+        path = tmp_path / "training_data.json"
+        training.save(path)
+
+        loaded = TrainingData.load(path).match_pattern("Which country?")
+
+        assert [r.text for r in loaded.get_suggestions()] == ["Italy", "Spain"]
+        assert loaded.get_response("SPAIN").count == 1
@@ -13,6 +13,7 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.export import RunReport, ReportExporter, HTMLExporter
+from src import models
 
 
 class TestCSVExport:
@@ -176,3 +177,139 @@ class TestRunReportLoading:
             report = RunReport.from_summary_and_csv(summary_path)
 
         assert report is not None
+
+
+def _synthetic_report(count: int) -> RunReport:
+    tests = [
+        models.TestResult(test_id=f"T{i:04d}", status="PASS" if i % 4 else "FAIL", category="Orari",
+                   question=f"domanda {i}", actual_response=f"risposta {i}", score=0.5 if i % 2 else None,
+                   conversation_history=[{'role': 'user', 'content': f"domanda {i}"},
+                                         {'role': 'assistant', 'content': f"risposta {i}"}])
+        for i in range(count)
+    ]
+    failed = sum(1 for t in tests if t.status == "FAIL")
+    return RunReport(project="demo", run_number=7, timestamp="2025-01-01T10:00:00", env="DEV",
+                     prompt_version="v1", model_version="m1", total_tests=count,
+                     passed=count - failed, failed=failed, skipped=0,
+                     pass_rate=100.0 * (count - failed) / count, duration_seconds=60,
+                     tests=tests, regressions=["T0004: PASS -> FAIL"])
+
+
+class TestExcelExport:
+    """Test export Excel (write-only)"""
+
+    def test_sheets_rows_and_styles(self, tmp_path):
+        openpyxl = pytest.importorskip("openpyxl")
+        report = _synthetic_report(250)
+
+        path = ReportExporter(report).to_excel(tmp_path / "report.xlsx")
+        wb = openpyxl.load_workbook(path)
+
+        assert wb.sheetnames == ["Summary", "Results", "Detail"]
+        results = wb["Results"]
+        assert results.max_row == 251
+        assert results["A2"].value == "T0000"
+        assert results["C2"].fill.start_color.rgb.endswith("FFC7CE")
+        assert results["A1"].font.bold
+        assert results.auto_filter.ref == "A1:G251"
+        assert results.column_dimensions["E"].width == 40
+        assert wb["Detail"].max_row == 501
+        assert "A1:D1" in {str(r) for r in wb["Summary"].merged_cells.ranges}
+        summary = {row[0]: row[1] for row in wb["Summary"].iter_rows(values_only=True) if row and row[0]}
+        assert summary["Total Tests"] == 250
+        assert "T0004: PASS -> FAIL" in summary
+
+
+class TestExportAll:
+    """Test export_all in parallelo"""
+
+    def test_parallel_matches_sequential(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(ReportExporter, "PARALLEL_MIN_TESTS", 0)
+        monkeypatch.setattr(ReportExporter, "POOL_FORMATS", ("html",))
+        report = _synthetic_report(30)
+        exporter = ReportExporter(report)
+
+        parallel = exporter.export_all(tmp_path / "parallel")
+        sequential = exporter.export_all(tmp_path / "sequential", parallel=False)
+
+        assert list(parallel) == list(sequential)
+        assert {"html", "csv"} <= set(parallel)
+        for fmt in parallel:
+            assert parallel[fmt].exists() and parallel[fmt].stat().st_size > 0
+        assert parallel["csv"].read_text(encoding="utf-8") == sequential["csv"].read_text(encoding="utf-8")
+
+    def test_falls_back_without_process_pool(self, tmp_path, monkeypatch, capsys):
+        from src import export as export_module
+
+        monkeypatch.setattr(ReportExporter, "PARALLEL_MIN_TESTS", 0)
+        monkeypatch.setattr(ReportExporter, "POOL_FORMATS", ("html",))
+
+        def no_pool(*args, **kwargs):
+            raise OSError("no semaphores")
+
+        monkeypatch.setattr(export_module, "ProcessPoolExecutor", no_pool)
+
+        results = ReportExporter(_synthetic_report(3)).export_all(tmp_path)
+
+        assert results["html"].exists() and results["csv"].exists()
+        assert "sequentially" in capsys.readouterr().out
+
+    def test_no_pool_without_slow_formats(self, tmp_path, monkeypatch):
+        from src import export as export_module
+
+        monkeypatch.setattr(ReportExporter, "PARALLEL_MIN_TESTS", 0)
+        monkeypatch.setattr(ReportExporter, "POOL_FORMATS", ("missing",))
+
+        def no_pool(*args, **kwargs):
+            raise AssertionError("pool started for fast formats")
+
+        monkeypatch.setattr(export_module, "ProcessPoolExecutor", no_pool)
+
+        results = ReportExporter(_synthetic_report(3)).export_all(tmp_path)
+
+        assert results["html"].exists() and results["csv"].exists()
+
+    def test_broken_pool_redoes_only_unfinished_formats(self, tmp_path, monkeypatch, capsys):
+        from concurrent.futures import Future
+        from concurrent.futures.process import BrokenProcessPool
+
+        from src import export as export_module
+
+        calls = []
+        real_export = export_module._export_format
+
+        def counting_export(report, fmt, path):
+            calls.append(fmt)
+            return real_export(report, fmt, path)
+
+        class DyingPool:
+            """Il worker dell'HTML muore, gli altri formati finiscono"""
+
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def submit(self, fn, report, fmt, path):
+                future = Future()
+                if fmt == "html":
+                    future.set_exception(BrokenProcessPool("worker died"))
+                else:
+                    future.set_result(fn(report, fmt, path))
+                return future
+
+        monkeypatch.setattr(ReportExporter, "PARALLEL_MIN_TESTS", 0)
+        monkeypatch.setattr(ReportExporter, "POOL_FORMATS", ("csv",))
+        monkeypatch.setattr(export_module, "_export_format", counting_export)
+        monkeypatch.setattr(export_module, "ProcessPoolExecutor", DyingPool)
+
+        results = ReportExporter(_synthetic_report(3)).export_all(tmp_path)
+
+        assert sorted(calls) == sorted(results)
+        assert calls[-1] == "html"
+        assert results["html"].exists() and results["csv"].exists()
+        assert "html sequentially" in capsys.readouterr().out